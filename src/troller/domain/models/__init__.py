@@ -1,5 +1,37 @@
 """Domain models."""
 
-from troller.domain.models.plan import Plan, PlanStep
+from troller.domain.models.ci import (
+    CheckResult,
+    CommitChecks,
+    FailureDigest,
+    SignatureMatch,
+    StepFailure,
+)
+from troller.domain.models.issue import IssueComment, IssueSnapshot, LinkedPullRequest
+from troller.domain.models.plan import CompletionDelta, Plan, PlanStep
+from troller.domain.models.plan_index import PlanIndex
+from troller.domain.models.replan import (
+    CommitSummary,
+    PlanChanges,
+    PlanRevision,
+    StepEdit,
+)
 
-__all__ = ["Plan", "PlanStep"]
+__all__ = [
+    "CheckResult",
+    "CommitChecks",
+    "CommitSummary",
+    "CompletionDelta",
+    "FailureDigest",
+    "IssueComment",
+    "IssueSnapshot",
+    "LinkedPullRequest",
+    "Plan",
+    "PlanChanges",
+    "PlanIndex",
+    "PlanRevision",
+    "PlanStep",
+    "SignatureMatch",
+    "StepEdit",
+    "StepFailure",
+]
@@ -0,0 +1,122 @@
+"""Domain model for CI/CD results and failure digests.
+
+Pure business logic with no external dependencies.
+"""
+
+from dataclasses import dataclass
+
+# Rollup states after which no check on the commit will change any more.
+FINAL_STATES = frozenset({"SUCCESS", "FAILURE", "ERROR"})
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """One check run or commit status reported for a commit.
+
+    Attributes:
+        name: Check run name or status context.
+        status: 'QUEUED', 'IN_PROGRESS', 'PENDING', 'COMPLETED' and similar.
+        conclusion: 'SUCCESS', 'FAILURE' and similar once completed, else None.
+    """
+
+    name: str
+    status: str
+    conclusion: str | None
+
+    @property
+    def running(self) -> bool:
+        """Whether the check is queued or in progress."""
+        return self.status != "COMPLETED"
+
+
+@dataclass(frozen=True)
+class CommitChecks:
+    """Combined CI/CD result of a commit.
+
+    Attributes:
+        owner: Repository owner (user or organization).
+        repo: Repository name.
+        sha: Commit SHA.
+        state: Rollup state, e.g. 'PENDING' or 'SUCCESS'; None while no check
+            has reported.
+        checks: Individual check runs and statuses.
+    """
+
+    owner: str
+    repo: str
+    sha: str
+    state: str | None
+    checks: tuple[CheckResult, ...]
+
+    @property
+    def completed(self) -> bool:
+        """Whether every check has finished."""
+        return self.state in FINAL_STATES
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether every check has finished successfully."""
+        return self.state == "SUCCESS"
+
+    @property
+    def running(self) -> bool:
+        """Whether any check is queued or in progress."""
+        return any(check.running for check in self.checks)
+
+
+@dataclass(frozen=True)
+class SignatureMatch:
+    """A log line matching a known failure signature.
+
+    Attributes:
+        signature: Name of the signature, e.g. 'pytest_failure'.
+        category: 'code' for failures the change caused, 'environment' for
+            infrastructure problems worth retrying.
+        line: The matching log line.
+    """
+
+    signature: str
+    category: str
+    line: str
+
+
+@dataclass(frozen=True)
+class StepFailure:
+    """Log excerpt of one failed job step.
+
+    Attributes:
+        job: Job name.
+        step: Step name, or None if only the whole job log was available.
+        tail: Last lines of the log.
+        matches: Lines matching failure signatures, in log order.
+    """
+
+    job: str
+    step: str | None
+    tail: tuple[str, ...]
+    matches: tuple[SignatureMatch, ...]
+
+
+@dataclass(frozen=True)
+class FailureDigest:
+    """Compact summary of why a workflow run failed.
+
+    Attributes:
+        run_id: GitHub Actions workflow run ID.
+        failures: One entry per failed step.
+    """
+
+    run_id: int
+    failures: tuple[StepFailure, ...]
+
+    @property
+    def categories(self) -> frozenset[str]:
+        """Categories of every matched signature."""
+        return frozenset(
+            match.category for failure in self.failures for match in failure.matches
+        )
+
+    @property
+    def environment_only(self) -> bool:
+        """Whether every matched signature points at the environment."""
+        return self.categories == {"environment"}
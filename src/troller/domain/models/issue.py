@@ -0,0 +1,75 @@
+"""Domain model for GitHub issue snapshots.
+
+Pure business logic with no external dependencies.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class IssueComment:
+    """A comment on an issue.
+
+    Attributes:
+        author: Login of the comment author, None for deleted accounts.
+        body: Comment text.
+        created_at: When the comment was posted.
+    """
+
+    author: str | None
+    body: str
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class LinkedPullRequest:
+    """A pull request connected to or referencing an issue.
+
+    Attributes:
+        number: Pull request number.
+        title: Pull request title.
+        state: 'OPEN', 'CLOSED' or 'MERGED'.
+        head_ref: Name of the pull request's head branch.
+        head_sha: Latest commit on the head branch.
+    """
+
+    number: int
+    title: str
+    state: str
+    head_ref: str
+    head_sha: str | None
+
+
+@dataclass(frozen=True)
+class IssueSnapshot:
+    """Immutable snapshot of everything the planning agent reads from an issue.
+
+    Unlike a lazy PyGithub Issue, a snapshot never triggers further API calls
+    and serializes compactly into workflow history.
+
+    Attributes:
+        owner: Repository owner (user or organization).
+        repo: Repository name.
+        number: Issue number.
+        title: Issue title.
+        body: Issue body, empty if none.
+        state: 'OPEN' or 'CLOSED'.
+        author: Login of the issue author, None for deleted accounts.
+        labels: Label names.
+        comments: All comments, oldest first.
+        linked_pull_requests: Pull requests connected to or referencing the issue.
+        latest_commit_sha: Head commit of the repository's default branch.
+    """
+
+    owner: str
+    repo: str
+    number: int
+    title: str
+    body: str
+    state: str
+    author: str | None
+    labels: tuple[str, ...]
+    comments: tuple[IssueComment, ...]
+    linked_pull_requests: tuple[LinkedPullRequest, ...]
+    latest_commit_sha: str | None
@@ -3,12 +3,12 @@
 Pure business logic with no external dependencies.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Any, Literal
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlanStep:
     """A single step in an implementation plan.
 
@@ -26,8 +26,31 @@ class PlanStep:
     related_files: list[str] | None = None
     estimated_complexity: Literal["simple", "moderate", "complex"] | None = None
 
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize this step to a JSON-compatible dictionary."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "completed": self.completed,
+            "related_files": (
+                list(self.related_files) if self.related_files is not None else None
+            ),
+            "estimated_complexity": self.estimated_complexity,
+        }
 
-@dataclass(frozen=True)
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PlanStep":
+        """Deserialize a step produced by to_dict."""
+        return cls(
+            id=data["id"],
+            description=data["description"],
+            completed=data["completed"],
+            related_files=data.get("related_files"),
+            estimated_complexity=data.get("estimated_complexity"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
 class Plan:
     """Implementation plan generated by the planning agent.
 
@@ -46,3 +69,96 @@ class Plan:
     metadata: dict[str, Any]
     technical_approach: str | None = None
     testing_strategy: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize this plan to a JSON-compatible dictionary.
+
+        Metadata values must themselves be JSON-compatible.
+        """
+        return {
+            "summary": self.summary,
+            "steps": [step.to_dict() for step in self.steps],
+            "created_at": self.created_at.isoformat(),
+            "metadata": dict(self.metadata),
+            "technical_approach": self.technical_approach,
+            "testing_strategy": self.testing_strategy,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Plan":
+        """Deserialize a plan produced by to_dict."""
+        return cls(
+            summary=data["summary"],
+            steps=[PlanStep.from_dict(step) for step in data["steps"]],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            metadata=dict(data["metadata"]),
+            technical_approach=data.get("technical_approach"),
+            testing_strategy=data.get("testing_strategy"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CompletionDelta:
+    """Step-completion changes between two versions of the same plan.
+
+    Bit i of completed is set when step i became completed, and bit i of
+    reopened when it stopped being completed, so the delta stays a few bytes
+    regardless of how large the plan is. The masks carry target states
+    rather than toggles, so applying a delta more than once, e.g. after an
+    activity retry or a replayed signal, has the same effect as applying it
+    once.
+
+    Attributes:
+        step_count: Number of steps in the plan the delta applies to.
+        completed: Bitmask of step positions to mark completed.
+        reopened: Bitmask of step positions to mark not completed.
+    """
+
+    step_count: int
+    completed: int = 0
+    reopened: int = 0
+
+    @classmethod
+    def between(cls, before: Plan, after: Plan) -> "CompletionDelta":
+        """Compute the completion changes that turn before into after.
+
+        Raises:
+            ValueError: If the plans do not have the same step IDs in order.
+        """
+        if [step.id for step in before.steps] != [step.id for step in after.steps]:
+            raise ValueError("plans must have the same steps in the same order")
+        completed = reopened = 0
+        for position, (old, new) in enumerate(
+            zip(before.steps, after.steps, strict=True)
+        ):
+            if old.completed != new.completed:
+                if new.completed:
+                    completed |= 1 << position
+                else:
+                    reopened |= 1 << position
+        return cls(step_count=len(before.steps), completed=completed, reopened=reopened)
+
+    def apply(self, plan: Plan) -> Plan:
+        """Return plan with the recorded completion flags set.
+
+        Raises:
+            ValueError: If plan does not have step_count steps.
+        """
+        if len(plan.steps) != self.step_count:
+            raise ValueError(
+                f"delta is for {self.step_count} steps, plan has {len(plan.steps)}"
+            )
+        changed = False
+        steps = []
+        for position, step in enumerate(plan.steps):
+            if self.completed >> position & 1:
+                target = True
+            elif self.reopened >> position & 1:
+                target = False
+            else:
+                target = step.completed
+            if target != step.completed:
+                step = replace(step, completed=target)
+                changed = True
+            steps.append(step)
+        return replace(plan, steps=steps) if changed else plan
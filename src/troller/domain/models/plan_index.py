@@ -0,0 +1,189 @@
+"""Indexed, immutable view over a plan's progress.
+
+Pure business logic with no external dependencies.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import replace
+from types import MappingProxyType
+
+from troller.domain.models.plan import CompletionDelta, Plan, PlanStep
+
+
+class PlanIndex:
+    """Plan with a completion bitset and an inverted file-to-step index.
+
+    Progress counters, next-pending lookup and file queries avoid scanning
+    the step list. Updates return a new index that shares the step list and
+    lookup tables with the original; only the completion bitset is replaced,
+    and the plan itself is rebuilt only when to_plan is called.
+    """
+
+    __slots__ = (
+        "_base",
+        "_base_completed",
+        "_completed",
+        "_completed_count",
+        "_files",
+        "_positions",
+    )
+
+    def __init__(
+        self,
+        base: Plan,
+        positions: Mapping[str, int],
+        files: Mapping[str, tuple[int, ...]],
+        base_completed: int,
+        completed: int,
+    ) -> None:
+        """Initialize from prebuilt tables; use from_plan instead."""
+        self._base = base
+        self._positions = positions
+        self._files = files
+        self._base_completed = base_completed
+        self._completed = completed
+        self._completed_count = completed.bit_count()
+
+    @classmethod
+    def from_plan(cls, plan: Plan) -> "PlanIndex":
+        """Index a plan.
+
+        Args:
+            plan: Plan to index.
+
+        Returns:
+            Index reflecting the plan's current completion flags.
+
+        Raises:
+            ValueError: If two steps share an ID.
+        """
+        positions: dict[str, int] = {}
+        files: dict[str, list[int]] = {}
+        completed = 0
+        for position, step in enumerate(plan.steps):
+            if step.id in positions:
+                raise ValueError(f"duplicate step id {step.id!r}")
+            positions[step.id] = position
+            for path in dict.fromkeys(step.related_files or ()):
+                files.setdefault(path, []).append(position)
+            if step.completed:
+                completed |= 1 << position
+        return cls(
+            plan,
+            MappingProxyType(positions),
+            MappingProxyType({path: tuple(p) for path, p in files.items()}),
+            completed,
+            completed,
+        )
+
+    @property
+    def total(self) -> int:
+        """Number of steps in the plan."""
+        return len(self._positions)
+
+    @property
+    def completed_count(self) -> int:
+        """Number of completed steps."""
+        return self._completed_count
+
+    @property
+    def pending_count(self) -> int:
+        """Number of steps not yet completed."""
+        return self.total - self._completed_count
+
+    @property
+    def percent_complete(self) -> float:
+        """Completed share of steps from 0 to 100; an empty plan is complete."""
+        if not self.total:
+            return 100.0
+        return 100.0 * self._completed_count / self.total
+
+    def is_completed(self, step_id: str) -> bool:
+        """Whether the step is completed.
+
+        Raises:
+            KeyError: If the plan has no step with this ID.
+        """
+        return bool(self._completed >> self._positions[step_id] & 1)
+
+    def step(self, step_id: str) -> PlanStep:
+        """Return the step with its current completion flag.
+
+        Raises:
+            KeyError: If the plan has no step with this ID.
+        """
+        return self._step_at(self._positions[step_id])
+
+    def next_pending(self) -> PlanStep | None:
+        """Return the first step in plan order that is not completed."""
+        # The lowest clear bit of the bitset is the lowest set bit of its
+        # complement: ~c & (c + 1).
+        position = (~self._completed & (self._completed + 1)).bit_length() - 1
+        if position >= self.total:
+            return None
+        return self._step_at(position)
+
+    def step_ids_for_file(self, path: str) -> tuple[str, ...]:
+        """IDs of the steps that list path in related_files, in plan order."""
+        return tuple(self._base.steps[p].id for p in self._files.get(path, ()))
+
+    def step_ids_for_files(self, paths: Iterable[str]) -> tuple[str, ...]:
+        """IDs of the steps touching any of paths, in plan order."""
+        positions: set[int] = set()
+        for path in paths:
+            positions.update(self._files.get(path, ()))
+        return tuple(self._base.steps[p].id for p in sorted(positions))
+
+    def with_completed(self, step_id: str, completed: bool = True) -> "PlanIndex":
+        """Return an index with one step's completion flag set.
+
+        Raises:
+            KeyError: If the plan has no step with this ID.
+        """
+        bit = 1 << self._positions[step_id]
+        updated = self._completed | bit if completed else self._completed & ~bit
+        return self._with_bits(updated)
+
+    def apply(self, delta: CompletionDelta) -> "PlanIndex":
+        """Return an index with a completion delta applied.
+
+        Raises:
+            ValueError: If the delta is for a plan with a different step count.
+        """
+        if delta.step_count != self.total:
+            raise ValueError(
+                f"delta is for {delta.step_count} steps, plan has {self.total}"
+            )
+        return self._with_bits((self._completed | delta.completed) & ~delta.reopened)
+
+    def delta(self) -> CompletionDelta:
+        """Completion changes since the plan this index was built from."""
+        return CompletionDelta(
+            step_count=self.total,
+            completed=self._completed & ~self._base_completed,
+            reopened=self._base_completed & ~self._completed,
+        )
+
+    def to_plan(self) -> Plan:
+        """Materialize the plan with current completion flags."""
+        if self._completed == self._base_completed:
+            return self._base
+        return replace(self._base, steps=[self._step_at(p) for p in range(self.total)])
+
+    def _step_at(self, position: int) -> PlanStep:
+        step = self._base.steps[position]
+        completed = bool(self._completed >> position & 1)
+        if step.completed == completed:
+            return step
+        return replace(step, completed=completed)
+
+    def _with_bits(self, completed: int) -> "PlanIndex":
+        if completed == self._completed:
+            return self
+        return PlanIndex(
+            self._base,
+            self._positions,
+            self._files,
+            self._base_completed,
+            completed,
+        )
@@ -0,0 +1,184 @@
+"""Domain model for incremental re-planning.
+
+Pure business logic with no external dependencies.
+"""
+
+import re
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Literal
+
+from troller.domain.models.ci import FailureDigest
+from troller.domain.models.issue import IssueComment
+from troller.domain.models.plan import Plan, PlanStep
+
+# Plan.metadata key holding the highest step number ever assigned, so that
+# IDs of dropped steps are never handed out again.
+LAST_STEP_NUMBER_KEY = "last_step_number"
+
+_STEP_NUMBER = re.compile(r"^step-(\d+)$")
+
+EditAction = Literal["complete", "modify", "insert", "drop"]
+
+
+@dataclass(frozen=True)
+class CommitSummary:
+    """A commit pushed since the previous plan.
+
+    Attributes:
+        sha: Commit SHA.
+        message: Commit message.
+    """
+
+    sha: str
+    message: str
+
+
+@dataclass(frozen=True)
+class PlanChanges:
+    """What happened since a plan was made.
+
+    Attributes:
+        commits: Commits pushed since the plan, oldest first.
+        ci_failures: Digests of CI runs that failed since the plan.
+        comments: Issue comments posted since the plan, oldest first.
+    """
+
+    commits: tuple[CommitSummary, ...] = ()
+    ci_failures: tuple[FailureDigest, ...] = ()
+    comments: tuple[IssueComment, ...] = ()
+
+    @property
+    def empty(self) -> bool:
+        """Whether nothing happened since the plan."""
+        return not (self.commits or self.ci_failures or self.comments)
+
+
+@dataclass(frozen=True, slots=True)
+class StepEdit:
+    """One step-level change to an existing plan.
+
+    Attributes:
+        action: 'complete' marks a step done, 'modify' replaces the given
+            fields of a step, 'insert' adds a new step and 'drop' removes one.
+        step_id: Step to change; for 'insert', the step the new one follows,
+            or None to insert at the start.
+        description: New description; required for 'insert'.
+        related_files: New related files for 'modify' and 'insert'; None
+            leaves a modified step's files as they were.
+        estimated_complexity: New complexity for 'modify' and 'insert'; None
+            leaves a modified step's estimate as it was.
+    """
+
+    action: EditAction
+    step_id: str | None
+    description: str | None = None
+    related_files: list[str] | None = None
+    estimated_complexity: Literal["simple", "moderate", "complex"] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PlanRevision:
+    """Step edits and plan-level changes that turn a plan into its successor.
+
+    Attributes:
+        edits: Edits in the order they are applied.
+        summary: New summary, or None to keep the previous one.
+        technical_approach: New technical approach, or None to keep it.
+        testing_strategy: New testing strategy, or None to keep it.
+    """
+
+    edits: tuple[StepEdit, ...]
+    summary: str | None = None
+    technical_approach: str | None = None
+    testing_strategy: str | None = None
+
+    def apply(self, plan: Plan, created_at: datetime) -> Plan:
+        """Return the plan with the revision applied.
+
+        Untouched steps keep their IDs and contents. Inserted steps get new
+        IDs numbered after every ID the plan has ever used, and steps
+        inserted after the same step keep the order they were given in.
+
+        Args:
+            plan: Plan to revise.
+            created_at: Creation time of the revised plan.
+
+        Returns:
+            The revised plan; its metadata records the last step number.
+
+        Raises:
+            ValueError: If an edit refers to an unknown step or lacks a
+                description it needs.
+        """
+        steps = list(plan.steps)
+        last_number = _last_step_number(plan)
+        # Anchor step ID -> ID of the step most recently inserted after it.
+        inserted_after: dict[str | None, str] = {}
+
+        for edit in self.edits:
+            if edit.action == "insert":
+                if not edit.description:
+                    raise ValueError("insert edits need a description")
+                last_number += 1
+                step = PlanStep(
+                    id=f"step-{last_number}",
+                    description=edit.description,
+                    completed=False,
+                    related_files=edit.related_files,
+                    estimated_complexity=edit.estimated_complexity,
+                )
+                anchor = inserted_after.get(edit.step_id, edit.step_id)
+                position = 0 if anchor is None else _position(steps, anchor) + 1
+                steps.insert(position, step)
+                inserted_after[edit.step_id] = step.id
+                continue
+
+            if edit.step_id is None:
+                raise ValueError(f"{edit.action} edits need a step_id")
+            position = _position(steps, edit.step_id)
+            step = steps[position]
+            if edit.action == "drop":
+                del steps[position]
+            elif edit.action == "complete":
+                steps[position] = replace(step, completed=True)
+            else:
+                steps[position] = replace(
+                    step,
+                    description=edit.description or step.description,
+                    related_files=(
+                        edit.related_files
+                        if edit.related_files is not None
+                        else step.related_files
+                    ),
+                    estimated_complexity=(
+                        edit.estimated_complexity or step.estimated_complexity
+                    ),
+                )
+
+        return replace(
+            plan,
+            summary=self.summary or plan.summary,
+            steps=steps,
+            created_at=created_at,
+            metadata={**plan.metadata, LAST_STEP_NUMBER_KEY: last_number},
+            technical_approach=self.technical_approach or plan.technical_approach,
+            testing_strategy=self.testing_strategy or plan.testing_strategy,
+        )
+
+
+def _last_step_number(plan: Plan) -> int:
+    """Highest step number the plan has used, including dropped steps."""
+    numbers = [
+        int(match.group(1))
+        for step in plan.steps
+        if (match := _STEP_NUMBER.match(step.id)) is not None
+    ]
+    return max([*numbers, int(plan.metadata.get(LAST_STEP_NUMBER_KEY, 0))])
+
+
+def _position(steps: list[PlanStep], step_id: str) -> int:
+    for position, step in enumerate(steps):
+        if step.id == step_id:
+            return position
+    raise ValueError(f"unknown step {step_id!r}")
@@ -0,0 +1,233 @@
+"""Failure extraction from GitHub Actions log archives.
+
+Run logs are a zip archive with one file per job and one per job step. The
+archive is spooled to a temporary file and opened through its central
+directory, so only the members of failed steps are decompressed, and those
+are scanned line by line. Memory use is bounded by the tail kept per step,
+not by the size of the logs.
+"""
+
+import io
+import re
+import zipfile
+from collections import deque
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import IO, Any
+
+from troller.domain.models.ci import FailureDigest, SignatureMatch, StepFailure
+
+DEFAULT_TAIL_LINES = 40
+DEFAULT_MAX_MATCHES = 20
+# Longer lines are cut, so one minified blob cannot dominate the digest.
+MAX_LINE_LENGTH = 500
+
+# Job and step conclusions that count as failed.
+_FAILED_CONCLUSIONS = frozenset({"failure", "timed_out"})
+# Every line starts with an ISO 8601 timestamp; terminal colours are common.
+_TIMESTAMP = re.compile(r"^\ufeff?\d{4}-\d\d-\d\dT[\d:.]+Z ")
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+@dataclass(frozen=True)
+class FailureSignature:
+    """A recognisable kind of CI failure.
+
+    Attributes:
+        name: Identifier reported in SignatureMatch.signature.
+        category: 'code' or 'environment'.
+        pattern: Regular expression searched in each log line.
+    """
+
+    name: str
+    category: str
+    pattern: str
+
+
+DEFAULT_SIGNATURES: tuple[FailureSignature, ...] = (
+    FailureSignature("pytest_failure", "code", r"^(?:FAILED|ERROR) \S+::\S+"),
+    FailureSignature("traceback", "code", r"^Traceback \(most recent call last\)"),
+    FailureSignature("assertion_error", "code", r"\bAssertionError\b"),
+    FailureSignature("syntax_error", "code", r"\b(?:SyntaxError|IndentationError)\b"),
+    FailureSignature("type_error", "code", r"^\S+:\d+: error: .+\[[\w-]+\]$"),
+    FailureSignature("lint_error", "code", r"^\S+:\d+:\d+: [A-Z]+\d+ "),
+    FailureSignature(
+        "network_error",
+        "environment",
+        r"Connection (?:refused|reset|timed out)|Could not resolve host"
+        r"|Temporary failure in name resolution|ECONNRESET|ETIMEDOUT",
+    ),
+    FailureSignature(
+        "rate_limited", "environment", r"429 Too Many Requests|rate limit exceeded"
+    ),
+    FailureSignature("disk_full", "environment", r"No space left on device"),
+    FailureSignature(
+        "out_of_memory",
+        "environment",
+        r"Out of memory|OOMKilled|exit code 137|MemoryError",
+    ),
+    FailureSignature(
+        "runner_lost",
+        "environment",
+        r"runner has received a shutdown signal|lost communication with the server",
+    ),
+    FailureSignature(
+        "timeout", "environment", r"has exceeded the maximum execution time"
+    ),
+)
+
+
+class SignatureIndex:
+    """Failure signatures compiled into a single regular expression.
+
+    One search per line finds the first signature that matches, instead of
+    one search per signature.
+    """
+
+    def __init__(
+        self, signatures: Sequence[FailureSignature] = DEFAULT_SIGNATURES
+    ) -> None:
+        """Compile the signatures.
+
+        Args:
+            signatures: Signatures to recognise, in order of precedence.
+
+        Raises:
+            ValueError: If signatures is empty.
+        """
+        if not signatures:
+            raise ValueError("signatures must not be empty")
+        self._signatures = {
+            f"s{index}": signature for index, signature in enumerate(signatures)
+        }
+        self._pattern = re.compile(
+            "|".join(
+                f"(?P<{group}>{signature.pattern})"
+                for group, signature in self._signatures.items()
+            )
+        )
+
+    def match(self, line: str) -> FailureSignature | None:
+        """Return the signature the line matches, if any."""
+        found = self._pattern.search(line)
+        if found is None or found.lastgroup is None:
+            return None
+        return self._signatures[found.lastgroup]
+
+
+_DEFAULT_INDEX = SignatureIndex()
+
+
+@dataclass(frozen=True)
+class FailedStep:
+    """A failed step located in the jobs listing of a run.
+
+    Attributes:
+        job: Job name.
+        step: Step name, or None if the job failed outside any step.
+        number: Step number, or None together with step.
+    """
+
+    job: str
+    step: str | None
+    number: int | None
+
+
+def failed_steps(jobs: Iterable[dict[str, Any]]) -> list[FailedStep]:
+    """Find the failed steps in a run's jobs listing.
+
+    Args:
+        jobs: The 'jobs' array of the list-jobs-for-a-run REST response.
+
+    Returns:
+        One entry per failed step; a job that failed without a failed step
+        yields one entry without a step.
+    """
+    failed: list[FailedStep] = []
+    for job in jobs:
+        if job.get("conclusion") not in _FAILED_CONCLUSIONS:
+            continue
+        steps = [
+            FailedStep(job["name"], step["name"], step["number"])
+            for step in job.get("steps") or []
+            if step.get("conclusion") in _FAILED_CONCLUSIONS
+        ]
+        failed.extend(steps or [FailedStep(job["name"], None, None)])
+    return failed
+
+
+def _clean(line: str) -> str:
+    line = _ANSI_ESCAPE.sub("", _TIMESTAMP.sub("", line.rstrip("\r\n")))
+    return line[:MAX_LINE_LENGTH]
+
+
+def _find_member(names: Sequence[str], failed: FailedStep) -> str | None:
+    """Locate the log of a failed step, falling back to the whole job log."""
+    if failed.number is not None:
+        prefix = f"{failed.job}/{failed.number}_"
+        for name in names:
+            if name.startswith(prefix) and name.endswith(".txt"):
+                return name
+    suffix = f"_{failed.job}.txt"
+    for name in names:
+        if "/" not in name and name.endswith(suffix):
+            return name
+    return None
+
+
+def _scan(
+    lines: Iterable[str], index: SignatureIndex, tail_lines: int, max_matches: int
+) -> tuple[tuple[str, ...], tuple[SignatureMatch, ...]]:
+    tail: deque[str] = deque(maxlen=tail_lines)
+    matches: list[SignatureMatch] = []
+    seen: set[tuple[str, str]] = set()
+    for raw in lines:
+        line = _clean(raw)
+        tail.append(line)
+        if len(matches) >= max_matches:
+            continue
+        signature = index.match(line)
+        if signature is not None and (signature.name, line) not in seen:
+            seen.add((signature.name, line))
+            matches.append(SignatureMatch(signature.name, signature.category, line))
+    return tuple(tail), tuple(matches)
+
+
+def digest_archive(
+    run_id: int,
+    archive: IO[bytes],
+    failed: Sequence[FailedStep],
+    index: SignatureIndex | None = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    max_matches: int = DEFAULT_MAX_MATCHES,
+) -> FailureDigest:
+    """Build a failure digest from a run's log archive.
+
+    Args:
+        run_id: Workflow run ID.
+        archive: Seekable file holding the zip archive.
+        failed: Failed steps to extract, from failed_steps.
+        index: Signatures to match; defaults to DEFAULT_SIGNATURES.
+        tail_lines: Lines kept from the end of each step log.
+        max_matches: Signature matches kept per step.
+
+    Returns:
+        Tail lines and signature matches of every failed step whose log is
+        in the archive.
+
+    Raises:
+        zipfile.BadZipFile: If archive is not a zip archive.
+    """
+    index = index or _DEFAULT_INDEX
+    failures: list[StepFailure] = []
+    with zipfile.ZipFile(archive) as logs:
+        names = logs.namelist()
+        for step in failed:
+            member = _find_member(names, step)
+            if member is None:
+                continue
+            with logs.open(member) as raw:
+                text = io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+                tail, matches = _scan(text, index, tail_lines, max_matches)
+            failures.append(StepFailure(step.job, step.step, tail, matches))
+    return FailureDigest(run_id, tuple(failures))
@@ -0,0 +1,334 @@
+"""Shared CI/CD poller for every active workflow in a worker process.
+
+Instead of every workflow polling GitHub Actions on its own timer, workflows
+register interest in a (repository, head SHA) pair. The poller fetches the
+checks of all watched commits in a repository with one GraphQL query, polls
+quickly while runs are queued or in progress and backs off while nothing is
+happening, and hands each completed result to the waiting workflows, e.g. as
+a Temporal signal. A failed poll of one repository, whatever the error, backs
+that repository off without affecting the others, and a result that could not
+be delivered is watched again and redelivered on a later poll.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from temporalio.client import Client
+
+from troller.domain.models.ci import CommitChecks
+from troller.worker.adapters.github_client import GitHubClient
+from troller.worker.adapters.github_graphql import validate_commit_sha
+
+_log = logging.getLogger(__name__)
+
+# Signal sent to a workflow when the commit it waits on finishes CI.
+CI_COMPLETED_SIGNAL = "ci_completed"
+
+CompletionHandler = Callable[[str, CommitChecks], Awaitable[None]]
+"""Receives the ID of a waiting workflow and the completed checks."""
+
+_RepoKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """How often repositories are polled.
+
+    Attributes:
+        active_interval_seconds: Interval while any watched run is queued or
+            in progress, and for the first poll after a registration.
+        max_interval_seconds: Longest interval while nothing is running.
+        backoff_factor: Growth of the interval per idle or failed poll.
+    """
+
+    active_interval_seconds: float = 15.0
+    max_interval_seconds: float = 300.0
+    backoff_factor: float = 2.0
+
+
+@dataclass(frozen=True)
+class PollerStats:
+    """Counters for a CIPoller.
+
+    Attributes:
+        repositories: Repositories with at least one watched commit.
+        commits: Watched commits.
+        polls: Repository polls made.
+        notifications: Completion results delivered to workflows.
+        errors: Failed polls and failed deliveries.
+    """
+
+    repositories: int
+    commits: int
+    polls: int
+    notifications: int
+    errors: int
+
+
+@dataclass
+class _RepoSchedule:
+    next_poll: float
+    interval: float
+
+
+def signal_workflows(
+    client: Client, signal: str = CI_COMPLETED_SIGNAL
+) -> CompletionHandler:
+    """Build a completion handler that signals the waiting workflow.
+
+    Args:
+        client: Temporal client used to signal workflows.
+        signal: Name of the signal; its argument is the CommitChecks.
+
+    Returns:
+        Handler for CIPoller.
+    """
+
+    async def handler(workflow_id: str, checks: CommitChecks) -> None:
+        await client.get_workflow_handle(workflow_id).signal(signal, checks)
+
+    return handler
+
+
+class CIPoller:
+    """Polls CI/CD results of watched commits on behalf of many workflows.
+
+    Registration is thread-safe, so synchronous activities can register
+    while the poller runs on an event loop.
+    """
+
+    def __init__(
+        self,
+        client: GitHubClient,
+        on_complete: CompletionHandler,
+        policy: PollPolicy | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the poller.
+
+        Args:
+            client: GitHub client used for the batched check queries.
+            on_complete: Called once per waiting workflow when a commit's
+                checks complete.
+            policy: Polling intervals; defaults to PollPolicy().
+            clock: Monotonic time source.
+        """
+        self._client = client
+        self._on_complete = on_complete
+        self._policy = policy or PollPolicy()
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Repository -> commit SHA -> IDs of the workflows waiting on it.
+        self._watches: dict[_RepoKey, dict[str, set[str]]] = {}
+        self._schedules: dict[_RepoKey, _RepoSchedule] = {}
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._polls = 0
+        self._notifications = 0
+        self._errors = 0
+
+    def stats(self) -> PollerStats:
+        """Return what the poller is watching and has done so far."""
+        with self._lock:
+            return PollerStats(
+                repositories=len(self._watches),
+                commits=sum(len(shas) for shas in self._watches.values()),
+                polls=self._polls,
+                notifications=self._notifications,
+                errors=self._errors,
+            )
+
+    def register(self, owner: str, repo: str, sha: str, workflow_id: str) -> None:
+        """Start watching a commit for a workflow.
+
+        The repository is polled at the next opportunity and then at the
+        active interval.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            sha: Head commit SHA whose CI/CD result the workflow waits for.
+            workflow_id: Workflow to notify when the checks complete.
+
+        Raises:
+            ValueError: If sha is not a hexadecimal commit SHA, e.g. a branch
+                name.
+        """
+        validate_commit_sha(sha)
+        key = (owner, repo)
+        with self._lock:
+            self._watches.setdefault(key, {}).setdefault(sha, set()).add(workflow_id)
+            self._schedules[key] = _RepoSchedule(
+                next_poll=self._clock(),
+                interval=self._policy.active_interval_seconds,
+            )
+            loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            loop.call_soon_threadsafe(wake.set)
+
+    def unregister(self, owner: str, repo: str, sha: str, workflow_id: str) -> None:
+        """Stop watching a commit for a workflow; unknown watches are ignored.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            sha: Commit SHA passed to register.
+            workflow_id: Workflow passed to register.
+        """
+        with self._lock:
+            self._remove((owner, repo), sha, {workflow_id})
+
+    def next_poll_delay(self) -> float | None:
+        """Seconds until the next repository is due, or None if none is watched."""
+        with self._lock:
+            if not self._schedules:
+                return None
+            next_poll = min(schedule.next_poll for schedule in self._schedules.values())
+        return max(0.0, next_poll - self._clock())
+
+    async def poll_due(self) -> int:
+        """Poll every repository that is due and deliver completed results.
+
+        Returns:
+            Number of workflows notified.
+        """
+        now = self._clock()
+        with self._lock:
+            due = {
+                key: list(self._watches[key])
+                for key, schedule in self._schedules.items()
+                if schedule.next_poll <= now
+            }
+
+        notified = 0
+        for (owner, repo), shas in due.items():
+            try:
+                results = await asyncio.to_thread(
+                    self._client.get_commit_checks, owner, repo, shas
+                )
+            except Exception:  # noqa: BLE001 - one failed repository must not stop the rest
+                _log.exception("Polling checks of %s/%s failed", owner, repo)
+                with self._lock:
+                    self._polls += 1
+                    self._errors += 1
+                    self._reschedule((owner, repo), running=False)
+                continue
+
+            completed = [checks for checks in results.values() if checks.completed]
+            with self._lock:
+                self._polls += 1
+                waiting = {
+                    checks.sha: self._remove((owner, repo), checks.sha)
+                    for checks in completed
+                }
+                self._reschedule(
+                    (owner, repo),
+                    running=any(checks.running for checks in results.values()),
+                )
+            for checks in completed:
+                for workflow_id in sorted(waiting[checks.sha]):
+                    notified += await self._deliver((owner, repo), workflow_id, checks)
+        return notified
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Poll until stop is set.
+
+        Args:
+            stop: Event that ends the loop once set.
+        """
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            wake = self._wake
+        try:
+            while not stop.is_set():
+                await self.poll_due()
+                wake.clear()
+                delay = self.next_poll_delay()
+                waiters = [
+                    asyncio.ensure_future(stop.wait()),
+                    asyncio.ensure_future(wake.wait()),
+                ]
+                try:
+                    await asyncio.wait(
+                        waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+        finally:
+            with self._lock:
+                self._loop = None
+                self._wake = None
+
+    async def _deliver(
+        self, key: _RepoKey, workflow_id: str, checks: CommitChecks
+    ) -> int:
+        """Hand a completed result to one workflow; returns 1 on success.
+
+        On failure the watch is restored, so the result is delivered again
+        after a later poll.
+        """
+        try:
+            await self._on_complete(workflow_id, checks)
+        except Exception:  # noqa: BLE001 - one failed delivery must not stop the rest
+            _log.exception(
+                "Delivering checks of %s to workflow %s failed", checks.sha, workflow_id
+            )
+            with self._lock:
+                self._errors += 1
+                self._requeue(key, checks.sha, workflow_id)
+            return 0
+        with self._lock:
+            self._notifications += 1
+        return 1
+
+    def _remove(
+        self, key: _RepoKey, sha: str, workflow_ids: set[str] | None = None
+    ) -> set[str]:
+        """Drop watches on a commit, all of them if workflow_ids is None.
+
+        Must be called with the lock held. Returns the workflows removed.
+        """
+        shas = self._watches.get(key, {})
+        waiting = shas.get(sha, set())
+        removed = set(waiting) if workflow_ids is None else waiting & workflow_ids
+        waiting -= removed
+        if not waiting:
+            shas.pop(sha, None)
+        if not shas:
+            self._watches.pop(key, None)
+            self._schedules.pop(key, None)
+        return removed
+
+    def _requeue(self, key: _RepoKey, sha: str, workflow_id: str) -> None:
+        """Watch a commit again after its result could not be delivered.
+
+        Must be called with the lock held. A repository that had no other
+        watches is polled again after one backed-off interval.
+        """
+        self._watches.setdefault(key, {}).setdefault(sha, set()).add(workflow_id)
+        if key not in self._schedules:
+            self._schedules[key] = _RepoSchedule(
+                next_poll=self._clock(),
+                interval=self._policy.active_interval_seconds,
+            )
+            self._reschedule(key, running=False)
+
+    def _reschedule(self, key: _RepoKey, running: bool) -> None:
+        """Set the next poll of a repository; must be called with the lock held."""
+        schedule = self._schedules.get(key)
+        if schedule is None:
+            return
+        if running:
+            schedule.interval = self._policy.active_interval_seconds
+        else:
+            schedule.interval = min(
+                schedule.interval * self._policy.backoff_factor,
+                self._policy.max_interval_seconds,
+            )
+        schedule.next_poll = self._clock() + schedule.interval
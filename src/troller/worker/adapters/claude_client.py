@@ -4,13 +4,585 @@ Adapter for interacting with Claude AI via Anthropic SDK.
 """
 
 import os
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, replace
 from datetime import datetime
+from functools import partial
 from typing import Any
 
-from anthropic import Anthropic
-from anthropic.types import MessageParam, ToolParam
+from anthropic import Anthropic, AsyncAnthropic, RateLimitError
+from anthropic.types import (
+    Message,
+    MessageParam,
+    TextBlockParam,
+    ToolParam,
+    Usage,
+)
+from anthropic.types.messages import MessageBatchIndividualResponse
+from anthropic.types.messages.batch_create_params import Request as BatchRequest
 
-from troller.domain.models.plan import Plan, PlanStep
+from troller.domain.models.plan import Plan
+from troller.domain.models.replan import (
+    LAST_STEP_NUMBER_KEY,
+    PlanChanges,
+    PlanRevision,
+    StepEdit,
+)
+from troller.worker.adapters.concurrency import (
+    ConcurrencyLimiter,
+    get_shared_limiter,
+)
+from troller.worker.adapters.context_budget import (
+    ContextBudget,
+    ContextReport,
+    prepare_context,
+)
+from troller.worker.adapters.hedging import Hedger
+from troller.worker.adapters.instrumentation import CallRecord, CallSink, CallTimer
+from troller.worker.adapters.plan_cache import PlanCache, plan_cache_key
+from troller.worker.adapters.plan_stream import (
+    IncrementalPlanParser,
+    PlanStreamEvent,
+    StreamedPlan,
+    StreamedStep,
+    StreamedSummary,
+    plan_step_from_tool_input,
+)
+from troller.worker.adapters.rate_limit import (
+    ANTHROPIC,
+    Priority,
+    RateLimitScheduler,
+)
+from troller.worker.adapters.repo_index import RepositoryContext
+from troller.worker.adapters.singleflight import (
+    SingleFlight,
+    SingleFlightStats,
+    get_shared_flight,
+)
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+DEFAULT_BATCH_POLL_INTERVAL_SECONDS = 60.0
+DEFAULT_BATCH_TIMEOUT_SECONDS = 24 * 60 * 60
+
+PLANNING_MODEL = "claude-opus-4-5-20251101"
+
+# Bump whenever PLANNING_SYSTEM_PROMPT or CREATE_PLAN_TOOL changes so that
+# anything keyed on prompt content (caches, metrics) can tell versions apart.
+PROMPT_VERSION = "1"
+
+PLANNING_SYSTEM_PROMPT = """You are a senior software architect analyzing GitHub issues to create implementation plans.
+
+Your task is to analyze the issue and create a structured implementation plan with:
+- A high-level summary of what needs to be done
+- Ordered implementation steps
+- Technical approach and architecture decisions
+- Testing strategy
+
+Keep plans simple and focused on the issue requirements."""
+
+# Tool schema for structured output
+CREATE_PLAN_TOOL: ToolParam = {
+    "name": "create_plan",
+    "description": "Create a structured implementation plan",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "summary": {
+                "type": "string",
+                "description": "High-level summary of the plan",
+            },
+            "steps": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "description": {"type": "string"},
+                        "completed": {"type": "boolean"},
+                        "related_files": {
+                            "type": ["array", "null"],
+                            "items": {"type": "string"},
+                        },
+                        "estimated_complexity": {
+                            "type": ["string", "null"],
+                            "enum": ["simple", "moderate", "complex", None],
+                        },
+                    },
+                    "required": ["id", "description", "completed"],
+                },
+            },
+            "technical_approach": {
+                "type": ["string", "null"],
+                "description": "Architecture decisions and technical approach",
+            },
+            "testing_strategy": {
+                "type": ["string", "null"],
+                "description": "How to test the implementation",
+            },
+        },
+        "required": ["summary", "steps"],
+    },
+}
+
+# The prompt cache prefix is ordered tools -> system -> messages, so a single
+# breakpoint on the system block caches the tool schema and system prompt
+# together. Only the per-issue user message is billed at full price.
+_PLANNING_TOOLS: list[ToolParam] = [CREATE_PLAN_TOOL]
+_PLANNING_SYSTEM: list[TextBlockParam] = [
+    {
+        "type": "text",
+        "text": PLANNING_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+
+REPLAN_SYSTEM_PROMPT = """You are a senior software architect keeping an implementation plan for a GitHub issue up to date.
+
+You are given the current plan and what happened since it was made: new commits, CI failures and issue comments. Revise the plan with as few step-level edits as possible:
+- complete: the step is done
+- modify: the step needs a different description, files or complexity
+- insert: a new step is needed; give the ID of the step it follows
+- drop: the step is no longer needed
+
+Refer to existing steps by their IDs. Leave steps that are still right untouched, and only restate the summary, technical approach or testing strategy if they changed."""
+
+REVISE_PLAN_TOOL: ToolParam = {
+    "name": "revise_plan",
+    "description": "Revise an existing implementation plan with step-level edits",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "edits": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "action": {
+                            "type": "string",
+                            "enum": ["complete", "modify", "insert", "drop"],
+                        },
+                        "step_id": {
+                            "type": ["string", "null"],
+                            "description": (
+                                "Step to change; for insert, the step the new "
+                                "step follows, or null to insert first"
+                            ),
+                        },
+                        "description": {"type": ["string", "null"]},
+                        "related_files": {
+                            "type": ["array", "null"],
+                            "items": {"type": "string"},
+                        },
+                        "estimated_complexity": {
+                            "type": ["string", "null"],
+                            "enum": ["simple", "moderate", "complex", None],
+                        },
+                    },
+                    "required": ["action", "step_id"],
+                },
+            },
+            "summary": {"type": ["string", "null"]},
+            "technical_approach": {"type": ["string", "null"]},
+            "testing_strategy": {"type": ["string", "null"]},
+        },
+        "required": ["edits"],
+    },
+}
+
+_REPLAN_TOOLS: list[ToolParam] = [REVISE_PLAN_TOOL]
+_REPLAN_SYSTEM: list[TextBlockParam] = [
+    {
+        "type": "text",
+        "text": REPLAN_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+# CI log lines shown per failed step when re-planning.
+_REPLAN_TAIL_LINES = 10
+
+# Plan cache key, context budget and call sink. Concurrent generate_plan
+# calls only coalesce when they would send the same request and record it to
+# the same sink. The key holds the sink itself, so it stays alive, and its
+# identity unique, while the call is in flight.
+PlanFlightKey = tuple[str, ContextBudget, CallSink | None]
+
+
+@dataclass(frozen=True)
+class PlanningRequest:
+    """One issue to plan as part of a batch.
+
+    Attributes:
+        issue_title: Title of the GitHub issue.
+        issue_body: Body/description of the GitHub issue.
+        issue_number: Issue number; must be unique within a batch.
+        repository: Repository files to show the model, or None.
+    """
+
+    issue_title: str
+    issue_body: str
+    issue_number: int
+    repository: RepositoryContext | None = None
+
+
+@dataclass(frozen=True)
+class PlanBatchError:
+    """Why a batched planning request produced no plan.
+
+    Attributes:
+        issue_number: Issue the request was for.
+        error_type: Batch result type ('errored', 'canceled', 'expired'),
+            the API error type for errored results, or 'invalid_output' for
+            a succeeded result without a usable create_plan call.
+        message: Human-readable error description.
+    """
+
+    issue_number: int
+    error_type: str
+    message: str
+
+
+def _read_api_key() -> str:
+    """Read the Anthropic API key from the environment.
+
+    Raises:
+        ValueError: If ANTHROPIC_API_KEY environment variable is not set.
+    """
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY environment variable is required")
+    return api_key
+
+
+def _build_plan_request(
+    issue_title: str,
+    issue_body: str,
+    issue_number: int,
+    budget: ContextBudget,
+    model: str,
+    repository: RepositoryContext | None = None,
+) -> tuple[dict[str, Any], ContextReport]:
+    """Build the messages.create keyword arguments for a planning call.
+
+    The issue body is fitted to the context budget first; the returned report
+    describes what was trimmed. Repository context, if given, follows the
+    issue.
+    """
+    context = prepare_context(issue_body, budget)
+    repository_section = ""
+    if repository is not None and repository.files:
+        repository_section = f"""
+
+{repository.render()}
+
+Prefer these paths for related_files where they apply."""
+    user_message = f"""Analyze this GitHub issue and create an implementation plan:
+
+Issue #{issue_number}: {issue_title}
+
+{context.issue_body}{repository_section}
+
+Create a structured plan with implementation steps."""
+
+    messages: list[MessageParam] = [{"role": "user", "content": user_message}]
+
+    request = {
+        "model": model,
+        "max_tokens": context.max_tokens,
+        "system": _PLANNING_SYSTEM,
+        "messages": messages,
+        "tools": _PLANNING_TOOLS,
+        "tool_choice": {"type": "tool", "name": "create_plan"},
+    }
+    return request, context.report
+
+
+def _plan_cache_key(
+    issue_title: str,
+    issue_body: str,
+    issue_number: int,
+    model: str,
+    repository: RepositoryContext | None = None,
+) -> str:
+    """Cache key for a planning call with the given model and current prompt.
+
+    Repository context is part of the prompt, so it is keyed together with
+    the issue body.
+    """
+    if repository is not None:
+        issue_body = f"{issue_body}\n\n{repository.render()}"
+    return plan_cache_key(issue_title, issue_body, issue_number, model, PROMPT_VERSION)
+
+
+def usage_metadata(usage: Usage) -> dict[str, int]:
+    """Extract token counts, including prompt cache activity, from usage.
+
+    Args:
+        usage: Usage block of an Anthropic Message response.
+
+    Returns:
+        Token counts keyed by usage field name. Cache fields are 0 when the
+        API did not report them.
+    """
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cache_read_input_tokens": usage.cache_read_input_tokens or 0,
+        "cache_creation_input_tokens": usage.cache_creation_input_tokens or 0,
+    }
+
+
+def _record_call(
+    sink: CallSink | None,
+    operation: str,
+    response: Message,
+    issue_number: int,
+    timer: CallTimer | None = None,
+    batch: bool = False,
+) -> CallRecord:
+    """Measure a completed call and send the record to sink, if any."""
+    call = CallRecord.create(
+        operation,
+        response.model,
+        usage_metadata(response.usage),
+        response.stop_reason,
+        wall_seconds=timer.elapsed() if timer is not None else None,
+        time_to_first_token_seconds=(
+            timer.time_to_first_token if timer is not None else None
+        ),
+        issue_number=issue_number,
+        batch=batch,
+        queue_seconds=timer.queue_seconds if timer is not None else None,
+    )
+    if sink is not None:
+        sink.record(call)
+    return call
+
+
+def _parse_plan(
+    response: Message,
+    issue_number: int,
+    call: CallRecord,
+    context: ContextReport | None = None,
+    repository: RepositoryContext | None = None,
+) -> Plan:
+    """Convert a create_plan tool-use response into a Plan domain object."""
+    # Extract the structured output from tool use
+    tool_use = next(block for block in response.content if block.type == "tool_use")
+    plan_data: dict[str, Any] = tool_use.input
+
+    # Convert to domain model
+    steps = [plan_step_from_tool_input(step) for step in plan_data["steps"]]
+
+    metadata: dict[str, Any] = {
+        "issue_number": issue_number,
+        "usage": usage_metadata(response.usage),
+        "call": call.summary(),
+    }
+    if context is not None:
+        metadata["context"] = context.to_metadata()
+    if repository is not None:
+        metadata["repository"] = repository.to_metadata()
+
+    return Plan(
+        summary=str(plan_data["summary"]),
+        steps=steps,
+        created_at=datetime.now(),
+        metadata=metadata,
+        technical_approach=plan_data.get("technical_approach"),
+        testing_strategy=plan_data.get("testing_strategy"),
+    )
+
+
+def _render_plan(plan: Plan) -> str:
+    """Write a plan compactly, one line per step."""
+    lines = [f"Summary: {plan.summary}"]
+    if plan.technical_approach:
+        lines.append(f"Technical approach: {plan.technical_approach}")
+    if plan.testing_strategy:
+        lines.append(f"Testing strategy: {plan.testing_strategy}")
+    lines.append("Steps:")
+    for step in plan.steps:
+        details = [step.description]
+        if step.related_files:
+            details.append(f"files: {', '.join(step.related_files)}")
+        if step.estimated_complexity is not None:
+            details.append(step.estimated_complexity)
+        done = "x" if step.completed else " "
+        lines.append(f"{step.id} [{done}] {' | '.join(details)}")
+    return "\n".join(lines)
+
+
+def _render_changes(changes: PlanChanges) -> str:
+    """Describe what happened since the previous plan."""
+    sections: list[str] = []
+    if changes.commits:
+        sections.append(
+            "New commits:\n"
+            + "\n".join(
+                f"- {commit.sha[:12]} {commit.message.strip()}"
+                for commit in changes.commits
+            )
+        )
+    if changes.ci_failures:
+        lines = ["CI failures:"]
+        for digest in changes.ci_failures:
+            for failure in digest.failures:
+                where = (
+                    f"{failure.job} / {failure.step}" if failure.step else failure.job
+                )
+                lines.append(f"- run {digest.run_id}, {where}:")
+                lines.extend(
+                    f"  [{match.category}] {match.line}" for match in failure.matches
+                )
+                lines.extend(
+                    f"  | {line}" for line in failure.tail[-_REPLAN_TAIL_LINES:]
+                )
+        sections.append("\n".join(lines))
+    if changes.comments:
+        sections.append(
+            "New comments:\n"
+            + "\n".join(
+                f"- @{comment.author or 'ghost'}: {comment.body.strip()}"
+                for comment in changes.comments
+            )
+        )
+    return "\n\n".join(sections)
+
+
+def _build_replan_request(
+    issue_title: str,
+    issue_number: int,
+    previous: Plan,
+    changes: PlanChanges,
+    budget: ContextBudget,
+    model: str,
+) -> tuple[dict[str, Any], ContextReport]:
+    """Build the messages.create keyword arguments for an incremental re-plan.
+
+    Only the changes are fitted to the context budget; the previous plan is
+    already compact. Edits are much shorter than a plan, so the output
+    budget is the smallest one.
+    """
+    context = prepare_context(_render_changes(changes), budget)
+    user_message = f"""Revise the implementation plan for this GitHub issue:
+
+Issue #{issue_number}: {issue_title}
+
+Current plan:
+{_render_plan(previous)}
+
+Since the plan was made:
+{context.issue_body}
+
+Return only the edits needed."""
+
+    messages: list[MessageParam] = [{"role": "user", "content": user_message}]
+    request = {
+        "model": model,
+        "max_tokens": budget.min_output_tokens,
+        "system": _REPLAN_SYSTEM,
+        "messages": messages,
+        "tools": _REPLAN_TOOLS,
+        "tool_choice": {"type": "tool", "name": "revise_plan"},
+    }
+    return request, context.report
+
+
+def _parse_replan(
+    response: Message,
+    previous: Plan,
+    issue_number: int,
+    call: CallRecord,
+    context: ContextReport,
+) -> Plan:
+    """Apply a revise_plan tool-use response to the previous plan."""
+    tool_use = next(block for block in response.content if block.type == "tool_use")
+    data: dict[str, Any] = tool_use.input
+    edits = tuple(
+        StepEdit(
+            action=edit["action"],
+            step_id=edit.get("step_id"),
+            description=edit.get("description"),
+            related_files=edit.get("related_files"),
+            estimated_complexity=edit.get("estimated_complexity"),
+        )
+        for edit in data["edits"]
+    )
+    revision = PlanRevision(
+        edits=edits,
+        summary=data.get("summary"),
+        technical_approach=data.get("technical_approach"),
+        testing_strategy=data.get("testing_strategy"),
+    )
+    plan = revision.apply(previous, datetime.now())
+
+    actions: dict[str, int] = {}
+    for edit in edits:
+        actions[edit.action] = actions.get(edit.action, 0) + 1
+    metadata: dict[str, Any] = {
+        "issue_number": issue_number,
+        "usage": usage_metadata(response.usage),
+        "call": call.summary(),
+        "context": context.to_metadata(),
+        "replan": {
+            "previous_created_at": previous.created_at.isoformat(),
+            "edits": actions,
+        },
+        LAST_STEP_NUMBER_KEY: plan.metadata[LAST_STEP_NUMBER_KEY],
+    }
+    return replace(plan, metadata=metadata)
+
+
+def _batch_custom_id(issue_number: int) -> str:
+    return f"issue-{issue_number}"
+
+
+def _batch_result_to_plan(
+    response: MessageBatchIndividualResponse, sink: CallSink | None
+) -> tuple[int, Plan | PlanBatchError]:
+    """Convert one batch result line into its issue number and outcome."""
+    issue_number = int(response.custom_id.removeprefix("issue-"))
+    result = response.result
+    if result.type == "succeeded":
+        call = _record_call(
+            sink, "plan_batch", result.message, issue_number, batch=True
+        )
+        try:
+            return issue_number, _parse_plan(result.message, issue_number, call)
+        except (StopIteration, LookupError, TypeError, ValueError) as parse_error:
+            # One malformed answer must not cost the rest of the batch.
+            return issue_number, PlanBatchError(
+                issue_number,
+                "invalid_output",
+                "Unusable create_plan output: "
+                f"{type(parse_error).__name__}: {parse_error}",
+            )
+    if result.type == "errored":
+        error = result.error.error
+        return issue_number, PlanBatchError(issue_number, error.type, error.message)
+    return issue_number, PlanBatchError(
+        issue_number, result.type, f"Batch request {result.type}"
+    )
+
+
+def _replay_plan(plan: Plan) -> list[PlanStreamEvent]:
+    """Stream events equivalent to streaming an already complete plan."""
+    events: list[PlanStreamEvent] = [StreamedSummary(plan.summary)]
+    events.extend(StreamedStep(step) for step in plan.steps)
+    events.append(StreamedPlan(plan))
+    return events
+
+
+def _tool_input_fragment(event: Any) -> str | None:
+    """Return the tool input JSON fragment carried by a stream event, if any."""
+    if event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+        return str(event.delta.partial_json)
+    return None
 
 
 class ClaudeClient:
@@ -20,20 +592,76 @@ class ClaudeClient:
     capabilities. Authenticates using Anthropic API key from environment.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        plan_cache: PlanCache | None = None,
+        scheduler: RateLimitScheduler | None = None,
+        priority: Priority = Priority.PLANNING,
+        sink: CallSink | None = None,
+        context_budget: ContextBudget | None = None,
+        model: str = PLANNING_MODEL,
+        hedger: Hedger | None = None,
+        flights: SingleFlight[PlanFlightKey, Plan] | None = None,
+    ) -> None:
         """Initialize Claude client with API key authentication.
 
+        Args:
+            plan_cache: Cache consulted before calling the API, or None to
+                always generate a fresh plan.
+            scheduler: Rate-limit scheduler gating every API call, or None to
+                call the API unthrottled.
+            priority: Scheduling priority of this client's calls.
+            sink: Destination for per-call token, cost and latency records.
+            context_budget: Limits for the issue context sent to the model;
+                defaults to ContextBudget().
+            model: Model used for planning.
+            hedger: Hedges slow generate_plan calls with a second request, or
+                None to send one request per call.
+            flights: Coalesces concurrent generate_plan calls with identical
+                inputs, context budget and sink; defaults to the process-wide
+                'anthropic' SingleFlight.
+
         Raises:
             ValueError: If ANTHROPIC_API_KEY environment variable is not set.
         """
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable is required")
+        api_key = _read_api_key()
 
         self._client = Anthropic(api_key=api_key)
+        self._plan_cache = plan_cache
+        self._scheduler = scheduler
+        self._priority = priority
+        self._sink = sink
+        self._context_budget = context_budget or ContextBudget()
+        self._model = model
+        self._hedger = hedger
+        self._flights: SingleFlight[PlanFlightKey, Plan] = flights or get_shared_flight(
+            "anthropic"
+        )
+
+    @property
+    def model(self) -> str:
+        """Model used for planning."""
+        return self._model
+
+    def coalescing_stats(self) -> SingleFlightStats:
+        """Return how many generate_plan calls shared an in-flight request."""
+        return self._flights.stats()
+
+    def prewarm(self) -> None:
+        """Open a pooled connection to the API before the first planning call.
+
+        Lists one model, which costs no tokens, so DNS resolution and the TLS
+        handshake are done and the connection waits in the keep-alive pool.
+        """
+        self._client.models.list(limit=1)
 
     def generate_plan(
-        self, issue_title: str, issue_body: str, issue_number: int
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        repository: RepositoryContext | None = None,
+        validate: Callable[[Plan], Sequence[str]] | None = None,
     ) -> Plan:
         """Generate an implementation plan from a GitHub issue.
 
@@ -41,106 +669,677 @@ class ClaudeClient:
             issue_title: Title of the GitHub issue.
             issue_body: Body/description of the GitHub issue.
             issue_number: Issue number for reference.
+            repository: Repository files to show the model, e.g. from
+                RepositoryIndexes.planning_context, or None.
+            validate: Checks a newly generated plan before it is cached; a
+                plan with problems is still returned but never cached.
 
         Returns:
             Plan domain object with implementation steps.
         """
-        system_prompt = """You are a senior software architect analyzing GitHub issues to create implementation plans.
+        cache_key = _plan_cache_key(
+            issue_title, issue_body, issue_number, self._model, repository
+        )
+        if self._plan_cache is not None:
+            cached = self._plan_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-Your task is to analyze the issue and create a structured implementation plan with:
-- A high-level summary of what needs to be done
-- Ordered implementation steps
-- Technical approach and architecture decisions
-- Testing strategy
+        plan = self._flights.do(
+            (cache_key, self._context_budget, self._sink),
+            partial(
+                self._generate_plan,
+                issue_title,
+                issue_body,
+                issue_number,
+                repository,
+            ),
+        )
+        # Coalesced callers share the plan, but each validates and caches it.
+        if self._plan_cache is not None and not (validate and validate(plan)):
+            self._plan_cache.put(cache_key, plan)
+        return plan
 
-Keep plans simple and focused on the issue requirements."""
+    def stream_plan(
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        repository: RepositoryContext | None = None,
+    ) -> Iterator[PlanStreamEvent]:
+        """Generate an implementation plan, yielding parts as they arrive.
 
-        user_message = f"""Analyze this GitHub issue and create an implementation plan:
+        Yields a StreamedSummary and one StreamedStep per step as soon as each
+        is complete in the model output, then a final StreamedPlan equal to
+        what generate_plan would return.
 
-Issue #{issue_number}: {issue_title}
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_body: Body/description of the GitHub issue.
+            issue_number: Issue number for reference.
+            repository: Repository files to show the model, e.g. from
+                RepositoryIndexes.planning_context, or None.
 
-{issue_body}
+        Yields:
+            Plan stream events, ending with StreamedPlan.
+        """
+        cache_key = _plan_cache_key(
+            issue_title, issue_body, issue_number, self._model, repository
+        )
+        if self._plan_cache is not None:
+            cached = self._plan_cache.get(cache_key)
+            if cached is not None:
+                yield from _replay_plan(cached)
+                return
 
-Create a structured plan with implementation steps."""
+        request, context = _build_plan_request(
+            issue_title,
+            issue_body,
+            issue_number,
+            self._context_budget,
+            self._model,
+            repository,
+        )
+        parser = IncrementalPlanParser()
+        timer = CallTimer()
+        with (
+            self._scheduled(timer),
+            self._client.messages.stream(**request) as stream,
+        ):
+            self._observe(stream.response.headers)
+            for event in stream:
+                if event.type == "content_block_delta":
+                    timer.mark_first_token()
+                fragment = _tool_input_fragment(event)
+                if fragment is not None:
+                    yield from parser.feed(fragment)
+            response = stream.get_final_message()
+        call = _record_call(self._sink, "stream_plan", response, issue_number, timer)
+        plan = _parse_plan(response, issue_number, call, context, repository)
+
+        if self._plan_cache is not None:
+            self._plan_cache.put(cache_key, plan)
+        yield StreamedPlan(plan)
+
+    def replan(
+        self,
+        issue_title: str,
+        issue_number: int,
+        previous: Plan,
+        changes: PlanChanges,
+    ) -> Plan:
+        """Revise a plan from what changed instead of planning from scratch.
+
+        The model sees the previous plan in compact form and the changes
+        only, and answers with step-level edits, which are merged into the
+        previous plan. Unchanged steps keep their IDs.
+
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_number: Issue number for reference.
+            previous: Plan to revise.
+            changes: Commits, CI failures and comments since previous.
+
+        Returns:
+            The revised plan, or previous itself if nothing changed.
+
+        Raises:
+            ValueError: If the model's edits refer to unknown steps.
+        """
+        if changes.empty:
+            return previous
+        request, context = _build_replan_request(
+            issue_title,
+            issue_number,
+            previous,
+            changes,
+            self._context_budget,
+            self._model,
+        )
+        timer = CallTimer()
+        response = self._create_message(request, timer, "replan", issue_number)
+        call = _record_call(self._sink, "replan", response, issue_number, timer)
+        return _parse_replan(response, previous, issue_number, call, context)
+
+    def submit_plan_batch(self, requests: Sequence[PlanningRequest]) -> str:
+        """Submit planning requests as one Message Batch.
+
+        Args:
+            requests: Issues to plan. Issue numbers must be unique.
 
-        # Define the tool schema for structured output
-        tools: list[ToolParam] = [
+        Returns:
+            ID of the created Message Batch.
+
+        Raises:
+            ValueError: If requests is empty or issue numbers repeat.
+        """
+        if not requests:
+            raise ValueError("requests must not be empty")
+        issue_numbers = [request.issue_number for request in requests]
+        if len(set(issue_numbers)) != len(issue_numbers):
+            raise ValueError("issue numbers must be unique within a batch")
+
+        batch_requests: list[BatchRequest] = [
             {
-                "name": "create_plan",
-                "description": "Create a structured implementation plan",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "summary": {
-                            "type": "string",
-                            "description": "High-level summary of the plan",
-                        },
-                        "steps": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "id": {"type": "string"},
-                                    "description": {"type": "string"},
-                                    "completed": {"type": "boolean"},
-                                    "related_files": {
-                                        "type": ["array", "null"],
-                                        "items": {"type": "string"},
-                                    },
-                                    "estimated_complexity": {
-                                        "type": ["string", "null"],
-                                        "enum": ["simple", "moderate", "complex", None],
-                                    },
-                                },
-                                "required": ["id", "description", "completed"],
-                            },
-                        },
-                        "technical_approach": {
-                            "type": ["string", "null"],
-                            "description": "Architecture decisions and technical approach",
-                        },
-                        "testing_strategy": {
-                            "type": ["string", "null"],
-                            "description": "How to test the implementation",
-                        },
-                    },
-                    "required": ["summary", "steps"],
-                },
+                "custom_id": _batch_custom_id(request.issue_number),
+                "params": _build_plan_request(  # type: ignore[typeddict-item]
+                    request.issue_title,
+                    request.issue_body,
+                    request.issue_number,
+                    self._context_budget,
+                    self._model,
+                    request.repository,
+                )[0],
             }
+            for request in requests
         ]
+        with self._scheduled():
+            batch = self._client.messages.batches.create(requests=batch_requests)
+        return batch.id
+
+    def collect_plan_batch(
+        self, batch_id: str
+    ) -> dict[int, Plan | PlanBatchError] | None:
+        """Fetch the results of a Message Batch if it has finished.
 
-        messages: list[MessageParam] = [{"role": "user", "content": user_message}]
-
-        response = self._client.messages.create(
-            model="claude-opus-4-5-20251101",
-            max_tokens=4096,
-            system=system_prompt,
-            messages=messages,
-            tools=tools,
-            tool_choice={"type": "tool", "name": "create_plan"},
-        )
-
-        # Extract the structured output from tool use
-        tool_use = next(block for block in response.content if block.type == "tool_use")
-        plan_data: dict[str, Any] = tool_use.input
-
-        # Convert to domain model
-        steps = [
-            PlanStep(
-                id=str(step["id"]),
-                description=str(step["description"]),
-                completed=bool(step["completed"]),
-                related_files=step.get("related_files"),
-                estimated_complexity=step.get("estimated_complexity"),
+        Args:
+            batch_id: ID returned by submit_plan_batch.
+
+        Returns:
+            Plan or PlanBatchError per issue number, or None while the batch
+            is still processing.
+        """
+        with self._scheduled():
+            batch = self._client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        with self._scheduled():
+            responses = list(self._client.messages.batches.results(batch_id))
+        return dict(
+            _batch_result_to_plan(response, self._sink) for response in responses
+        )
+
+    def generate_plans_batch(
+        self,
+        requests: Sequence[PlanningRequest],
+        poll_interval_seconds: float = DEFAULT_BATCH_POLL_INTERVAL_SECONDS,
+        timeout_seconds: float = DEFAULT_BATCH_TIMEOUT_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> dict[int, Plan | PlanBatchError]:
+        """Plan many issues through the Message Batches API.
+
+        Issues already in the plan cache are answered from it and not
+        submitted; successful batch results are added to the cache.
+
+        Args:
+            requests: Issues to plan. Issue numbers must be unique.
+            poll_interval_seconds: Delay between batch status checks.
+            timeout_seconds: Maximum time to wait for the batch to end.
+            sleep: Sleep function, injectable for tests.
+
+        Returns:
+            Plan or PlanBatchError for every requested issue number.
+
+        Raises:
+            TimeoutError: If the batch does not end within timeout_seconds.
+        """
+        results: dict[int, Plan | PlanBatchError] = {}
+        pending: list[PlanningRequest] = []
+        cache_keys: dict[int, str] = {}
+        for request in requests:
+            cache_key = _plan_cache_key(
+                request.issue_title,
+                request.issue_body,
+                request.issue_number,
+                self._model,
+                request.repository,
             )
-            for step in plan_data["steps"]
-        ]
+            cache_keys[request.issue_number] = cache_key
+            cached = self._plan_cache.get(cache_key) if self._plan_cache else None
+            if cached is not None:
+                results[request.issue_number] = cached
+            else:
+                pending.append(request)
+
+        if not pending:
+            return results
+
+        batch_id = self.submit_plan_batch(pending)
+        deadline = time.monotonic() + timeout_seconds
+        while (batch_results := self.collect_plan_batch(batch_id)) is None:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Message Batch {batch_id} did not end in time")
+            sleep(poll_interval_seconds)
 
-        return Plan(
-            summary=str(plan_data["summary"]),
-            steps=steps,
-            created_at=datetime.now(),
-            metadata={"issue_number": issue_number},
-            technical_approach=plan_data.get("technical_approach"),
-            testing_strategy=plan_data.get("testing_strategy"),
+        submitted = {request.issue_number: request for request in pending}
+        for issue_number, outcome in batch_results.items():
+            if isinstance(outcome, Plan):
+                # Batch results do not carry the request; rebuild its report.
+                request = submitted[issue_number]
+                context = prepare_context(request.issue_body, self._context_budget)
+                metadata = {
+                    **outcome.metadata,
+                    "context": context.report.to_metadata(),
+                }
+                if request.repository is not None:
+                    metadata["repository"] = request.repository.to_metadata()
+                outcome = replace(outcome, metadata=metadata)
+                if self._plan_cache is not None:
+                    self._plan_cache.put(cache_keys[issue_number], outcome)
+            results[issue_number] = outcome
+        return results
+
+    def _generate_plan(
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        repository: RepositoryContext | None,
+    ) -> Plan:
+        """Make the planning call for generate_plan."""
+        request, context = _build_plan_request(
+            issue_title,
+            issue_body,
+            issue_number,
+            self._context_budget,
+            self._model,
+            repository,
         )
+        timer = CallTimer()
+        response = self._create_message(request, timer, "generate_plan", issue_number)
+        call = _record_call(self._sink, "generate_plan", response, issue_number, timer)
+        return _parse_plan(response, issue_number, call, context, repository)
+
+    def _create_message(
+        self,
+        request: dict[str, Any],
+        timer: CallTimer,
+        operation: str,
+        issue_number: int,
+    ) -> Message:
+        """Call messages.create, hedged if a hedger is configured.
+
+        The losing response of a hedged call is recorded to the sink as
+        '<operation>_discarded', so its tokens are accounted for.
+        """
+        if self._hedger is None:
+            return self._send_message(request, timer)
+        message: Message = self._hedger.call(
+            partial(self._send_message, request, timer),
+            on_discard=partial(
+                _record_call,
+                self._sink,
+                f"{operation}_discarded",
+                issue_number=issue_number,
+            ),
+        )
+        return message
+
+    def _send_message(self, request: dict[str, Any], timer: CallTimer) -> Message:
+        """Call messages.create, under the rate-limit scheduler if any."""
+        message: Message
+        if self._scheduler is None:
+            timer.mark_sent()
+            message = self._client.messages.create(**request)
+            return message
+        with self._scheduled(timer):
+            raw = self._client.messages.with_raw_response.create(**request)
+        self._observe(raw.headers)
+        message = raw.parse()
+        return message
+
+    @contextmanager
+    def _scheduled(self, timer: CallTimer | None = None) -> Iterator[None]:
+        """Wait for rate-limit budget and back off on rate-limit errors.
+
+        Marks timer as sent once the call may proceed.
+        """
+        if self._scheduler is None:
+            if timer is not None:
+                timer.mark_sent()
+            yield
+            return
+        self._scheduler.acquire(ANTHROPIC, self._priority)
+        if timer is not None:
+            timer.mark_sent()
+        try:
+            yield
+        except RateLimitError as error:
+            self._scheduler.backoff(ANTHROPIC, headers=error.response.headers)
+            raise
+        self._scheduler.record_success(ANTHROPIC)
+
+    def _observe(self, headers: Mapping[str, str]) -> None:
+        if self._scheduler is not None:
+            self._scheduler.observe_headers(ANTHROPIC, headers)
+
+
+class AsyncClaudeClient:
+    """Async Claude API client for generating implementation plans.
+
+    Async counterpart of ClaudeClient built on AsyncAnthropic, intended for
+    async Temporal activities. Calls are bounded by a per-process
+    ConcurrencyLimiter shared by every AsyncClaudeClient instance, so many
+    workflows can plan on one event loop without exceeding the API budget.
+    """
+
+    def __init__(
+        self,
+        limiter: ConcurrencyLimiter | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        plan_cache: PlanCache | None = None,
+        scheduler: RateLimitScheduler | None = None,
+        priority: Priority = Priority.PLANNING,
+        sink: CallSink | None = None,
+        context_budget: ContextBudget | None = None,
+        model: str = PLANNING_MODEL,
+        hedger: Hedger | None = None,
+        flights: SingleFlight[PlanFlightKey, Plan] | None = None,
+    ) -> None:
+        """Initialize async Claude client with API key authentication.
+
+        Args:
+            limiter: Limiter bounding concurrent calls. Defaults to the
+                process-wide 'anthropic' limiter.
+            max_concurrency: Limit used when the shared limiter is created.
+            plan_cache: Cache consulted before calling the API, or None to
+                always generate a fresh plan.
+            scheduler: Rate-limit scheduler gating every API call, or None to
+                call the API unthrottled.
+            priority: Scheduling priority of this client's calls.
+            sink: Destination for per-call token, cost and latency records.
+            context_budget: Limits for the issue context sent to the model;
+                defaults to ContextBudget().
+            model: Model used for planning.
+            hedger: Hedges slow generate_plan calls with a second request, or
+                None to send one request per call. A hedge shares the
+                concurrency slot of the call it hedges.
+            flights: Coalesces concurrent generate_plan calls with identical
+                inputs, context budget and sink; defaults to the process-wide
+                'anthropic' SingleFlight.
+
+        Raises:
+            ValueError: If ANTHROPIC_API_KEY environment variable is not set.
+        """
+        api_key = _read_api_key()
+
+        self._client = AsyncAnthropic(api_key=api_key)
+        self._limiter = limiter or get_shared_limiter("anthropic", max_concurrency)
+        self._plan_cache = plan_cache
+        self._scheduler = scheduler
+        self._priority = priority
+        self._sink = sink
+        self._context_budget = context_budget or ContextBudget()
+        self._model = model
+        self._hedger = hedger
+        self._flights: SingleFlight[PlanFlightKey, Plan] = flights or get_shared_flight(
+            "anthropic"
+        )
+
+    @property
+    def model(self) -> str:
+        """Model used for planning."""
+        return self._model
+
+    def coalescing_stats(self) -> SingleFlightStats:
+        """Return how many generate_plan calls shared an in-flight request."""
+        return self._flights.stats()
+
+    async def prewarm(self) -> None:
+        """Open a pooled connection to the API before the first planning call.
+
+        Async counterpart of ClaudeClient.prewarm; call it on the event loop
+        the client will be used from.
+        """
+        await self._client.models.list(limit=1)
+
+    @property
+    def limiter(self) -> ConcurrencyLimiter:
+        """Limiter bounding concurrent calls made by this client."""
+        return self._limiter
+
+    async def generate_plan(
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        repository: RepositoryContext | None = None,
+        validate: Callable[[Plan], Sequence[str]] | None = None,
+    ) -> Plan:
+        """Generate an implementation plan from a GitHub issue.
+
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_body: Body/description of the GitHub issue.
+            issue_number: Issue number for reference.
+            repository: Repository files to show the model, e.g. from
+                RepositoryIndexes.planning_context, or None.
+            validate: Checks a newly generated plan before it is cached; a
+                plan with problems is still returned but never cached.
+
+        Returns:
+            Plan domain object with implementation steps.
+        """
+        cache_key = _plan_cache_key(
+            issue_title, issue_body, issue_number, self._model, repository
+        )
+        if self._plan_cache is not None:
+            cached = self._plan_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        plan = await self._flights.do_async(
+            (cache_key, self._context_budget, self._sink),
+            partial(
+                self._generate_plan,
+                issue_title,
+                issue_body,
+                issue_number,
+                repository,
+            ),
+        )
+        # Coalesced callers share the plan, but each validates and caches it.
+        if self._plan_cache is not None and not (validate and validate(plan)):
+            self._plan_cache.put(cache_key, plan)
+        return plan
+
+    async def stream_plan(
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        repository: RepositoryContext | None = None,
+    ) -> AsyncIterator[PlanStreamEvent]:
+        """Generate an implementation plan, yielding parts as they arrive.
+
+        Async counterpart of ClaudeClient.stream_plan. The concurrency slot is
+        held until the stream completes.
+
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_body: Body/description of the GitHub issue.
+            issue_number: Issue number for reference.
+            repository: Repository files to show the model, e.g. from
+                RepositoryIndexes.planning_context, or None.
+
+        Yields:
+            Plan stream events, ending with StreamedPlan.
+        """
+        cache_key = _plan_cache_key(
+            issue_title, issue_body, issue_number, self._model, repository
+        )
+        if self._plan_cache is not None:
+            cached = self._plan_cache.get(cache_key)
+            if cached is not None:
+                for cached_event in _replay_plan(cached):
+                    yield cached_event
+                return
+
+        request, context = _build_plan_request(
+            issue_title,
+            issue_body,
+            issue_number,
+            self._context_budget,
+            self._model,
+            repository,
+        )
+        parser = IncrementalPlanParser()
+        timer = CallTimer()
+        async with (
+            self._limiter.slot(),
+            self._scheduled(timer),
+            self._client.messages.stream(**request) as stream,
+        ):
+            self._observe(stream.response.headers)
+            async for event in stream:
+                if event.type == "content_block_delta":
+                    timer.mark_first_token()
+                fragment = _tool_input_fragment(event)
+                if fragment is None:
+                    continue
+                for parsed in parser.feed(fragment):
+                    yield parsed
+            response = await stream.get_final_message()
+        call = _record_call(self._sink, "stream_plan", response, issue_number, timer)
+        plan = _parse_plan(response, issue_number, call, context, repository)
+
+        if self._plan_cache is not None:
+            self._plan_cache.put(cache_key, plan)
+        yield StreamedPlan(plan)
+
+    async def replan(
+        self,
+        issue_title: str,
+        issue_number: int,
+        previous: Plan,
+        changes: PlanChanges,
+    ) -> Plan:
+        """Revise a plan from what changed instead of planning from scratch.
+
+        Async counterpart of ClaudeClient.replan.
+
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_number: Issue number for reference.
+            previous: Plan to revise.
+            changes: Commits, CI failures and comments since previous.
+
+        Returns:
+            The revised plan, or previous itself if nothing changed.
+
+        Raises:
+            ValueError: If the model's edits refer to unknown steps.
+        """
+        if changes.empty:
+            return previous
+        request, context = _build_replan_request(
+            issue_title,
+            issue_number,
+            previous,
+            changes,
+            self._context_budget,
+            self._model,
+        )
+        timer = CallTimer()
+        async with self._limiter.slot():
+            response = await self._create_message(
+                request, timer, "replan", issue_number
+            )
+        call = _record_call(self._sink, "replan", response, issue_number, timer)
+        return _parse_replan(response, previous, issue_number, call, context)
+
+    async def _generate_plan(
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        repository: RepositoryContext | None,
+    ) -> Plan:
+        """Make the planning call for generate_plan."""
+        request, context = _build_plan_request(
+            issue_title,
+            issue_body,
+            issue_number,
+            self._context_budget,
+            self._model,
+            repository,
+        )
+        timer = CallTimer()
+        async with self._limiter.slot():
+            response = await self._create_message(
+                request, timer, "generate_plan", issue_number
+            )
+        call = _record_call(self._sink, "generate_plan", response, issue_number, timer)
+        return _parse_plan(response, issue_number, call, context, repository)
+
+    async def _create_message(
+        self,
+        request: dict[str, Any],
+        timer: CallTimer,
+        operation: str,
+        issue_number: int,
+    ) -> Message:
+        """Call messages.create, hedged if a hedger is configured.
+
+        The caller holds a concurrency slot for the original request; a
+        hedge waits for a slot of its own, so hedging never exceeds the
+        limiter's limit. A losing response that completed is recorded to
+        the sink as '<operation>_discarded'; a cancelled one has no usage
+        to record.
+        """
+        if self._hedger is None:
+            return await self._send_message(request, timer)
+        return await self._hedger.call_async(
+            partial(self._send_message, request, timer),
+            on_discard=partial(
+                _record_call,
+                self._sink,
+                f"{operation}_discarded",
+                issue_number=issue_number,
+            ),
+            hedge_request=partial(self._send_hedge, request, timer),
+        )
+
+    async def _send_hedge(self, request: dict[str, Any], timer: CallTimer) -> Message:
+        """Send a hedge request once a concurrency slot is free."""
+        async with self._limiter.slot():
+            return await self._send_message(request, timer)
+
+    async def _send_message(self, request: dict[str, Any], timer: CallTimer) -> Message:
+        """Call messages.create, under the rate-limit scheduler if any."""
+        message: Message
+        if self._scheduler is None:
+            timer.mark_sent()
+            message = await self._client.messages.create(**request)
+            return message
+        async with self._scheduled(timer):
+            raw = await self._client.messages.with_raw_response.create(**request)
+        self._observe(raw.headers)
+        message = await raw.parse()
+        return message
+
+    @asynccontextmanager
+    async def _scheduled(self, timer: CallTimer | None = None) -> AsyncIterator[None]:
+        """Wait for rate-limit budget and back off on rate-limit errors.
+
+        Marks timer as sent once the call may proceed.
+        """
+        if self._scheduler is None:
+            if timer is not None:
+                timer.mark_sent()
+            yield
+            return
+        await self._scheduler.acquire_async(ANTHROPIC, self._priority)
+        if timer is not None:
+            timer.mark_sent()
+        try:
+            yield
+        except RateLimitError as error:
+            self._scheduler.backoff(ANTHROPIC, headers=error.response.headers)
+            raise
+        self._scheduler.record_success(ANTHROPIC)
+
+    def _observe(self, headers: Mapping[str, str]) -> None:
+        if self._scheduler is not None:
+            self._scheduler.observe_headers(ANTHROPIC, headers)
@@ -0,0 +1,129 @@
+"""Concurrency limiting for async adapters.
+
+Bounds the number of in-flight calls to an external API from a single worker
+process and tracks queue depth and wait times so saturation is visible.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """Point-in-time statistics for a ConcurrencyLimiter.
+
+    Attributes:
+        limit: Maximum number of concurrent holders.
+        in_flight: Number of callers currently holding a slot.
+        queue_depth: Number of callers currently waiting for a slot.
+        max_queue_depth: Highest queue depth observed.
+        total_acquired: Number of slots handed out since creation.
+        total_wait_seconds: Cumulative time callers spent waiting.
+        max_wait_seconds: Longest single wait observed.
+    """
+
+    limit: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+    total_acquired: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        """Average time a caller waited for a slot."""
+        if self.total_acquired == 0:
+            return 0.0
+        return self.total_wait_seconds / self.total_acquired
+
+
+class ConcurrencyLimiter:
+    """Async semaphore that records queue depth and wait-time statistics.
+
+    Use one instance per process and external API so that every activity
+    running on the worker's event loop shares the same budget.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize the limiter.
+
+        Args:
+            limit: Maximum number of concurrent holders.
+
+        Raises:
+            ValueError: If limit is less than 1.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+
+        self._limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._in_flight = 0
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._total_acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Maximum number of concurrent holders."""
+        return self._limit
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of the context."""
+        self._queue_depth += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+        started = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queue_depth -= 1
+
+        waited = time.monotonic() - started
+        self._total_acquired += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> LimiterStats:
+        """Return a snapshot of the limiter statistics."""
+        return LimiterStats(
+            limit=self._limit,
+            in_flight=self._in_flight,
+            queue_depth=self._queue_depth,
+            max_queue_depth=self._max_queue_depth,
+            total_acquired=self._total_acquired,
+            total_wait_seconds=self._total_wait,
+            max_wait_seconds=self._max_wait,
+        )
+
+
+_shared_limiters: dict[str, ConcurrencyLimiter] = {}
+
+
+def get_shared_limiter(name: str, limit: int) -> ConcurrencyLimiter:
+    """Return the process-wide limiter for name, creating it on first use.
+
+    Args:
+        name: Identifier of the external API being limited (e.g. 'anthropic').
+        limit: Concurrency limit used if the limiter does not exist yet.
+
+    Returns:
+        The shared ConcurrencyLimiter for name.
+    """
+    limiter = _shared_limiters.get(name)
+    if limiter is None:
+        limiter = ConcurrencyLimiter(limit)
+        _shared_limiters[name] = limiter
+    return limiter
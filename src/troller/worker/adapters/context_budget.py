@@ -0,0 +1,281 @@
+"""Context budget for planning prompts.
+
+Issues with pasted logs or stack traces can be mostly repetition. A body over
+budget is shrunk before the planning call in increasing order of loss,
+stopping as soon as it fits: runs of repeated log lines are collapsed, long
+fenced code blocks keep only their head and tail, and a body still over
+budget is cut in the middle. Bodies within budget are sent as written. The
+output budget (max_tokens) is sized from the issue instead of being fixed.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any
+
+# Rough characters per token for English prose, code and logs. Good enough
+# for budgeting; exact counts would cost a count_tokens round-trip per call.
+CHARS_PER_TOKEN = 4
+
+# Shortest run of identical log lines that is collapsed.
+MIN_REPEATED_LINES = 3
+# Shortest run of log lines differing only in numbers or IDs that is
+# collapsed; shorter runs are more likely to be meaningful, e.g. a list of
+# versions or a handful of distinct assertions.
+MIN_SIMILAR_LINES = 10
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+# Numbers, hex IDs and similar volatile parts of otherwise identical log lines.
+_VOLATILE = re.compile(r"0x[0-9a-fA-F]+|[0-9a-fA-F]{8,}|\d+")
+# Lines outside code fences that look like log output: a leading timestamp
+# or log level, optionally in brackets.
+_LOG_LINE = re.compile(
+    r"^\s*\[?(?:\d{4}-\d{2}-\d{2}|\d{2}:\d{2}:\d{2}"
+    r"|(?:TRACE|DEBUG|INFO|NOTICE|WARN|WARNING|ERROR|FATAL|CRITICAL)\b)"
+)
+_FILE_REFERENCE = re.compile(
+    r"[\w./-]+\.(?:py|pyi|js|jsx|ts|tsx|go|rs|java|kt|rb|php|c|cc|cpp|h|hpp|cs"
+    r"|swift|scala|sql|sh|ya?ml|toml|json|md)\b"
+)
+
+
+@dataclass(frozen=True)
+class ContextBudget:
+    """Limits applied to the issue context of a planning call.
+
+    Attributes:
+        max_input_tokens: Estimated tokens the issue body may use.
+        code_block_head_lines: Lines kept from the start of a long code block.
+        code_block_tail_lines: Lines kept from the end of a long code block.
+        min_output_tokens: Smallest max_tokens given to a planning call.
+        max_output_tokens: Largest max_tokens given to a planning call.
+    """
+
+    max_input_tokens: int = 12_000
+    code_block_head_lines: int = 40
+    code_block_tail_lines: int = 20
+    min_output_tokens: int = 4096
+    max_output_tokens: int = 16_384
+
+
+@dataclass(frozen=True)
+class ContextReport:
+    """What the context budget changed.
+
+    Attributes:
+        original_tokens: Estimated tokens of the issue body as written.
+        final_tokens: Estimated tokens of the body actually sent.
+        deduplicated_lines: Repeated log lines collapsed.
+        trimmed_code_blocks: Code blocks shortened to head and tail.
+        omitted_code_lines: Lines dropped from those code blocks.
+        truncated_characters: Characters cut from the middle of the body.
+        max_tokens: Output budget chosen for the call.
+    """
+
+    original_tokens: int
+    final_tokens: int
+    deduplicated_lines: int
+    trimmed_code_blocks: int
+    omitted_code_lines: int
+    truncated_characters: int
+    max_tokens: int
+
+    def to_metadata(self) -> dict[str, Any]:
+        """Describe the trimming for Plan.metadata."""
+        return {
+            "original_tokens": self.original_tokens,
+            "final_tokens": self.final_tokens,
+            "deduplicated_lines": self.deduplicated_lines,
+            "trimmed_code_blocks": self.trimmed_code_blocks,
+            "omitted_code_lines": self.omitted_code_lines,
+            "truncated_characters": self.truncated_characters,
+            "max_tokens": self.max_tokens,
+        }
+
+
+@dataclass(frozen=True)
+class PreparedContext:
+    """Issue body fitted to a budget, with the output budget to request.
+
+    Attributes:
+        issue_body: Body to put in the prompt.
+        max_tokens: Output budget for the call.
+        report: What was changed to get there.
+    """
+
+    issue_body: str
+    max_tokens: int
+    report: ContextReport
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def collapse_repeated_lines(text: str) -> tuple[str, int]:
+    """Collapse runs of repeated lines in log output.
+
+    Only lines inside fenced blocks or that look like log lines are
+    considered. A run of at least MIN_REPEATED_LINES identical lines, or of
+    at least MIN_SIMILAR_LINES lines differing only in numbers or IDs, is
+    replaced by its first line and a note with the number of lines dropped.
+    Indentation is significant, so code such as consecutive closing brackets
+    is left alone.
+
+    Returns:
+        The collapsed text and the number of lines removed.
+    """
+    output: list[str] = []
+    removed = 0
+    run: list[str] = []
+    run_key: str | None = None
+    in_fence = False
+
+    def close_run() -> None:
+        nonlocal removed
+        identical = all(line.rstrip() == run[0].rstrip() for line in run)
+        if identical and len(run) >= MIN_REPEATED_LINES:
+            note = f"[previous line repeated {len(run) - 1} more times]"
+        elif len(run) >= MIN_SIMILAR_LINES:
+            note = (
+                f"[previous line repeated {len(run) - 1} more times"
+                " with different numbers]"
+            )
+        else:
+            output.extend(run)
+            return
+        output.extend((run[0], note))
+        removed += len(run) - 1
+
+    for line in text.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+            key = None
+        elif in_fence or _LOG_LINE.match(line):
+            key = _VOLATILE.sub("#", line.rstrip())
+        else:
+            key = None
+        if key is not None and key.strip() and key == run_key:
+            run.append(line)
+            continue
+        close_run()
+        run, run_key = [line], key
+    close_run()
+    return "\n".join(output), removed
+
+
+def trim_code_blocks(
+    text: str, head_lines: int, tail_lines: int
+) -> tuple[str, int, int]:
+    """Shorten fenced code blocks to their first and last lines.
+
+    Args:
+        text: Markdown text.
+        head_lines: Lines kept from the start of a long block.
+        tail_lines: Lines kept from the end of a long block.
+
+    Returns:
+        The trimmed text, the number of blocks trimmed and the number of
+        lines omitted.
+    """
+    output: list[str] = []
+    block: list[str] | None = None
+    trimmed_blocks = 0
+    omitted_lines = 0
+
+    for line in text.splitlines():
+        if block is None:
+            output.append(line)
+            if _FENCE.match(line):
+                block = []
+            continue
+        if not _FENCE.match(line):
+            block.append(line)
+            continue
+        if len(block) > head_lines + tail_lines + 1:
+            omitted = len(block) - head_lines - tail_lines
+            tail = block[len(block) - tail_lines :] if tail_lines else []
+            block = [*block[:head_lines], f"[... {omitted} lines omitted ...]", *tail]
+            trimmed_blocks += 1
+            omitted_lines += omitted
+        output.extend(block)
+        output.append(line)
+        block = None
+
+    if block is not None:
+        # Unterminated fence: keep the rest of the text as written.
+        output.extend(block)
+    return "\n".join(output), trimmed_blocks, omitted_lines
+
+
+def _truncate_middle(text: str, max_characters: int) -> tuple[str, int]:
+    """Cut text to max_characters, keeping two thirds head and one third tail."""
+    excess = len(text) - max_characters
+    if excess <= 0:
+        return text, 0
+    head = max_characters * 2 // 3
+    tail = max_characters - head
+    marker = f"\n[... {excess} characters omitted ...]\n"
+    return text[:head] + marker + text[len(text) - tail :], excess
+
+
+def file_references(text: str) -> set[str]:
+    """Return the distinct source file paths mentioned in text."""
+    return set(_FILE_REFERENCE.findall(text))
+
+
+def output_budget(issue_body: str, budget: ContextBudget) -> int:
+    """Size max_tokens from how much the plan is likely to cover.
+
+    Longer issues and issues naming more files tend to need more steps.
+    """
+    estimate = (
+        budget.min_output_tokens
+        + estimate_tokens(issue_body) // 4
+        + 150 * len(file_references(issue_body))
+    )
+    return max(budget.min_output_tokens, min(budget.max_output_tokens, estimate))
+
+
+def prepare_context(issue_body: str, budget: ContextBudget) -> PreparedContext:
+    """Fit an issue body into the budget and choose the output budget.
+
+    Args:
+        issue_body: Issue body as written.
+        budget: Limits to apply.
+
+    Returns:
+        The body to send, max_tokens for the call and a report of changes.
+    """
+    original_tokens = estimate_tokens(issue_body)
+    body = issue_body
+    deduplicated = trimmed_blocks = omitted_lines = truncated = 0
+    if estimate_tokens(body) > budget.max_input_tokens:
+        body, deduplicated = collapse_repeated_lines(body)
+    if estimate_tokens(body) > budget.max_input_tokens:
+        body, trimmed_blocks, omitted_lines = trim_code_blocks(
+            body, budget.code_block_head_lines, budget.code_block_tail_lines
+        )
+    if estimate_tokens(body) > budget.max_input_tokens:
+        body, truncated = _truncate_middle(
+            body, budget.max_input_tokens * CHARS_PER_TOKEN
+        )
+    if not (deduplicated or trimmed_blocks or truncated):
+        # Nothing was trimmed: send the body byte-for-byte.
+        body = issue_body
+
+    max_tokens = output_budget(body, budget)
+    return PreparedContext(
+        issue_body=body,
+        max_tokens=max_tokens,
+        report=ContextReport(
+            original_tokens=original_tokens,
+            final_tokens=estimate_tokens(body),
+            deduplicated_lines=deduplicated,
+            trimmed_code_blocks=trimmed_blocks,
+            omitted_code_lines=omitted_lines,
+            truncated_characters=truncated,
+            max_tokens=max_tokens,
+        ),
+    )
@@ -3,10 +3,111 @@
 Adapter for interacting with GitHub via PyGithub library.
 """
 
+import json
 import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import IO, Any
+from urllib.parse import urlencode
 
-from github import Auth, Github
+import requests
+from github import Auth, Consts, Github, RateLimitExceededException
 from github.Issue import Issue as GithubIssue
+from github.Repository import Repository
+
+from troller.domain.models.ci import CommitChecks, FailureDigest
+from troller.domain.models.issue import IssueSnapshot
+from troller.worker.adapters import ci_logs, github_graphql
+from troller.worker.adapters.http_cache import ConditionalCache
+from troller.worker.adapters.lru_cache import LRUCache
+from troller.worker.adapters.rate_limit import (
+    GITHUB,
+    GITHUB_GRAPHQL,
+    Priority,
+    RateLimitScheduler,
+)
+from troller.worker.adapters.singleflight import SingleFlight, SingleFlightStats
+
+# Connections kept alive per host by the shared requests session. Sized for
+# many concurrent activities in one worker process.
+DEFAULT_POOL_SIZE = 32
+REPOSITORY_CACHE_SIZE = 256
+REPOSITORY_CACHE_TTL_SECONDS = 15 * 60
+# Issues fetched per GraphQL query; keeps each query well inside GitHub's
+# node limits while still collapsing most backlogs into a few round-trips.
+SNAPSHOT_BATCH_SIZE = 20
+# Commits whose checks are fetched per GraphQL query.
+COMMIT_CHECKS_BATCH_SIZE = 50
+# Log archives are streamed to disk in chunks of this size.
+LOG_CHUNK_BYTES = 64 * 1024
+# Larger log archives are not downloaded.
+MAX_LOG_ARCHIVE_BYTES = 512 * 1024 * 1024
+# Jobs per page of a workflow run's job listing; the most GitHub allows.
+JOBS_PAGE_SIZE = 100
+
+
+@dataclass(frozen=True)
+class _SharedGithub:
+    """Process-wide PyGithub client and repository handles for one token."""
+
+    client: Github
+    repositories: LRUCache[str, Repository]
+    http_cache: ConditionalCache
+    flights: SingleFlight[tuple[Any, ...], Any]
+
+
+_shared_lock = threading.Lock()
+_shared: dict[tuple[str, str], _SharedGithub] = {}
+
+
+def _create_http_cache() -> ConditionalCache:
+    """Create the response cache, on disk if GITHUB_HTTP_CACHE_DIR is set."""
+    cache_dir = os.getenv("GITHUB_HTTP_CACHE_DIR")
+    return ConditionalCache(disk_dir=Path(cache_dir) if cache_dir else None)
+
+
+def _get_shared(token: str, base_url: str) -> _SharedGithub:
+    """Return the shared client state for a token and API URL.
+
+    The state is created on first use.
+    """
+    with _shared_lock:
+        shared = _shared.get((token, base_url))
+        if shared is None:
+            shared = _SharedGithub(
+                client=Github(
+                    base_url=base_url,
+                    auth=Auth.Token(token),
+                    pool_size=DEFAULT_POOL_SIZE,
+                    # PyGithub's default spacing (0.25s between requests, 1s
+                    # between writes) would cap the whole process at about
+                    # four calls a second. The RateLimitScheduler paces calls
+                    # against GitHub's actual budget instead.
+                    seconds_between_requests=None,
+                    seconds_between_writes=None,
+                ),
+                repositories=LRUCache(
+                    REPOSITORY_CACHE_SIZE, ttl_seconds=REPOSITORY_CACHE_TTL_SECONDS
+                ),
+                http_cache=_create_http_cache(),
+                flights=SingleFlight(),
+            )
+            _shared[token, base_url] = shared
+        return shared
+
+
+def reset_shared_clients() -> None:
+    """Drop every shared client and cached repository handle.
+
+    Intended for tests and for child processes after a fork, which must not
+    reuse the parent's connection pool.
+    """
+    with _shared_lock:
+        _shared.clear()
 
 
 class GitHubClient:
@@ -14,11 +115,26 @@ class GitHubClient:
 
     This is an adapter that wraps PyGithub to provide GitHub integration.
     Authenticates using a GitHub personal access token from environment.
+    GITHUB_API_URL overrides the API endpoint, e.g. for GitHub Enterprise.
+
+    All instances using the same token share one PyGithub client, and with it
+    one pooled HTTP session, plus an LRU cache of repository handles and a
+    conditional-request cache for polled REST reads. Identical reads made at
+    the same time by any of those instances share one request.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        scheduler: RateLimitScheduler | None = None,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> None:
         """Initialize GitHub client with token authentication.
 
+        Args:
+            scheduler: Rate-limit scheduler gating every API call, or None to
+                call GitHub unthrottled.
+            priority: Scheduling priority of this client's calls.
+
         Raises:
             ValueError: If GITHUB_TOKEN environment variable is not set.
         """
@@ -26,8 +142,32 @@ class GitHubClient:
         if not token:
             raise ValueError("GITHUB_TOKEN environment variable is required")
 
-        auth = Auth.Token(token)
-        self._client = Github(auth=auth)
+        base_url = os.getenv("GITHUB_API_URL", Consts.DEFAULT_BASE_URL)
+        shared = _get_shared(token, base_url.rstrip("/"))
+        self._client = shared.client
+        self._repositories = shared.repositories
+        self._http_cache = shared.http_cache
+        self._flights = shared.flights
+        self._scheduler = scheduler
+        self._priority = priority
+
+    def get_repo(self, owner: str, repo: str) -> Repository:
+        """Fetch a repository, reusing a cached handle when available.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+
+        Returns:
+            PyGithub Repository object.
+        """
+        full_name = f"{owner}/{repo}"
+        repository = self._repositories.get(full_name)
+        if repository is None:
+            repository = self._flights.do(
+                ("repo", full_name), partial(self._fetch_repo, full_name)
+            )
+        return repository
 
     def get_issue(self, owner: str, repo: str, issue_number: int) -> GithubIssue:
         """Fetch a GitHub issue by repository and issue number.
@@ -40,5 +180,374 @@ class GitHubClient:
         Returns:
             PyGithub Issue object containing issue details.
         """
-        repository = self._client.get_repo(f"{owner}/{repo}")
-        return repository.get_issue(issue_number)
+        repository = self.get_repo(owner, repo)
+        issue: GithubIssue = self._flights.do(
+            ("issue", owner, repo, issue_number),
+            lambda: self._call(lambda: repository.get_issue(issue_number)),
+        )
+        return issue
+
+    def get_json(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        """GET a REST API resource using conditional requests.
+
+        The request carries If-None-Match / If-Modified-Since from the last
+        response for the same URL; a 304 answer is served from the cache and
+        does not count against the rate limit.
+
+        Args:
+            path: API path starting with '/', e.g. '/repos/o/r/commits/sha/status'.
+            params: Optional query parameters.
+
+        Returns:
+            Decoded JSON response body.
+
+        Raises:
+            GithubException: If GitHub answers with an error status.
+        """
+        url = self._client.requester.base_url + path
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        # Callers share the response body but each decodes its own copy.
+        body: str = self._flights.do(("GET", url), partial(self._get_body, url))
+        return json.loads(body)
+
+    def prewarm(self) -> None:
+        """Open a pooled connection to the API before the first real call.
+
+        Reads /rate_limit, which does not count against the rate limit, so
+        DNS resolution and the TLS handshake are done and the connection
+        waits in the shared keep-alive pool.
+
+        Raises:
+            GithubException: If GitHub answers with an error status.
+        """
+        self._client.requester.requestJsonAndCheck("GET", "/rate_limit")
+
+    def coalescing_stats(self) -> SingleFlightStats:
+        """Return how many calls shared another call's in-flight request.
+
+        The counters cover every client sharing this client's token.
+        """
+        return self._flights.stats()
+
+    def get_combined_status(self, owner: str, repo: str, ref: str) -> dict[str, Any]:
+        """Fetch the combined commit status for a ref.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            ref: Commit SHA, branch or tag name.
+
+        Returns:
+            Combined status payload as returned by the REST API.
+        """
+        status: dict[str, Any] = self.get_json(
+            f"/repos/{owner}/{repo}/commits/{ref}/status"
+        )
+        return status
+
+    def get_check_runs(self, owner: str, repo: str, ref: str) -> dict[str, Any]:
+        """Fetch the GitHub Actions check runs for a ref.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            ref: Commit SHA, branch or tag name.
+
+        Returns:
+            Check runs payload as returned by the REST API.
+        """
+        check_runs: dict[str, Any] = self.get_json(
+            f"/repos/{owner}/{repo}/commits/{ref}/check-runs", {"per_page": 100}
+        )
+        return check_runs
+
+    def get_issue_snapshot(
+        self, owner: str, repo: str, issue_number: int
+    ) -> IssueSnapshot:
+        """Fetch an immutable snapshot of an issue in one GraphQL round-trip.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            issue_number: Issue number to fetch.
+
+        Returns:
+            Snapshot with title, body, labels, comments, linked pull requests
+            and the default branch head.
+        """
+        return self.get_issue_snapshots(owner, repo, [issue_number])[issue_number]
+
+    def get_issue_snapshots(
+        self, owner: str, repo: str, issue_numbers: Sequence[int]
+    ) -> dict[int, IssueSnapshot]:
+        """Fetch snapshots of many issues in the same repository.
+
+        Issues are fetched SNAPSHOT_BATCH_SIZE per GraphQL query. Only issues
+        with more than one page of comments need extra queries.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            issue_numbers: Issue numbers to fetch.
+
+        Returns:
+            Snapshot per issue number.
+
+        Raises:
+            GithubException: If the query fails or an issue does not exist.
+        """
+        unique_numbers = list(dict.fromkeys(issue_numbers))
+        snapshots: dict[int, IssueSnapshot] = {}
+        for start in range(0, len(unique_numbers), SNAPSHOT_BATCH_SIZE):
+            batch = tuple(unique_numbers[start : start + SNAPSHOT_BATCH_SIZE])
+            snapshots.update(
+                self._flights.do(
+                    ("snapshots", owner, repo, batch),
+                    partial(self._snapshot_batch, owner, repo, batch),
+                )
+            )
+        return snapshots
+
+    def get_commit_checks(
+        self, owner: str, repo: str, shas: Sequence[str]
+    ) -> dict[str, CommitChecks]:
+        """Fetch the CI/CD results of many commits in the same repository.
+
+        Commits are fetched COMMIT_CHECKS_BATCH_SIZE per GraphQL query.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            shas: Commit SHAs to fetch.
+
+        Returns:
+            Check results per SHA.
+
+        Raises:
+            ValueError: If a SHA is not a hexadecimal object ID.
+            GithubException: If the query fails.
+        """
+        requester = self._client.requester
+        unique_shas = list(dict.fromkeys(shas))
+        results: dict[str, CommitChecks] = {}
+
+        for start in range(0, len(unique_shas), COMMIT_CHECKS_BATCH_SIZE):
+            batch = unique_shas[start : start + COMMIT_CHECKS_BATCH_SIZE]
+            query = github_graphql.build_commit_checks_query(batch)
+            _, response = self._call(
+                partial(requester.graphql_query, query, {"owner": owner, "name": repo}),
+                GITHUB_GRAPHQL,
+            )
+            repository = response["data"]["repository"]
+            for index, sha in enumerate(batch):
+                results[sha] = github_graphql.parse_commit_checks(
+                    owner, repo, sha, repository.get(github_graphql.commit_alias(index))
+                )
+        return results
+
+    def get_failure_digest(
+        self,
+        owner: str,
+        repo: str,
+        run_id: int,
+        index: ci_logs.SignatureIndex | None = None,
+        tail_lines: int = ci_logs.DEFAULT_TAIL_LINES,
+    ) -> FailureDigest:
+        """Summarize why a GitHub Actions workflow run failed.
+
+        The failed jobs and steps are read from every page of the jobs
+        listing, the log archive is streamed to a temporary file, and only
+        the logs of the failed steps are read from it.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            run_id: Workflow run ID.
+            index: Failure signatures to match; defaults to the built-in ones.
+            tail_lines: Lines kept from the end of each failed step's log.
+
+        Returns:
+            Tail lines and signature matches per failed step; no failures if
+            the run did not fail.
+
+        Raises:
+            GithubException: If the jobs listing or the log archive cannot be
+                read.
+            ValueError: If the log archive exceeds MAX_LOG_ARCHIVE_BYTES.
+        """
+        failed = ci_logs.failed_steps(self._list_jobs(owner, repo, run_id))
+        if not failed:
+            return FailureDigest(run_id, ())
+
+        with tempfile.TemporaryFile() as archive:
+            self._download(f"/repos/{owner}/{repo}/actions/runs/{run_id}/logs", archive)
+            archive.seek(0)
+            return ci_logs.digest_archive(
+                run_id, archive, failed, index, tail_lines=tail_lines
+            )
+
+    def _list_jobs(self, owner: str, repo: str, run_id: int) -> list[dict[str, Any]]:
+        """Read the jobs of a run's latest attempt, page by page."""
+        path = f"/repos/{owner}/{repo}/actions/runs/{run_id}/jobs"
+        jobs: list[dict[str, Any]] = []
+        page = 1
+        while True:
+            listing = self.get_json(
+                path, {"filter": "latest", "per_page": JOBS_PAGE_SIZE, "page": page}
+            )
+            jobs.extend(listing["jobs"])
+            if not listing["jobs"] or len(jobs) >= listing["total_count"]:
+                return jobs
+            page += 1
+
+    def _fetch_repo(self, full_name: str) -> Repository:
+        repository = self._call(lambda: self._client.get_repo(full_name))
+        self._repositories.put(full_name, repository)
+        return repository
+
+    def _get_body(self, url: str) -> str:
+        """Make a conditional GET and return the current response body."""
+        requester = self._client.requester
+        cached = self._http_cache.get(url)
+        headers = cached.validator_headers() if cached is not None else {}
+        status, response_headers, body = self._call(
+            lambda: requester.requestJson("GET", url, headers=headers)
+        )
+        resolved = self._http_cache.resolve(url, cached, status, response_headers, body)
+        if resolved is None:
+            data = json.loads(body) if body else {}
+            raise requester.createException(status, response_headers, data)
+        return resolved
+
+    def _snapshot_batch(
+        self, owner: str, repo: str, batch: tuple[int, ...]
+    ) -> dict[int, IssueSnapshot]:
+        """Fetch snapshots of up to SNAPSHOT_BATCH_SIZE issues in one query."""
+        query = github_graphql.build_issues_query(list(batch))
+        _, response = self._call(
+            partial(
+                self._client.requester.graphql_query,
+                query,
+                {"owner": owner, "name": repo},
+            ),
+            GITHUB_GRAPHQL,
+        )
+        repository = response["data"]["repository"]
+        default_branch = repository.get("defaultBranchRef") or {}
+        latest_commit_sha = (default_branch.get("target") or {}).get("oid")
+
+        snapshots: dict[int, IssueSnapshot] = {}
+        for number in batch:
+            issue = repository[github_graphql.issue_alias(number)]
+            for name in github_graphql.ISSUE_PAGE_QUERIES:
+                issue[name]["nodes"] = self._all_nodes(
+                    owner, repo, number, name, issue[name]
+                )
+            comments = github_graphql.parse_comments(issue["comments"])
+            snapshots[number] = github_graphql.parse_issue(
+                owner, repo, issue, comments, latest_commit_sha
+            )
+        return snapshots
+
+    def _download(self, path: str, file: IO[bytes]) -> None:
+        """Stream a binary resource, following redirects, into file."""
+        chunks = self._call(
+            partial(self._open_stream, self._client.requester.base_url + path)
+        )
+        written = 0
+        for chunk in chunks:
+            written += len(chunk)
+            if written > MAX_LOG_ARCHIVE_BYTES:
+                raise ValueError(
+                    f"{path} exceeds {MAX_LOG_ARCHIVE_BYTES} bytes; not downloaded"
+                )
+            file.write(chunk)
+
+    def _open_stream(self, url: str) -> Iterator[bytes]:
+        """Start streaming url, raising GithubException on an error status.
+
+        PyGithub's getStream raises requests.HTTPError instead of the
+        GithubException its other calls raise, which would also bypass the
+        rate-limit backoff in _call.
+        """
+        requester = self._client.requester
+        try:
+            _, _, chunks = requester.getStream(url, chunk_size=LOG_CHUNK_BYTES)
+        except requests.HTTPError as error:
+            response = error.response
+            if response is None:
+                raise
+            try:
+                data = response.json()
+            except ValueError:
+                data = {"message": response.text}
+            if not isinstance(data, dict):
+                data = {"message": response.text}
+            raise requester.createException(
+                response.status_code, dict(response.headers), data
+            ) from error
+        return chunks
+
+    def _all_nodes(
+        self,
+        owner: str,
+        repo: str,
+        issue_number: int,
+        name: str,
+        connection: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Collect every node of an issue connection, following its pages."""
+        nodes: list[dict[str, Any]] = list(connection["nodes"])
+        cursor = github_graphql.next_page_cursor(connection)
+        while cursor is not None:
+            variables = {
+                "owner": owner,
+                "name": repo,
+                "number": issue_number,
+                "cursor": cursor,
+            }
+            _, response = self._call(
+                partial(
+                    self._client.requester.graphql_query,
+                    github_graphql.ISSUE_PAGE_QUERIES[name],
+                    variables,
+                ),
+                GITHUB_GRAPHQL,
+            )
+            connection = response["data"]["repository"]["issue"][name]
+            nodes.extend(connection["nodes"])
+            cursor = github_graphql.next_page_cursor(connection)
+        return nodes
+
+    def _call[T](self, request: Callable[[], T], resource: str = GITHUB) -> T:
+        """Run one API request under the rate-limit scheduler, if any.
+
+        The scheduler learns the remaining budget from the rate-limit headers
+        PyGithub records for every response, and backs off every call to the
+        same budget in the process when GitHub reports the limit exceeded.
+
+        Args:
+            request: Makes the request.
+            resource: Budget the request counts against: GITHUB for REST,
+                GITHUB_GRAPHQL for GraphQL queries.
+        """
+        if self._scheduler is None:
+            return request()
+
+        self._scheduler.acquire(resource, self._priority)
+        try:
+            result = request()
+        except RateLimitExceededException as error:
+            self._scheduler.backoff(resource, headers=error.headers or {})
+            raise
+        self._scheduler.record_success(resource)
+
+        # PyGithub keeps the headers of the latest response, which reports on
+        # the budget of the API that answered it.
+        requester = self._client.requester
+        remaining, _limit = requester.rate_limiting
+        reset_at = requester.rate_limiting_resettime
+        if remaining >= 0 and reset_at:
+            self._scheduler.observe(resource, remaining, reset_at)
+        return result
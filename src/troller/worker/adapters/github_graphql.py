@@ -0,0 +1,300 @@
+"""GraphQL queries and response parsing for GitHub issue snapshots.
+
+One query fetches title, body, labels, comments, linked pull requests and the
+default branch head for any number of issues in a repository, using one alias
+per issue. Commit check results are batched the same way, one alias per
+commit.
+"""
+
+import re
+from datetime import datetime
+from typing import Any
+
+from troller.domain.models.ci import CheckResult, CommitChecks
+from troller.domain.models.issue import IssueComment, IssueSnapshot, LinkedPullRequest
+
+# GitHub's maximum page size for connections.
+PAGE_SIZE = 100
+
+_PULL_REQUEST_FIELDS = """
+fragment PullRequestFields on PullRequest {
+  number
+  title
+  state
+  headRefName
+  headRefOid
+}
+"""
+
+_PAGE_INFO = "pageInfo { hasNextPage endCursor }"
+
+_LABEL_CONNECTION = f"""
+  {_PAGE_INFO}
+  nodes {{ name }}
+"""
+
+_COMMENT_CONNECTION = f"""
+  {_PAGE_INFO}
+  nodes {{ author {{ login }} body createdAt }}
+"""
+
+_TIMELINE_CONNECTION = f"""
+  {_PAGE_INFO}
+  nodes {{
+    ... on ConnectedEvent {{
+      subject {{ ... on PullRequest {{ ...PullRequestFields }} }}
+    }}
+    ... on CrossReferencedEvent {{
+      source {{ ... on PullRequest {{ ...PullRequestFields }} }}
+    }}
+  }}
+"""
+
+# Timeline events that link a pull request to an issue.
+_TIMELINE_ITEM_TYPES = "itemTypes: [CONNECTED_EVENT, CROSS_REFERENCED_EVENT]"
+
+_ISSUE_FIELDS = f"""
+fragment IssueFields on Issue {{
+  number
+  title
+  body
+  state
+  author {{ login }}
+  labels(first: {PAGE_SIZE}) {{ {_LABEL_CONNECTION} }}
+  comments(first: {PAGE_SIZE}) {{ {_COMMENT_CONNECTION} }}
+  timelineItems(first: {PAGE_SIZE}, {_TIMELINE_ITEM_TYPES}) {{
+    {_TIMELINE_CONNECTION}
+  }}
+}}
+{_PULL_REQUEST_FIELDS}
+"""
+
+
+def _issue_page_query(
+    connection: str, selection: str, arguments: str = "", fragments: str = ""
+) -> str:
+    """Query for the page of an issue connection after $cursor."""
+    return f"""
+query($owner: String!, $name: String!, $number: Int!, $cursor: String!) {{
+  repository(owner: $owner, name: $name) {{
+    issue(number: $number) {{
+      {connection}(first: {PAGE_SIZE}, after: $cursor{arguments}) {{ {selection} }}
+    }}
+  }}
+}}
+{fragments}"""
+
+
+LABELS_PAGE_QUERY = _issue_page_query("labels", _LABEL_CONNECTION)
+COMMENTS_PAGE_QUERY = _issue_page_query("comments", _COMMENT_CONNECTION)
+TIMELINE_PAGE_QUERY = _issue_page_query(
+    "timelineItems",
+    _TIMELINE_CONNECTION,
+    f", {_TIMELINE_ITEM_TYPES}",
+    _PULL_REQUEST_FIELDS,
+)
+
+# Connections of IssueFields that can outgrow one page, with the query for
+# their later pages.
+ISSUE_PAGE_QUERIES = {
+    "labels": LABELS_PAGE_QUERY,
+    "comments": COMMENTS_PAGE_QUERY,
+    "timelineItems": TIMELINE_PAGE_QUERY,
+}
+
+
+_SHA = re.compile(r"[0-9a-fA-F]{7,40}")
+
+_COMMIT_CHECKS_FIELDS = f"""
+fragment CommitChecks on Commit {{
+  statusCheckRollup {{
+    state
+    contexts(first: {PAGE_SIZE}) {{
+      nodes {{
+        ... on CheckRun {{ name status conclusion }}
+        ... on StatusContext {{ context state }}
+      }}
+    }}
+  }}
+}}
+"""
+
+# Commit status states that are still waiting for a result.
+_PENDING_STATUS_STATES = frozenset({"EXPECTED", "PENDING"})
+
+
+def issue_alias(issue_number: int) -> str:
+    """GraphQL alias under which an issue is returned."""
+    return f"issue_{issue_number}"
+
+
+def build_issues_query(issue_numbers: list[int]) -> str:
+    """Build one query fetching every issue in issue_numbers.
+
+    Args:
+        issue_numbers: Issue numbers in the same repository.
+
+    Returns:
+        GraphQL query taking $owner and $name variables.
+    """
+    issues = "\n".join(
+        f"    {issue_alias(number)}: issue(number: {int(number)}) {{ ...IssueFields }}"
+        for number in issue_numbers
+    )
+    return f"""
+query($owner: String!, $name: String!) {{
+  repository(owner: $owner, name: $name) {{
+    defaultBranchRef {{ target {{ oid }} }}
+{issues}
+  }}
+}}
+{_ISSUE_FIELDS}
+"""
+
+
+def _login(actor: dict[str, Any] | None) -> str | None:
+    return actor["login"] if actor else None
+
+
+def parse_comments(connection: dict[str, Any]) -> list[IssueComment]:
+    """Convert a comments connection's nodes into IssueComment objects."""
+    return [
+        IssueComment(
+            author=_login(node.get("author")),
+            body=node["body"],
+            created_at=datetime.fromisoformat(node["createdAt"]),
+        )
+        for node in connection["nodes"]
+    ]
+
+
+def next_page_cursor(connection: dict[str, Any]) -> str | None:
+    """Cursor of a connection's next page, or None if this was the last."""
+    page_info = connection["pageInfo"]
+    return page_info["endCursor"] if page_info["hasNextPage"] else None
+
+
+def _linked_pull_requests(issue: dict[str, Any]) -> tuple[LinkedPullRequest, ...]:
+    pull_requests: dict[int, LinkedPullRequest] = {}
+    for node in issue["timelineItems"]["nodes"]:
+        pr = node.get("subject") or node.get("source")
+        # Empty objects are events pointing at issues rather than PRs.
+        if not pr:
+            continue
+        pull_requests[pr["number"]] = LinkedPullRequest(
+            number=pr["number"],
+            title=pr["title"],
+            state=pr["state"],
+            head_ref=pr["headRefName"],
+            head_sha=pr.get("headRefOid"),
+        )
+    return tuple(pull_requests.values())
+
+
+def parse_issue(
+    owner: str,
+    repo: str,
+    issue: dict[str, Any],
+    comments: list[IssueComment],
+    latest_commit_sha: str | None,
+) -> IssueSnapshot:
+    """Convert an IssueFields result into an IssueSnapshot.
+
+    Args:
+        owner: Repository owner.
+        repo: Repository name.
+        issue: Issue object from the query response, with the nodes of
+            every page of its labels and timelineItems.
+        comments: Every comment, including pages fetched separately.
+        latest_commit_sha: Head of the default branch.
+
+    Returns:
+        Immutable issue snapshot.
+    """
+    return IssueSnapshot(
+        owner=owner,
+        repo=repo,
+        number=issue["number"],
+        title=issue["title"],
+        body=issue["body"] or "",
+        state=issue["state"],
+        author=_login(issue.get("author")),
+        labels=tuple(label["name"] for label in issue["labels"]["nodes"]),
+        comments=tuple(comments),
+        linked_pull_requests=_linked_pull_requests(issue),
+        latest_commit_sha=latest_commit_sha,
+    )
+
+
+def commit_alias(index: int) -> str:
+    """GraphQL alias under which the index-th commit is returned."""
+    return f"commit_{index}"
+
+
+def validate_commit_sha(sha: str) -> None:
+    """Check that sha can be used in a commit checks query.
+
+    Raises:
+        ValueError: If sha is not a hexadecimal object ID.
+    """
+    if not _SHA.fullmatch(sha):
+        raise ValueError(f"invalid commit SHA: {sha!r}")
+
+
+def build_commit_checks_query(shas: list[str]) -> str:
+    """Build one query fetching the check rollup of every commit in shas.
+
+    Args:
+        shas: Commit SHAs in the same repository.
+
+    Returns:
+        GraphQL query taking $owner and $name variables.
+
+    Raises:
+        ValueError: If a SHA is not a hexadecimal object ID.
+    """
+    for sha in shas:
+        validate_commit_sha(sha)
+    commits = "\n".join(
+        f'    {commit_alias(index)}: object(oid: "{sha}") {{ ...CommitChecks }}'
+        for index, sha in enumerate(shas)
+    )
+    return f"""
+query($owner: String!, $name: String!) {{
+  repository(owner: $owner, name: $name) {{
+{commits}
+  }}
+}}
+{_COMMIT_CHECKS_FIELDS}
+"""
+
+
+def _check_result(node: dict[str, Any]) -> CheckResult:
+    if "context" in node:
+        state = node["state"]
+        if state in _PENDING_STATUS_STATES:
+            return CheckResult(node["context"], "PENDING", None)
+        return CheckResult(node["context"], "COMPLETED", state)
+    return CheckResult(node["name"], node["status"], node.get("conclusion"))
+
+
+def parse_commit_checks(
+    owner: str, repo: str, sha: str, commit: dict[str, Any] | None
+) -> CommitChecks:
+    """Convert a CommitChecks result into a CommitChecks domain object.
+
+    Args:
+        owner: Repository owner.
+        repo: Repository name.
+        sha: Commit SHA the result was requested for.
+        commit: Commit object from the query response; None if GitHub does
+            not know the commit yet.
+
+    Returns:
+        Check results of the commit.
+    """
+    rollup = (commit or {}).get("statusCheckRollup")
+    if rollup is None:
+        return CommitChecks(owner, repo, sha, None, ())
+    checks = tuple(_check_result(node) for node in rollup["contexts"]["nodes"] if node)
+    return CommitChecks(owner, repo, sha, rollup["state"], checks)
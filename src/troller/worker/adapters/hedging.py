@@ -0,0 +1,320 @@
+"""Hedged requests for tail latency.
+
+A call that is still running after a high percentile of recent latencies is
+likely stuck behind a slow replica or a long queue. Hedging fires a second,
+identical request at that point and returns whichever finishes first. The
+extra spend is capped as a fraction of all calls, and the delay is learned
+from a sliding window of observed latencies. An original request that lost
+to its hedge is recorded as taking the hedge delay, a lower bound on its
+real latency, so the window does not drift towards the fast calls only.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to hedge and how much hedging to allow.
+
+    Attributes:
+        percentile: Latency percentile after which a hedge is fired.
+        window: Recent successful calls the percentile is computed over.
+        min_samples: Calls observed before hedging starts.
+        max_hedge_ratio: Upper bound on hedges fired per call, capping the
+            extra spend at this fraction of all calls.
+    """
+
+    percentile: float = 0.95
+    window: int = 200
+    min_samples: int = 20
+    max_hedge_ratio: float = 0.05
+
+
+@dataclass(frozen=True)
+class HedgeStats:
+    """Counters for a Hedger.
+
+    Attributes:
+        calls: Calls made through the hedger.
+        fired: Hedge requests sent.
+        won: Hedge requests that finished before the original.
+        over_budget: Calls that passed the delay but were not hedged because
+            the budget was spent.
+    """
+
+    calls: int
+    fired: int
+    won: int
+    over_budget: int
+
+
+class LatencyTracker:
+    """Sliding window of latencies with percentile lookups."""
+
+    def __init__(self, window: int) -> None:
+        """Initialize an empty tracker.
+
+        Args:
+            window: Number of most recent latencies kept.
+        """
+        self._lock = threading.Lock()
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add one observed latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Nearest-rank percentile of the window, or None if it is empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(fraction * len(samples)))
+        return samples[rank - 1]
+
+
+class Hedger:
+    """Runs calls with a second request fired after the learned delay.
+
+    Before warm-up a blocking request runs inline on the calling thread.
+    After it, the original request runs on a pool of its own, so originals
+    never queue behind hedges. That pool is bounded: once max_originals
+    originals are running, further calls run inline and are not hedged.
+    A blocking request cannot be interrupted, so a losing request finishes
+    in the background and its result is discarded. Async calls cancel the
+    losing task, which closes its connection.
+    """
+
+    def __init__(
+        self,
+        policy: HedgePolicy | None = None,
+        max_workers: int = 32,
+        clock: Callable[[], float] = time.perf_counter,
+        max_originals: int = 128,
+    ) -> None:
+        """Initialize the hedger.
+
+        Args:
+            policy: Hedging parameters; defaults to HedgePolicy().
+            max_workers: Threads available to blocking hedges.
+            clock: Monotonic time source for latency measurements.
+            max_originals: Threads available to blocking original requests.
+        """
+        self._policy = policy or HedgePolicy()
+        self._tracker = LatencyTracker(self._policy.window)
+        self._max_workers = max_workers
+        self._max_originals = max_originals
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._originals: ThreadPoolExecutor | None = None
+        # A free slot guarantees an idle original thread, so originals
+        # never wait in the pool's queue.
+        self._original_slots = threading.BoundedSemaphore(max_originals)
+        self._calls = 0
+        self._fired = 0
+        self._won = 0
+        self._over_budget = 0
+
+    def stats(self) -> HedgeStats:
+        """Return the hedging counters so far."""
+        with self._lock:
+            return HedgeStats(self._calls, self._fired, self._won, self._over_budget)
+
+    def hedge_delay(self) -> float | None:
+        """Seconds after which a call is hedged, or None before warm-up."""
+        if len(self._tracker) < self._policy.min_samples:
+            return None
+        return self._tracker.percentile(self._policy.percentile)
+
+    def call[T](
+        self,
+        request: Callable[[], T],
+        on_discard: Callable[[T], object] | None = None,
+    ) -> T:
+        """Run a blocking request, hedging it if it is slow.
+
+        Args:
+            request: Makes one request; may be invoked twice concurrently.
+            on_discard: Called with the result of a request that succeeded
+                but lost, e.g. to record what it cost.
+
+        Returns:
+            Result of the first request to succeed.
+
+        Raises:
+            Exception: Whatever the original request raised, if no request
+                succeeded.
+        """
+        delay = self._start_call()
+        if delay is None or not self._original_slots.acquire(blocking=False):
+            return self._timed(request)
+
+        primary = self._original_pool().submit(self._measured, request)
+        primary.add_done_callback(lambda _: self._original_slots.release())
+        wait([primary], timeout=delay)
+        if primary.done() or not self._take_hedge():
+            return self._settle(primary.result())
+
+        hedge = self._hedge_pool().submit(self._measured, request)
+        futures = [primary, hedge]
+        pending: set[Future[tuple[T, float]]] = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in futures:
+                if future in done and future.exception() is None:
+                    if future is hedge:
+                        self._count_win()
+                        if primary in pending:
+                            self._tracker.record(delay)
+                    for other in futures:
+                        if other is not future:
+                            other.cancel()
+                            if on_discard is not None:
+                                other.add_done_callback(
+                                    partial(self._discarded, on_discard)
+                                )
+                    return self._settle(future.result())
+        return primary.result()[0]
+
+    async def call_async[T](
+        self,
+        request: Callable[[], Awaitable[T]],
+        on_discard: Callable[[T], object] | None = None,
+        hedge_request: Callable[[], Awaitable[T]] | None = None,
+    ) -> T:
+        """Run an async request, hedging it if it is slow.
+
+        Args:
+            request: Makes the original request.
+            on_discard: Called with the result of a request that succeeded
+                but lost; a cancelled request has no result to report.
+            hedge_request: Makes the hedge request, e.g. after taking a
+                concurrency slot of its own; defaults to request.
+
+        Returns:
+            Result of the first request to succeed.
+
+        Raises:
+            Exception: Whatever the original request raised, if no request
+                succeeded.
+        """
+        delay = self._start_call()
+        if delay is None:
+            return await self._timed_async(request)
+
+        primary = asyncio.ensure_future(self._measured_async(request))
+        tasks = [primary]
+        try:
+            await asyncio.wait(tasks, timeout=delay)
+            if primary.done() or not self._take_hedge():
+                return self._settle(await primary)
+
+            hedge = asyncio.ensure_future(
+                self._measured_async(hedge_request or request)
+            )
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in tasks:
+                    if task in done and task.exception() is None:
+                        if task is hedge:
+                            self._count_win()
+                            if primary in pending:
+                                self._tracker.record(delay)
+                        if on_discard is not None:
+                            for other in tasks:
+                                if other is not task:
+                                    other.add_done_callback(
+                                        partial(self._discarded, on_discard)
+                                    )
+                        return self._settle(task.result())
+            return primary.result()[0]
+        finally:
+            # Cancel whichever request lost, and both if the caller gave up.
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _discarded[T](
+        on_discard: Callable[[T], object],
+        future: Future[tuple[T, float]] | asyncio.Future[tuple[T, float]],
+    ) -> None:
+        """Pass the result of a losing request that succeeded to on_discard."""
+        if not future.cancelled() and future.exception() is None:
+            on_discard(future.result()[0])
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self._max_workers, thread_name_prefix="hedge"
+                )
+            return self._executor
+
+    def _original_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._originals is None:
+                self._originals = ThreadPoolExecutor(
+                    self._max_originals, thread_name_prefix="hedge-original"
+                )
+            return self._originals
+
+    def _start_call(self) -> float | None:
+        with self._lock:
+            self._calls += 1
+        return self.hedge_delay()
+
+    def _take_hedge(self) -> bool:
+        """Spend hedge budget, if any is left."""
+        with self._lock:
+            if self._fired + 1 > self._policy.max_hedge_ratio * self._calls:
+                self._over_budget += 1
+                return False
+            self._fired += 1
+            return True
+
+    def _count_win(self) -> None:
+        with self._lock:
+            self._won += 1
+
+    def _timed[T](self, request: Callable[[], T]) -> T:
+        return self._settle(self._measured(request))
+
+    async def _timed_async[T](self, request: Callable[[], Awaitable[T]]) -> T:
+        return self._settle(await self._measured_async(request))
+
+    def _measured[T](self, request: Callable[[], T]) -> tuple[T, float]:
+        started = self._clock()
+        result = request()
+        return result, self._clock() - started
+
+    async def _measured_async[T](
+        self, request: Callable[[], Awaitable[T]]
+    ) -> tuple[T, float]:
+        started = self._clock()
+        result = await request()
+        return result, self._clock() - started
+
+    def _settle[T](self, measured: tuple[T, float]) -> T:
+        """Record the winning request's latency and return its result."""
+        result, seconds = measured
+        self._tracker.record(seconds)
+        return result
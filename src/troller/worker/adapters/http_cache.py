@@ -0,0 +1,194 @@
+"""Conditional-request cache for HTTP GET responses.
+
+Stores each response body with its ETag and Last-Modified validators so the
+next request for the same URL can be sent with If-None-Match /
+If-Modified-Since. A 304 Not Modified answer is then served from the cache.
+GitHub does not count 304 responses against the rate limit.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from troller.worker.adapters.lru_cache import LRUCache
+
+DEFAULT_MAX_MEMORY_ENTRIES = 2048
+DEFAULT_MAX_DISK_ENTRIES = 20_000
+# How many disk writes happen between pruning passes over the cache directory.
+_PRUNE_EVERY_WRITES = 200
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A response body together with its cache validators.
+
+    Attributes:
+        body: Raw response body.
+        etag: Value of the ETag header, if any.
+        last_modified: Value of the Last-Modified header, if any.
+    """
+
+    body: str
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def validator_headers(self) -> dict[str, str]:
+        """Request headers that make a GET conditional on this response."""
+        headers: dict[str, str] = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(frozen=True)
+class ConditionalCacheStats:
+    """Counters for a ConditionalCache.
+
+    Attributes:
+        not_modified: Responses served from cache after a 304.
+        refreshed: Full responses stored or replaced.
+    """
+
+    not_modified: int
+    refreshed: int
+
+
+class ConditionalCache:
+    """Bounded in-memory store of validated responses with optional disk tier."""
+
+    def __init__(
+        self,
+        disk_dir: Path | None = None,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            disk_dir: Directory for the on-disk tier, or None for memory only.
+            max_memory_entries: Maximum responses held in memory.
+            max_disk_entries: Maximum response files kept in disk_dir.
+        """
+        self._memory: LRUCache[str, CachedResponse] = LRUCache(max_memory_entries)
+        self._disk_dir = disk_dir
+        self._max_disk_entries = max_disk_entries
+        self._lock = threading.Lock()
+        self._not_modified = 0
+        self._refreshed = 0
+        self._writes_since_prune = 0
+        if disk_dir is not None:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Return the stored response for url, if any."""
+        cached = self._memory.get(url)
+        if cached is None:
+            cached = self._read_disk(url)
+            if cached is not None:
+                self._memory.put(url, cached)
+        return cached
+
+    def resolve(
+        self,
+        url: str,
+        cached: CachedResponse | None,
+        status: int,
+        headers: dict[str, str],
+        body: str,
+    ) -> str | None:
+        """Record a response and return the body the caller should use.
+
+        Args:
+            url: Cache key the request was made for.
+            cached: Entry whose validators were sent with the request, if any.
+            status: HTTP status of the response.
+            headers: Response headers with lower-case names.
+            body: Raw response body.
+
+        Returns:
+            The cached body for a 304, the fresh body for a 200, or None if
+            the response is neither (the caller handles it as an error).
+        """
+        if status == 304 and cached is not None:
+            with self._lock:
+                self._not_modified += 1
+            return cached.body
+
+        if status != 200:
+            return None
+
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if etag is not None or last_modified is not None:
+            self._store(url, CachedResponse(body, etag, last_modified))
+        return body
+
+    def stats(self) -> ConditionalCacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return ConditionalCacheStats(
+                not_modified=self._not_modified, refreshed=self._refreshed
+            )
+
+    def _store(self, url: str, response: CachedResponse) -> None:
+        self._memory.put(url, response)
+        with self._lock:
+            self._refreshed += 1
+        if self._disk_dir is None:
+            return
+
+        payload = {
+            "url": url,
+            "body": response.body,
+            "etag": response.etag,
+            "last_modified": response.last_modified,
+        }
+        path = self._disk_path(url)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        tmp_path.replace(path)
+
+        with self._lock:
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= _PRUNE_EVERY_WRITES
+            if prune:
+                self._writes_since_prune = 0
+        if prune:
+            self._prune_disk()
+
+    def _read_disk(self, url: str) -> CachedResponse | None:
+        if self._disk_dir is None:
+            return None
+        try:
+            payload = json.loads(self._disk_path(url).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if payload.get("url") != url:
+            return None
+        return CachedResponse(
+            body=payload["body"],
+            etag=payload.get("etag"),
+            last_modified=payload.get("last_modified"),
+        )
+
+    def _disk_path(self, url: str) -> Path:
+        assert self._disk_dir is not None
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self._disk_dir / f"{digest}.json"
+
+    def _prune_disk(self) -> None:
+        """Delete the least recently written files above max_disk_entries."""
+        assert self._disk_dir is not None
+        try:
+            files = sorted(
+                self._disk_dir.glob("*.json"), key=lambda path: path.stat().st_mtime
+            )
+        except FileNotFoundError:
+            # Another process pruned concurrently; try again on a later write.
+            return
+        for path in files[: max(0, len(files) - self._max_disk_entries)]:
+            path.unlink(missing_ok=True)
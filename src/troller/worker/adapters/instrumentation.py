@@ -0,0 +1,316 @@
+"""Token, cost and latency instrumentation for model calls.
+
+Every model call produces a CallRecord with token counts, wall time,
+time-to-first-token and computed cost. Records go to a pluggable CallSink,
+such as a JSONL file or an in-process registry, and carry the ID of the
+workflow they ran for so spend can be aggregated per workflow.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """Prices in USD per million tokens.
+
+    Attributes:
+        input: Uncached input tokens.
+        output: Output tokens.
+        cache_write: Input tokens written to the prompt cache.
+        cache_read: Input tokens read from the prompt cache.
+    """
+
+    input: float
+    output: float
+    cache_write: float
+    cache_read: float
+
+
+# Standard (5-minute cache) API pricing.
+MODEL_PRICING: dict[str, ModelPricing] = {
+    "claude-opus-4-5-20251101": ModelPricing(5.0, 25.0, 6.25, 0.50),
+    "claude-sonnet-4-5-20250929": ModelPricing(3.0, 15.0, 3.75, 0.30),
+    "claude-haiku-4-5-20251001": ModelPricing(1.0, 5.0, 1.25, 0.10),
+}
+# Message Batches are billed at half the standard price.
+BATCH_DISCOUNT = 0.5
+
+_workflow_id: ContextVar[str | None] = ContextVar("workflow_id", default=None)
+
+
+def call_cost(
+    model: str, usage: Mapping[str, int], batch: bool = False
+) -> float | None:
+    """Compute the cost of a call from its token usage.
+
+    Args:
+        model: Model ID the call was served by.
+        usage: Token counts as returned by usage_metadata.
+        batch: Whether the call ran through the Message Batches API.
+
+    Returns:
+        Cost in USD, or None if the model's pricing is unknown.
+    """
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return None
+    cost = (
+        usage["input_tokens"] * pricing.input
+        + usage["output_tokens"] * pricing.output
+        + usage["cache_creation_input_tokens"] * pricing.cache_write
+        + usage["cache_read_input_tokens"] * pricing.cache_read
+    ) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+@dataclass(frozen=True)
+class CallRecord:
+    """Measurements of one model call.
+
+    Attributes:
+        operation: Client method that made the call, e.g. 'generate_plan'.
+        model: Model ID the call was served by.
+        input_tokens: Uncached input tokens.
+        output_tokens: Output tokens.
+        cache_read_input_tokens: Input tokens read from the prompt cache.
+        cache_creation_input_tokens: Input tokens written to the prompt cache.
+        stop_reason: Why the model stopped generating.
+        wall_seconds: Time from sending the request to the full response;
+            None for batch results.
+        queue_seconds: Time spent waiting for a concurrency slot and
+            rate-limit budget before the request was sent; None for batch
+            results.
+        time_to_first_token_seconds: Time until the first streamed content;
+            None for calls that were not streamed.
+        cost_usd: Computed cost, or None if the model's pricing is unknown.
+        issue_number: Issue the call was made for, if any.
+        workflow_id: Workflow the call ran for, if known.
+        timestamp: When the call finished, in epoch seconds.
+    """
+
+    operation: str
+    model: str
+    input_tokens: int
+    output_tokens: int
+    cache_read_input_tokens: int
+    cache_creation_input_tokens: int
+    stop_reason: str | None
+    wall_seconds: float | None
+    queue_seconds: float | None
+    time_to_first_token_seconds: float | None
+    cost_usd: float | None
+    issue_number: int | None
+    workflow_id: str | None
+    timestamp: float
+
+    @classmethod
+    def create(
+        cls,
+        operation: str,
+        model: str,
+        usage: Mapping[str, int],
+        stop_reason: str | None,
+        wall_seconds: float | None = None,
+        time_to_first_token_seconds: float | None = None,
+        issue_number: int | None = None,
+        batch: bool = False,
+        queue_seconds: float | None = None,
+    ) -> "CallRecord":
+        """Build a record, computing cost and tagging the current workflow.
+
+        Args:
+            operation: Client method that made the call.
+            model: Model ID the call was served by.
+            usage: Token counts as returned by usage_metadata.
+            stop_reason: Why the model stopped generating.
+            wall_seconds: Time from request to full response.
+            time_to_first_token_seconds: Time until the first streamed content.
+            issue_number: Issue the call was made for, if any.
+            batch: Whether the call ran through the Message Batches API.
+            queue_seconds: Time waited before the request was sent.
+
+        Returns:
+            The call record.
+        """
+        return cls(
+            operation=operation,
+            model=model,
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            cache_read_input_tokens=usage["cache_read_input_tokens"],
+            cache_creation_input_tokens=usage["cache_creation_input_tokens"],
+            stop_reason=stop_reason,
+            wall_seconds=wall_seconds,
+            queue_seconds=queue_seconds,
+            time_to_first_token_seconds=time_to_first_token_seconds,
+            cost_usd=call_cost(model, usage, batch),
+            issue_number=issue_number,
+            workflow_id=_workflow_id.get(),
+            timestamp=time.time(),
+        )
+
+    def summary(self) -> dict[str, Any]:
+        """Compact description of the call for Plan.metadata."""
+        return {
+            "model": self.model,
+            "stop_reason": self.stop_reason,
+            "wall_seconds": self.wall_seconds,
+            "queue_seconds": self.queue_seconds,
+            "time_to_first_token_seconds": self.time_to_first_token_seconds,
+            "cost_usd": self.cost_usd,
+        }
+
+
+class CallSink(Protocol):
+    """Destination for call records."""
+
+    def record(self, call: CallRecord) -> None:
+        """Store or forward one call record."""
+        ...
+
+
+class JsonlCallSink:
+    """Appends each call record as one JSON line to a file."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the sink.
+
+        Args:
+            path: File to append to; created along with its parent directory.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        self._lock = threading.Lock()
+
+    def record(self, call: CallRecord) -> None:
+        """Append the record to the file."""
+        line = json.dumps(asdict(call), separators=(",", ":")) + "\n"
+        with self._lock, self._path.open("a", encoding="utf-8") as file:
+            file.write(line)
+
+
+@dataclass(frozen=True)
+class CallTotals:
+    """Aggregated usage over a set of calls.
+
+    Attributes:
+        calls: Number of calls.
+        input_tokens: Sum of uncached input tokens.
+        output_tokens: Sum of output tokens.
+        cache_read_input_tokens: Sum of cache-read input tokens.
+        cache_creation_input_tokens: Sum of cache-write input tokens.
+        cost_usd: Sum of known costs.
+        wall_seconds: Sum of measured wall times.
+    """
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cost_usd: float = 0.0
+    wall_seconds: float = 0.0
+
+
+class InMemoryCallSink:
+    """In-process registry of call records with per-workflow totals."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._records: list[CallRecord] = []
+
+    def record(self, call: CallRecord) -> None:
+        """Keep the record."""
+        with self._lock:
+            self._records.append(call)
+
+    @property
+    def records(self) -> list[CallRecord]:
+        """Snapshot of every record so far, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+    def totals(self, workflow_id: str | None = None) -> CallTotals:
+        """Aggregate records, optionally only those of one workflow."""
+        records = [
+            call
+            for call in self.records
+            if workflow_id is None or call.workflow_id == workflow_id
+        ]
+        return CallTotals(
+            calls=len(records),
+            input_tokens=sum(call.input_tokens for call in records),
+            output_tokens=sum(call.output_tokens for call in records),
+            cache_read_input_tokens=sum(
+                call.cache_read_input_tokens for call in records
+            ),
+            cache_creation_input_tokens=sum(
+                call.cache_creation_input_tokens for call in records
+            ),
+            cost_usd=sum(call.cost_usd or 0.0 for call in records),
+            wall_seconds=sum(call.wall_seconds or 0.0 for call in records),
+        )
+
+
+@contextmanager
+def workflow_scope(workflow_id: str) -> Iterator[None]:
+    """Tag every call record created inside the block with workflow_id."""
+    token = _workflow_id.set(workflow_id)
+    try:
+        yield
+    finally:
+        _workflow_id.reset(token)
+
+
+class CallTimer:
+    """Measures queue time, wall time and time-to-first-token of one call.
+
+    Time until mark_sent is queue time; wall time and time-to-first-token
+    are measured from mark_sent, so they reflect the API alone.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Start timing.
+
+        Args:
+            clock: Monotonic time source.
+        """
+        self._clock = clock
+        self._created = clock()
+        self._started = self._created
+        self._sent = False
+        self._first_token: float | None = None
+
+    def mark_sent(self) -> None:
+        """Record that the request is being sent; later calls are ignored."""
+        if not self._sent:
+            self._sent = True
+            self._started = self._clock()
+
+    @property
+    def queue_seconds(self) -> float:
+        """Seconds between creating the timer and mark_sent."""
+        return self._started - self._created
+
+    def mark_first_token(self) -> None:
+        """Record the arrival of streamed content; later calls are ignored."""
+        if self._first_token is None:
+            self._first_token = self._clock() - self._started
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        """Seconds until mark_first_token was first called, if it was."""
+        return self._first_token
+
+    def elapsed(self) -> float:
+        """Seconds since mark_sent, or since creation if it was not called."""
+        return self._clock() - self._started
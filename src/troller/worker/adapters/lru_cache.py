@@ -0,0 +1,90 @@
+"""Bounded in-memory LRU cache with optional time-to-live.
+
+Shared building block for adapter-level caches. Safe to use from multiple
+threads.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class LRUCache[K, V]:
+    """Least-recently-used cache with size and age bounds.
+
+    Entries older than ttl_seconds are treated as missing and dropped on
+    access. When the cache is full, the least recently used entry is evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept.
+            ttl_seconds: Maximum entry age, or None to never expire.
+            clock: Monotonic time source, injectable for tests.
+
+        Raises:
+            ValueError: If max_entries is less than 1.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self._ttl is not None and self._clock() - stored_at > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V, stored_at: float | None = None) -> None:
+        """Store value under key, evicting the least recently used if full.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            stored_at: When the value was first stored, on this cache's clock,
+                so a value copied from another tier keeps its age; None for
+                now.
+        """
+        with self._lock:
+            self._entries[key] = (
+                self._clock() if stored_at is None else stored_at,
+                value,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        """Remove key and return its value, or None if it was not cached."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,345 @@
+"""Model cascade for planning calls.
+
+Most of the backlog is typo fixes, dependency bumps and small chores that a
+cheaper model plans as well as Opus. A local heuristic triages each issue
+from its length, labels, title and code references without a model call.
+Clearly simple issues are planned on the cheap model; everything else,
+including borderline cases, goes to the strong model. A cheap plan that
+fails validation is thrown away, never cached, and the issue is re-planned on
+the strong model; the tokens the rejected attempt used are kept in the
+strong plan's routing metadata.
+"""
+
+import re
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from typing import Any
+
+from troller.domain.models.plan import Plan
+from troller.worker.adapters.claude_client import AsyncClaudeClient, ClaudeClient
+from troller.worker.adapters.context_budget import estimate_tokens, file_references
+from troller.worker.adapters.repo_index import RepositoryContext
+
+CHEAP_PLANNING_MODEL = "claude-haiku-4-5-20251001"
+
+# Issues scoring at or below this are planned on the cheap model. A simple
+# label or title scores -2 and a short body -1, so at least two independent
+# simple signals are needed.
+DEFAULT_SIMPLE_THRESHOLD = -3
+
+_SIMPLE_LABELS = frozenset(
+    {"chore", "dependencies", "docs", "documentation", "good first issue", "typo"}
+)
+_COMPLEX_LABELS = frozenset(
+    {
+        "architecture",
+        "breaking change",
+        "enhancement",
+        "epic",
+        "feature",
+        "performance",
+        "refactor",
+        "security",
+    }
+)
+_SIMPLE_TITLE = re.compile(
+    r"\b(typo|spelling|bump|rename|readme|docs?|changelog|lint|chore)\b",
+    re.IGNORECASE,
+)
+_FENCE = re.compile(r"^\s*(```|~~~)", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class IssueTriage:
+    """Heuristic complexity estimate of an issue.
+
+    Attributes:
+        score: Negative for simple issues, positive for complex ones.
+        reasons: Signals that contributed to the score.
+    """
+
+    score: int
+    reasons: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class RoutingStats:
+    """Counters for a plan router.
+
+    Attributes:
+        cheap: Plans produced by the cheap model.
+        strong: Plans produced by the strong model, escalations included.
+        escalated: Cheap plans rejected by validation and re-planned.
+    """
+
+    cheap: int
+    strong: int
+    escalated: int
+
+
+def triage_issue(
+    issue_title: str, issue_body: str, labels: Sequence[str] = ()
+) -> IssueTriage:
+    """Score how complex an issue is likely to be to plan.
+
+    Args:
+        issue_title: Title of the GitHub issue.
+        issue_body: Body/description of the GitHub issue.
+        labels: Label names on the issue.
+
+    Returns:
+        The score and the signals behind it.
+    """
+    score = 0
+    reasons: list[str] = []
+
+    tokens = estimate_tokens(issue_body)
+    if tokens < 100:
+        score -= 1
+        reasons.append("short body")
+    elif tokens > 1000:
+        score += 2
+        reasons.append("long body")
+
+    files = len(file_references(f"{issue_title}\n{issue_body}"))
+    if files >= 4:
+        score += 3
+        reasons.append(f"mentions {files} files")
+    elif files >= 2:
+        score += 1
+        reasons.append(f"mentions {files} files")
+
+    code_blocks = len(_FENCE.findall(issue_body)) // 2
+    if code_blocks >= 2:
+        score += 1
+        reasons.append(f"{code_blocks} code blocks")
+
+    names = {label.lower() for label in labels}
+    if simple := sorted(names & _SIMPLE_LABELS):
+        score -= 2
+        reasons.append(f"label {simple[0]!r}")
+    if complex_ := sorted(names & _COMPLEX_LABELS):
+        score += 3
+        reasons.append(f"label {complex_[0]!r}")
+
+    if match := _SIMPLE_TITLE.search(issue_title):
+        score -= 2
+        reasons.append(f"title mentions {match.group(1).lower()!r}")
+
+    return IssueTriage(score, tuple(reasons))
+
+
+def validate_plan(plan: Plan) -> list[str]:
+    """Check a generated plan for defects that warrant re-planning.
+
+    Args:
+        plan: Plan to check.
+
+    Returns:
+        Descriptions of the problems found; empty if the plan is usable.
+    """
+    problems: list[str] = []
+    if not plan.summary.strip():
+        problems.append("summary is empty")
+    if not plan.steps:
+        problems.append("plan has no steps")
+    seen: set[str] = set()
+    for step in plan.steps:
+        if step.id in seen:
+            problems.append(f"duplicate step id {step.id!r}")
+        seen.add(step.id)
+        if not step.description.strip():
+            problems.append(f"step {step.id!r} has no description")
+    call = plan.metadata.get("call") or {}
+    if call.get("stop_reason") == "max_tokens":
+        problems.append("output was truncated at max_tokens")
+    return problems
+
+
+def _with_routing(
+    plan: Plan,
+    triage: IssueTriage,
+    tier: str,
+    rejected: Sequence[str] = (),
+    rejected_plan: Plan | None = None,
+) -> Plan:
+    """Record how a plan was routed in its metadata.
+
+    For an escalation, rejected_plan is the cheap plan that failed
+    validation; its usage and call details are recorded so the tokens it
+    used are not lost.
+    """
+    routing: dict[str, Any] = {
+        "tier": tier,
+        "triage_score": triage.score,
+        "triage_reasons": list(triage.reasons),
+        "escalated": bool(rejected),
+    }
+    if rejected:
+        routing["rejected_cheap_plan"] = list(rejected)
+    if rejected_plan is not None:
+        for key in ("usage", "call"):
+            if key in rejected_plan.metadata:
+                routing[f"rejected_cheap_{key}"] = rejected_plan.metadata[key]
+    return replace(plan, metadata={**plan.metadata, "routing": routing})
+
+
+class _RoutingCounters:
+    """Thread-safe counters behind RoutingStats."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cheap = 0
+        self._strong = 0
+        self._escalated = 0
+
+    def count(self, tier: str, escalated: bool = False) -> None:
+        with self._lock:
+            if tier == "cheap":
+                self._cheap += 1
+            else:
+                self._strong += 1
+            self._escalated += escalated
+
+    def stats(self) -> RoutingStats:
+        with self._lock:
+            return RoutingStats(self._cheap, self._strong, self._escalated)
+
+
+class PlanRouter:
+    """Plans simple issues on a cheap model and the rest on a strong one."""
+
+    def __init__(
+        self,
+        cheap: ClaudeClient | None = None,
+        strong: ClaudeClient | None = None,
+        simple_threshold: int = DEFAULT_SIMPLE_THRESHOLD,
+    ) -> None:
+        """Initialize the router.
+
+        Args:
+            cheap: Client for simple issues; defaults to one using
+                CHEAP_PLANNING_MODEL.
+            strong: Client for complex issues and escalations; defaults to
+                one using the standard planning model.
+            simple_threshold: Highest triage score planned on the cheap model.
+
+        Raises:
+            ValueError: If ANTHROPIC_API_KEY environment variable is not set.
+        """
+        self._cheap = cheap or ClaudeClient(model=CHEAP_PLANNING_MODEL)
+        self._strong = strong or ClaudeClient()
+        self._simple_threshold = simple_threshold
+        self._counters = _RoutingCounters()
+
+    def stats(self) -> RoutingStats:
+        """Return how many plans each model produced so far."""
+        return self._counters.stats()
+
+    def generate_plan(
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        labels: Sequence[str] = (),
+        repository: RepositoryContext | None = None,
+    ) -> Plan:
+        """Generate an implementation plan on the cheapest suitable model.
+
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_body: Body/description of the GitHub issue.
+            issue_number: Issue number for reference.
+            labels: Label names on the issue, used for triage.
+            repository: Repository files to show the model, or None.
+
+        Returns:
+            Plan with routing details in metadata['routing'].
+        """
+        triage = triage_issue(issue_title, issue_body, labels)
+        rejected: list[str] = []
+        cheap_plan: Plan | None = None
+        if triage.score <= self._simple_threshold:
+            cheap_plan = self._cheap.generate_plan(
+                issue_title, issue_body, issue_number, repository, validate_plan
+            )
+            rejected = validate_plan(cheap_plan)
+            if not rejected:
+                self._counters.count("cheap")
+                return _with_routing(cheap_plan, triage, "cheap")
+
+        plan = self._strong.generate_plan(
+            issue_title, issue_body, issue_number, repository
+        )
+        self._counters.count("strong", escalated=bool(rejected))
+        return _with_routing(plan, triage, "strong", rejected, cheap_plan)
+
+
+class AsyncPlanRouter:
+    """Async counterpart of PlanRouter built on AsyncClaudeClient."""
+
+    def __init__(
+        self,
+        cheap: AsyncClaudeClient | None = None,
+        strong: AsyncClaudeClient | None = None,
+        simple_threshold: int = DEFAULT_SIMPLE_THRESHOLD,
+    ) -> None:
+        """Initialize the router.
+
+        Args:
+            cheap: Client for simple issues; defaults to one using
+                CHEAP_PLANNING_MODEL.
+            strong: Client for complex issues and escalations; defaults to
+                one using the standard planning model.
+            simple_threshold: Highest triage score planned on the cheap model.
+
+        Raises:
+            ValueError: If ANTHROPIC_API_KEY environment variable is not set.
+        """
+        self._cheap = cheap or AsyncClaudeClient(model=CHEAP_PLANNING_MODEL)
+        self._strong = strong or AsyncClaudeClient()
+        self._simple_threshold = simple_threshold
+        self._counters = _RoutingCounters()
+
+    def stats(self) -> RoutingStats:
+        """Return how many plans each model produced so far."""
+        return self._counters.stats()
+
+    async def generate_plan(
+        self,
+        issue_title: str,
+        issue_body: str,
+        issue_number: int,
+        labels: Sequence[str] = (),
+        repository: RepositoryContext | None = None,
+    ) -> Plan:
+        """Generate an implementation plan on the cheapest suitable model.
+
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_body: Body/description of the GitHub issue.
+            issue_number: Issue number for reference.
+            labels: Label names on the issue, used for triage.
+            repository: Repository files to show the model, or None.
+
+        Returns:
+            Plan with routing details in metadata['routing'].
+        """
+        triage = triage_issue(issue_title, issue_body, labels)
+        rejected: list[str] = []
+        cheap_plan: Plan | None = None
+        if triage.score <= self._simple_threshold:
+            cheap_plan = await self._cheap.generate_plan(
+                issue_title, issue_body, issue_number, repository, validate_plan
+            )
+            rejected = validate_plan(cheap_plan)
+            if not rejected:
+                self._counters.count("cheap")
+                return _with_routing(cheap_plan, triage, "cheap")
+
+        plan = await self._strong.generate_plan(
+            issue_title, issue_body, issue_number, repository
+        )
+        self._counters.count("strong", escalated=bool(rejected))
+        return _with_routing(plan, triage, "strong", rejected, cheap_plan)
@@ -0,0 +1,216 @@
+"""Content-addressed cache for generated plans.
+
+Plans are keyed by a hash of everything that determines the planning call's
+output, so a workflow resuming after continue-as-new or a restart gets the
+previous plan back without another planning call when the issue is unchanged.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from troller.domain.models.plan import Plan
+from troller.worker.adapters.lru_cache import LRUCache
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+# How many disk writes happen between sweeps of expired plans off the disk.
+_PRUNE_EVERY_WRITES = 200
+
+
+def plan_cache_key(
+    issue_title: str,
+    issue_body: str,
+    issue_number: int,
+    model: str,
+    prompt_version: str,
+) -> str:
+    """Compute the cache key for a planning call.
+
+    Args:
+        issue_title: Title of the GitHub issue.
+        issue_body: Body/description of the GitHub issue.
+        issue_number: Issue number for reference.
+        model: Model used for planning.
+        prompt_version: Version of the planning prompt and tool schema.
+
+    Returns:
+        Hex SHA-256 digest identifying the planning inputs.
+    """
+    material = json.dumps(
+        [issue_title, issue_body, issue_number, model, prompt_version],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class PlanCacheStats:
+    """Hit and miss counters for a PlanCache.
+
+    Attributes:
+        memory_hits: Lookups served from the in-memory tier.
+        disk_hits: Lookups served from the on-disk tier.
+        misses: Lookups that found no fresh entry.
+    """
+
+    memory_hits: int
+    disk_hits: int
+    misses: int
+
+
+class PlanCache:
+    """Two-tier plan cache: in-memory LRU backed by an optional SQLite file.
+
+    Both tiers honour the same TTL. The disk tier is bounded by entry count
+    and evicts least recently used rows first. Expired rows are only read as
+    misses, and are swept off the disk every few hundred writes.
+    """
+
+    def __init__(
+        self,
+        disk_path: Path | None = None,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 10_000,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the plan cache.
+
+        Args:
+            disk_path: SQLite database file for the disk tier, or None to
+                cache in memory only.
+            max_memory_entries: Maximum plans held in memory.
+            max_disk_entries: Maximum plans held on disk.
+            ttl_seconds: Maximum age of a cached plan.
+            clock: Wall-clock time source, injectable for tests.
+        """
+        self._memory: LRUCache[str, Plan] = LRUCache(
+            max_memory_entries, ttl_seconds=ttl_seconds, clock=clock
+        )
+        self._max_disk_entries = max_disk_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._disk_rows = 0
+        self._writes_since_prune = 0
+
+        self._db: sqlite3.Connection | None = None
+        if disk_path is not None:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS plans_accessed_at ON plans (accessed_at)"
+            )
+            self._db.commit()
+            self._disk_rows = self._count_rows()
+
+    def get(self, key: str) -> Plan | None:
+        """Return the cached plan for key, or None on a miss."""
+        plan = self._memory.get(key)
+        if plan is not None:
+            with self._lock:
+                self._memory_hits += 1
+            return plan
+
+        entry = self._get_from_disk(key)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+        plan, stored_at = entry
+        # Keep the disk entry's age so the TTL bounds the plan's total life.
+        self._memory.put(key, plan, stored_at=stored_at)
+        return plan
+
+    def put(self, key: str, plan: Plan) -> None:
+        """Store plan under key in every tier."""
+        self._memory.put(key, plan)
+        if self._db is None:
+            return
+
+        now = self._clock()
+        payload = json.dumps(plan.to_dict())
+        with self._lock:
+            replaced = self._db.execute(
+                "SELECT 1 FROM plans WHERE key = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            if replaced is None:
+                self._disk_rows += 1
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= _PRUNE_EVERY_WRITES:
+                self._writes_since_prune = 0
+                self._db.execute(
+                    "DELETE FROM plans WHERE stored_at < ?", (now - self._ttl,)
+                )
+                # Also picks up rows other processes added or removed.
+                self._disk_rows = self._count_rows()
+            if self._disk_rows > self._max_disk_entries:
+                # The accessed_at index makes this read only the rows evicted.
+                evicted = self._db.execute(
+                    "DELETE FROM plans WHERE key IN ("
+                    "SELECT key FROM plans ORDER BY accessed_at LIMIT ?)",
+                    (self._disk_rows - self._max_disk_entries,),
+                )
+                self._disk_rows -= evicted.rowcount
+            self._db.commit()
+
+    def stats(self) -> PlanCacheStats:
+        """Return a snapshot of hit and miss counters."""
+        with self._lock:
+            return PlanCacheStats(
+                memory_hits=self._memory_hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+            )
+
+    def close(self) -> None:
+        """Close the disk tier, if any."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _get_from_disk(self, key: str) -> tuple[Plan, float] | None:
+        if self._db is None:
+            return None
+
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, stored_at FROM plans WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, stored_at = row
+            if now - stored_at > self._ttl:
+                deleted = self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                self._disk_rows -= deleted.rowcount
+                self._db.commit()
+                return None
+            self._db.execute(
+                "UPDATE plans SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+        return Plan.from_dict(json.loads(payload)), stored_at
+
+    def _count_rows(self) -> int:
+        assert self._db is not None
+        rows: int = self._db.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+        return rows
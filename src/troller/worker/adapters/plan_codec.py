@@ -0,0 +1,254 @@
+"""Compact serialization of plans for Temporal workflow history.
+
+Plans cross every activity boundary and are carried through continue-as-new,
+so their encoded size is paid again and again in history. The compact form
+stores steps as positional arrays, writes every distinct related file path
+once in a shared table, abbreviates complexity levels, and zlib-compresses
+payloads above a size threshold. Progress between activities can travel as a
+CompletionDelta of a few bytes instead of the whole plan.
+"""
+
+import json
+import sys
+import zlib
+from datetime import datetime
+from typing import Any, Literal
+
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    CompositePayloadConverter,
+    DataConverter,
+    DefaultPayloadConverter,
+    EncodingPayloadConverter,
+)
+
+from troller.domain.models.plan import CompletionDelta, Plan, PlanStep
+
+ENCODING = "binary/troller-plan"
+FORMAT_VERSION = 1
+# Payloads at least this large are compressed when that makes them smaller.
+DEFAULT_COMPRESSION_THRESHOLD_BYTES = 1024
+
+_Complexity = Literal["simple", "moderate", "complex"]
+
+# First byte of an encoded payload.
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+_COMPLEXITY_NAMES: tuple[_Complexity, ...] = ("simple", "moderate", "complex")
+_COMPLEXITY_CODES = {name: code for code, name in enumerate(_COMPLEXITY_NAMES)}
+_TYPE_METADATA_KEY = "troller-type"
+
+
+def _frame(document: Any, compression_threshold: int) -> bytes:
+    data = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(data) >= compression_threshold:
+        compressed = zlib.compress(data)
+        if len(compressed) < len(data):
+            return _ZLIB + compressed
+    return _RAW + data
+
+
+def _unframe(data: bytes) -> Any:
+    marker, body = data[:1], data[1:]
+    if marker == _ZLIB:
+        body = zlib.decompress(body)
+    elif marker != _RAW:
+        raise ValueError(f"unknown plan payload marker {marker!r}")
+    return json.loads(body)
+
+
+def _encode_steps(steps: list[PlanStep]) -> tuple[list[str], list[list[Any]]]:
+    """Encode steps as arrays, replacing file paths with file-table indexes."""
+    file_indexes: dict[str, int] = {}
+    encoded: list[list[Any]] = []
+    for step in steps:
+        files = (
+            [
+                file_indexes.setdefault(path, len(file_indexes))
+                for path in step.related_files
+            ]
+            if step.related_files is not None
+            else None
+        )
+        complexity = (
+            _COMPLEXITY_CODES[step.estimated_complexity]
+            if step.estimated_complexity is not None
+            else None
+        )
+        encoded.append(
+            [step.id, step.description, int(step.completed), files, complexity]
+        )
+    return list(file_indexes), encoded
+
+
+def _decode_steps(files: list[str], encoded: list[list[Any]]) -> list[PlanStep]:
+    """Rebuild steps; each distinct path becomes one shared, interned string."""
+    paths = [sys.intern(path) for path in files]
+    return [
+        PlanStep(
+            id=step_id,
+            description=description,
+            completed=bool(completed),
+            related_files=(
+                [paths[index] for index in file_refs] if file_refs is not None else None
+            ),
+            estimated_complexity=(
+                _COMPLEXITY_NAMES[complexity] if complexity is not None else None
+            ),
+        )
+        for step_id, description, completed, file_refs, complexity in encoded
+    ]
+
+
+def encode_plan(
+    plan: Plan, compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD_BYTES
+) -> bytes:
+    """Encode a plan in the compact format.
+
+    Args:
+        plan: Plan to encode. Metadata values must be JSON-compatible.
+        compression_threshold: Minimum uncompressed size, in bytes, at which
+            compression is attempted.
+
+    Returns:
+        Encoded plan.
+    """
+    files, steps = _encode_steps(plan.steps)
+    document: dict[str, Any] = {
+        "v": FORMAT_VERSION,
+        "s": plan.summary,
+        "c": plan.created_at.isoformat(),
+        "f": files,
+        "st": steps,
+    }
+    if plan.metadata:
+        document["m"] = plan.metadata
+    if plan.technical_approach is not None:
+        document["a"] = plan.technical_approach
+    if plan.testing_strategy is not None:
+        document["t"] = plan.testing_strategy
+    return _frame(document, compression_threshold)
+
+
+def decode_plan(data: bytes) -> Plan:
+    """Decode a plan produced by encode_plan.
+
+    Raises:
+        ValueError: If data is not a supported plan encoding.
+    """
+    document = _unframe(data)
+    if document.get("v") != FORMAT_VERSION:
+        raise ValueError(f"unsupported plan format version {document.get('v')!r}")
+    return Plan(
+        summary=document["s"],
+        steps=_decode_steps(document["f"], document["st"]),
+        created_at=datetime.fromisoformat(document["c"]),
+        metadata=document.get("m", {}),
+        technical_approach=document.get("a"),
+        testing_strategy=document.get("t"),
+    )
+
+
+def encode_step(step: PlanStep) -> bytes:
+    """Encode a single step in the compact format."""
+    files, steps = _encode_steps([step])
+    return _frame({"v": FORMAT_VERSION, "f": files, "st": steps}, sys.maxsize)
+
+
+def decode_step(data: bytes) -> PlanStep:
+    """Decode a step produced by encode_step."""
+    document = _unframe(data)
+    return _decode_steps(document["f"], document["st"])[0]
+
+
+def encode_completion_delta(delta: CompletionDelta) -> bytes:
+    """Encode a completion delta; the bitmasks are written in hex."""
+    return _frame(
+        {
+            "n": delta.step_count,
+            "c": format(delta.completed, "x"),
+            "r": format(delta.reopened, "x"),
+        },
+        sys.maxsize,
+    )
+
+
+def decode_completion_delta(data: bytes) -> CompletionDelta:
+    """Decode a completion delta produced by encode_completion_delta."""
+    document = _unframe(data)
+    return CompletionDelta(
+        step_count=document["n"],
+        completed=int(document["c"], 16),
+        reopened=int(document["r"], 16),
+    )
+
+
+class PlanPayloadConverter(EncodingPayloadConverter):
+    """Temporal payload converter for Plan, PlanStep and CompletionDelta.
+
+    Any other value is left to the next converter in the chain.
+    """
+
+    def __init__(
+        self, compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD_BYTES
+    ) -> None:
+        """Initialize the converter.
+
+        Args:
+            compression_threshold: Minimum uncompressed plan size, in bytes,
+                at which compression is attempted.
+        """
+        self._compression_threshold = compression_threshold
+
+    @property
+    def encoding(self) -> str:
+        """Encoding written to the payload metadata."""
+        return ENCODING
+
+    def to_payload(self, value: Any) -> Payload | None:
+        """Encode a plan model, or return None for any other value."""
+        if isinstance(value, Plan):
+            data = encode_plan(value, self._compression_threshold)
+        elif isinstance(value, PlanStep):
+            data = encode_step(value)
+        elif isinstance(value, CompletionDelta):
+            data = encode_completion_delta(value)
+        else:
+            return None
+        return Payload(
+            metadata={
+                "encoding": ENCODING.encode(),
+                _TYPE_METADATA_KEY: type(value).__name__.encode(),
+            },
+            data=data,
+        )
+
+    def from_payload(self, payload: Payload, type_hint: type | None = None) -> Any:
+        """Decode a payload written by to_payload.
+
+        Raises:
+            RuntimeError: If the payload names an unknown model type.
+        """
+        model = payload.metadata.get(_TYPE_METADATA_KEY, b"").decode()
+        if model == "Plan":
+            return decode_plan(payload.data)
+        if model == "PlanStep":
+            return decode_step(payload.data)
+        if model == "CompletionDelta":
+            return decode_completion_delta(payload.data)
+        raise RuntimeError(f"unknown plan payload type {model!r}")
+
+
+class PlanAwarePayloadConverter(CompositePayloadConverter):
+    """Temporal's default payload converters with compact plan encoding first."""
+
+    def __init__(self) -> None:
+        """Chain PlanPayloadConverter ahead of the default converters."""
+        super().__init__(
+            PlanPayloadConverter(),
+            *DefaultPayloadConverter.default_encoding_payload_converters,
+        )
+
+
+# Data converter to pass to Temporal clients and workers.
+plan_data_converter = DataConverter(payload_converter_class=PlanAwarePayloadConverter)
@@ -0,0 +1,141 @@
+"""Incremental parsing of streamed create_plan tool input.
+
+The planning model emits the create_plan tool input as a sequence of partial
+JSON fragments. IncrementalPlanParser scans those fragments as they arrive and
+emits the summary and each PlanStep as soon as its JSON value is complete, so
+callers can act on early steps while later ones are still being generated.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from troller.domain.models.plan import Plan, PlanStep
+
+
+@dataclass(frozen=True)
+class StreamedSummary:
+    """The plan summary, emitted once its string value is complete."""
+
+    summary: str
+
+
+@dataclass(frozen=True)
+class StreamedStep:
+    """A plan step, emitted once its JSON object is complete."""
+
+    step: PlanStep
+
+
+@dataclass(frozen=True)
+class StreamedPlan:
+    """The final plan, emitted after the stream ends."""
+
+    plan: Plan
+
+
+PlanStreamEvent = StreamedSummary | StreamedStep | StreamedPlan
+
+
+def plan_step_from_tool_input(step: dict[str, Any]) -> PlanStep:
+    """Convert one create_plan step object into a PlanStep."""
+    return PlanStep(
+        id=str(step["id"]),
+        description=str(step["description"]),
+        completed=bool(step["completed"]),
+        related_files=step.get("related_files"),
+        estimated_complexity=step.get("estimated_complexity"),
+    )
+
+
+class IncrementalPlanParser:
+    """Scans partial create_plan JSON and emits completed values.
+
+    Only the top-level "summary" string and the objects of the top-level
+    "steps" array are emitted; every other field is read from the final
+    message once streaming ends.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty parser."""
+        self._buffer = ""
+        self._pos = 0
+        # Each entry is "{" or "[" for the container currently open.
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._current_key: str | None = None
+        self._steps_depth: int | None = None
+        self._step_start: int | None = None
+
+    def feed(self, fragment: str) -> list[StreamedSummary | StreamedStep]:
+        """Consume a JSON fragment and return values completed by it.
+
+        Args:
+            fragment: Next chunk of the tool input JSON.
+
+        Returns:
+            Summary and step events completed by this fragment, in order.
+        """
+        self._buffer += fragment
+        events: list[StreamedSummary | StreamedStep] = []
+        buffer = self._buffer
+
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._on_string_end(events)
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                self._on_open(char)
+            elif char in "}]":
+                self._on_close(events)
+            elif char == "," and len(self._stack) == 1:
+                self._expect_key = True
+
+            self._pos += 1
+
+        return events
+
+    def _on_string_end(self, events: list[StreamedSummary | StreamedStep]) -> None:
+        if len(self._stack) != 1:
+            return
+        value = json.loads(self._buffer[self._string_start : self._pos + 1])
+        if self._expect_key:
+            self._current_key = value
+            self._expect_key = False
+        elif self._current_key == "summary":
+            events.append(StreamedSummary(summary=value))
+
+    def _on_open(self, char: str) -> None:
+        self._stack.append(char)
+        depth = len(self._stack)
+        if depth == 1:
+            self._expect_key = True
+        elif depth == 2 and char == "[" and self._current_key == "steps":
+            self._steps_depth = depth
+        elif depth == 3 and self._steps_depth == 2 and char == "{":
+            self._step_start = self._pos
+
+    def _on_close(self, events: list[StreamedSummary | StreamedStep]) -> None:
+        depth = len(self._stack)
+        self._stack.pop()
+        if depth == 3 and self._step_start is not None:
+            step_json = self._buffer[self._step_start : self._pos + 1]
+            self._step_start = None
+            events.append(
+                StreamedStep(plan_step_from_tool_input(json.loads(step_json)))
+            )
+        elif depth == 2 and self._steps_depth == 2:
+            self._steps_depth = None
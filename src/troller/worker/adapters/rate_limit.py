@@ -0,0 +1,369 @@
+"""Shared rate-limit scheduler for external API calls.
+
+A token bucket per external API gates outgoing calls. Budgets are learned from
+rate-limit response headers, waiting callers are served in priority order,
+and rate-limit errors push the whole bucket into a jittered backoff so that
+many workflows do not retry in lockstep.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from enum import IntEnum
+
+GITHUB = "github"
+# GitHub meters GraphQL in points against a budget separate from REST.
+GITHUB_GRAPHQL = "github-graphql"
+ANTHROPIC = "anthropic"
+
+# Anthropic reports a budget per request count and per token kind.
+_ANTHROPIC_LIMITS = ("requests", "input-tokens", "output-tokens")
+
+DEFAULT_BACKOFF_BASE_SECONDS = 1.0
+DEFAULT_BACKOFF_CAP_SECONDS = 120.0
+# Longest a waiter sleeps before re-checking its bucket, so that budget
+# learned from other callers' responses is picked up promptly.
+_MAX_POLL_SECONDS = 0.5
+# Delay before a caller retries while higher-priority callers are waiting.
+_YIELD_SECONDS = 0.01
+
+
+class Priority(IntEnum):
+    """Scheduling priority of a call; lower values are served first."""
+
+    PLANNING = 0
+    INTERACTIVE = 1
+    BACKGROUND = 2
+
+
+@dataclass(frozen=True)
+class RateLimitStats:
+    """Counters for one rate-limited resource.
+
+    Attributes:
+        acquired: Calls let through.
+        throttled: Calls that had to wait before being let through.
+        total_wait_seconds: Cumulative time spent waiting.
+        backoffs: Rate-limit errors that triggered a backoff.
+        waiting: Callers currently waiting.
+        tokens: Tokens currently available.
+        refill_per_second: Current refill rate.
+    """
+
+    acquired: int
+    throttled: int
+    total_wait_seconds: float
+    backoffs: int
+    waiting: int
+    tokens: float
+    refill_per_second: float
+
+
+class _Bucket:
+    """Token bucket state for one resource; guarded by the scheduler lock."""
+
+    def __init__(self, capacity: float, refill_per_second: float, now: float) -> None:
+        self.capacity = capacity
+        self.default_refill_per_second = refill_per_second
+        self.refill_per_second = refill_per_second
+        # End of the server window the learned refill rate applies to.
+        self.learned_until: float | None = None
+        self.tokens = capacity
+        self.updated_at = now
+        self.blocked_until = 0.0
+        self.waiting: dict[Priority, int] = dict.fromkeys(Priority, 0)
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.backoffs = 0
+        # Rate-limit errors since the last successful call; the exponent of
+        # the next backoff when the caller does not know its retry attempt.
+        self.consecutive_backoffs = 0
+
+    def refill(self, now: float) -> None:
+        if self.learned_until is not None and now >= self.learned_until:
+            # The server window has reset: start from a full bucket at the
+            # configured rate until new headers are observed.
+            self.refill_per_second = self.default_refill_per_second
+            self.learned_until = None
+            self.tokens = self.capacity
+            self.updated_at = now
+            return
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def higher_priority_waiting(self, priority: Priority) -> bool:
+        return any(self.waiting[p] for p in Priority if p < priority)
+
+
+class RateLimitScheduler:
+    """Token-bucket scheduler shared by every adapter in a worker process.
+
+    Blocking callers use acquire and async callers use acquire_async; both
+    draw from the same buckets.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        """Initialize the scheduler with default GitHub and Anthropic buckets.
+
+        Args:
+            clock: Monotonic time source.
+            wall_clock: Epoch time source, used to interpret reset headers.
+            jitter: Source of uniform random numbers in [0, 1).
+        """
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self._buckets: dict[str, _Bucket] = {}
+        # GitHub REST: 5,000 requests/hour for a token.
+        self.configure(GITHUB, capacity=100, refill_per_second=5000 / 3600)
+        # GitHub GraphQL: 5,000 points/hour; most of our queries cost 1 point.
+        self.configure(GITHUB_GRAPHQL, capacity=100, refill_per_second=5000 / 3600)
+        # Anthropic: conservative until response headers reveal the tier.
+        self.configure(ANTHROPIC, capacity=50, refill_per_second=50 / 60)
+
+    def configure(
+        self, resource: str, capacity: float, refill_per_second: float
+    ) -> None:
+        """Create or replace the bucket for a resource.
+
+        Args:
+            resource: Resource name, e.g. GITHUB or ANTHROPIC.
+            capacity: Maximum burst size.
+            refill_per_second: Sustained rate.
+        """
+        with self._lock:
+            self._buckets[resource] = _Bucket(
+                capacity, refill_per_second, self._clock()
+            )
+
+    def acquire(
+        self,
+        resource: str,
+        priority: Priority = Priority.BACKGROUND,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Block until a call to resource may proceed.
+
+        Args:
+            resource: Resource name.
+            priority: Scheduling priority of the call.
+            sleep: Sleep function, injectable for tests.
+        """
+        started = self._enter(resource, priority)
+        throttled = False
+        try:
+            while (delay := self._reserve(resource, priority)) > 0:
+                throttled = True
+                sleep(min(delay, _MAX_POLL_SECONDS))
+        finally:
+            self._leave(resource, priority, started, throttled)
+
+    async def acquire_async(
+        self, resource: str, priority: Priority = Priority.BACKGROUND
+    ) -> None:
+        """Wait without blocking the event loop until a call may proceed.
+
+        Args:
+            resource: Resource name.
+            priority: Scheduling priority of the call.
+        """
+        started = self._enter(resource, priority)
+        throttled = False
+        try:
+            while (delay := self._reserve(resource, priority)) > 0:
+                throttled = True
+                await asyncio.sleep(min(delay, _MAX_POLL_SECONDS))
+        finally:
+            self._leave(resource, priority, started, throttled)
+
+    def observe(self, resource: str, remaining: int, reset_at_epoch: float) -> None:
+        """Learn the remaining budget for a resource from the server.
+
+        The remaining quota is spread evenly over the time left in the
+        window, and a bucket that the server reports as exhausted is blocked
+        until the window resets.
+
+        Args:
+            resource: Resource name.
+            remaining: Calls left in the current window.
+            reset_at_epoch: When the window resets, in epoch seconds.
+        """
+        seconds_left = max(1.0, reset_at_epoch - self._wall_clock())
+        with self._lock:
+            bucket = self._buckets[resource]
+            now = self._clock()
+            bucket.refill(now)
+            bucket.tokens = min(bucket.tokens, float(max(remaining, 0)))
+            bucket.refill_per_second = max(remaining, 0) / seconds_left
+            bucket.learned_until = now + seconds_left
+            if remaining <= 0:
+                bucket.blocked_until = max(bucket.blocked_until, now + seconds_left)
+
+    def observe_headers(self, resource: str, headers: Mapping[str, str]) -> None:
+        """Learn the budget from GitHub or Anthropic rate-limit headers.
+
+        Anthropic limits requests, input tokens and output tokens separately.
+        Each token budget is turned into calls by scaling the request limit by
+        the fraction of tokens left, and the budget closest to running out
+        sets the bucket's rate. Headers without rate-limit information are
+        ignored.
+
+        Args:
+            resource: Resource name.
+            headers: Response headers; names are matched case-insensitively.
+        """
+        lowered = {name.lower(): value for name, value in headers.items()}
+        if "x-ratelimit-remaining" in lowered and "x-ratelimit-reset" in lowered:
+            self.observe(
+                resource,
+                int(lowered["x-ratelimit-remaining"]),
+                float(lowered["x-ratelimit-reset"]),
+            )
+            return
+
+        # (calls remaining, reset epoch) for each reported Anthropic budget.
+        budgets: list[tuple[int, float]] = []
+        requests_limit: int | None = None
+        for kind in _ANTHROPIC_LIMITS:
+            prefix = f"anthropic-ratelimit-{kind}"
+            remaining = lowered.get(f"{prefix}-remaining")
+            reset = lowered.get(f"{prefix}-reset")
+            if remaining is None or reset is None:
+                continue
+            reset_at = datetime.fromisoformat(reset).timestamp()
+            if kind == "requests":
+                requests_limit = int(lowered.get(f"{prefix}-limit", remaining))
+                budgets.append((int(remaining), reset_at))
+                continue
+            limit = lowered.get(f"{prefix}-limit")
+            if int(remaining) <= 0:
+                budgets.append((0, reset_at))
+            elif limit is not None and requests_limit is not None:
+                fraction = int(remaining) / max(int(limit), 1)
+                budgets.append((int(requests_limit * fraction), reset_at))
+        if budgets:
+            self.observe(resource, *min(budgets))
+
+    def backoff(
+        self,
+        resource: str,
+        attempt: int | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> float:
+        """Pause every call to a resource after a rate-limit error.
+
+        Uses retry-after when the server sends it, exponential backoff
+        otherwise, and adds up to 50% random jitter either way.
+
+        Args:
+            resource: Resource name.
+            attempt: Zero-based retry attempt of the failed call, or None to
+                use the number of rate-limit errors on the resource since its
+                last successful call.
+            headers: Headers of the rate-limit error response, if available.
+
+        Returns:
+            Seconds until the resource accepts calls again.
+        """
+        lowered = {name.lower(): value for name, value in (headers or {}).items()}
+        retry_after = lowered.get("retry-after")
+        with self._lock:
+            bucket = self._buckets[resource]
+            if attempt is None:
+                attempt = bucket.consecutive_backoffs
+            bucket.consecutive_backoffs += 1
+            bucket.backoffs += 1
+            if retry_after is not None and retry_after.replace(".", "", 1).isdigit():
+                base = float(retry_after)
+            else:
+                base = min(
+                    DEFAULT_BACKOFF_CAP_SECONDS,
+                    DEFAULT_BACKOFF_BASE_SECONDS * 2 ** min(attempt, 32),
+                )
+            delay = base * (1 + 0.5 * self._jitter())
+            bucket.blocked_until = max(bucket.blocked_until, self._clock() + delay)
+        return delay
+
+    def record_success(self, resource: str) -> None:
+        """Note a call to resource that was not rate limited.
+
+        Resets the exponent used by backoff calls that pass no attempt.
+
+        Args:
+            resource: Resource name.
+        """
+        with self._lock:
+            self._buckets[resource].consecutive_backoffs = 0
+
+    def stats(self, resource: str) -> RateLimitStats:
+        """Return a snapshot of the counters for a resource."""
+        with self._lock:
+            bucket = self._buckets[resource]
+            bucket.refill(self._clock())
+            return RateLimitStats(
+                acquired=bucket.acquired,
+                throttled=bucket.throttled,
+                total_wait_seconds=bucket.total_wait,
+                backoffs=bucket.backoffs,
+                waiting=sum(bucket.waiting.values()),
+                tokens=bucket.tokens,
+                refill_per_second=bucket.refill_per_second,
+            )
+
+    def _enter(self, resource: str, priority: Priority) -> float:
+        with self._lock:
+            self._buckets[resource].waiting[priority] += 1
+        return self._clock()
+
+    def _leave(
+        self, resource: str, priority: Priority, started: float, throttled: bool
+    ) -> None:
+        with self._lock:
+            bucket = self._buckets[resource]
+            bucket.waiting[priority] -= 1
+            if throttled:
+                bucket.throttled += 1
+                bucket.total_wait += self._clock() - started
+
+    def _reserve(self, resource: str, priority: Priority) -> float:
+        """Take a token if allowed; otherwise return seconds to wait."""
+        with self._lock:
+            bucket = self._buckets[resource]
+            now = self._clock()
+            bucket.refill(now)
+            if now < bucket.blocked_until:
+                return bucket.blocked_until - now
+            if bucket.higher_priority_waiting(priority):
+                return _YIELD_SECONDS
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                bucket.acquired += 1
+                return 0.0
+            if bucket.refill_per_second <= 0:
+                return _MAX_POLL_SECONDS
+            return (1 - bucket.tokens) / bucket.refill_per_second
+
+
+_shared_scheduler: RateLimitScheduler | None = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_shared_scheduler() -> RateLimitScheduler:
+    """Return the process-wide scheduler, creating it on first use."""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = RateLimitScheduler()
+        return _shared_scheduler
@@ -0,0 +1,665 @@
+"""Incremental repository index for choosing planning context.
+
+Planning from the issue text alone leaves the model guessing which files are
+involved. The index keeps, for one commit of a repository, every source
+file's path, a table of the symbols it defines and a BM25 term index over
+path, symbol and identifier terms. Moving the index to a newer commit only
+re-reads the files that differ between the two commits, so keeping it
+current costs a diff and a few blob reads instead of a full rebuild.
+
+A planning call includes only the top-ranked files and their most relevant
+symbols, which is far smaller than a repository dump and gives the model
+real paths for related_files.
+"""
+
+import contextlib
+import heapq
+import math
+import re
+import subprocess
+import threading
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import IO, Any
+
+from troller.worker.adapters.context_budget import file_references
+from troller.worker.adapters.lru_cache import LRUCache
+from troller.worker.adapters.workspaces import GitCommandError, Workspace
+
+DEFAULT_MAX_FILES = 12
+DEFAULT_MAX_SYMBOLS_PER_FILE = 8
+DEFAULT_MAX_REPOSITORIES = 32
+# Larger files are generated code, data or vendored bundles more often than
+# not; they are indexed by path only.
+MAX_FILE_BYTES = 512 * 1024
+
+# BM25 parameters: term frequency saturation and document length weighting.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Path and symbol terms say more about a file than a mention in its body.
+PATH_TERM_WEIGHT = 3
+SYMBOL_TERM_WEIGHT = 2
+
+_INDEXED_SUFFIXES = frozenset(
+    {
+        ".c", ".cc", ".cfg", ".cpp", ".cs", ".go", ".h", ".hpp", ".ini",
+        ".java", ".js", ".json", ".jsx", ".kt", ".md", ".php", ".proto",
+        ".py", ".pyi", ".rb", ".rs", ".rst", ".scala", ".sh", ".sql",
+        ".swift", ".toml", ".ts", ".tsx", ".txt", ".yaml", ".yml",
+    }
+)  # fmt: skip
+_INDEXED_NAMES = frozenset({"Dockerfile", "Makefile"})
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_STOPWORDS = frozenset(
+    {
+        "and", "are", "as", "be", "but", "by", "can", "for", "from", "has",
+        "have", "if", "in", "into", "is", "it", "its", "not", "of", "on",
+        "or", "should", "so", "that", "the", "this", "to", "was", "we",
+        "when", "which", "will", "with", "would",
+    }
+)  # fmt: skip
+
+# Definition patterns per file suffix; group 1 is the kind, group 2 the name.
+_PYTHON_SYMBOLS = re.compile(
+    r"^\s*(class|def|async def)\s+([A-Za-z_]\w*)", re.MULTILINE
+)
+_SCRIPT_SYMBOLS = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?"
+    r"(class|interface|type|enum|function|const)\s+([A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+_SYMBOL_PATTERNS: dict[str, re.Pattern[str]] = {
+    ".py": _PYTHON_SYMBOLS,
+    ".pyi": _PYTHON_SYMBOLS,
+    ".js": _SCRIPT_SYMBOLS,
+    ".jsx": _SCRIPT_SYMBOLS,
+    ".ts": _SCRIPT_SYMBOLS,
+    ".tsx": _SCRIPT_SYMBOLS,
+    ".go": re.compile(r"^(func|type)\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)", re.MULTILINE),
+    ".rs": re.compile(
+        r"^\s*(?:pub(?:\([^)]*\))?\s+)?(fn|struct|enum|trait|mod)\s+([A-Za-z_]\w*)",
+        re.MULTILINE,
+    ),
+    ".java": re.compile(
+        r"^\s*(?:(?:public|protected|private|abstract|final|static)\s+)*"
+        r"(class|interface|enum|record)\s+([A-Za-z_]\w*)",
+        re.MULTILINE,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """A definition found in a source file.
+
+    Attributes:
+        name: Defined name.
+        kind: Keyword that introduced it, e.g. 'class' or 'def'.
+        line: 1-based line number of the definition.
+    """
+
+    name: str
+    kind: str
+    line: int
+
+
+@dataclass(frozen=True)
+class RankedFile:
+    """A file ranked for an issue.
+
+    Attributes:
+        path: Path relative to the repository root.
+        score: BM25 score against the issue text.
+        symbols: The file's symbols most relevant to the issue.
+        referenced: Whether the issue mentions the file by path.
+    """
+
+    path: str
+    score: float
+    symbols: tuple[Symbol, ...]
+    referenced: bool = False
+
+
+@dataclass(frozen=True)
+class RepositoryContext:
+    """Repository files selected for a planning prompt.
+
+    Attributes:
+        commit: Commit the index described.
+        files: Files in order of relevance.
+    """
+
+    commit: str
+    files: tuple[RankedFile, ...]
+
+    def render(self) -> str:
+        """Format the files and symbols for the planning prompt."""
+        header = "Repository files likely relevant to the issue"
+        lines = [f"{header} (commit {self.commit[:12]}):"]
+        for ranked in self.files:
+            symbols = ", ".join(
+                f"{symbol.kind} {symbol.name} (line {symbol.line})"
+                for symbol in ranked.symbols
+            )
+            lines.append(
+                f"- {ranked.path}: {symbols}" if symbols else f"- {ranked.path}"
+            )
+        return "\n".join(lines)
+
+    def to_metadata(self) -> dict[str, Any]:
+        """Describe the selection for Plan.metadata."""
+        return {"commit": self.commit, "files": [ranked.path for ranked in self.files]}
+
+
+@dataclass(frozen=True)
+class IndexUpdate:
+    """What moving an index to a commit involved.
+
+    Attributes:
+        commit: Commit the index now describes.
+        previous: Commit it described before, or None if it was empty.
+        rebuilt: Whether every file was read instead of only a diff.
+        added: Files indexed for the first time.
+        modified: Files re-read because their content changed.
+        removed: Files dropped from the index.
+    """
+
+    commit: str
+    previous: str | None
+    rebuilt: bool
+    added: int
+    modified: int
+    removed: int
+
+
+@dataclass(frozen=True)
+class _Document:
+    terms: Counter[str]
+    length: int
+    symbols: tuple[Symbol, ...]
+
+
+def terms(text: str) -> list[str]:
+    """Split text into lowercase search terms.
+
+    Identifiers are split at underscores and case changes, and compound
+    identifiers are kept whole as well, so 'GitHubClient' yields 'github',
+    'client' and 'githubclient'.
+    """
+    found: list[str] = []
+    for identifier in _IDENTIFIER.findall(text):
+        parts = [
+            part.lower()
+            for word in identifier.split("_")
+            for part in _CAMEL_PART.findall(word)
+        ]
+        if len(parts) > 1:
+            parts.append(identifier.lower().replace("_", ""))
+        found.extend(part for part in parts if len(part) > 1 and part not in _STOPWORDS)
+    return found
+
+
+def extract_symbols(path: str, text: str) -> tuple[Symbol, ...]:
+    """Find the classes, functions and similar definitions in a source file.
+
+    Args:
+        path: File path; its suffix selects the definition patterns.
+        text: File contents.
+
+    Returns:
+        Definitions in file order; empty for unsupported languages.
+    """
+    pattern = _SYMBOL_PATTERNS.get(PurePosixPath(path).suffix)
+    if pattern is None:
+        return ()
+    return tuple(
+        Symbol(
+            name=match.group(2),
+            kind=match.group(1),
+            line=text.count("\n", 0, match.start(2)) + 1,
+        )
+        for match in pattern.finditer(text)
+    )
+
+
+def _indexed(path: str) -> bool:
+    posix = PurePosixPath(path)
+    return posix.suffix in _INDEXED_SUFFIXES or posix.name in _INDEXED_NAMES
+
+
+def _document(path: str, content: bytes | None) -> _Document:
+    """Index one file; content None indexes the path alone."""
+    counts = Counter({term: PATH_TERM_WEIGHT for term in terms(path)})
+    symbols: tuple[Symbol, ...] = ()
+    if content is not None and b"\0" not in content:
+        text = content.decode("utf-8", errors="replace")
+        symbols = extract_symbols(path, text)
+        for symbol in symbols:
+            for term in terms(symbol.name):
+                counts[term] += SYMBOL_TERM_WEIGHT
+        counts.update(terms(text))
+    return _Document(counts, sum(counts.values()), symbols)
+
+
+def _git(git_dir: Path, *args: str) -> bytes:
+    """Run git in git_dir and return its raw standard output."""
+    completed = subprocess.run(
+        ["git", *args], cwd=git_dir, capture_output=True, check=False
+    )
+    if completed.returncode != 0:
+        stderr = completed.stderr.decode(errors="replace").strip()
+        raise GitCommandError(
+            f"git {args[0]} failed with exit code {completed.returncode}: {stderr}"
+        )
+    return completed.stdout
+
+
+def _read_blobs(
+    git_dir: Path, blobs: list[tuple[str, str]]
+) -> Iterator[tuple[str, bytes | None]]:
+    """Read blobs through one git cat-file process.
+
+    Args:
+        git_dir: Repository, bare or not.
+        blobs: (path, object ID) pairs.
+
+    Yields:
+        Each path with its content, or None if the blob exceeds
+        MAX_FILE_BYTES.
+
+    Raises:
+        GitCommandError: If cat-file's output ends early or a blob is missing.
+    """
+    if not blobs:
+        return
+    with subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        cwd=git_dir,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ) as process:
+        assert process.stdin is not None and process.stdout is not None
+        # Requests are written from a thread, so a long request list cannot
+        # fill the pipe while cat-file waits for its answers to be read.
+        writer = threading.Thread(
+            target=_write_requests, args=(process.stdin, [oid for _, oid in blobs])
+        )
+        writer.start()
+        finished = False
+        try:
+            for path, _ in blobs:
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    raise GitCommandError(f"git cat-file: missing blob for {path}")
+                size = int(header[2])
+                content = _read_exact(process.stdout, size, keep=size <= MAX_FILE_BYTES)
+                process.stdout.read(1)  # newline after the content
+                yield path, content
+            finished = True
+        finally:
+            if not finished:
+                # Stopped early: the writer may be blocked on a full pipe
+                # that cat-file, itself blocked on its unread output, will
+                # never drain. Killing cat-file breaks the pipe and frees it.
+                process.stdout.close()
+                process.kill()
+            writer.join()
+
+
+def _write_requests(stdin: IO[bytes], oids: list[str]) -> None:
+    """Write cat-file requests, stopping quietly if cat-file was killed."""
+    with contextlib.suppress(BrokenPipeError):
+        try:
+            for oid in oids:
+                stdin.write(f"{oid}\n".encode())
+        finally:
+            stdin.close()
+
+
+def _read_exact(stream: IO[bytes], size: int, keep: bool) -> bytes | None:
+    """Read size bytes from stream, returning them only if keep is set."""
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(min(remaining, 1 << 16))
+        if not chunk:
+            raise GitCommandError("git cat-file: unexpected end of output")
+        remaining -= len(chunk)
+        if keep:
+            chunks.append(chunk)
+    return b"".join(chunks) if keep else None
+
+
+class RepositoryIndex:
+    """File, symbol and BM25 term index of one repository at one commit.
+
+    Not thread-safe; RepositoryIndexes serializes access per repository.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index; build or advance it before searching."""
+        self._commit: str | None = None
+        self._documents: dict[str, _Document] = {}
+        # Term -> path -> weighted term frequency.
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @property
+    def commit(self) -> str | None:
+        """Commit the index describes, or None while it is empty."""
+        return self._commit
+
+    def symbols(self, path: str) -> tuple[Symbol, ...]:
+        """Definitions in an indexed file; empty if the file is not indexed."""
+        document = self._documents.get(path)
+        return document.symbols if document is not None else ()
+
+    def build(self, git_dir: Path, commit: str) -> IndexUpdate:
+        """Index every file of a commit from scratch.
+
+        Args:
+            git_dir: Repository holding the commit; a bare mirror or worktree.
+            commit: Commit SHA or other revision to index.
+
+        Returns:
+            Summary of the update.
+
+        Raises:
+            GitCommandError: If the commit cannot be read.
+        """
+        sha = self._resolve(git_dir, commit)
+        previous = self._commit
+
+        listing = _git(git_dir, "ls-tree", "-r", "-z", "--full-tree", sha)
+        blobs: list[tuple[str, str]] = []
+        for entry in listing.split(b"\0"):
+            if not entry:
+                continue
+            info, path = entry.decode(errors="surrogateescape").split("\t", 1)
+            mode, kind, oid = info.split()
+            if kind == "blob" and mode != "120000" and _indexed(path):
+                blobs.append((path, oid))
+        # Everything is read before the index is touched, so a failed read
+        # leaves it at the previous commit.
+        documents = [
+            (path, _document(path, content))
+            for path, content in _read_blobs(git_dir, blobs)
+        ]
+        self._documents = {}
+        self._postings = {}
+        self._total_length = 0
+        for path, document in documents:
+            self._add(path, document)
+        self._commit = sha
+        return IndexUpdate(sha, previous, True, len(blobs), 0, 0)
+
+    def advance(self, git_dir: Path, commit: str) -> IndexUpdate:
+        """Move the index to another commit, re-reading only changed files.
+
+        An empty index, or one whose commit is no longer in the repository
+        (e.g. after a force push), is rebuilt instead. If reading the commit
+        fails, the index is left at its previous commit.
+
+        Args:
+            git_dir: Repository holding both commits.
+            commit: Commit SHA or other revision to index.
+
+        Returns:
+            Summary of the update.
+
+        Raises:
+            GitCommandError: If the commit cannot be read.
+        """
+        sha = self._resolve(git_dir, commit)
+        previous = self._commit
+        if previous is None:
+            return self.build(git_dir, sha)
+        if previous == sha:
+            return IndexUpdate(sha, previous, False, 0, 0, 0)
+        try:
+            diff = _git(git_dir, "diff-tree", "-r", "-z", "--no-renames", previous, sha)
+        except GitCommandError:
+            return self.build(git_dir, sha)
+
+        # Entries are ":<old mode> <new mode> <old oid> <new oid> <status>"
+        # followed by the path, each NUL-terminated.
+        fields = diff.decode(errors="surrogateescape").split("\0")
+        changed: list[tuple[str, str]] = []
+        stale: list[str] = []
+        added = modified = removed = 0
+        for info, path in zip(fields[0::2], fields[1::2], strict=False):
+            _, new_mode, _, new_oid, status = info.lstrip(":").split()
+            if path in self._documents:
+                stale.append(path)
+                if status == "D" or new_mode == "120000" or not _indexed(path):
+                    removed += 1
+                    continue
+                modified += 1
+            elif status == "D" or new_mode == "120000" or not _indexed(path):
+                continue
+            else:
+                added += 1
+            changed.append((path, new_oid))
+        # As in build, nothing changes until every changed file has been read.
+        documents = [
+            (path, _document(path, content))
+            for path, content in _read_blobs(git_dir, changed)
+        ]
+        for path in stale:
+            self._remove(path)
+        for path, document in documents:
+            self._add(path, document)
+        self._commit = sha
+        return IndexUpdate(sha, previous, False, added, modified, removed)
+
+    def search(self, query: str, limit: int = DEFAULT_MAX_FILES) -> list[RankedFile]:
+        """Rank files against free text with BM25.
+
+        Args:
+            query: Text to match, e.g. an issue title and body.
+            limit: Maximum number of files returned.
+
+        Returns:
+            Matching files, best first, each with its symbols that share a
+            term with the query.
+        """
+        query_terms = set(terms(query))
+        return [
+            RankedFile(path, score, self._matching_symbols(path, query_terms))
+            for path, score in self._best(self._scores(query_terms), limit)
+        ]
+
+    def planning_context(
+        self,
+        issue_title: str,
+        issue_body: str,
+        max_files: int = DEFAULT_MAX_FILES,
+        max_symbols_per_file: int = DEFAULT_MAX_SYMBOLS_PER_FILE,
+    ) -> RepositoryContext:
+        """Select the files and symbols to show the model for an issue.
+
+        Files the issue mentions by path come first, then the best BM25
+        matches for the title and body.
+
+        Args:
+            issue_title: Title of the GitHub issue.
+            issue_body: Body/description of the GitHub issue.
+            max_files: Maximum number of files included.
+            max_symbols_per_file: Maximum symbols listed per file.
+
+        Returns:
+            The selection, for the planning prompt.
+
+        Raises:
+            ValueError: If the index is empty.
+        """
+        if self._commit is None:
+            raise ValueError("index has not been built")
+        text = f"{issue_title}\n{issue_body}"
+        query_terms = set(terms(text))
+        scores = self._scores(query_terms)
+        selected: dict[str, RankedFile] = {}
+        for reference in sorted(file_references(text)):
+            for path in self._paths_ending_with(reference):
+                if path not in selected:
+                    selected[path] = RankedFile(
+                        path,
+                        scores.get(path, 0.0),
+                        self._matching_symbols(path, query_terms, fill=True),
+                        referenced=True,
+                    )
+        # Symbols are only looked up for the files that make the cut.
+        for path, score in self._best(scores, max_files):
+            if len(selected) >= max_files:
+                break
+            if path not in selected:
+                selected[path] = RankedFile(
+                    path, score, self._matching_symbols(path, query_terms)
+                )
+        return RepositoryContext(
+            self._commit,
+            tuple(
+                RankedFile(
+                    ranked_file.path,
+                    ranked_file.score,
+                    ranked_file.symbols[:max_symbols_per_file],
+                    ranked_file.referenced,
+                )
+                for ranked_file in list(selected.values())[:max_files]
+            ),
+        )
+
+    def _scores(self, query_terms: set[str]) -> dict[str, float]:
+        """BM25 score of every file sharing a term with the query."""
+        if not self._documents or not query_terms:
+            return {}
+        count = len(self._documents)
+        average_length = self._total_length / count
+        scores: dict[str, float] = {}
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            frequency = len(postings)
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for path, tf in postings.items():
+                norm = (
+                    1 - BM25_B + BM25_B * self._documents[path].length / average_length
+                )
+                score = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+                scores[path] = scores.get(path, 0.0) + score
+        return scores
+
+    @staticmethod
+    def _best(scores: dict[str, float], limit: int) -> list[tuple[str, float]]:
+        """The limit best-scoring files, best first, ties broken by path."""
+        return heapq.nsmallest(
+            limit, scores.items(), key=lambda item: (-item[1], item[0])
+        )
+
+    def _matching_symbols(
+        self, path: str, query_terms: set[str], fill: bool = False
+    ) -> tuple[Symbol, ...]:
+        """Symbols sharing a term with the query, optionally topped up with the rest."""
+        symbols = self._documents[path].symbols
+        matching = [s for s in symbols if query_terms.intersection(terms(s.name))]
+        if fill:
+            matching += [s for s in symbols if s not in matching]
+        return tuple(matching)
+
+    def _paths_ending_with(self, reference: str) -> Iterable[str]:
+        reference = reference.lstrip("./")
+        return sorted(
+            path
+            for path in self._documents
+            if path == reference or path.endswith(f"/{reference}")
+        )
+
+    def _add(self, path: str, document: _Document) -> None:
+        self._documents[path] = document
+        self._total_length += document.length
+        for term, frequency in document.terms.items():
+            self._postings.setdefault(term, {})[path] = frequency
+
+    def _remove(self, path: str) -> None:
+        document = self._documents.pop(path)
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings[term]
+            del postings[path]
+            if not postings:
+                del self._postings[term]
+
+    @staticmethod
+    def _resolve(git_dir: Path, commit: str) -> str:
+        return (
+            _git(git_dir, "rev-parse", "--verify", f"{commit}^{{commit}}")
+            .decode()
+            .strip()
+        )
+
+
+class RepositoryIndexes:
+    """Keeps the index of recently planned repositories current.
+
+    Each repository's index follows the commits it is asked about, so
+    planning successive issues against a moving default branch costs one
+    diff per new commit. Safe to use from multiple threads.
+    """
+
+    def __init__(self, max_repositories: int = DEFAULT_MAX_REPOSITORIES) -> None:
+        """Initialize the store.
+
+        Args:
+            max_repositories: Indexes kept before the least recently used one
+                is dropped.
+        """
+        self._indexes: LRUCache[tuple[str, str], RepositoryIndex] = LRUCache(
+            max_repositories
+        )
+        self._lock = threading.Lock()
+        self._repo_locks: dict[tuple[str, str], threading.Lock] = {}
+
+    def planning_context(
+        self,
+        workspace: Workspace,
+        issue_title: str,
+        issue_body: str,
+        max_files: int = DEFAULT_MAX_FILES,
+        max_symbols_per_file: int = DEFAULT_MAX_SYMBOLS_PER_FILE,
+    ) -> RepositoryContext:
+        """Select planning context for an issue from a checked-out repository.
+
+        Args:
+            workspace: Checkout whose commit the context is taken from.
+            issue_title: Title of the GitHub issue.
+            issue_body: Body/description of the GitHub issue.
+            max_files: Maximum number of files included.
+            max_symbols_per_file: Maximum symbols listed per file.
+
+        Returns:
+            The selection, for the planning prompt.
+
+        Raises:
+            GitCommandError: If the commit cannot be read.
+        """
+        key = (workspace.owner, workspace.repo)
+        with self._lock:
+            repo_lock = self._repo_locks.setdefault(key, threading.Lock())
+        with repo_lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = RepositoryIndex()
+                self._indexes.put(key, index)
+            index.advance(workspace.path, workspace.commit)
+            return index.planning_context(
+                issue_title, issue_body, max_files, max_symbols_per_file
+            )
@@ -0,0 +1,175 @@
+"""Coalescing of duplicate in-flight adapter calls.
+
+When many workflows start against the same repository, or Temporal retries
+overlap with the original attempt, identical requests run at the same time.
+A SingleFlight lets the first caller for a key make the request while
+concurrent callers with the same key wait for it and share its result or
+error. Nothing is kept once the request finishes, so this complements
+rather than replaces the longer-lived caches.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """Counters for a SingleFlight.
+
+    Attributes:
+        calls: Calls made through the SingleFlight.
+        executed: Requests actually made.
+        coalesced: Calls that shared another call's request.
+        errors: Requests that raised; every caller sharing one saw the error.
+        in_flight: Requests currently running.
+    """
+
+    calls: int
+    executed: int
+    coalesced: int
+    errors: int
+    in_flight: int
+
+
+class _Call:
+    """A blocking request in flight and its eventual outcome."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight[K: Hashable, T]:
+    """Shares one in-flight request among concurrent calls with the same key.
+
+    Blocking and async calls are tracked separately: a blocking call never
+    waits on a coroutine, and async calls only coalesce with calls on the
+    same event loop. Safe to use from multiple threads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with nothing in flight."""
+        self._lock = threading.Lock()
+        self._calls: dict[K, _Call] = {}
+        self._tasks: dict[tuple[asyncio.AbstractEventLoop, K], asyncio.Task[T]] = {}
+        self._total = 0
+        self._executed = 0
+        self._coalesced = 0
+        self._errors = 0
+
+    def stats(self) -> SingleFlightStats:
+        """Return the coalescing counters so far."""
+        with self._lock:
+            return SingleFlightStats(
+                calls=self._total,
+                executed=self._executed,
+                coalesced=self._coalesced,
+                errors=self._errors,
+                in_flight=len(self._calls) + len(self._tasks),
+            )
+
+    def do(self, key: K, request: Callable[[], T]) -> T:
+        """Run a blocking request, or wait for the identical one in flight.
+
+        Args:
+            key: Identifies the request; calls with equal keys must be
+                interchangeable.
+            request: Makes the request if none is in flight for key.
+
+        Returns:
+            Result of the shared request.
+
+        Raises:
+            Exception: Whatever the shared request raised.
+        """
+        with self._lock:
+            self._total += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = request()
+            except BaseException as error:  # noqa: BLE001 - re-raised in every caller
+                call.error = error
+                with self._lock:
+                    self._errors += 1
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        result: T = call.result
+        return result
+
+    async def do_async(self, key: K, request: Callable[[], Awaitable[T]]) -> T:
+        """Run an async request, or wait for the identical one in flight.
+
+        The request runs as its own task, so a caller that is cancelled does
+        not cancel the request for the others.
+
+        Args:
+            key: Identifies the request; calls with equal keys must be
+                interchangeable.
+            request: Makes the request if none is in flight for key.
+
+        Returns:
+            Result of the shared request.
+
+        Raises:
+            Exception: Whatever the shared request raised.
+        """
+        flight_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            self._total += 1
+            task = self._tasks.get(flight_key)
+            if task is None:
+                task = asyncio.ensure_future(request())
+                self._tasks[flight_key] = task
+                self._executed += 1
+                task.add_done_callback(lambda done: self._finish(flight_key, done))
+            else:
+                self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(
+        self, flight_key: tuple[asyncio.AbstractEventLoop, K], task: asyncio.Task[T]
+    ) -> None:
+        with self._lock:
+            del self._tasks[flight_key]
+            if task.cancelled() or task.exception() is not None:
+                self._errors += 1
+
+
+_shared_flights: dict[str, SingleFlight[Any, Any]] = {}
+_shared_flights_lock = threading.Lock()
+
+
+def get_shared_flight(name: str) -> SingleFlight[Any, Any]:
+    """Return the process-wide SingleFlight for name, creating it on first use.
+
+    Args:
+        name: Identifier of the adapter whose calls are coalesced (e.g.
+            'anthropic').
+
+    Returns:
+        The shared SingleFlight for name.
+    """
+    with _shared_flights_lock:
+        flight = _shared_flights.get(name)
+        if flight is None:
+            flight = _shared_flights[name] = SingleFlight()
+        return flight
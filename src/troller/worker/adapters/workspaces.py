@@ -0,0 +1,427 @@
+"""Repository workspaces for agent activities.
+
+Each repository is cloned once into a bare mirror under the workspace root
+and fetched incrementally after that. Mirrors hold branches and tags only;
+pull request refs, which can outnumber branches by far on busy repositories,
+are not fetched, and a commit only they reach is fetched by itself on demand.
+Workflows get their own git worktree of the mirror, which shares the mirror's
+object store, so a checkout costs a working-tree write instead of a clone. A
+workflow keeps its worktree, and whatever it changed there, across activities
+until it is removed or evicted.
+Worktrees not leased by a running activity are evicted least recently used
+first when the worktree count or disk quota is exceeded.
+
+Layout under the root:
+    mirrors/<owner>/<repo>.git            bare mirror
+    worktrees/<owner>/<repo>/<workflow>   per-workflow checkout
+
+One worker process should own a workspace root.
+"""
+
+import base64
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_MAX_WORKTREES = 64
+DEFAULT_MAX_BYTES = 50 * 1024**3
+# A mirror fetched more recently than this is not fetched again, unless the
+# requested commit is missing from it.
+DEFAULT_FETCH_INTERVAL_SECONDS = 60.0
+
+_UNSAFE_NAME = re.compile(r"[^\w.-]")
+# Refs kept in a mirror, updated in place and pruned when deleted upstream.
+_MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class GitCommandError(RuntimeError):
+    """A git command exited with an error."""
+
+
+@dataclass(frozen=True)
+class Workspace:
+    """A workflow's checkout of a repository.
+
+    Attributes:
+        owner: Repository owner (user or organization).
+        repo: Repository name.
+        workflow_id: Workflow the checkout belongs to.
+        path: Working tree directory.
+        commit: Commit checked out when the worktree was created.
+    """
+
+    owner: str
+    repo: str
+    workflow_id: str
+    path: Path
+    commit: str
+
+
+@dataclass(frozen=True)
+class WorkspaceStats:
+    """Usage of a workspace root.
+
+    Attributes:
+        mirrors: Bare mirrors on disk.
+        worktrees: Worktrees on disk.
+        leased: Worktrees currently leased.
+        bytes_used: Last measured size of mirrors and worktrees.
+        evictions: Worktrees and mirrors evicted so far.
+    """
+
+    mirrors: int
+    worktrees: int
+    leased: int
+    bytes_used: int
+    evictions: int
+
+
+def github_remote_url(owner: str, repo: str) -> str:
+    """HTTPS clone URL of a repository on github.com."""
+    return f"https://github.com/{owner}/{repo}.git"
+
+
+def _safe(name: str) -> str:
+    """Make a name usable as a single path component."""
+    cleaned = _UNSAFE_NAME.sub("_", name)
+    return cleaned if cleaned.strip(".") else f"_{cleaned}"
+
+
+def _disk_usage(path: Path) -> int:
+    """Total size of the files under path, not following symlinks."""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+            else:
+                total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
+class RepositoryWorkspaces:
+    """Hands out per-workflow worktrees backed by shared bare mirrors."""
+
+    def __init__(
+        self,
+        root: Path,
+        max_worktrees: int = DEFAULT_MAX_WORKTREES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        fetch_interval_seconds: float = DEFAULT_FETCH_INTERVAL_SECONDS,
+        remote_url: Callable[[str, str], str] = github_remote_url,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the workspace manager.
+
+        When GITHUB_TOKEN is set, fetches authenticate with it. The token is
+        passed to git through its environment, so it never appears in a
+        command line or in the mirror's config.
+
+        Args:
+            root: Directory holding mirrors and worktrees; created if missing.
+            max_worktrees: Worktrees kept before the least recently used idle
+                one is evicted.
+            max_bytes: Disk quota for mirrors and worktrees together.
+            fetch_interval_seconds: Minimum time between fetches of a mirror.
+            remote_url: Maps owner and repository to the URL to clone from.
+            clock: Time source for fetch freshness and recency of use.
+        """
+        self._root = root
+        self._max_worktrees = max_worktrees
+        self._max_bytes = max_bytes
+        self._fetch_interval = fetch_interval_seconds
+        self._remote_url = remote_url
+        self._clock = clock
+        self._token = os.getenv("GITHUB_TOKEN")
+
+        self._lock = threading.Lock()
+        # Mirrors and worktrees are identified by their paths.
+        self._mirror_locks: dict[Path, threading.Lock] = {}
+        self._fetched_at: dict[Path, float] = {}
+        self._last_used: dict[Path, float] = {}
+        self._leases: dict[Path, int] = {}
+        self._sizes: dict[Path, int] = {}
+        self._evictions = 0
+        self._load_existing()
+
+    def stats(self) -> WorkspaceStats:
+        """Return how much of the root is in use."""
+        with self._lock:
+            return WorkspaceStats(
+                mirrors=len(self._mirror_paths()),
+                worktrees=len(self._last_used),
+                leased=sum(1 for count in self._leases.values() if count),
+                bytes_used=sum(self._sizes.values()),
+                evictions=self._evictions,
+            )
+
+    @contextmanager
+    def lease(
+        self, owner: str, repo: str, workflow_id: str, ref: str | None = None
+    ) -> Iterator[Workspace]:
+        """Check out a workflow's worktree and protect it from eviction.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            workflow_id: Workflow the worktree belongs to.
+            ref: Commit, branch or tag for a new worktree; defaults to the
+                remote's HEAD. An existing worktree is returned as it is.
+
+        Yields:
+            The workflow's workspace.
+
+        Raises:
+            GitCommandError: If cloning, fetching or checking out fails.
+        """
+        worktree = self._worktree_path(owner, repo, workflow_id)
+        with self._lock:
+            self._leases[worktree] = self._leases.get(worktree, 0) + 1
+        try:
+            yield self.checkout(owner, repo, workflow_id, ref)
+        finally:
+            with self._lock:
+                self._leases[worktree] -= 1
+                if not self._leases[worktree]:
+                    del self._leases[worktree]
+                    if worktree in self._last_used:
+                        self._sizes[worktree] = _disk_usage(worktree)
+            self._enforce_quota()
+
+    def checkout(
+        self, owner: str, repo: str, workflow_id: str, ref: str | None = None
+    ) -> Workspace:
+        """Return a workflow's worktree, creating it if needed.
+
+        Prefer lease(), which also keeps the worktree from being evicted
+        while it is used.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            workflow_id: Workflow the worktree belongs to.
+            ref: Commit, branch or tag for a new worktree; defaults to the
+                remote's HEAD. An existing worktree is returned as it is.
+
+        Returns:
+            The workflow's workspace.
+
+        Raises:
+            GitCommandError: If cloning, fetching or checking out fails.
+        """
+        mirror = self._mirror_path(owner, repo)
+        worktree = self._worktree_path(owner, repo, workflow_id)
+        with self._mirror_lock(mirror):
+            if not worktree.exists():
+                self._update_mirror(owner, repo, mirror, ref)
+                worktree.parent.mkdir(parents=True, exist_ok=True)
+                self._git(
+                    mirror, "worktree", "add", "--detach", str(worktree), ref or "HEAD"
+                )
+                with self._lock:
+                    self._sizes[worktree] = _disk_usage(worktree)
+            commit = self._git(worktree, "rev-parse", "HEAD")
+            # Recorded before the mirror lock is released, so the mirror is
+            # never seen unused while the worktree exists.
+            with self._lock:
+                self._last_used[worktree] = self._clock()
+        self._enforce_quota(keep=worktree)
+        return Workspace(owner, repo, workflow_id, worktree, commit)
+
+    def remove(self, owner: str, repo: str, workflow_id: str) -> None:
+        """Delete a workflow's worktree, e.g. once the workflow has finished.
+
+        Args:
+            owner: Repository owner (user or organization).
+            repo: Repository name.
+            workflow_id: Workflow the worktree belongs to.
+        """
+        worktree = self._worktree_path(owner, repo, workflow_id)
+        with self._mirror_lock(self._mirror_of(worktree)):
+            self._remove_worktree(worktree)
+
+    def _update_mirror(
+        self, owner: str, repo: str, mirror: Path, ref: str | None
+    ) -> None:
+        """Clone or fetch the mirror so that it contains ref.
+
+        Must be called with the mirror's lock held.
+        """
+        if not mirror.exists():
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            self._git(
+                mirror.parent,
+                "clone",
+                "--bare",
+                "--quiet",
+                self._remote_url(owner, repo),
+                str(mirror),
+            )
+        elif self._needs_fetch(mirror, ref):
+            self._git(
+                mirror, "fetch", "--prune", "--quiet", "origin", *_MIRROR_REFSPECS
+            )
+        else:
+            return
+        if ref is not None and not self._has_commit(mirror, ref):
+            # E.g. a pull request head: GitHub serves reachable commits by ID.
+            self._git(mirror, "fetch", "--quiet", "origin", ref)
+        with self._lock:
+            self._fetched_at[mirror] = self._clock()
+            self._sizes[mirror] = _disk_usage(mirror)
+
+    def _needs_fetch(self, mirror: Path, ref: str | None) -> bool:
+        with self._lock:
+            fetched_at = self._fetched_at.get(mirror)
+        if fetched_at is None or self._clock() - fetched_at >= self._fetch_interval:
+            return True
+        return ref is not None and not self._has_commit(mirror, ref)
+
+    def _has_commit(self, mirror: Path, ref: str) -> bool:
+        try:
+            self._git(mirror, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+        except GitCommandError:
+            return False
+        return True
+
+    def _enforce_quota(self, keep: Path | None = None) -> None:
+        """Evict idle worktrees, then unused mirrors, until within limits.
+
+        Args:
+            keep: Worktree about to be handed out, which is never evicted.
+        """
+        while True:
+            with self._lock:
+                over_count = len(self._last_used) > self._max_worktrees
+                over_bytes = sum(self._sizes.values()) > self._max_bytes
+                if not (over_count or over_bytes):
+                    return
+                idle = [
+                    (last_used, worktree)
+                    for worktree, last_used in self._last_used.items()
+                    if worktree not in self._leases and worktree != keep
+                ]
+                in_use = {self._mirror_of(worktree) for worktree in self._last_used}
+                unused_mirrors = [
+                    mirror for mirror in self._mirror_paths() if mirror not in in_use
+                ]
+            if idle:
+                _, victim = min(idle)
+                with self._mirror_lock(self._mirror_of(victim)):
+                    with self._lock:
+                        # A lease may have started since the victim was chosen.
+                        evictable = (
+                            victim in self._last_used and victim not in self._leases
+                        )
+                    if not evictable:
+                        continue
+                    self._remove_worktree(victim)
+            elif over_bytes and unused_mirrors:
+                if not self._remove_mirror(unused_mirrors[0]):
+                    continue
+            else:
+                # Everything left is leased; the quota is exceeded until a
+                # lease ends.
+                return
+            with self._lock:
+                self._evictions += 1
+
+    def _remove_worktree(self, worktree: Path) -> None:
+        """Delete a worktree; must be called with its mirror's lock held."""
+        mirror = self._mirror_of(worktree)
+        if mirror.exists() and worktree.exists():
+            try:
+                self._git(mirror, "worktree", "remove", "--force", str(worktree))
+            except GitCommandError:
+                shutil.rmtree(worktree, ignore_errors=True)
+                self._git(mirror, "worktree", "prune")
+        else:
+            shutil.rmtree(worktree, ignore_errors=True)
+        with self._lock:
+            self._last_used.pop(worktree, None)
+            self._sizes.pop(worktree, None)
+
+    def _remove_mirror(self, mirror: Path) -> bool:
+        """Delete a mirror unless a worktree started using it; True if deleted."""
+        with self._mirror_lock(mirror):
+            with self._lock:
+                in_use = any(
+                    self._mirror_of(worktree) == mirror
+                    for worktree in (*self._last_used, *self._leases)
+                )
+            if in_use:
+                return False
+            shutil.rmtree(mirror, ignore_errors=True)
+        with self._lock:
+            self._fetched_at.pop(mirror, None)
+            self._sizes.pop(mirror, None)
+        return True
+
+    def _load_existing(self) -> None:
+        """Pick up mirrors and worktrees left by a previous process."""
+        for mirror in self._mirror_paths():
+            self._sizes[mirror] = _disk_usage(mirror)
+        worktrees = self._root / "worktrees"
+        if not worktrees.is_dir():
+            return
+        for worktree in worktrees.glob("*/*/*"):
+            if worktree.is_dir():
+                self._last_used[worktree] = worktree.stat().st_mtime
+                self._sizes[worktree] = _disk_usage(worktree)
+
+    def _mirror_paths(self) -> list[Path]:
+        mirrors = self._root / "mirrors"
+        return sorted(mirrors.glob("*/*.git")) if mirrors.is_dir() else []
+
+    def _mirror_path(self, owner: str, repo: str) -> Path:
+        return self._root / "mirrors" / _safe(owner) / f"{_safe(repo)}.git"
+
+    def _worktree_path(self, owner: str, repo: str, workflow_id: str) -> Path:
+        return (
+            self._root / "worktrees" / _safe(owner) / _safe(repo) / _safe(workflow_id)
+        )
+
+    def _mirror_of(self, worktree: Path) -> Path:
+        owner, repo = worktree.parts[-3:-1]
+        return self._root / "mirrors" / owner / f"{repo}.git"
+
+    def _mirror_lock(self, mirror: Path) -> threading.Lock:
+        with self._lock:
+            return self._mirror_locks.setdefault(mirror, threading.Lock())
+
+    def _git(self, cwd: Path, *args: str) -> str:
+        """Run git in cwd and return its stripped standard output."""
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        if self._token:
+            credentials = base64.b64encode(f"x-access-token:{self._token}".encode())
+            env |= {
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.https://github.com/.extraheader",
+                "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials.decode()}",
+            }
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise GitCommandError(
+                f"git {args[0]} failed with exit code {completed.returncode}: "
+                f"{completed.stderr.strip()}"
+            )
+        return completed.stdout.strip()
@@ -0,0 +1,372 @@
+"""Worker process startup.
+
+Importing the Anthropic SDK and PyGithub takes most of a worker's cold start,
+so this module imports neither when it loads. WorkerBootstrap imports the
+adapters that need them on first use, builds one ClaudeClient, one
+AsyncClaudeClient and one GitHubClient per process with the options the
+caller supplies, and warms their connection pools in the background while the
+worker connects to Temporal, so the first activity does not pay for DNS
+resolution and TLS handshakes. The async client is built and warmed on the
+worker's event loop, which its connection pool is bound to. Every step is
+timed; the breakdown is logged when the worker starts polling so cold start
+can be tracked across releases.
+"""
+
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from temporalio.worker import Worker
+
+    from troller.worker.adapters.claude_client import AsyncClaudeClient, ClaudeClient
+    from troller.worker.adapters.github_client import GitHubClient
+
+_log = logging.getLogger(__name__)
+
+CLAUDE_MODULE = "troller.worker.adapters.claude_client"
+GITHUB_MODULE = "troller.worker.adapters.github_client"
+
+DEFAULT_PREWARM_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class StartupTimings:
+    """Where a worker's startup time went.
+
+    Attributes:
+        imports: Seconds spent importing each lazily loaded module.
+        clients: Seconds spent constructing each client, imports excluded.
+        prewarm: Seconds each client took to open its first connection.
+        prewarm_errors: Error message per client whose pre-warm failed.
+        total_seconds: Seconds from bootstrap creation until the worker was
+            ready to poll, or None if it is not ready yet.
+    """
+
+    imports: dict[str, float]
+    clients: dict[str, float]
+    prewarm: dict[str, float]
+    prewarm_errors: dict[str, str]
+    total_seconds: float | None
+
+    def to_metadata(self) -> dict[str, Any]:
+        """Return the timings as a JSON-serialisable dict, in milliseconds."""
+
+        def millis(seconds: dict[str, float]) -> dict[str, float]:
+            return {name: round(value * 1000, 1) for name, value in seconds.items()}
+
+        return {
+            "imports_ms": millis(self.imports),
+            "clients_ms": millis(self.clients),
+            "prewarm_ms": millis(self.prewarm),
+            "prewarm_errors": dict(self.prewarm_errors),
+            "total_ms": (
+                None
+                if self.total_seconds is None
+                else round(self.total_seconds * 1000, 1)
+            ),
+        }
+
+
+class WorkerBootstrap:
+    """Lazily imports, builds and pre-warms the clients of one worker process.
+
+    Safe to use from multiple threads; each module is imported and each
+    client built at most once.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        claude_options: Mapping[str, Any] | None = None,
+        async_claude_options: Mapping[str, Any] | None = None,
+        github_options: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Start the startup clock.
+
+        Args:
+            clock: Monotonic clock in seconds.
+            claude_options: Keyword arguments for ClaudeClient, e.g. model,
+                plan_cache or scheduler.
+            async_claude_options: Keyword arguments for AsyncClaudeClient,
+                e.g. model, limiter or plan_cache.
+            github_options: Keyword arguments for GitHubClient, e.g.
+                scheduler.
+        """
+        self._clock = clock
+        self._started = clock()
+        self._ready: float | None = None
+        self._lock = threading.Lock()
+        self._options: dict[str, Mapping[str, Any]] = {
+            "claude": claude_options or {},
+            "async_claude": async_claude_options or {},
+            "github": github_options or {},
+        }
+        self._client_locks = {name: threading.Lock() for name in self._options}
+        self._imports: dict[str, float] = {}
+        self._clients: dict[str, Any] = {}
+        self._client_seconds: dict[str, float] = {}
+        self._prewarm_seconds: dict[str, float] = {}
+        self._prewarm_errors: dict[str, str] = {}
+        self._prewarm: Future[None] | None = None
+        self._async_prewarm: asyncio.Future[None] | None = None
+
+    def import_module(self, name: str) -> ModuleType:
+        """Import a module, recording how long the first import took.
+
+        Args:
+            name: Dotted module name.
+
+        Returns:
+            The imported module.
+        """
+        start = self._clock()
+        module = importlib.import_module(name)
+        elapsed = self._clock() - start
+        with self._lock:
+            self._imports.setdefault(name, elapsed)
+        return module
+
+    def claude_client(self) -> "ClaudeClient":
+        """Return the process's ClaudeClient, building it on first use.
+
+        Raises:
+            ValueError: If ANTHROPIC_API_KEY environment variable is not set.
+        """
+        client: ClaudeClient = self._client("claude", CLAUDE_MODULE, "ClaudeClient")
+        return client
+
+    def async_claude_client(self) -> "AsyncClaudeClient":
+        """Return the process's AsyncClaudeClient, building it on first use.
+
+        Its connection pool is bound to the event loop it is first used on,
+        so use it from the worker's loop only; run() warms it there.
+
+        Raises:
+            ValueError: If ANTHROPIC_API_KEY environment variable is not set.
+        """
+        client: AsyncClaudeClient = self._client(
+            "async_claude", CLAUDE_MODULE, "AsyncClaudeClient"
+        )
+        return client
+
+    def github_client(self) -> "GitHubClient":
+        """Return the process's GitHubClient, building it on first use.
+
+        Raises:
+            ValueError: If GITHUB_TOKEN environment variable is not set.
+        """
+        client: GitHubClient = self._client("github", GITHUB_MODULE, "GitHubClient")
+        return client
+
+    def start_prewarm(self) -> "Future[None]":
+        """Build the blocking clients and open their connections in the background.
+
+        Failures are logged and recorded in the timings but never raised: a
+        client that could not be warmed is built or connected again on first
+        use. Calling this more than once returns the same future.
+
+        Returns:
+            Future that completes once both clients are warm or have failed.
+        """
+        with self._lock:
+            if self._prewarm is None:
+                self._prewarm = Future()
+                threading.Thread(
+                    target=self._run_prewarm, name="worker-prewarm", daemon=True
+                ).start()
+            return self._prewarm
+
+    def wait_warm(self, timeout: float | None = None) -> bool:
+        """Block until pre-warming finishes, starting it if needed.
+
+        Args:
+            timeout: Seconds to wait at most, or None to wait indefinitely.
+
+        Returns:
+            True if pre-warming finished within the timeout.
+        """
+        done, _ = wait([self.start_prewarm()], timeout=timeout)
+        return bool(done)
+
+    def mark_ready(self) -> StartupTimings:
+        """Record that the worker is about to poll and log the breakdown.
+
+        Returns:
+            The startup timings, including the total.
+        """
+        with self._lock:
+            if self._ready is None:
+                self._ready = self._clock()
+        timings = self.timings()
+        _log.info("Worker startup timings: %s", timings.to_metadata())
+        return timings
+
+    def timings(self) -> StartupTimings:
+        """Return the startup timings recorded so far."""
+        with self._lock:
+            return StartupTimings(
+                imports=dict(self._imports),
+                clients=dict(self._client_seconds),
+                prewarm=dict(self._prewarm_seconds),
+                prewarm_errors=dict(self._prewarm_errors),
+                total_seconds=(
+                    None if self._ready is None else self._ready - self._started
+                ),
+            )
+
+    async def prewarm_async(self) -> None:
+        """Build the AsyncClaudeClient and open its connection on this loop.
+
+        Failures are logged and recorded in the timings, as for
+        start_prewarm, but never raised.
+        """
+        try:
+            # The import is the slow part; keep it off the event loop.
+            await asyncio.to_thread(self.import_module, CLAUDE_MODULE)
+            client = self.async_claude_client()
+            start = self._clock()
+            await client.prewarm()
+            elapsed = self._clock() - start
+        except Exception as error:  # noqa: BLE001 - pre-warming is best effort
+            self._record_prewarm_error("async_claude", error)
+            return
+        with self._lock:
+            self._prewarm_seconds["async_claude"] = elapsed
+
+    async def run(
+        self,
+        worker: "Worker",
+        prewarm_timeout_seconds: float = DEFAULT_PREWARM_TIMEOUT_SECONDS,
+    ) -> None:
+        """Run a Temporal worker once the clients are warm.
+
+        Pre-warming of the blocking clients has usually been running since
+        start_prewarm was called before connecting to Temporal; the async
+        client is warmed here, on the worker's event loop, at the same time.
+        If warming takes longer than the timeout the worker starts polling
+        anyway and warming finishes in the background.
+
+        Args:
+            worker: Worker to run; it starts polling its task queue here.
+            prewarm_timeout_seconds: Longest to wait for pre-warming.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + prewarm_timeout_seconds
+        self._async_prewarm = asyncio.ensure_future(self.prewarm_async())
+        warm = await asyncio.to_thread(self.wait_warm, prewarm_timeout_seconds)
+        done, _ = await asyncio.wait(
+            [self._async_prewarm], timeout=max(0.0, deadline - loop.time())
+        )
+        if not (warm and done):
+            _log.warning(
+                "Client pre-warming still running after %.1fs; starting worker",
+                prewarm_timeout_seconds,
+            )
+        self.mark_ready()
+        await worker.run()
+
+    def _client(self, name: str, module: str, class_name: str) -> Any:
+        with self._client_locks[name]:
+            client = self._clients.get(name)
+            if client is None:
+                client_class = getattr(self.import_module(module), class_name)
+                start = self._clock()
+                client = client_class(**self._options[name])
+                elapsed = self._clock() - start
+                with self._lock:
+                    self._clients[name] = client
+                    self._client_seconds[name] = elapsed
+            return client
+
+    def _run_prewarm(self) -> None:
+        assert self._prewarm is not None
+        steps = {"claude": self.claude_client, "github": self.github_client}
+        with ThreadPoolExecutor(len(steps), thread_name_prefix="prewarm") as pool:
+            for name, get_client in steps.items():
+                pool.submit(self._prewarm_one, name, get_client)
+        self._prewarm.set_result(None)
+
+    def _prewarm_one(self, name: str, get_client: Callable[[], Any]) -> None:
+        try:
+            client = get_client()
+            start = self._clock()
+            client.prewarm()
+            elapsed = self._clock() - start
+        except Exception as error:  # noqa: BLE001 - pre-warming is best effort
+            self._record_prewarm_error(name, error)
+            return
+        with self._lock:
+            self._prewarm_seconds[name] = elapsed
+
+    def _record_prewarm_error(self, name: str, error: Exception) -> None:
+        _log.warning("Pre-warming the %s client failed: %s", name, error)
+        with self._lock:
+            self._prewarm_errors[name] = str(error) or type(error).__name__
+
+
+_bootstrap: WorkerBootstrap | None = None
+_bootstrap_lock = threading.Lock()
+
+
+def get_bootstrap(
+    claude_options: Mapping[str, Any] | None = None,
+    async_claude_options: Mapping[str, Any] | None = None,
+    github_options: Mapping[str, Any] | None = None,
+) -> WorkerBootstrap:
+    """Return the process-wide WorkerBootstrap, creating it on first use.
+
+    Args:
+        claude_options: ClaudeClient options used when the bootstrap is
+            created.
+        async_claude_options: AsyncClaudeClient options used when the
+            bootstrap is created.
+        github_options: GitHubClient options used when the bootstrap is
+            created.
+
+    Raises:
+        ValueError: If the bootstrap already exists and options differing from
+            the ones it was created with are passed; they would be ignored.
+    """
+    global _bootstrap
+    with _bootstrap_lock:
+        if _bootstrap is None:
+            _bootstrap = WorkerBootstrap(
+                claude_options=claude_options,
+                async_claude_options=async_claude_options,
+                github_options=github_options,
+            )
+            return _bootstrap
+        requested = {
+            "claude": claude_options,
+            "async_claude": async_claude_options,
+            "github": github_options,
+        }
+        conflicting = sorted(
+            name
+            for name, options in requested.items()
+            if options is not None and dict(options) != _bootstrap._options[name]
+        )
+        if conflicting:
+            raise ValueError(
+                "The worker bootstrap already exists with different "
+                f"{', '.join(conflicting)} options; call reset_bootstrap() first"
+            )
+        return _bootstrap
+
+
+def reset_bootstrap() -> None:
+    """Forget the process-wide WorkerBootstrap and its clients.
+
+    Intended for tests and for child processes after a fork.
+    """
+    global _bootstrap
+    with _bootstrap_lock:
+        _bootstrap = None
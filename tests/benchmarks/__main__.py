@@ -0,0 +1,5 @@
+"""Entry point for python -m tests.benchmarks."""
+
+from tests.benchmarks.suite import main
+
+main()
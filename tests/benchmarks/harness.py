@@ -0,0 +1,263 @@
+"""Measurement helpers for adapter benchmarks.
+
+Each scenario runs twice per concurrency level: a timing pass for throughput
+and latency percentiles, then a shorter pass under tracemalloc for memory and
+allocations. Tracing slows allocation down, so it is kept out of the timing
+pass. tracemalloc sees live blocks, not allocation events, so allocations are
+counted as the blocks a pass leaves behind: before a collection, which
+includes its garbage, and after one, which is what it retained.
+"""
+
+import asyncio
+import gc
+import math
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Self
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Measurements for one scenario at one concurrency level.
+
+    Attributes:
+        scenario: Scenario name, e.g. 'claude.generate_plan'.
+        concurrency: Calls in flight at once.
+        calls: Calls made in the timing pass.
+        errors: Calls that raised.
+        duration_seconds: Wall time of the timing pass.
+        throughput_per_second: Successful calls per second.
+        latency_p50_ms: Median latency of successful calls.
+        latency_p95_ms: 95th percentile latency.
+        latency_p99_ms: 99th percentile latency.
+        peak_traced_bytes: Peak traced memory during the memory pass,
+            above the traced memory when it started.
+        peak_memory_per_in_flight_bytes: peak_traced_bytes divided by
+            concurrency.
+        net_allocated_blocks_per_call: Memory blocks allocated during the
+            memory pass and still live at its end, garbage included, per
+            call; blocks freed within the pass are not counted.
+        net_allocated_bytes_per_call: Size of those blocks, per call.
+        retained_blocks_per_call: Blocks allocated during the memory pass
+            that survive a full collection after it, per call.
+        retained_bytes_per_call: Size of those blocks, per call.
+        gc_collections_per_call: Garbage collections run during the memory
+            pass, per call.
+    """
+
+    scenario: str
+    concurrency: int
+    calls: int
+    errors: int
+    duration_seconds: float
+    throughput_per_second: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    peak_traced_bytes: int
+    peak_memory_per_in_flight_bytes: int
+    net_allocated_blocks_per_call: float
+    net_allocated_bytes_per_call: float
+    retained_blocks_per_call: float
+    retained_bytes_per_call: float
+    gc_collections_per_call: float
+
+
+@dataclass(frozen=True)
+class _Timing:
+    latencies: list[float]
+    errors: int
+    duration: float
+
+
+@dataclass(frozen=True)
+class _Growth:
+    blocks: int
+    bytes: int
+
+
+@dataclass(frozen=True)
+class _Memory:
+    peak_bytes: int
+    net_allocated: _Growth
+    retained: _Growth
+    gc_collections: int
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list; 0.0 when empty."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _gc_collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+# Leave out the snapshots' own bookkeeping.
+_SNAPSHOT_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+
+def _growth(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> _Growth:
+    """Blocks and bytes allocated between two snapshots and live at the second."""
+    stats = after.filter_traces(_SNAPSHOT_FILTERS).compare_to(
+        before.filter_traces(_SNAPSHOT_FILTERS), "filename"
+    )
+    return _Growth(
+        blocks=sum(stat.count_diff for stat in stats),
+        bytes=sum(stat.size_diff for stat in stats),
+    )
+
+
+class _MemoryProbe:
+    """Context manager tracing memory, allocations and collections inside it."""
+
+    memory: _Memory
+
+    def __enter__(self) -> Self:
+        gc.collect()
+        self._collections_before = _gc_collections()
+        tracemalloc.start()
+        self._before = tracemalloc.take_snapshot()
+        self._baseline, _ = tracemalloc.get_traced_memory()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        _, peak = tracemalloc.get_traced_memory()
+        at_end = tracemalloc.take_snapshot()
+        collections = _gc_collections() - self._collections_before
+        gc.collect()
+        collected = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        self.memory = _Memory(
+            peak_bytes=max(0, peak - self._baseline),
+            net_allocated=_growth(self._before, at_end),
+            retained=_growth(self._before, collected),
+            gc_collections=collections,
+        )
+
+
+def _result(
+    scenario: str, concurrency: int, timing: _Timing, memory: _Memory, memory_calls: int
+) -> BenchmarkResult:
+    latencies = sorted(timing.latencies)
+    return BenchmarkResult(
+        scenario=scenario,
+        concurrency=concurrency,
+        calls=len(timing.latencies) + timing.errors,
+        errors=timing.errors,
+        duration_seconds=timing.duration,
+        throughput_per_second=len(latencies) / timing.duration,
+        latency_p50_ms=percentile(latencies, 0.50) * 1000,
+        latency_p95_ms=percentile(latencies, 0.95) * 1000,
+        latency_p99_ms=percentile(latencies, 0.99) * 1000,
+        peak_traced_bytes=memory.peak_bytes,
+        peak_memory_per_in_flight_bytes=memory.peak_bytes // concurrency,
+        net_allocated_blocks_per_call=memory.net_allocated.blocks / memory_calls,
+        net_allocated_bytes_per_call=memory.net_allocated.bytes / memory_calls,
+        retained_blocks_per_call=memory.retained.blocks / memory_calls,
+        retained_bytes_per_call=memory.retained.bytes / memory_calls,
+        gc_collections_per_call=memory.gc_collections / memory_calls,
+    )
+
+
+def _time_threaded(
+    call: Callable[[int], object], concurrency: int, calls: int
+) -> _Timing:
+    def timed(index: int) -> float | None:
+        started = time.perf_counter()
+        try:
+            call(index)
+        except Exception:  # noqa: BLE001 - failures are counted, not raised
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, range(calls)))
+    duration = time.perf_counter() - started
+    latencies = [latency for latency in outcomes if latency is not None]
+    return _Timing(latencies, len(outcomes) - len(latencies), duration)
+
+
+def run_threaded(
+    scenario: str,
+    call: Callable[[int], object],
+    concurrency: int,
+    calls: int,
+    memory_calls: int,
+) -> BenchmarkResult:
+    """Benchmark a blocking call from a pool of concurrency threads.
+
+    Args:
+        scenario: Scenario name.
+        call: Makes one call; receives the call index.
+        concurrency: Worker threads.
+        calls: Calls in the timing pass.
+        memory_calls: Calls in the memory pass.
+
+    Returns:
+        Measurements for the scenario.
+    """
+    timing = _time_threaded(call, concurrency, calls)
+    with _MemoryProbe() as probe:
+        _time_threaded(call, concurrency, memory_calls)
+    return _result(scenario, concurrency, timing, probe.memory, memory_calls)
+
+
+async def _time_async(
+    call: Callable[[int], Awaitable[object]], concurrency: int, calls: int
+) -> _Timing:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(index: int) -> float | None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except Exception:  # noqa: BLE001 - failures are counted, not raised
+                return None
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(timed(index) for index in range(calls)))
+    duration = time.perf_counter() - started
+    latencies = [latency for latency in outcomes if latency is not None]
+    return _Timing(latencies, len(outcomes) - len(latencies), duration)
+
+
+def run_async(
+    scenario: str,
+    call: Callable[[int], Awaitable[object]],
+    concurrency: int,
+    calls: int,
+    memory_calls: int,
+) -> BenchmarkResult:
+    """Benchmark a coroutine with up to concurrency calls in flight.
+
+    Both passes run in one event loop so the client's connections are reused.
+
+    Args:
+        scenario: Scenario name.
+        call: Makes one call; receives the call index.
+        concurrency: Maximum calls in flight.
+        calls: Calls in the timing pass.
+        memory_calls: Calls in the memory pass.
+
+    Returns:
+        Measurements for the scenario.
+    """
+
+    async def both_passes() -> tuple[_Timing, _Memory]:
+        timing = await _time_async(call, concurrency, calls)
+        with _MemoryProbe() as probe:
+            await _time_async(call, concurrency, memory_calls)
+        return timing, probe.memory
+
+    timing, memory = asyncio.run(both_passes())
+    return _result(scenario, concurrency, timing, memory, memory_calls)
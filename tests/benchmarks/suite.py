@@ -0,0 +1,255 @@
+"""Adapter benchmark suite against in-process fake servers.
+
+Runs ClaudeClient, AsyncClaudeClient and GitHubClient unmodified against the
+fake Anthropic and GitHub servers, so it needs no network access or
+credentials, and reports one BenchmarkResult per scenario and concurrency
+level as JSON.
+
+Usage:
+    python -m tests.benchmarks --concurrency 1,8,32 --calls 200 --output out.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+from unittest.mock import patch
+
+from tests.benchmarks.harness import BenchmarkResult, run_async, run_threaded
+from tests.fixtures.fake_anthropic import FakeAnthropicConfig, fake_anthropic_server
+from tests.fixtures.fake_github import HEAD_SHA, FakeGitHubConfig, fake_github_server
+from troller.worker.adapters.claude_client import AsyncClaudeClient, ClaudeClient
+from troller.worker.adapters.concurrency import ConcurrencyLimiter
+from troller.worker.adapters.github_client import GitHubClient, reset_shared_clients
+
+SCHEMA_VERSION = 2
+
+
+@dataclass(frozen=True)
+class SuiteConfig:
+    """Parameters of a benchmark run.
+
+    Attributes:
+        concurrency_levels: Calls in flight at once, one run per level.
+        calls: Calls per scenario and level in the timing pass.
+        memory_calls: Calls per scenario and level in the memory pass.
+        latency_seconds: Server-side delay added to every request.
+        error_rate: Fraction of requests the fake servers fail.
+        plan_steps: Steps in every generated plan.
+        step_padding: Extra characters per plan step description.
+        comments_per_issue: Comments on every GitHub issue.
+        body_padding: Characters in every issue and comment body.
+        scenarios: Scenario names to run; empty runs all of them.
+    """
+
+    concurrency_levels: tuple[int, ...] = (1, 4, 16)
+    calls: int = 100
+    memory_calls: int = 20
+    latency_seconds: float = 0.005
+    error_rate: float = 0.0
+    plan_steps: int = 5
+    step_padding: int = 200
+    comments_per_issue: int = 10
+    body_padding: int = 500
+    scenarios: tuple[str, ...] = ()
+
+
+def _claude_generate_plan(concurrency: int) -> Callable[[int], object]:
+    client = ClaudeClient()
+    return lambda index: client.generate_plan("Title", "Body", index)
+
+
+def _claude_stream_plan(concurrency: int) -> Callable[[int], object]:
+    client = ClaudeClient()
+    return lambda index: list(client.stream_plan("Title", "Body", index))
+
+
+def _github_get_issue(concurrency: int) -> Callable[[int], object]:
+    client = GitHubClient()
+    return lambda index: client.get_issue("owner", "repo", index)
+
+
+def _github_issue_snapshot(concurrency: int) -> Callable[[int], object]:
+    client = GitHubClient()
+    return lambda index: client.get_issue_snapshot("owner", "repo", index)
+
+
+def _github_combined_status(concurrency: int) -> Callable[[int], object]:
+    client = GitHubClient()
+    return lambda index: client.get_combined_status("owner", "repo", HEAD_SHA)
+
+
+def _claude_async_generate_plan(
+    concurrency: int,
+) -> Callable[[int], Awaitable[object]]:
+    # A fresh client per level, because each run_async uses a new event loop.
+    client = AsyncClaudeClient(limiter=ConcurrencyLimiter(concurrency))
+    return lambda index: client.generate_plan("Title", "Body", index)
+
+
+_THREADED_SCENARIOS: dict[str, Callable[[int], Callable[[int], object]]] = {
+    "claude.generate_plan": _claude_generate_plan,
+    "claude.stream_plan": _claude_stream_plan,
+    "github.get_issue": _github_get_issue,
+    "github.get_issue_snapshot": _github_issue_snapshot,
+    "github.get_combined_status": _github_combined_status,
+}
+_ASYNC_SCENARIOS: dict[str, Callable[[int], Callable[[int], Awaitable[object]]]] = {
+    "claude.async_generate_plan": _claude_async_generate_plan,
+}
+SCENARIOS = (*_THREADED_SCENARIOS, *_ASYNC_SCENARIOS)
+
+
+@contextmanager
+def _fake_environment(config: SuiteConfig) -> Iterator[None]:
+    """Run both fake servers and point the adapters at them."""
+    anthropic_config = FakeAnthropicConfig(
+        latency_seconds=config.latency_seconds,
+        error_rate=config.error_rate,
+        plan_steps=config.plan_steps,
+        step_padding=config.step_padding,
+    )
+    github_config = FakeGitHubConfig(
+        latency_seconds=config.latency_seconds,
+        error_rate=config.error_rate,
+        comments_per_issue=config.comments_per_issue,
+        body_padding=config.body_padding,
+    )
+    with (
+        fake_anthropic_server(anthropic_config) as anthropic,
+        fake_github_server(github_config) as github,
+    ):
+        env = {
+            "ANTHROPIC_API_KEY": "benchmark-key",
+            "ANTHROPIC_BASE_URL": anthropic.url,
+            "GITHUB_TOKEN": "benchmark-token",
+            "GITHUB_API_URL": github.url,
+        }
+        with patch.dict(os.environ, env):
+            reset_shared_clients()
+            try:
+                yield
+            finally:
+                reset_shared_clients()
+
+
+def run_suite(config: SuiteConfig) -> list[BenchmarkResult]:
+    """Run the selected scenarios at every concurrency level.
+
+    Args:
+        config: Benchmark parameters.
+
+    Returns:
+        One result per scenario and concurrency level.
+
+    Raises:
+        ValueError: If config names an unknown scenario.
+    """
+    unknown = set(config.scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    selected = config.scenarios or SCENARIOS
+
+    results: list[BenchmarkResult] = []
+    with _fake_environment(config):
+        for scenario in selected:
+            for concurrency in config.concurrency_levels:
+                if scenario in _THREADED_SCENARIOS:
+                    result = run_threaded(
+                        scenario,
+                        _THREADED_SCENARIOS[scenario](concurrency),
+                        concurrency,
+                        config.calls,
+                        config.memory_calls,
+                    )
+                else:
+                    result = run_async(
+                        scenario,
+                        _ASYNC_SCENARIOS[scenario](concurrency),
+                        concurrency,
+                        config.calls,
+                        config.memory_calls,
+                    )
+                results.append(result)
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def report(config: SuiteConfig, results: Sequence[BenchmarkResult]) -> dict[str, Any]:
+    """Build the machine-readable report for a run."""
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": asdict(config),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def _parse_args(argv: Sequence[str] | None) -> tuple[SuiteConfig, str | None]:
+    defaults = SuiteConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        default=",".join(map(str, defaults.concurrency_levels)),
+        help="comma-separated concurrency levels",
+    )
+    parser.add_argument("--calls", type=int, default=defaults.calls)
+    parser.add_argument("--memory-calls", type=int, default=defaults.memory_calls)
+    parser.add_argument(
+        "--latency-ms", type=float, default=defaults.latency_seconds * 1000
+    )
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--plan-steps", type=int, default=defaults.plan_steps)
+    parser.add_argument("--step-padding", type=int, default=defaults.step_padding)
+    parser.add_argument("--comments", type=int, default=defaults.comments_per_issue)
+    parser.add_argument("--body-padding", type=int, default=defaults.body_padding)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        default=[],
+        choices=SCENARIOS,
+        help="scenario to run; repeatable, defaults to all",
+    )
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+    config = SuiteConfig(
+        concurrency_levels=tuple(int(level) for level in args.concurrency.split(",")),
+        calls=args.calls,
+        memory_calls=args.memory_calls,
+        latency_seconds=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        plan_steps=args.plan_steps,
+        step_padding=args.step_padding,
+        comments_per_issue=args.comments,
+        body_padding=args.body_padding,
+        scenarios=tuple(args.scenario),
+    )
+    return config, args.output
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the suite from the command line and emit the JSON report."""
+    config, output = _parse_args(argv)
+    document = json.dumps(report(config, run_suite(config)), indent=2)
+    if output is None:
+        print(document)
+    else:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(document + "\n")
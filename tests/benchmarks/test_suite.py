@@ -0,0 +1,53 @@
+"""Smoke test keeping the benchmark suite runnable."""
+
+import json
+
+import pytest
+
+from tests.benchmarks.harness import percentile
+from tests.benchmarks.suite import SuiteConfig, report, run_suite
+
+
+class TestBenchmarkSuite:
+    """Test suite for the benchmark runner."""
+
+    def test_percentile_uses_nearest_rank(self) -> None:
+        """Percentiles pick an observed value, never interpolate."""
+        values = [float(n) for n in range(1, 101)]
+
+        assert percentile(values, 0.50) == 50.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([], 0.5) == 0.0
+
+    def test_run_suite_produces_json_report(self) -> None:
+        """A tiny run covers each adapter and serializes to JSON."""
+        config = SuiteConfig(
+            concurrency_levels=(2,),
+            calls=4,
+            memory_calls=2,
+            latency_seconds=0.0,
+            scenarios=(
+                "claude.generate_plan",
+                "claude.async_generate_plan",
+                "github.get_combined_status",
+            ),
+        )
+
+        results = run_suite(config)
+        document = json.loads(json.dumps(report(config, results)))
+
+        assert [result["scenario"] for result in document["results"]] == list(
+            config.scenarios
+        )
+        for result in document["results"]:
+            assert result["calls"] == 4
+            assert result["errors"] == 0
+            assert result["latency_p50_ms"] <= result["latency_p99_ms"]
+            assert result["throughput_per_second"] > 0
+            assert result["peak_traced_bytes"] > 0
+            assert result["net_allocated_blocks_per_call"] > 0
+
+    def test_run_suite_rejects_unknown_scenario(self) -> None:
+        """Typos in scenario names fail fast."""
+        with pytest.raises(ValueError, match="unknown scenarios"):
+            run_suite(SuiteConfig(scenarios=("claude.nope",)))
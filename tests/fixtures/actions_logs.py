@@ -0,0 +1,119 @@
+"""Canned GitHub Actions runs and log archives for tests.
+
+Archives follow the layout GitHub serves: one top-level file per job named
+'<index>_<job>.txt', plus a directory per job with one file per step named
+'<number>_<step>.txt'. Every line starts with a timestamp.
+"""
+
+import io
+import zipfile
+from dataclasses import dataclass
+from typing import Any
+
+_TIMESTAMP = "2025-01-01T00:00:00.0000000Z "
+
+
+@dataclass(frozen=True)
+class FakeWorkflowRun:
+    """A workflow run served by FakeGitHubServer.
+
+    Attributes:
+        jobs: Body of the list-jobs-for-a-run response.
+        archive: Zip archive served as the run logs.
+    """
+
+    jobs: dict[str, Any]
+    archive: bytes
+
+
+def make_log_archive(files: dict[str, list[str]]) -> bytes:
+    """Zip log files, prefixing every line with a timestamp."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, lines in files.items():
+            archive.writestr(name, "".join(f"{_TIMESTAMP}{line}\n" for line in lines))
+    return buffer.getvalue()
+
+
+def _job(name: str, conclusion: str, steps: list[tuple[str, str]]) -> dict[str, Any]:
+    return {
+        "name": name,
+        "conclusion": conclusion,
+        "steps": [
+            {"name": step, "number": number, "conclusion": step_conclusion}
+            for number, (step, step_conclusion) in enumerate(steps, start=1)
+        ],
+    }
+
+
+def failed_test_run(noise_lines: int = 1000) -> FakeWorkflowRun:
+    """A run whose 'test' job fails in pytest after a long, passing build.
+
+    Args:
+        noise_lines: Lines of passing output in the build job and before the
+            failure in the test step.
+    """
+    noise = [f"compiling module {n}" for n in range(noise_lines)]
+    pytest_log = [
+        *[f"tests/test_{n}.py::test_ok PASSED" for n in range(noise_lines)],
+        "\x1b[31mFAILED tests/test_api.py::test_create - AssertionError: 1 != 2\x1b[0m",
+        "E       AssertionError: 1 != 2",
+        "=== 1 failed, 999 passed in 12.3s ===",
+        "##[error]Process completed with exit code 1.",
+    ]
+    files = {
+        "0_build.txt": noise,
+        "build/1_Set up job.txt": ["Runner ready"],
+        "build/2_Compile.txt": noise,
+        "1_test.txt": ["Runner ready", *pytest_log],
+        "test/1_Set up job.txt": ["Runner ready"],
+        "test/2_Run pytest.txt": pytest_log,
+    }
+    jobs = {
+        "total_count": 2,
+        "jobs": [
+            _job(
+                "build", "success", [("Set up job", "success"), ("Compile", "success")]
+            ),
+            _job(
+                "test",
+                "failure",
+                [("Set up job", "success"), ("Run pytest", "failure")],
+            ),
+        ],
+    }
+    return FakeWorkflowRun(jobs, make_log_archive(files))
+
+
+def environment_failure_run() -> FakeWorkflowRun:
+    """A run whose only job fails installing dependencies over the network."""
+    log = [
+        "Collecting requests",
+        "WARNING: Retrying after NewConnectionError: Connection refused",
+        "ERROR: Could not install packages due to an OSError",
+    ]
+    # No step files: GitHub omits them for some runs, leaving the job log.
+    files = {"0_install.txt": log}
+    jobs = {
+        "total_count": 1,
+        "jobs": [{"name": "install", "conclusion": "failure", "steps": []}],
+    }
+    return FakeWorkflowRun(jobs, make_log_archive(files))
+
+
+def matrix_failure_run(job_count: int) -> FakeWorkflowRun:
+    """A matrix run whose last job fails, after job_count - 1 passing ones."""
+    passing = [
+        _job(f"test ({n})", "success", [("Run pytest", "success")])
+        for n in range(job_count - 1)
+    ]
+    last = f"test ({job_count - 1})"
+    files = {
+        f"{job_count - 1}_{last}.txt": ["E       AssertionError: 1 != 2"],
+        f"{last}/1_Run pytest.txt": ["E       AssertionError: 1 != 2"],
+    }
+    jobs = {
+        "total_count": job_count,
+        "jobs": [*passing, _job(last, "failure", [("Run pytest", "failure")])],
+    }
+    return FakeWorkflowRun(jobs, make_log_archive(files))
@@ -0,0 +1,396 @@
+"""In-process fake of the Anthropic Messages API.
+
+Serves just enough of /v1/messages and /v1/messages/batches for the adapters
+to run unmodified against it, with configurable latency, error rate and
+payload size. Point the SDK at it through ANTHROPIC_BASE_URL.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+_BATCH_PATH = re.compile(r"^/v1/messages/batches/(?P<id>[\w-]+)(?P<results>/results)?$")
+
+
+def make_plan_input(
+    issue_number: int, steps: int = 3, padding: int = 0
+) -> dict[str, Any]:
+    """Build a create_plan tool input.
+
+    Args:
+        issue_number: Issue number echoed into the summary.
+        steps: Number of plan steps.
+        padding: Extra characters appended to each step description.
+    """
+    return {
+        "summary": f"Plan for issue #{issue_number}",
+        "steps": [
+            {
+                "id": f"step-{i}",
+                "description": f"Step {i} for issue #{issue_number}" + "x" * padding,
+                "completed": False,
+                "related_files": [f"src/module_{i}.py"],
+                "estimated_complexity": "simple",
+            }
+            for i in range(1, steps + 1)
+        ],
+        "technical_approach": "Fake approach",
+        "testing_strategy": "Fake tests",
+    }
+
+
+def _issue_number(request_body: dict[str, Any]) -> int:
+    content = request_body["messages"][0]["content"]
+    text = content if isinstance(content, str) else json.dumps(content)
+    match = re.search(r"Issue #(\d+)", text)
+    return int(match.group(1)) if match else 0
+
+
+@dataclass
+class FakeAnthropicConfig:
+    """Behaviour knobs for FakeAnthropicServer.
+
+    Attributes:
+        latency_seconds: Delay before answering each /v1/messages call.
+        error_rate: Fraction of /v1/messages calls answered with HTTP 529.
+        plan_steps: Steps in each generated plan.
+        step_padding: Extra characters per step description.
+        batch_polls_until_ended: Batch retrievals reporting in_progress before
+            the batch ends.
+        failing_issue_numbers: Issues whose batch requests end errored.
+        malformed_issue_numbers: Issues whose batch requests succeed with a
+            text answer instead of a create_plan call.
+        slow_calls: 1-based /v1/messages call counts answered after
+            slow_latency_seconds instead of latency_seconds.
+        slow_latency_seconds: Delay for the calls in slow_calls.
+        seed: Seed for the error-rate random generator.
+    """
+
+    latency_seconds: float = 0.0
+    error_rate: float = 0.0
+    plan_steps: int = 3
+    step_padding: int = 0
+    batch_polls_until_ended: int = 1
+    failing_issue_numbers: frozenset[int] = frozenset()
+    malformed_issue_numbers: frozenset[int] = frozenset()
+    slow_calls: frozenset[int] = frozenset()
+    slow_latency_seconds: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class _Batch:
+    requests: list[dict[str, Any]]
+    polls: int = 0
+    ended: bool = False
+
+
+@dataclass
+class FakeAnthropicServer:
+    """Threaded HTTP server emulating the Anthropic API."""
+
+    config: FakeAnthropicConfig = field(default_factory=FakeAnthropicConfig)
+    message_calls: int = 0
+    batches: dict[str, _Batch] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as ANTHROPIC_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def message(self, request_body: dict[str, Any]) -> dict[str, Any]:
+        """Build the Message returned for a create request."""
+        issue_number = _issue_number(request_body)
+        plan_input = make_plan_input(
+            issue_number, self.config.plan_steps, self.config.step_padding
+        )
+        return {
+            "id": f"msg_{issue_number}",
+            "type": "message",
+            "role": "assistant",
+            "model": request_body["model"],
+            "content": [
+                {
+                    "type": "tool_use",
+                    "id": f"toolu_{issue_number}",
+                    "name": "create_plan",
+                    "input": plan_input,
+                }
+            ],
+            "stop_reason": "tool_use",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": len(json.dumps(request_body)) // 4,
+                "output_tokens": len(json.dumps(plan_input)) // 4,
+                "cache_read_input_tokens": 0,
+                "cache_creation_input_tokens": 0,
+            },
+        }
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, Nagle's
+            # algorithm and delayed ACKs add tens of milliseconds per response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = self._read_json()
+                if self.path == "/v1/messages":
+                    self._create_message(body)
+                elif self.path == "/v1/messages/batches":
+                    self._create_batch(body)
+                else:
+                    self._send_json(404, {"type": "error", "error": {}})
+
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] == "/v1/models":
+                    self._send_json(
+                        200,
+                        {
+                            "data": [
+                                {
+                                    "type": "model",
+                                    "id": "claude-sonnet-4-5",
+                                    "display_name": "Claude Sonnet 4.5",
+                                    "created_at": "2025-09-29T00:00:00Z",
+                                }
+                            ],
+                            "has_more": False,
+                            "first_id": "claude-sonnet-4-5",
+                            "last_id": "claude-sonnet-4-5",
+                        },
+                    )
+                    return
+                match = _BATCH_PATH.match(self.path)
+                if match is None:
+                    self._send_json(404, {"type": "error", "error": {}})
+                elif match.group("results"):
+                    self._batch_results(match.group("id"))
+                else:
+                    self._retrieve_batch(match.group("id"))
+
+            def _read_json(self) -> dict[str, Any]:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length)) if length else {}
+
+            def _send_json(self, status: int, payload: Any) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _create_message(self, body: dict[str, Any]) -> None:
+                with server._lock:
+                    server.message_calls += 1
+                    failed = server._random.random() < server.config.error_rate
+                    slow = server.message_calls in server.config.slow_calls
+                time.sleep(
+                    server.config.slow_latency_seconds
+                    if slow
+                    else server.config.latency_seconds
+                )
+                if failed:
+                    self._send_json(
+                        529,
+                        {
+                            "type": "error",
+                            "error": {"type": "overloaded_error", "message": "busy"},
+                        },
+                    )
+                    return
+                message = server.message(body)
+                if body.get("stream"):
+                    self._stream_message(message)
+                else:
+                    self._send_json(200, message)
+
+            def _stream_message(self, message: dict[str, Any]) -> None:
+                tool_use = message["content"][0]
+                partial = json.dumps(tool_use["input"])
+                events: list[tuple[str, dict[str, Any]]] = [
+                    (
+                        "message_start",
+                        {
+                            "type": "message_start",
+                            "message": {**message, "content": [], "stop_reason": None},
+                        },
+                    ),
+                    (
+                        "content_block_start",
+                        {
+                            "type": "content_block_start",
+                            "index": 0,
+                            "content_block": {**tool_use, "input": {}},
+                        },
+                    ),
+                ]
+                events.extend(
+                    (
+                        "content_block_delta",
+                        {
+                            "type": "content_block_delta",
+                            "index": 0,
+                            "delta": {
+                                "type": "input_json_delta",
+                                "partial_json": partial[i : i + 64],
+                            },
+                        },
+                    )
+                    for i in range(0, len(partial), 64)
+                )
+                events.extend(
+                    [
+                        (
+                            "content_block_stop",
+                            {"type": "content_block_stop", "index": 0},
+                        ),
+                        (
+                            "message_delta",
+                            {
+                                "type": "message_delta",
+                                "delta": {
+                                    "stop_reason": "tool_use",
+                                    "stop_sequence": None,
+                                },
+                                "usage": message["usage"],
+                            },
+                        ),
+                        ("message_stop", {"type": "message_stop"}),
+                    ]
+                )
+                data = "".join(
+                    f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+                    for name, payload in events
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _create_batch(self, body: dict[str, Any]) -> None:
+                with server._lock:
+                    batch_id = f"msgbatch_{len(server.batches) + 1}"
+                    server.batches[batch_id] = _Batch(requests=body["requests"])
+                self._send_json(200, self._batch_json(batch_id))
+
+            def _retrieve_batch(self, batch_id: str) -> None:
+                with server._lock:
+                    batch = server.batches[batch_id]
+                    batch.polls += 1
+                    if batch.polls >= server.config.batch_polls_until_ended:
+                        batch.ended = True
+                self._send_json(200, self._batch_json(batch_id))
+
+            def _batch_json(self, batch_id: str) -> dict[str, Any]:
+                batch = server.batches[batch_id]
+                total = len(batch.requests)
+                failing = sum(
+                    1
+                    for request in batch.requests
+                    if _issue_number(request["params"])
+                    in server.config.failing_issue_numbers
+                )
+                return {
+                    "id": batch_id,
+                    "type": "message_batch",
+                    "processing_status": "ended" if batch.ended else "in_progress",
+                    "request_counts": {
+                        "processing": 0 if batch.ended else total,
+                        "succeeded": total - failing if batch.ended else 0,
+                        "errored": failing if batch.ended else 0,
+                        "canceled": 0,
+                        "expired": 0,
+                    },
+                    "created_at": "2025-01-01T00:00:00Z",
+                    "expires_at": "2025-01-02T00:00:00Z",
+                    "ended_at": "2025-01-01T01:00:00Z" if batch.ended else None,
+                    "archived_at": None,
+                    "cancel_initiated_at": None,
+                    "results_url": (
+                        f"{server.url}/v1/messages/batches/{batch_id}/results"
+                        if batch.ended
+                        else None
+                    ),
+                }
+
+            def _batch_results(self, batch_id: str) -> None:
+                config = server.config
+                lines = []
+                for request in server.batches[batch_id].requests:
+                    params = request["params"]
+                    if _issue_number(params) in config.failing_issue_numbers:
+                        result: dict[str, Any] = {
+                            "type": "errored",
+                            "error": {
+                                "type": "error",
+                                "error": {
+                                    "type": "invalid_request_error",
+                                    "message": "prompt is too long",
+                                },
+                            },
+                        }
+                    else:
+                        message = server.message(params)
+                        if _issue_number(params) in config.malformed_issue_numbers:
+                            message["content"] = [{"type": "text", "text": "Sorry"}]
+                            message["stop_reason"] = "end_turn"
+                        result = {"type": "succeeded", "message": message}
+                    lines.append(
+                        json.dumps(
+                            {"custom_id": request["custom_id"], "result": result}
+                        )
+                    )
+                data = ("\n".join(lines) + "\n").encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/binary")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+@contextmanager
+def fake_anthropic_server(
+    config: FakeAnthropicConfig | None = None,
+) -> Iterator[FakeAnthropicServer]:
+    """Run a FakeAnthropicServer for the duration of the context."""
+    server = FakeAnthropicServer(config or FakeAnthropicConfig())
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
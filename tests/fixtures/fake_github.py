@@ -0,0 +1,361 @@
+"""In-process fake of the GitHub REST and GraphQL APIs.
+
+Serves just enough of the API for GitHubClient to run unmodified against it:
+repositories, issues, combined statuses and check runs over REST (with ETag
+revalidation), workflow run jobs and log archives, and the issue snapshot and
+commit checks queries over GraphQL. Latency, error
+rate and payload sizes are configurable. Point the client at it through
+GITHUB_API_URL.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from tests.fixtures.actions_logs import FakeWorkflowRun
+
+_REPO_PATH = re.compile(r"^/repos/(?P<owner>[\w.-]+)/(?P<repo>[\w.-]+)")
+_ISSUE_PATH = re.compile(r"/issues/(?P<number>\d+)$")
+_STATUS_PATH = re.compile(r"/commits/(?P<ref>[\w.-]+)/(?P<kind>status|check-runs)")
+_RUN_PATH = re.compile(r"/actions/runs/(?P<run_id>\d+)/(?P<kind>jobs|logs)")
+_BLOB_PATH = re.compile(r"^/_blobs/runs/(?P<run_id>\d+)\.zip$")
+_ISSUE_ALIAS = re.compile(r"issue_(\d+): issue\(number: (\d+)\)")
+_COMMIT_ALIAS = re.compile(r'(commit_\d+): object\(oid: "(\w+)"\)')
+HEAD_SHA = "0" * 40
+
+
+@dataclass
+class FakeGitHubConfig:
+    """Behaviour knobs for FakeGitHubServer.
+
+    Attributes:
+        latency_seconds: Delay before answering each request.
+        error_rate: Fraction of requests answered with HTTP 502.
+        comments_per_issue: Comments returned for every issue.
+        labels_per_issue: Labels returned for every issue.
+        body_padding: Characters in every issue and comment body.
+        seed: Seed for the error-rate random generator.
+    """
+
+    latency_seconds: float = 0.0
+    error_rate: float = 0.0
+    comments_per_issue: int = 3
+    labels_per_issue: int = 1
+    body_padding: int = 100
+    seed: int = 0
+
+
+def _comment_node(issue_number: int, index: int, padding: int) -> dict[str, Any]:
+    return {
+        "author": {"login": f"user-{index % 7}"},
+        "body": f"Comment {index} on #{issue_number} " + "c" * padding,
+        "createdAt": "2025-01-01T00:00:00+00:00",
+    }
+
+
+@dataclass
+class FakeGitHubServer:
+    """Threaded HTTP server emulating the GitHub API.
+
+    commit_states maps commit SHAs to their check rollup state; commits not
+    in it have succeeded. workflow_runs holds the runs whose jobs (paged by
+    per_page and page) and logs are served; the logs of runs in expired_logs answer 410 Gone. Tests may
+    change these while the server runs. Run logs are served the way GitHub
+    does, as a redirect to a separate blob URL.
+    """
+
+    config: FakeGitHubConfig = field(default_factory=FakeGitHubConfig)
+    requests: int = 0
+    not_modified: int = 0
+    commit_states: dict[str, str] = field(default_factory=dict)
+    workflow_runs: dict[int, FakeWorkflowRun] = field(default_factory=dict)
+    expired_logs: set[int] = field(default_factory=set)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as GITHUB_API_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def comments_page(
+        self, issue_number: int, offset: int, page_size: int
+    ) -> dict[str, Any]:
+        """Build a GraphQL comments connection starting at offset."""
+        end = min(offset + page_size, self.config.comments_per_issue)
+        return {
+            "pageInfo": {
+                "hasNextPage": end < self.config.comments_per_issue,
+                "endCursor": str(end),
+            },
+            "nodes": [
+                _comment_node(issue_number, index, self.config.body_padding)
+                for index in range(offset, end)
+            ],
+        }
+
+    def labels_page(self, offset: int, page_size: int) -> dict[str, Any]:
+        """Build a GraphQL labels connection starting at offset."""
+        end = min(offset + page_size, self.config.labels_per_issue)
+        return {
+            "pageInfo": {
+                "hasNextPage": end < self.config.labels_per_issue,
+                "endCursor": str(end),
+            },
+            "nodes": [
+                {"name": "bug" if index == 0 else f"label-{index}"}
+                for index in range(offset, end)
+            ],
+        }
+
+    def graphql_issue(self, issue_number: int) -> dict[str, Any]:
+        """Build the IssueFields result for an issue."""
+        return {
+            "number": issue_number,
+            "title": f"Issue {issue_number}",
+            "body": "b" * self.config.body_padding,
+            "state": "OPEN",
+            "author": {"login": "octocat"},
+            "labels": self.labels_page(0, 100),
+            "comments": self.comments_page(issue_number, 0, 100),
+            "timelineItems": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "nodes": [],
+            },
+        }
+
+    def graphql_commit(self, sha: str) -> dict[str, Any]:
+        """Build the CommitChecks result for a commit."""
+        state = self.commit_states.get(sha, "SUCCESS")
+        if state == "PENDING":
+            check = {"name": "test", "status": "IN_PROGRESS", "conclusion": None}
+        else:
+            check = {"name": "test", "status": "COMPLETED", "conclusion": state}
+        return {"statusCheckRollup": {"state": state, "contexts": {"nodes": [check]}}}
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, Nagle's
+            # algorithm and delayed ACKs add tens of milliseconds per response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if not self._admit():
+                    return
+                path = self.path.split("?", 1)[0]
+                if path == "/rate_limit":
+                    self._send_json(200, {"resources": {}, "rate": {}})
+                    return
+                if blob_match := _BLOB_PATH.match(path):
+                    self._send_blob(int(blob_match.group("run_id")))
+                    return
+                repo_match = _REPO_PATH.match(path)
+                if repo_match is None:
+                    self._send_json(404, {"message": "Not Found"})
+                    return
+                owner, repo = repo_match.group("owner", "repo")
+                rest = path[repo_match.end() :]
+                if not rest:
+                    self._send_json(200, self._repository(owner, repo))
+                elif match := _ISSUE_PATH.fullmatch(rest):
+                    self._send_json(
+                        200, self._issue(owner, repo, int(match.group("number")))
+                    )
+                elif match := _STATUS_PATH.fullmatch(rest):
+                    self._send_conditional(self._status(match.group("kind")))
+                elif match := _RUN_PATH.fullmatch(rest):
+                    query = parse_qs(urlsplit(self.path).query)
+                    self._send_run(
+                        int(match.group("run_id")),
+                        match.group("kind"),
+                        int(query.get("page", ["1"])[0]),
+                        int(query.get("per_page", ["30"])[0]),
+                    )
+                else:
+                    self._send_json(404, {"message": "Not Found"})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length)) if length else {}
+                if not self._admit():
+                    return
+                if self.path != "/graphql":
+                    self._send_json(404, {"message": "Not Found"})
+                    return
+                self._send_json(200, {"data": self._graphql(body)})
+
+            def _admit(self) -> bool:
+                """Count the request, apply latency and maybe fail it."""
+                with server._lock:
+                    server.requests += 1
+                    failed = server._random.random() < server.config.error_rate
+                time.sleep(server.config.latency_seconds)
+                if failed:
+                    self._send_json(502, {"message": "Server Error"})
+                return not failed
+
+            def _send_json(
+                self, status: int, payload: Any, etag: str | None = None
+            ) -> None:
+                data = json.dumps(payload).encode() if status != 304 else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-RateLimit-Limit", "5000")
+                self.send_header(
+                    "X-RateLimit-Remaining", str(max(0, 5000 - server.requests))
+                )
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_run(
+                self, run_id: int, kind: str, page: int, per_page: int
+            ) -> None:
+                run = server.workflow_runs.get(run_id)
+                if run is None:
+                    self._send_json(404, {"message": "Not Found"})
+                elif kind == "jobs":
+                    start = (page - 1) * per_page
+                    jobs = run.jobs["jobs"][start : start + per_page]
+                    self._send_json(200, {**run.jobs, "jobs": jobs})
+                else:
+                    self.send_response(302)
+                    self.send_header(
+                        "Location", f"{server.url}/_blobs/runs/{run_id}.zip"
+                    )
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+            def _send_blob(self, run_id: int) -> None:
+                run = server.workflow_runs.get(run_id)
+                if run is None:
+                    self._send_json(404, {"message": "Not Found"})
+                    return
+                if run_id in server.expired_logs:
+                    self._send_json(410, {"message": "Gone"})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/zip")
+                self.send_header("Content-Length", str(len(run.archive)))
+                self.end_headers()
+                self.wfile.write(run.archive)
+
+            def _send_conditional(self, payload: Any) -> None:
+                digest = hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+                etag = f'"{digest}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self._send_json(304, None, etag)
+                else:
+                    self._send_json(200, payload, etag)
+
+            def _repository(self, owner: str, repo: str) -> dict[str, Any]:
+                return {
+                    "id": 1,
+                    "name": repo,
+                    "full_name": f"{owner}/{repo}",
+                    "owner": {"login": owner},
+                    "url": f"{server.url}/repos/{owner}/{repo}",
+                    "default_branch": "main",
+                }
+
+            def _issue(self, owner: str, repo: str, number: int) -> dict[str, Any]:
+                return {
+                    "id": number,
+                    "number": number,
+                    "title": f"Issue {number}",
+                    "body": "b" * server.config.body_padding,
+                    "state": "open",
+                    "user": {"login": "octocat"},
+                    "labels": [{"name": "bug"}],
+                    "comments": server.config.comments_per_issue,
+                    "url": f"{server.url}/repos/{owner}/{repo}/issues/{number}",
+                }
+
+            def _status(self, kind: str) -> dict[str, Any]:
+                if kind == "status":
+                    return {
+                        "state": "success",
+                        "sha": HEAD_SHA,
+                        "total_count": 1,
+                        "statuses": [{"context": "ci", "state": "success"}],
+                    }
+                return {
+                    "total_count": 1,
+                    "check_runs": [
+                        {"name": "test", "status": "completed", "conclusion": "success"}
+                    ],
+                }
+
+            def _graphql(self, body: dict[str, Any]) -> dict[str, Any]:
+                variables = body.get("variables") or {}
+                if "cursor" in variables:
+                    offset = int(variables["cursor"])
+                    if "labels(" in body["query"]:
+                        labels = server.labels_page(offset, 100)
+                        return {"repository": {"issue": {"labels": labels}}}
+                    connection = server.comments_page(variables["number"], offset, 100)
+                    return {"repository": {"issue": {"comments": connection}}}
+                if commits := _COMMIT_ALIAS.findall(body["query"]):
+                    return {
+                        "repository": {
+                            alias: server.graphql_commit(sha) for alias, sha in commits
+                        }
+                    }
+                repository: dict[str, Any] = {
+                    "defaultBranchRef": {"target": {"oid": HEAD_SHA}}
+                }
+                for alias_number, number in _ISSUE_ALIAS.findall(body["query"]):
+                    repository[f"issue_{alias_number}"] = server.graphql_issue(
+                        int(number)
+                    )
+                return {"repository": repository}
+
+        return Handler
+
+
+@contextmanager
+def fake_github_server(
+    config: FakeGitHubConfig | None = None,
+) -> Iterator[FakeGitHubServer]:
+    """Run a FakeGitHubServer for the duration of the context."""
+    server = FakeGitHubServer(config or FakeGitHubConfig())
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
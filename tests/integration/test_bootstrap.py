@@ -0,0 +1,57 @@
+"""Integration tests for the worker bootstrap against fake API servers."""
+
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from tests.fixtures.fake_anthropic import fake_anthropic_server
+from tests.fixtures.fake_github import fake_github_server
+from troller.worker.bootstrap import WorkerBootstrap
+
+
+class TestWorkerBootstrapAgainstFakeServers:
+    """Test suite for WorkerBootstrap over real HTTP."""
+
+    def test_prewarm_reaches_both_apis(self) -> None:
+        """Each client opens a connection before its first real call."""
+        with fake_anthropic_server() as anthropic, fake_github_server() as github:
+            env = {
+                "ANTHROPIC_API_KEY": "test-key",
+                "ANTHROPIC_BASE_URL": anthropic.url,
+                "GITHUB_TOKEN": "test-token",
+                "GITHUB_API_URL": github.url,
+            }
+            with patch.dict(os.environ, env):
+                bootstrap = WorkerBootstrap()
+                assert bootstrap.wait_warm(10)
+                issue = bootstrap.github_client().get_issue("owner", "repo", 3)
+
+        timings = bootstrap.timings()
+        assert timings.prewarm_errors == {}
+        assert set(timings.prewarm) == {"claude", "github"}
+        assert issue.title == "Issue 3"
+        # The rate-limit read, then the repository and issue.
+        assert github.requests == 3
+
+    async def test_run_prewarms_async_client(self) -> None:
+        """The async client's connection is opened on the worker's loop."""
+        worker = MagicMock()
+        worker.run = AsyncMock()
+        with fake_anthropic_server() as anthropic, fake_github_server() as github:
+            env = {
+                "ANTHROPIC_API_KEY": "test-key",
+                "ANTHROPIC_BASE_URL": anthropic.url,
+                "GITHUB_TOKEN": "test-token",
+                "GITHUB_API_URL": github.url,
+            }
+            with patch.dict(os.environ, env):
+                bootstrap = WorkerBootstrap()
+                bootstrap.start_prewarm()
+                await bootstrap.run(worker, prewarm_timeout_seconds=10)
+                plan = await bootstrap.async_claude_client().generate_plan(
+                    "Title", "Body", 2
+                )
+
+        timings = bootstrap.timings()
+        assert timings.prewarm_errors == {}
+        assert set(timings.prewarm) == {"claude", "github", "async_claude"}
+        assert plan.summary == "Plan for issue #2"
@@ -0,0 +1,190 @@
+"""Integration tests for ClaudeClient against a fake Anthropic server."""
+
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.fixtures.fake_anthropic import FakeAnthropicConfig, fake_anthropic_server
+from troller.domain.models.plan import Plan
+from troller.worker.adapters.claude_client import (
+    AsyncClaudeClient,
+    ClaudeClient,
+    PlanBatchError,
+    PlanningRequest,
+)
+from troller.worker.adapters.concurrency import ConcurrencyLimiter
+from troller.worker.adapters.hedging import HedgePolicy, Hedger, HedgeStats
+from troller.worker.adapters.instrumentation import InMemoryCallSink
+from troller.worker.adapters.plan_cache import PlanCache
+from troller.worker.adapters.plan_stream import StreamedPlan, StreamedStep
+
+
+def _requests(*issue_numbers: int) -> list[PlanningRequest]:
+    return [
+        PlanningRequest(f"Issue {n}", f"Body of issue {n}", n) for n in issue_numbers
+    ]
+
+
+class TestClaudeClientBatch:
+    """Test suite for ClaudeClient batch planning."""
+
+    def test_generate_plans_batch_maps_results_to_issues(self) -> None:
+        """Each issue gets its own Plan, or a PlanBatchError if it failed."""
+        config = FakeAnthropicConfig(
+            batch_polls_until_ended=3, failing_issue_numbers=frozenset({12})
+        )
+        with fake_anthropic_server(config) as server:
+            env = {"ANTHROPIC_API_KEY": "test-key", "ANTHROPIC_BASE_URL": server.url}
+            with patch.dict(os.environ, env):
+                client = ClaudeClient()
+                sleeps: list[float] = []
+                results = client.generate_plans_batch(
+                    _requests(11, 12, 13),
+                    poll_interval_seconds=5,
+                    sleep=sleeps.append,
+                )
+
+        assert sorted(results) == [11, 12, 13]
+        plan = results[11]
+        assert isinstance(plan, Plan)
+        assert plan.summary == "Plan for issue #11"
+        assert plan.metadata["issue_number"] == 11
+        assert results[12] == PlanBatchError(
+            12, "invalid_request_error", "prompt is too long"
+        )
+        assert sleeps == [5, 5]
+        assert server.message_calls == 0
+
+    def test_generate_plans_batch_isolates_unusable_results(self) -> None:
+        """A succeeded result without a plan fails its issue, not the batch."""
+        config = FakeAnthropicConfig(malformed_issue_numbers=frozenset({22}))
+        with fake_anthropic_server(config) as server:
+            env = {"ANTHROPIC_API_KEY": "test-key", "ANTHROPIC_BASE_URL": server.url}
+            with patch.dict(os.environ, env):
+                client = ClaudeClient(plan_cache=PlanCache())
+                results = client.generate_plans_batch(
+                    _requests(21, 22, 23), sleep=lambda _: None
+                )
+
+        assert isinstance(results[21], Plan)
+        assert isinstance(results[23], Plan)
+        error = results[22]
+        assert isinstance(error, PlanBatchError)
+        assert error.error_type == "invalid_output"
+        assert "StopIteration" in error.message
+
+    def test_generate_plans_batch_skips_cached_issues(self) -> None:
+        """Cached issues are not resubmitted; fresh results are cached."""
+        with fake_anthropic_server() as server:
+            env = {"ANTHROPIC_API_KEY": "test-key", "ANTHROPIC_BASE_URL": server.url}
+            with patch.dict(os.environ, env):
+                client = ClaudeClient(plan_cache=PlanCache())
+                client.generate_plans_batch(_requests(1, 2), sleep=lambda _: None)
+                results = client.generate_plans_batch(
+                    _requests(1, 2, 3), sleep=lambda _: None
+                )
+
+        assert sorted(results) == [1, 2, 3]
+        assert [len(batch.requests) for batch in server.batches.values()] == [2, 1]
+
+    def test_generate_plans_batch_times_out(self) -> None:
+        """A batch that never ends raises TimeoutError."""
+        config = FakeAnthropicConfig(batch_polls_until_ended=1_000)
+        with fake_anthropic_server(config) as server:
+            env = {"ANTHROPIC_API_KEY": "test-key", "ANTHROPIC_BASE_URL": server.url}
+            with patch.dict(os.environ, env):
+                client = ClaudeClient()
+                with pytest.raises(TimeoutError):
+                    client.generate_plans_batch(
+                        _requests(1), timeout_seconds=0, sleep=lambda _: None
+                    )
+
+    def test_submit_plan_batch_rejects_duplicate_issues(self) -> None:
+        """Issue numbers double as batch custom IDs and must be unique."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            client = ClaudeClient()
+            with pytest.raises(ValueError, match="unique"):
+                client.submit_plan_batch(_requests(1, 1))
+
+
+class TestClaudeClientStreaming:
+    """Test suite for ClaudeClient streaming over real SSE."""
+
+    def test_stream_plan_parses_server_sent_events(self) -> None:
+        """stream_plan yields every step before the final plan."""
+        config = FakeAnthropicConfig(plan_steps=5, step_padding=100)
+        with fake_anthropic_server(config) as server:
+            env = {"ANTHROPIC_API_KEY": "test-key", "ANTHROPIC_BASE_URL": server.url}
+            with patch.dict(os.environ, env):
+                events = list(ClaudeClient().stream_plan("Title", "Body", 4))
+
+        steps = [event.step for event in events if isinstance(event, StreamedStep)]
+        assert [step.id for step in steps] == [f"step-{i}" for i in range(1, 6)]
+        final = events[-1]
+        assert isinstance(final, StreamedPlan)
+        assert final.plan.steps == steps
+        assert final.plan.metadata["usage"]["output_tokens"] > 0
+        call = final.plan.metadata["call"]
+        assert 0 < call["time_to_first_token_seconds"] <= call["wall_seconds"]
+
+
+# Five fast calls teach the hedger the latency distribution; the sixth call
+# stalls on the server and should be rescued by a hedge (the seventh call).
+_HEDGE_POLICY = HedgePolicy(min_samples=5, max_hedge_ratio=1.0)
+_STALLING_SERVER = FakeAnthropicConfig(
+    latency_seconds=0.01, slow_calls=frozenset({6}), slow_latency_seconds=1.0
+)
+
+
+class TestClaudeClientHedging:
+    """Test suite for hedged planning calls."""
+
+    def test_generate_plan_hedges_a_stalled_call(self) -> None:
+        """A stalled call is answered by the hedge instead of waiting."""
+        with fake_anthropic_server(_STALLING_SERVER) as server:
+            env = {"ANTHROPIC_API_KEY": "test-key", "ANTHROPIC_BASE_URL": server.url}
+            with patch.dict(os.environ, env):
+                hedger = Hedger(_HEDGE_POLICY)
+                sink = InMemoryCallSink()
+                client = ClaudeClient(hedger=hedger, sink=sink)
+                for number in range(1, 6):
+                    client.generate_plan("Title", "Body", number)
+
+                started = time.perf_counter()
+                plan = client.generate_plan("Title", "Body", 6)
+                elapsed = time.perf_counter() - started
+                # The stalled request finishes in the background.
+                deadline = time.monotonic() + 5
+                while len(sink.records) < 7 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+
+        assert plan.summary == "Plan for issue #6"
+        assert elapsed < 0.5
+        assert server.message_calls == 7
+        discarded = sink.records[-1]
+        assert discarded.operation == "generate_plan_discarded"
+        assert (discarded.issue_number, discarded.output_tokens > 0) == (6, True)
+        assert hedger.stats() == HedgeStats(calls=6, fired=1, won=1, over_budget=0)
+
+    async def test_async_generate_plan_hedges_a_stalled_call(self) -> None:
+        """The async client hedges too and cancels the stalled request."""
+        with fake_anthropic_server(_STALLING_SERVER) as server:
+            env = {"ANTHROPIC_API_KEY": "test-key", "ANTHROPIC_BASE_URL": server.url}
+            with patch.dict(os.environ, env):
+                hedger = Hedger(_HEDGE_POLICY)
+                limiter = ConcurrencyLimiter(4)
+                client = AsyncClaudeClient(limiter=limiter, hedger=hedger)
+                for number in range(1, 6):
+                    await client.generate_plan("Title", "Body", number)
+
+                started = time.perf_counter()
+                plan = await client.generate_plan("Title", "Body", 6)
+                elapsed = time.perf_counter() - started
+
+        assert plan.summary == "Plan for issue #6"
+        assert elapsed < 0.5
+        assert hedger.stats() == HedgeStats(calls=6, fired=1, won=1, over_budget=0)
+        # The hedge held a concurrency slot of its own.
+        assert limiter.stats().total_acquired == 7
@@ -0,0 +1,148 @@
+"""Integration tests for GitHubClient against a fake GitHub server."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from github import GithubException
+
+from tests.fixtures.actions_logs import failed_test_run, matrix_failure_run
+from tests.fixtures.fake_github import HEAD_SHA, FakeGitHubConfig, fake_github_server
+from troller.domain.models.ci import CommitChecks
+from troller.worker.adapters.ci_poller import CIPoller, PollPolicy
+from troller.worker.adapters.github_client import GitHubClient
+
+
+class TestGitHubClientAgainstFakeServer:
+    """Test suite for GitHubClient over real HTTP."""
+
+    def test_get_issue_reads_rest_issue(self) -> None:
+        """get_issue goes through the repository handle to the issue."""
+        with fake_github_server() as server:
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                issue = GitHubClient().get_issue("owner", "repo", 12)
+
+                assert issue.title == "Issue 12"
+
+    def test_get_issue_snapshots_follow_comment_and_label_pages(self) -> None:
+        """Snapshots include every comment and label, beyond the first page."""
+        config = FakeGitHubConfig(
+            comments_per_issue=150, labels_per_issue=120, body_padding=10
+        )
+        with fake_github_server(config) as server:
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                snapshots = GitHubClient().get_issue_snapshots("owner", "repo", [1, 2])
+
+        assert [len(snapshots[n].comments) for n in (1, 2)] == [150, 150]
+        assert [len(snapshots[n].labels) for n in (1, 2)] == [120, 120]
+        assert snapshots[2].latest_commit_sha == HEAD_SHA
+        # One batched query plus one extra comments and labels page per issue.
+        assert server.requests == 5
+
+    def test_polled_status_is_revalidated(self) -> None:
+        """Repeated status reads are answered with 304 Not Modified."""
+        with fake_github_server() as server:
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                client = GitHubClient()
+                first = client.get_combined_status("owner", "repo", HEAD_SHA)
+                second = client.get_combined_status("owner", "repo", HEAD_SHA)
+
+        assert first == second
+        assert first["state"] == "success"
+        assert server.not_modified == 1
+
+
+class TestCIPollerAgainstFakeServer:
+    """Test suite for the shared CI/CD poller over real HTTP."""
+
+    async def test_poller_delivers_results_once_checks_complete(self) -> None:
+        """Workflows hear about their commit only after CI finishes."""
+        pending_sha, done_sha = "a" * 40, "b" * 40
+        deliveries: list[tuple[str, CommitChecks]] = []
+
+        async def on_complete(workflow_id: str, checks: CommitChecks) -> None:
+            deliveries.append((workflow_id, checks))
+
+        policy = PollPolicy(active_interval_seconds=0, max_interval_seconds=0)
+        with fake_github_server() as server:
+            server.commit_states[pending_sha] = "PENDING"
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                poller = CIPoller(GitHubClient(), on_complete, policy)
+                poller.register("owner", "repo", pending_sha, "wf-pending")
+                poller.register("owner", "repo", done_sha, "wf-done")
+
+                await poller.poll_due()
+                server.commit_states[pending_sha] = "FAILURE"
+                await poller.poll_due()
+
+        assert [(wf, checks.state) for wf, checks in deliveries] == [
+            ("wf-done", "SUCCESS"),
+            ("wf-pending", "FAILURE"),
+        ]
+        assert server.requests == 2
+
+
+class TestFailureDigestAgainstFakeServer:
+    """Test suite for streamed CI log extraction over real HTTP."""
+
+    def test_get_failure_digest_streams_redirected_archive(self) -> None:
+        """Logs are fetched through the blob redirect and digested."""
+        with fake_github_server() as server:
+            server.workflow_runs[42] = failed_test_run(noise_lines=20_000)
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                digest = GitHubClient().get_failure_digest(
+                    "owner", "repo", 42, tail_lines=2
+                )
+
+        (failure,) = digest.failures
+        assert failure.step == "Run pytest"
+        assert failure.tail[-1] == "##[error]Process completed with exit code 1."
+        assert [match.signature for match in failure.matches] == [
+            "pytest_failure",
+            "assertion_error",
+        ]
+
+    def test_get_failure_digest_reads_every_page_of_jobs(self) -> None:
+        """A failed job past the first page of a large matrix is reported."""
+        with fake_github_server() as server:
+            server.workflow_runs[45] = matrix_failure_run(job_count=150)
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                digest = GitHubClient().get_failure_digest("owner", "repo", 45)
+
+        (failure,) = digest.failures
+        assert (failure.job, failure.step) == ("test (149)", "Run pytest")
+        # Two pages of jobs, then the archive and its blob redirect.
+        assert server.requests == 4
+
+    def test_failed_log_download_raises_github_exception(self) -> None:
+        """An error status on the log archive surfaces as GithubException."""
+        with fake_github_server() as server:
+            server.workflow_runs[44] = failed_test_run()
+            server.expired_logs.add(44)
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                with pytest.raises(GithubException) as raised:
+                    GitHubClient().get_failure_digest("owner", "repo", 44)
+
+        assert raised.value.status == 410
+        assert raised.value.data == {"message": "Gone"}
+
+    def test_successful_run_skips_log_download(self) -> None:
+        """Without failed jobs, only the jobs listing is requested."""
+        run = failed_test_run()
+        for job in run.jobs["jobs"]:
+            job["conclusion"] = "success"
+        with fake_github_server() as server:
+            server.workflow_runs[43] = run
+            env = {"GITHUB_TOKEN": "test-token", "GITHUB_API_URL": server.url}
+            with patch.dict(os.environ, env):
+                digest = GitHubClient().get_failure_digest("owner", "repo", 43)
+
+        assert digest.failures == ()
+        assert server.requests == 1
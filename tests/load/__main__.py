@@ -0,0 +1,5 @@
+"""Entry point for python -m tests.load."""
+
+from tests.load.simulation import main
+
+main()
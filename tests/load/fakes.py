@@ -0,0 +1,170 @@
+"""Latency-modelled local fakes of the planning and CI adapters.
+
+The fakes run as Temporal activities in place of the Claude and GitHub
+adapters. Each call sleeps for a latency drawn from a log-normal model of the
+real service, scaled down so thousands of workflows finish in seconds, and
+answers deterministically for a given seed so retried activities and repeated
+runs agree.
+"""
+
+import asyncio
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Literal
+
+from temporalio import activity
+
+# 99th percentile of the standard normal distribution.
+_Z_99 = 2.326
+
+CIState = Literal["pending", "success", "failure"]
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Log-normal service latency given by its median and 99th percentile.
+
+    Attributes:
+        median_seconds: Median latency.
+        p99_seconds: 99th percentile latency; equal to the median for a
+            constant latency.
+    """
+
+    median_seconds: float
+    p99_seconds: float
+
+    def __post_init__(self) -> None:
+        """Validate the model.
+
+        Raises:
+            ValueError: If the median is negative or above the 99th
+                percentile.
+        """
+        if self.median_seconds < 0:
+            raise ValueError("median_seconds must not be negative")
+        if self.p99_seconds < self.median_seconds:
+            raise ValueError("p99_seconds must not be below median_seconds")
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        if self.median_seconds == 0 or self.p99_seconds == self.median_seconds:
+            return self.median_seconds
+        sigma = math.log(self.p99_seconds / self.median_seconds) / _Z_99
+        return self.median_seconds * math.exp(rng.gauss(0.0, sigma))
+
+
+@dataclass(frozen=True)
+class ServiceProfile:
+    """How the faked services behave.
+
+    Attributes:
+        planning: Latency of a Claude planning call.
+        replanning: Latency of a Claude re-planning call.
+        ci_poll: Latency of a GitHub commit status read.
+        ci_polls_until_done: Inclusive range of polls before a CI run
+            finishes.
+        ci_failure_rate: Fraction of CI runs that fail and trigger a re-plan.
+        time_scale: Real seconds slept per modelled second of latency.
+    """
+
+    planning: LatencyModel = field(default_factory=lambda: LatencyModel(20.0, 90.0))
+    replanning: LatencyModel = field(default_factory=lambda: LatencyModel(8.0, 40.0))
+    ci_poll: LatencyModel = field(default_factory=lambda: LatencyModel(0.3, 2.0))
+    ci_polls_until_done: tuple[int, int] = (2, 12)
+    ci_failure_rate: float = 0.3
+    time_scale: float = 0.001
+
+
+@dataclass(frozen=True)
+class PlanRequest:
+    """Input of the planning fakes.
+
+    Attributes:
+        issue_number: Issue being planned.
+        revision: Plan revision to produce, starting at 1.
+    """
+
+    issue_number: int
+    revision: int
+
+
+@dataclass(frozen=True)
+class PlanResult:
+    """Output of the planning fakes.
+
+    Attributes:
+        steps: Steps in the plan.
+    """
+
+    steps: int
+
+
+@dataclass(frozen=True)
+class CIPoll:
+    """Input of the CI polling fake.
+
+    Attributes:
+        issue_number: Issue whose pull request is being checked.
+        round: CI run for the issue, starting at 0.
+        poll: Polls already made for this CI run.
+    """
+
+    issue_number: int
+    round: int
+    poll: int
+
+
+class SimulatedServices:
+    """Activities standing in for the planning and CI adapters.
+
+    Also records, per activity type, how long each activity task waited in
+    the task queue before a worker picked it up.
+    """
+
+    def __init__(self, profile: ServiceProfile, seed: int = 0) -> None:
+        """Initialize the fakes.
+
+        Args:
+            profile: Latencies and outcomes of the faked services.
+            seed: Seed for latencies and outcomes.
+        """
+        self._profile = profile
+        self._seed = seed
+        self._rng = random.Random(seed)
+        self.queue_latency: dict[str, list[float]] = {}
+
+    @activity.defn(name="plan_issue")
+    async def plan_issue(self, request: PlanRequest) -> PlanResult:
+        """Fake the initial planning call."""
+        await self._serve(self._profile.planning)
+        rng = self._outcome_rng("plan", request.issue_number, request.revision)
+        return PlanResult(steps=rng.randint(3, 8))
+
+    @activity.defn(name="replan_issue")
+    async def replan_issue(self, request: PlanRequest) -> PlanResult:
+        """Fake a re-planning call after a CI failure."""
+        await self._serve(self._profile.replanning)
+        rng = self._outcome_rng("plan", request.issue_number, request.revision)
+        return PlanResult(steps=rng.randint(3, 8))
+
+    @activity.defn(name="check_ci")
+    async def check_ci(self, poll: CIPoll) -> CIState:
+        """Fake one read of the pull request's CI status."""
+        await self._serve(self._profile.ci_poll)
+        rng = self._outcome_rng("ci", poll.issue_number, poll.round)
+        if poll.poll + 1 < rng.randint(*self._profile.ci_polls_until_done):
+            return "pending"
+        return "failure" if rng.random() < self._profile.ci_failure_rate else "success"
+
+    async def _serve(self, latency: LatencyModel) -> None:
+        info = activity.info()
+        # Both timestamps come from the server, so they share its clock.
+        waited = info.started_time - info.current_attempt_scheduled_time
+        self.queue_latency.setdefault(info.activity_type, []).append(
+            max(0.0, waited.total_seconds())
+        )
+        await asyncio.sleep(latency.sample(self._rng) * self._profile.time_scale)
+
+    def _outcome_rng(self, *key: object) -> random.Random:
+        return random.Random(":".join(map(str, (self._seed, *key))))
@@ -0,0 +1,350 @@
+"""Load simulation of issue workflows on Temporal's time-skipping test server.
+
+Drives many SyntheticIssueWorkflow instances at once through planning, CI
+polling and continue-as-new on a local worker, with the Claude and GitHub
+adapters replaced by the latency-modelled fakes in tests.load.fakes. Timers
+are skipped, so a week of CI polling per issue finishes in seconds, while
+activity latencies are slept for real (scaled) so the worker does realistic
+work. Reports worker CPU and memory, history size per workflow run and
+activity queue latency as JSON.
+
+The time-skipping server is downloaded on first use, so the first run needs
+network access.
+
+Usage:
+    python -m tests.load --workflows 2000 --concurrency 200 --output out.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Self
+
+from temporalio.client import Client, WorkflowFailureError, WorkflowHandle
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from tests.benchmarks.harness import percentile
+from tests.load.fakes import ServiceProfile, SimulatedServices
+from tests.load.workflows import IssueOutcome, IssueRun, SyntheticIssueWorkflow
+
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """Parameters of a simulation run.
+
+    Attributes:
+        workflows: Synthetic issues to resolve.
+        concurrency: Workflows running at once.
+        max_rounds: CI runs per issue before it is abandoned.
+        polls_per_run: CI polls after which a workflow continues as new.
+        poll_interval_seconds: Simulated time between CI polls.
+        max_concurrent_activities: Worker activity slots.
+        max_concurrent_workflow_tasks: Worker workflow task slots.
+        history_sample: Workflows whose histories are fetched and measured.
+        seed: Seed for latencies and outcomes.
+        profile: Latencies and outcomes of the faked services.
+        task_queue: Task queue the worker polls.
+    """
+
+    workflows: int = 1000
+    concurrency: int = 150
+    max_rounds: int = 4
+    polls_per_run: int = 10
+    poll_interval_seconds: float = 300.0
+    max_concurrent_activities: int = 100
+    max_concurrent_workflow_tasks: int = 100
+    history_sample: int = 100
+    seed: int = 0
+    profile: ServiceProfile = field(default_factory=ServiceProfile)
+    task_queue: str = "troller-load-simulation"
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """Nearest-rank summary of a set of measurements.
+
+    Attributes:
+        count: Measurements taken.
+        p50: Median.
+        p95: 95th percentile.
+        p99: 99th percentile.
+        max: Largest measurement.
+    """
+
+    count: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def of(cls, values: Sequence[float]) -> Self:
+        """Summarize values; all fields are 0 when there are none."""
+        ordered = sorted(values)
+        return cls(
+            count=len(ordered),
+            p50=percentile(ordered, 0.50),
+            p95=percentile(ordered, 0.95),
+            p99=percentile(ordered, 0.99),
+            max=ordered[-1] if ordered else 0.0,
+        )
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Measurements of one simulation run.
+
+    Attributes:
+        workflows: Workflows started.
+        succeeded: Workflows whose CI eventually passed.
+        abandoned: Workflows that ran out of CI rounds.
+        failed: Workflows that failed outright.
+        runs: Workflow runs, continue-as-new included.
+        activities: Activities executed, by activity type.
+        wall_seconds: Real time the run took.
+        simulated_seconds: Time that passed on the server's clock.
+        cpu_seconds: CPU time of the worker process (worker and client).
+        cpu_utilisation: cpu_seconds over wall_seconds; 1.0 is one core.
+        peak_rss_mib: Peak resident memory of the worker process.
+        peak_rss_growth_mib: How much the peak grew during the run.
+        history_events: Events per workflow run, over the sampled workflows.
+        history_bytes: Serialized history bytes per workflow run.
+        queue_latency_seconds: Time activity tasks waited in the task queue
+            before a worker started them, by activity type.
+    """
+
+    workflows: int
+    succeeded: int
+    abandoned: int
+    failed: int
+    runs: int
+    activities: dict[str, int]
+    wall_seconds: float
+    simulated_seconds: float
+    cpu_seconds: float
+    cpu_utilisation: float
+    peak_rss_mib: float
+    peak_rss_growth_mib: float
+    history_events: Distribution
+    history_bytes: Distribution
+    queue_latency_seconds: dict[str, Distribution]
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_simulation(
+    config: SimulationConfig, env: WorkflowEnvironment | None = None
+) -> SimulationResult:
+    """Run the simulation on a local worker.
+
+    Args:
+        config: Simulation parameters.
+        env: Time-skipping environment to use, or None to start one for
+            this run.
+
+    Returns:
+        Measurements of the run.
+    """
+    if env is None:
+        async with await WorkflowEnvironment.start_time_skipping() as started:
+            return await run_simulation(config, started)
+
+    services = SimulatedServices(config.profile, config.seed)
+    slots = asyncio.Semaphore(config.concurrency)
+
+    async def resolve(
+        issue_number: int,
+    ) -> tuple[WorkflowHandle[Any, IssueOutcome], IssueOutcome | None]:
+        async with slots:
+            handle = await env.client.start_workflow(
+                SyntheticIssueWorkflow.run,
+                IssueRun(
+                    issue_number=issue_number,
+                    max_rounds=config.max_rounds,
+                    polls_per_run=config.polls_per_run,
+                    poll_interval_seconds=config.poll_interval_seconds,
+                ),
+                id=f"load-issue-{config.seed}-{issue_number}",
+                task_queue=config.task_queue,
+            )
+            try:
+                return handle, await handle.result()
+            except WorkflowFailureError:
+                return handle, None
+
+    rss_before = _peak_rss_mib()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    simulated_before = await env.get_current_time()
+    async with Worker(
+        env.client,
+        task_queue=config.task_queue,
+        workflows=[SyntheticIssueWorkflow],
+        activities=[
+            services.plan_issue,
+            services.replan_issue,
+            services.check_ci,
+        ],
+        max_concurrent_activities=config.max_concurrent_activities,
+        max_concurrent_workflow_tasks=config.max_concurrent_workflow_tasks,
+    ):
+        finished = await asyncio.gather(
+            *(resolve(number) for number in range(1, config.workflows + 1))
+        )
+    wall_seconds = time.perf_counter() - wall_before
+    cpu_seconds = time.process_time() - cpu_before
+    simulated = await env.get_current_time() - simulated_before
+    rss_after = _peak_rss_mib()
+
+    outcomes = [outcome for _, outcome in finished if outcome is not None]
+    events: list[float] = []
+    sizes: list[float] = []
+    for handle, _ in finished[: config.history_sample]:
+        for run_events, run_bytes in await _history_sizes(env.client, handle):
+            events.append(run_events)
+            sizes.append(run_bytes)
+
+    return SimulationResult(
+        workflows=config.workflows,
+        succeeded=sum(outcome.state == "success" for outcome in outcomes),
+        abandoned=sum(outcome.state == "abandoned" for outcome in outcomes),
+        failed=config.workflows - len(outcomes),
+        runs=sum(outcome.runs for outcome in outcomes),
+        activities={
+            name: len(latencies)
+            for name, latencies in sorted(services.queue_latency.items())
+        },
+        wall_seconds=wall_seconds,
+        simulated_seconds=simulated.total_seconds(),
+        cpu_seconds=cpu_seconds,
+        cpu_utilisation=cpu_seconds / wall_seconds if wall_seconds else 0.0,
+        peak_rss_mib=rss_after,
+        peak_rss_growth_mib=rss_after - rss_before,
+        history_events=Distribution.of(events),
+        history_bytes=Distribution.of(sizes),
+        queue_latency_seconds={
+            name: Distribution.of(latencies)
+            for name, latencies in sorted(services.queue_latency.items())
+        },
+    )
+
+
+async def _history_sizes(
+    client: Client, handle: WorkflowHandle[Any, Any]
+) -> list[tuple[int, int]]:
+    """Event count and serialized size of every run of a workflow."""
+    sizes: list[tuple[int, int]] = []
+    run_id: str | None = handle.first_execution_run_id or handle.run_id
+    while run_id:
+        history = await client.get_workflow_handle(
+            handle.id, run_id=run_id
+        ).fetch_history()
+        sizes.append(
+            (len(history.events), sum(event.ByteSize() for event in history.events))
+        )
+        last = history.events[-1] if history.events else None
+        run_id = None
+        if last is not None and last.HasField(
+            "workflow_execution_continued_as_new_event_attributes"
+        ):
+            attributes = last.workflow_execution_continued_as_new_event_attributes
+            run_id = attributes.new_execution_run_id
+    return sizes
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def report(config: SimulationConfig, result: SimulationResult) -> dict[str, Any]:
+    """Build the machine-readable report for a run."""
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": asdict(config),
+        "result": asdict(result),
+    }
+
+
+def _parse_args(argv: Sequence[str] | None) -> tuple[SimulationConfig, str | None]:
+    defaults = SimulationConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workflows", type=int, default=defaults.workflows)
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency)
+    parser.add_argument("--max-rounds", type=int, default=defaults.max_rounds)
+    parser.add_argument("--polls-per-run", type=int, default=defaults.polls_per_run)
+    parser.add_argument(
+        "--poll-interval", type=float, default=defaults.poll_interval_seconds
+    )
+    parser.add_argument(
+        "--max-activities", type=int, default=defaults.max_concurrent_activities
+    )
+    parser.add_argument(
+        "--max-workflow-tasks",
+        type=int,
+        default=defaults.max_concurrent_workflow_tasks,
+    )
+    parser.add_argument("--history-sample", type=int, default=defaults.history_sample)
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=defaults.profile.time_scale,
+        help="real seconds slept per modelled second of service latency",
+    )
+    parser.add_argument(
+        "--ci-failure-rate", type=float, default=defaults.profile.ci_failure_rate
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+    config = SimulationConfig(
+        workflows=args.workflows,
+        concurrency=args.concurrency,
+        max_rounds=args.max_rounds,
+        polls_per_run=args.polls_per_run,
+        poll_interval_seconds=args.poll_interval,
+        max_concurrent_activities=args.max_activities,
+        max_concurrent_workflow_tasks=args.max_workflow_tasks,
+        history_sample=args.history_sample,
+        seed=args.seed,
+        profile=replace(
+            defaults.profile,
+            time_scale=args.time_scale,
+            ci_failure_rate=args.ci_failure_rate,
+        ),
+    )
+    return config, args.output
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the simulation from the command line and emit the JSON report."""
+    config, output = _parse_args(argv)
+    result = asyncio.run(run_simulation(config))
+    document = json.dumps(report(config, result), indent=2)
+    if output is None:
+        print(document)
+    else:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(document + "\n")
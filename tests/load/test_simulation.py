@@ -0,0 +1,118 @@
+"""Smoke test keeping the load simulation runnable."""
+
+import json
+import random
+from dataclasses import replace
+from datetime import timedelta
+
+import pytest
+from temporalio.testing import ActivityEnvironment, WorkflowEnvironment
+
+from tests.load.fakes import (
+    CIPoll,
+    LatencyModel,
+    PlanRequest,
+    ServiceProfile,
+    SimulatedServices,
+)
+from tests.load.simulation import (
+    Distribution,
+    SimulationConfig,
+    report,
+    run_simulation,
+)
+
+INSTANT = ServiceProfile(time_scale=0.0)
+
+
+def _activity_environment(
+    activity_type: str, waited_seconds: float
+) -> ActivityEnvironment:
+    env = ActivityEnvironment()
+    env.info = replace(
+        env.info,
+        activity_type=activity_type,
+        started_time=env.info.current_attempt_scheduled_time
+        + timedelta(seconds=waited_seconds),
+    )
+    return env
+
+
+class TestFakes:
+    """Test suite for the latency-modelled fakes."""
+
+    def test_latency_model_matches_median_and_tail(self) -> None:
+        """Samples have the configured median and 99th percentile."""
+        model = LatencyModel(median_seconds=2.0, p99_seconds=10.0)
+        rng = random.Random(1)
+
+        samples = sorted(model.sample(rng) for _ in range(20_000))
+
+        assert samples[10_000] == pytest.approx(2.0, rel=0.05)
+        assert samples[19_800] == pytest.approx(10.0, rel=0.1)
+        assert LatencyModel(0.5, 0.5).sample(rng) == 0.5
+
+    def test_latency_model_rejects_inverted_tail(self) -> None:
+        """A 99th percentile below the median is a configuration error."""
+        with pytest.raises(ValueError, match="p99_seconds"):
+            LatencyModel(median_seconds=2.0, p99_seconds=1.0)
+
+    async def test_check_ci_finishes_within_configured_polls(self) -> None:
+        """A CI run stays pending, then settles on one outcome per seed."""
+        services = SimulatedServices(replace(INSTANT, ci_polls_until_done=(3, 3)))
+        env = _activity_environment("check_ci", 0.25)
+
+        states = [
+            await env.run(services.check_ci, CIPoll(7, 0, poll)) for poll in range(4)
+        ]
+
+        assert states[:2] == ["pending", "pending"]
+        assert states[2] in ("success", "failure")
+        assert states[3] == states[2]
+        assert services.queue_latency == {"check_ci": [0.25] * 4}
+
+    async def test_outcomes_depend_only_on_seed_and_inputs(self) -> None:
+        """Retried activities and repeated runs see the same answers."""
+        env = _activity_environment("plan_issue", 0.0)
+        request = PlanRequest(issue_number=3, revision=1)
+
+        first = await env.run(SimulatedServices(INSTANT, seed=5).plan_issue, request)
+        second = await env.run(SimulatedServices(INSTANT, seed=5).plan_issue, request)
+
+        assert first == second
+        assert 3 <= first.steps <= 8
+
+
+def test_distribution_summarizes_with_nearest_rank() -> None:
+    """Percentiles are observed values; an empty set is all zeros."""
+    values = [float(n) for n in range(100, 0, -1)]
+
+    assert Distribution.of(values) == Distribution(100, 50.0, 95.0, 99.0, 100.0)
+    assert Distribution.of([]) == Distribution(0, 0.0, 0.0, 0.0, 0.0)
+
+
+async def test_small_simulation_produces_json_report() -> None:
+    """A tiny run plans, polls, continues as new and reports."""
+    try:
+        env = await WorkflowEnvironment.start_time_skipping()
+    except RuntimeError as error:
+        pytest.skip(f"time-skipping test server unavailable: {error}")
+    config = SimulationConfig(
+        workflows=12,
+        concurrency=6,
+        polls_per_run=2,
+        history_sample=4,
+        profile=INSTANT,
+    )
+
+    async with env:
+        result = await run_simulation(config, env)
+    document = json.loads(json.dumps(report(config, result)))
+
+    assert result.succeeded + result.abandoned == 12
+    assert result.failed == 0
+    assert result.runs > 12
+    assert result.activities["plan_issue"] == 12
+    assert result.history_events.count >= 4
+    assert result.simulated_seconds >= config.poll_interval_seconds
+    assert document["result"]["queue_latency_seconds"]["check_ci"]["count"] > 0
@@ -0,0 +1,128 @@
+"""Synthetic issue workflow driven by the load simulation.
+
+Models the lifecycle the real issue workflow is planned to have: plan the
+issue, then poll CI on a timer, re-plan after each failed CI run, and
+continue as new once a run has made enough polls to keep its history
+bounded. Timers are what time skipping fast-forwards, so simulated weeks of
+polling finish in seconds.
+"""
+
+import asyncio
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from typing import Literal
+
+from temporalio import workflow
+
+with workflow.unsafe.imports_passed_through():
+    from tests.load.fakes import CIPoll, PlanRequest, SimulatedServices
+
+ACTIVITY_TIMEOUT = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class IssueRun:
+    """State carried from one workflow run to the next.
+
+    Attributes:
+        issue_number: Issue being resolved.
+        max_rounds: CI runs to attempt before giving up.
+        polls_per_run: CI polls after which the workflow continues as new.
+        poll_interval_seconds: Simulated time between CI polls.
+        plan_revision: Latest plan revision; 0 before the issue is planned.
+        round: Current CI run, starting at 0.
+        poll: Polls already made for the current CI run.
+        runs: Workflow runs so far, including this one.
+    """
+
+    issue_number: int
+    max_rounds: int
+    polls_per_run: int
+    poll_interval_seconds: float
+    plan_revision: int = 0
+    round: int = 0
+    poll: int = 0
+    runs: int = 1
+
+
+@dataclass(frozen=True)
+class IssueOutcome:
+    """How a synthetic issue ended.
+
+    Attributes:
+        issue_number: Issue that was resolved.
+        state: 'success' if a CI run passed, 'abandoned' after max_rounds
+            failed runs.
+        rounds: CI runs attempted.
+        plan_revisions: Plans produced, the initial one included.
+        runs: Workflow runs used, continue-as-new included.
+    """
+
+    issue_number: int
+    state: Literal["success", "abandoned"]
+    rounds: int
+    plan_revisions: int
+    runs: int
+
+
+@workflow.defn
+class SyntheticIssueWorkflow:
+    """Plans an issue, then polls CI until it passes or rounds run out."""
+
+    @workflow.run
+    async def run(self, state: IssueRun) -> IssueOutcome:
+        """Resolve the issue, continuing as new every polls_per_run polls."""
+        if state.plan_revision == 0:
+            await workflow.execute_activity_method(
+                SimulatedServices.plan_issue,
+                PlanRequest(state.issue_number, 1),
+                start_to_close_timeout=ACTIVITY_TIMEOUT,
+            )
+            state = replace(state, plan_revision=1)
+
+        polls = 0
+        while state.round < state.max_rounds:
+            if (
+                polls >= state.polls_per_run
+                or workflow.info().is_continue_as_new_suggested()
+            ):
+                workflow.continue_as_new(replace(state, runs=state.runs + 1))
+
+            await asyncio.sleep(state.poll_interval_seconds)
+            ci_state = await workflow.execute_activity_method(
+                SimulatedServices.check_ci,
+                CIPoll(state.issue_number, state.round, state.poll),
+                start_to_close_timeout=ACTIVITY_TIMEOUT,
+            )
+            polls += 1
+            if ci_state == "pending":
+                state = replace(state, poll=state.poll + 1)
+                continue
+            if ci_state == "success":
+                return IssueOutcome(
+                    state.issue_number,
+                    "success",
+                    state.round + 1,
+                    state.plan_revision,
+                    state.runs,
+                )
+
+            await workflow.execute_activity_method(
+                SimulatedServices.replan_issue,
+                PlanRequest(state.issue_number, state.plan_revision + 1),
+                start_to_close_timeout=ACTIVITY_TIMEOUT,
+            )
+            state = replace(
+                state,
+                plan_revision=state.plan_revision + 1,
+                round=state.round + 1,
+                poll=0,
+            )
+
+        return IssueOutcome(
+            state.issue_number,
+            "abandoned",
+            state.round,
+            state.plan_revision,
+            state.runs,
+        )
@@ -0,0 +1,54 @@
+"""Unit tests for CommitChecks domain model."""
+
+from troller.domain.models.ci import (
+    CheckResult,
+    CommitChecks,
+    FailureDigest,
+    SignatureMatch,
+    StepFailure,
+)
+
+
+def _checks(state: str | None, *statuses: str) -> CommitChecks:
+    return CommitChecks(
+        owner="owner",
+        repo="repo",
+        sha="abc1234",
+        state=state,
+        checks=tuple(
+            CheckResult(f"check-{n}", s, None) for n, s in enumerate(statuses)
+        ),
+    )
+
+
+def test_pending_commit_with_queued_run_is_running() -> None:
+    checks = _checks("PENDING", "COMPLETED", "QUEUED")
+
+    assert checks.running
+    assert not checks.completed
+    assert not checks.succeeded
+
+
+def test_commit_without_reported_checks_is_idle() -> None:
+    checks = _checks(None)
+
+    assert not checks.running
+    assert not checks.completed
+
+
+def test_final_states_complete_the_commit() -> None:
+    assert _checks("SUCCESS", "COMPLETED").succeeded
+    failed = _checks("FAILURE", "COMPLETED")
+    assert failed.completed
+    assert not failed.succeeded
+
+
+def _digest(*categories: str) -> FailureDigest:
+    matches = tuple(SignatureMatch("sig", category, "line") for category in categories)
+    return FailureDigest(1, (StepFailure("test", "Run", ("line",), matches),))
+
+
+def test_digest_is_environment_only_when_every_match_is() -> None:
+    assert _digest("environment", "environment").environment_only
+    assert not _digest("environment", "code").environment_only
+    assert not _digest().environment_only
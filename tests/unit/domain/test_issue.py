@@ -0,0 +1,56 @@
+"""Unit tests for IssueSnapshot domain model."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from troller.domain.models.issue import IssueComment, IssueSnapshot, LinkedPullRequest
+
+
+def _snapshot() -> IssueSnapshot:
+    return IssueSnapshot(
+        owner="owner",
+        repo="repo",
+        number=7,
+        title="Crash on startup",
+        body="Steps to reproduce",
+        state="OPEN",
+        author="octocat",
+        labels=("bug",),
+        comments=(
+            IssueComment(
+                author="hubot",
+                body="Confirmed",
+                created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            ),
+        ),
+        linked_pull_requests=(
+            LinkedPullRequest(
+                number=8,
+                title="Fix crash",
+                state="OPEN",
+                head_ref="fix-crash",
+                head_sha="abc123",
+            ),
+        ),
+        latest_commit_sha="def456",
+    )
+
+
+def test_issue_snapshot_holds_issue_details() -> None:
+    """IssueSnapshot exposes every field it was created with."""
+    snapshot = _snapshot()
+
+    assert snapshot.title == "Crash on startup"
+    assert snapshot.labels == ("bug",)
+    assert snapshot.comments[0].author == "hubot"
+    assert snapshot.linked_pull_requests[0].head_sha == "abc123"
+
+
+def test_issue_snapshot_immutability() -> None:
+    """Verify IssueSnapshot instances are immutable and hashable."""
+    snapshot = _snapshot()
+
+    with pytest.raises(AttributeError):
+        snapshot.title = "Changed"  # type: ignore[misc]
+    assert hash(snapshot) == hash(_snapshot())
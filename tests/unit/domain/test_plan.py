@@ -1,10 +1,11 @@
 """Unit tests for Plan domain model."""
 
+import json
 from datetime import datetime, timezone
 
 import pytest
 
-from troller.domain.models.plan import Plan, PlanStep
+from troller.domain.models.plan import CompletionDelta, Plan, PlanStep
 
 
 def test_plan_step_creation_with_required_fields() -> None:
@@ -131,3 +132,73 @@ def test_plan_step_complexity_values() -> None:
             estimated_complexity=complexity,  # type: ignore[arg-type]
         )
         assert step.estimated_complexity == complexity
+
+
+def test_plan_round_trips_through_dict() -> None:
+    """Plan.from_dict restores a plan serialized with to_dict."""
+    plan = Plan(
+        summary="Implement user authentication",
+        steps=[
+            PlanStep(
+                id="step-1",
+                description="Set up database models",
+                completed=True,
+                related_files=["src/models/user.py"],
+                estimated_complexity="simple",
+            ),
+            PlanStep(id="step-2", description="Add login route", completed=False),
+        ],
+        created_at=datetime.now(timezone.utc),
+        metadata={"issue_number": 42},
+        technical_approach="JWT",
+    )
+
+    data = plan.to_dict()
+    restored = Plan.from_dict(json.loads(json.dumps(data)))
+
+    assert restored == plan
+
+
+def _three_step_plan(*completed: bool) -> Plan:
+    return Plan(
+        summary="Plan",
+        steps=[
+            PlanStep(id=f"step-{n}", description=f"Step {n}", completed=done)
+            for n, done in enumerate(completed, start=1)
+        ],
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        metadata={},
+    )
+
+
+def test_completion_delta_records_changed_steps() -> None:
+    """CompletionDelta.between sets one bit per step whose flag changed."""
+    before = _three_step_plan(False, True, False)
+    after = _three_step_plan(True, False, False)
+
+    delta = CompletionDelta.between(before, after)
+
+    assert delta == CompletionDelta(step_count=3, completed=0b001, reopened=0b010)
+    assert delta.apply(before) == after
+
+
+def test_completion_delta_is_idempotent() -> None:
+    """Applying the same delta twice, e.g. on a retry, changes nothing more."""
+    before = _three_step_plan(False, True, False)
+    after = _three_step_plan(True, False, False)
+    delta = CompletionDelta.between(before, after)
+
+    assert delta.apply(delta.apply(before)) == after
+    assert delta.apply(after) is after
+
+
+def test_completion_delta_rejects_mismatched_plans() -> None:
+    """Deltas only make sense between versions of the same plan."""
+    with pytest.raises(ValueError, match="same steps"):
+        CompletionDelta.between(
+            _three_step_plan(False, False, False), _three_step_plan(False, False)
+        )
+    with pytest.raises(ValueError, match="delta is for 2 steps"):
+        CompletionDelta(step_count=2, completed=1).apply(
+            _three_step_plan(False, False, False)
+        )
@@ -0,0 +1,136 @@
+"""Unit tests for PlanIndex."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from troller.domain.models.plan import CompletionDelta, Plan, PlanStep
+from troller.domain.models.plan_index import PlanIndex
+
+
+def _plan() -> Plan:
+    return Plan(
+        summary="Plan",
+        steps=[
+            PlanStep(
+                id="step-1",
+                description="Models",
+                completed=True,
+                related_files=["src/models.py"],
+            ),
+            PlanStep(
+                id="step-2",
+                description="Adapter",
+                completed=False,
+                related_files=["src/adapter.py", "src/models.py"],
+            ),
+            PlanStep(id="step-3", description="Docs", completed=False),
+            PlanStep(
+                id="step-4",
+                description="Tests",
+                completed=False,
+                related_files=["tests/test_adapter.py", "src/adapter.py"],
+            ),
+        ],
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        metadata={},
+    )
+
+
+def test_progress_counters() -> None:
+    """Counters reflect the plan's completion flags."""
+    index = PlanIndex.from_plan(_plan())
+
+    assert index.total == 4
+    assert index.completed_count == 1
+    assert index.pending_count == 3
+    assert index.percent_complete == 25.0
+
+
+def test_empty_plan_is_complete() -> None:
+    """A plan without steps has nothing pending."""
+    index = PlanIndex.from_plan(
+        Plan(summary="", steps=[], created_at=datetime.now(), metadata={})
+    )
+
+    assert index.percent_complete == 100.0
+    assert index.next_pending() is None
+
+
+def test_next_pending_skips_completed_steps() -> None:
+    """next_pending returns the first incomplete step in plan order."""
+    index = PlanIndex.from_plan(_plan())
+
+    first = index.next_pending()
+    assert first is not None and first.id == "step-2"
+
+    index = index.with_completed("step-2").with_completed("step-3")
+    last = index.next_pending()
+    assert last is not None and last.id == "step-4"
+    assert index.with_completed("step-4").next_pending() is None
+
+
+def test_file_queries_return_step_ids_in_plan_order() -> None:
+    """The inverted index maps related files to the steps touching them."""
+    index = PlanIndex.from_plan(_plan())
+
+    assert index.step_ids_for_file("src/models.py") == ("step-1", "step-2")
+    assert index.step_ids_for_file("README.md") == ()
+    assert index.step_ids_for_files(["tests/test_adapter.py", "src/models.py"]) == (
+        "step-1",
+        "step-2",
+        "step-4",
+    )
+
+
+def test_updates_leave_original_untouched() -> None:
+    """with_completed returns a new index and shares unchanged state."""
+    plan = _plan()
+    original = PlanIndex.from_plan(plan)
+
+    updated = original.with_completed("step-2").with_completed("step-1", False)
+
+    assert original.is_completed("step-1") and not original.is_completed("step-2")
+    assert updated.is_completed("step-2") and not updated.is_completed("step-1")
+    assert updated.step("step-2").completed is True
+    assert original.with_completed("step-1") is original
+    assert original.to_plan() is plan
+
+
+def test_to_plan_and_delta_round_trip() -> None:
+    """to_plan materializes updates and delta reproduces them on the base."""
+    plan = _plan()
+    updated = PlanIndex.from_plan(plan).with_completed("step-3")
+
+    new_plan = updated.to_plan()
+
+    assert [step.completed for step in new_plan.steps] == [True, False, True, False]
+    assert new_plan.steps[0] is plan.steps[0]
+    assert updated.delta() == CompletionDelta.between(plan, new_plan)
+    assert PlanIndex.from_plan(plan).apply(updated.delta()).to_plan() == new_plan
+
+
+def test_applying_a_delta_twice_is_idempotent() -> None:
+    """A replayed delta leaves the completion flags as one application did."""
+    plan = _plan()
+    delta = PlanIndex.from_plan(plan).with_completed("step-1", False).delta()
+    index = PlanIndex.from_plan(plan).apply(delta)
+
+    assert index.apply(delta).to_plan() == index.to_plan()
+    assert index.step("step-1").completed is False
+
+
+def test_rejects_duplicate_and_unknown_step_ids() -> None:
+    """Duplicate IDs cannot be indexed and unknown IDs raise KeyError."""
+    plan = _plan()
+    duplicated = Plan(
+        summary="",
+        steps=[plan.steps[0], plan.steps[0]],
+        created_at=plan.created_at,
+        metadata={},
+    )
+
+    with pytest.raises(ValueError, match="duplicate step id"):
+        PlanIndex.from_plan(duplicated)
+    with pytest.raises(KeyError):
+        PlanIndex.from_plan(plan).with_completed("step-9")
@@ -0,0 +1,111 @@
+"""Unit tests for incremental re-planning domain models."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from troller.domain.models.issue import IssueComment
+from troller.domain.models.plan import Plan, PlanStep
+from troller.domain.models.replan import (
+    LAST_STEP_NUMBER_KEY,
+    CommitSummary,
+    PlanChanges,
+    PlanRevision,
+    StepEdit,
+)
+
+CREATED = datetime(2025, 1, 1, tzinfo=timezone.utc)
+REVISED = datetime(2025, 1, 2, tzinfo=timezone.utc)
+
+
+def _plan() -> Plan:
+    return Plan(
+        summary="Add caching",
+        steps=[
+            PlanStep("step-1", "Add cache module", False, ["cache.py"], "simple"),
+            PlanStep("step-2", "Wire cache into client", False, ["client.py"]),
+            PlanStep("step-3", "Document cache", False),
+        ],
+        created_at=CREATED,
+        metadata={"issue_number": 4},
+        technical_approach="LRU cache",
+    )
+
+
+def test_plan_changes_empty() -> None:
+    """Changes are empty until something happened."""
+    assert PlanChanges().empty
+    assert not PlanChanges(commits=(CommitSummary("abc", "Fix"),)).empty
+    comment = IssueComment("alice", "Any news?", CREATED)
+    assert not PlanChanges(comments=(comment,)).empty
+
+
+def test_apply_keeps_untouched_steps_and_ids() -> None:
+    """Complete, modify and drop change only the steps they name."""
+    revision = PlanRevision(
+        edits=(
+            StepEdit("complete", "step-1"),
+            StepEdit("modify", "step-2", related_files=["client.py", "api.py"]),
+            StepEdit("drop", "step-3"),
+        ),
+        testing_strategy="Unit tests",
+    )
+
+    plan = revision.apply(_plan(), REVISED)
+
+    assert plan.steps == [
+        PlanStep("step-1", "Add cache module", True, ["cache.py"], "simple"),
+        PlanStep("step-2", "Wire cache into client", False, ["client.py", "api.py"]),
+    ]
+    assert plan.summary == "Add caching"
+    assert plan.technical_approach == "LRU cache"
+    assert plan.testing_strategy == "Unit tests"
+    assert plan.created_at == REVISED
+    assert plan.metadata == {"issue_number": 4, LAST_STEP_NUMBER_KEY: 3}
+
+
+def test_apply_inserts_in_order_with_new_ids() -> None:
+    """Inserted steps follow their anchor in the order they were given."""
+    revision = PlanRevision(
+        edits=(
+            StepEdit("insert", "step-1", description="Add cache tests"),
+            StepEdit("insert", "step-1", description="Benchmark cache"),
+            StepEdit("insert", None, description="Agree on cache size"),
+        )
+    )
+
+    plan = revision.apply(_plan(), REVISED)
+
+    assert [(step.id, step.description) for step in plan.steps] == [
+        ("step-6", "Agree on cache size"),
+        ("step-1", "Add cache module"),
+        ("step-4", "Add cache tests"),
+        ("step-5", "Benchmark cache"),
+        ("step-2", "Wire cache into client"),
+        ("step-3", "Document cache"),
+    ]
+
+
+def test_dropped_step_ids_are_never_reused() -> None:
+    """IDs of dropped steps stay retired across revisions."""
+    first = PlanRevision(edits=(StepEdit("drop", "step-3"),)).apply(_plan(), REVISED)
+
+    second = PlanRevision(
+        edits=(StepEdit("insert", "step-2", description="Document cache again"),)
+    ).apply(first, REVISED)
+
+    assert [step.id for step in second.steps] == ["step-1", "step-2", "step-4"]
+
+
+@pytest.mark.parametrize(
+    ("edit", "message"),
+    [
+        (StepEdit("complete", "step-9"), "unknown step 'step-9'"),
+        (StepEdit("drop", None), "drop edits need a step_id"),
+        (StepEdit("insert", "step-1"), "insert edits need a description"),
+    ],
+)
+def test_apply_rejects_invalid_edits(edit: StepEdit, message: str) -> None:
+    """Edits that cannot be applied raise ValueError."""
+    with pytest.raises(ValueError, match=message):
+        PlanRevision(edits=(edit,)).apply(_plan(), REVISED)
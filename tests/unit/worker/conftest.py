@@ -0,0 +1,15 @@
+"""Shared fixtures for worker adapter tests."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from troller.worker.adapters.github_client import reset_shared_clients
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_github_clients() -> Iterator[None]:
+    """Isolate tests from process-wide GitHub client state."""
+    reset_shared_clients()
+    yield
+    reset_shared_clients()
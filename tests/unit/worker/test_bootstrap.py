@@ -0,0 +1,201 @@
+"""Unit tests for the worker bootstrap."""
+
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from troller.worker.adapters.claude_client import AsyncClaudeClient, ClaudeClient
+from troller.worker.adapters.concurrency import ConcurrencyLimiter
+from troller.worker.adapters.github_client import GitHubClient
+from troller.worker.bootstrap import (
+    CLAUDE_MODULE,
+    GITHUB_MODULE,
+    StartupTimings,
+    WorkerBootstrap,
+    get_bootstrap,
+    reset_bootstrap,
+)
+
+ENV = {"ANTHROPIC_API_KEY": "test-key", "GITHUB_TOKEN": "test-token"}
+
+
+class _Clock:
+    """Clock that advances one second per reading."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += 1.0
+        return self.now
+
+
+def test_importing_bootstrap_does_not_import_sdks() -> None:
+    """The SDKs stay unloaded until a client is asked for."""
+    code = (
+        "import sys, troller.worker.bootstrap; "
+        "print(sorted({'anthropic', 'github'} & set(sys.modules)))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    assert completed.stdout.strip() == "[]"
+
+
+class TestWorkerBootstrap:
+    """Test suite for WorkerBootstrap."""
+
+    def test_clients_are_built_once(self) -> None:
+        """Concurrent callers all get the same client instances."""
+        bootstrap = WorkerBootstrap()
+
+        with patch.dict(os.environ, ENV):
+            with ThreadPoolExecutor(4) as pool:
+                claude = set(pool.map(lambda _: bootstrap.claude_client(), range(4)))
+                github = set(pool.map(lambda _: bootstrap.github_client(), range(4)))
+
+        assert len(claude) == 1
+        assert isinstance(claude.pop(), ClaudeClient)
+        assert len(github) == 1
+        assert isinstance(github.pop(), GitHubClient)
+        timings = bootstrap.timings()
+        assert set(timings.imports) == {CLAUDE_MODULE, GITHUB_MODULE}
+        assert set(timings.clients) == {"claude", "github"}
+
+    def test_clients_are_built_with_caller_options(self) -> None:
+        """Model, limiter and other options reach the client constructors."""
+        limiter = ConcurrencyLimiter(2)
+        bootstrap = WorkerBootstrap(
+            claude_options={"model": "claude-haiku-4-5-20251001"},
+            async_claude_options={"limiter": limiter},
+        )
+
+        with patch.dict(os.environ, ENV):
+            claude = bootstrap.claude_client()
+            async_claude = bootstrap.async_claude_client()
+
+        assert claude.model == "claude-haiku-4-5-20251001"
+        assert async_claude.limiter is limiter
+
+    def test_prewarm_opens_a_connection_per_client(self) -> None:
+        """Both clients are built and warmed in the background."""
+        bootstrap = WorkerBootstrap()
+
+        with patch.dict(os.environ, ENV):
+            with patch.object(ClaudeClient, "prewarm") as claude_prewarm:
+                with patch.object(GitHubClient, "prewarm") as github_prewarm:
+                    assert bootstrap.start_prewarm() is bootstrap.start_prewarm()
+                    assert bootstrap.wait_warm(5)
+
+        claude_prewarm.assert_called_once_with()
+        github_prewarm.assert_called_once_with()
+        timings = bootstrap.timings()
+        assert set(timings.prewarm) == {"claude", "github"}
+        assert timings.prewarm_errors == {}
+        assert timings.total_seconds is None
+
+    def test_prewarm_failures_are_recorded_not_raised(self) -> None:
+        """A client that cannot be built or connected is reported."""
+        bootstrap = WorkerBootstrap()
+        env = {"ANTHROPIC_API_KEY": "test-key", "GITHUB_TOKEN": ""}
+
+        with patch.dict(os.environ, env):
+            with patch.object(
+                ClaudeClient, "prewarm", side_effect=ConnectionError("refused")
+            ):
+                assert bootstrap.wait_warm(5)
+
+        assert bootstrap.timings().prewarm == {}
+        assert bootstrap.timings().prewarm_errors == {
+            "claude": "refused",
+            "github": "GITHUB_TOKEN environment variable is required",
+        }
+
+    def test_mark_ready_reports_total(self) -> None:
+        """The total runs from bootstrap creation to readiness."""
+        bootstrap = WorkerBootstrap(clock=_Clock())
+
+        timings = bootstrap.mark_ready()
+
+        assert timings == StartupTimings({}, {}, {}, {}, 1.0)
+        assert timings.to_metadata() == {
+            "imports_ms": {},
+            "clients_ms": {},
+            "prewarm_ms": {},
+            "prewarm_errors": {},
+            "total_ms": 1000.0,
+        }
+
+    async def test_run_polls_after_prewarm(self) -> None:
+        """The worker starts once pre-warming is done."""
+        bootstrap = WorkerBootstrap()
+        worker = MagicMock()
+        worker.run = AsyncMock()
+
+        with patch.object(WorkerBootstrap, "wait_warm", return_value=True) as warm:
+            await bootstrap.run(worker, prewarm_timeout_seconds=3)
+
+        warm.assert_called_once_with(3)
+        worker.run.assert_awaited_once_with()
+        assert bootstrap.timings().total_seconds is not None
+
+    async def test_run_warms_async_client_on_the_worker_loop(self) -> None:
+        """The async client is built and warmed before the worker polls."""
+        bootstrap = WorkerBootstrap()
+        worker = MagicMock()
+        worker.run = AsyncMock()
+
+        with patch.dict(os.environ, ENV):
+            with patch.object(AsyncClaudeClient, "prewarm") as prewarm:
+                with patch.object(WorkerBootstrap, "wait_warm", return_value=True):
+                    await bootstrap.run(worker)
+
+        prewarm.assert_awaited_once_with()
+        assert set(bootstrap.timings().prewarm) == {"async_claude"}
+        assert bootstrap.timings().prewarm_errors == {}
+
+    async def test_run_starts_worker_when_prewarm_times_out(self) -> None:
+        """Slow pre-warming delays polling by at most the timeout."""
+        bootstrap = WorkerBootstrap()
+        worker = MagicMock()
+        worker.run = AsyncMock()
+
+        with patch.object(WorkerBootstrap, "wait_warm", return_value=False):
+            await bootstrap.run(worker, prewarm_timeout_seconds=0)
+
+        worker.run.assert_awaited_once_with()
+
+
+def test_get_bootstrap_is_process_wide() -> None:
+    """Callers share one bootstrap until it is reset."""
+    reset_bootstrap()
+    first = get_bootstrap()
+
+    assert get_bootstrap() is first
+    reset_bootstrap()
+    assert get_bootstrap() is not first
+    reset_bootstrap()
+
+
+def test_get_bootstrap_rejects_options_once_created() -> None:
+    """Options that would be ignored by an existing bootstrap raise."""
+    reset_bootstrap()
+    first = get_bootstrap(claude_options={"model": "claude-a"})
+    try:
+        assert get_bootstrap(claude_options={"model": "claude-a"}) is first
+        assert get_bootstrap() is first
+        with pytest.raises(ValueError, match="different claude options"):
+            get_bootstrap(claude_options={"model": "claude-b"})
+        with pytest.raises(ValueError, match="github"):
+            get_bootstrap(github_options={"timeout": 5})
+    finally:
+        reset_bootstrap()
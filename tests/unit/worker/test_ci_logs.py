@@ -0,0 +1,128 @@
+"""Unit tests for CI log failure extraction."""
+
+import io
+
+import pytest
+
+from tests.fixtures.actions_logs import (
+    environment_failure_run,
+    failed_test_run,
+    make_log_archive,
+)
+from troller.domain.models.ci import SignatureMatch
+from troller.worker.adapters.ci_logs import (
+    FailedStep,
+    FailureSignature,
+    SignatureIndex,
+    digest_archive,
+    failed_steps,
+)
+
+
+class TestSignatureIndex:
+    """Test suite for SignatureIndex."""
+
+    def test_matches_built_in_signatures(self) -> None:
+        """Code and environment failures are told apart."""
+        index = SignatureIndex()
+
+        pytest_failure = index.match("FAILED tests/test_a.py::test_b - boom")
+        network = index.match("curl: (6) Could not resolve host: pypi.org")
+
+        assert pytest_failure is not None
+        assert (pytest_failure.name, pytest_failure.category) == (
+            "pytest_failure",
+            "code",
+        )
+        assert network is not None
+        assert network.category == "environment"
+        assert index.match("tests/test_a.py::test_b PASSED") is None
+
+    def test_earlier_signatures_take_precedence(self) -> None:
+        """When several signatures match at the same place, the first wins."""
+        index = SignatureIndex(
+            [
+                FailureSignature("specific", "code", r"disk quota"),
+                FailureSignature("generic", "environment", r"disk"),
+            ]
+        )
+
+        signature = index.match("disk quota exceeded")
+
+        assert signature is not None
+        assert signature.name == "specific"
+
+    def test_rejects_empty_signature_list(self) -> None:
+        """An index needs at least one signature."""
+        with pytest.raises(ValueError, match="must not be empty"):
+            SignatureIndex([])
+
+
+class TestFailedSteps:
+    """Test suite for failed_steps."""
+
+    def test_lists_failed_steps_of_failed_jobs(self) -> None:
+        """Only failed steps of failed jobs are returned."""
+        assert failed_steps(failed_test_run().jobs["jobs"]) == [
+            FailedStep("test", "Run pytest", 2)
+        ]
+
+    def test_job_without_failed_step_yields_whole_job(self) -> None:
+        """Jobs failing outside a step are reported without a step."""
+        assert failed_steps(environment_failure_run().jobs["jobs"]) == [
+            FailedStep("install", None, None)
+        ]
+
+
+class TestDigestArchive:
+    """Test suite for digest_archive."""
+
+    def test_extracts_tail_and_signatures_of_failed_step(self) -> None:
+        """The digest holds a cleaned tail and the matched failure lines."""
+        run = failed_test_run(noise_lines=5000)
+
+        digest = digest_archive(
+            7,
+            io.BytesIO(run.archive),
+            failed_steps(run.jobs["jobs"]),
+            tail_lines=3,
+        )
+
+        (failure,) = digest.failures
+        assert (failure.job, failure.step) == ("test", "Run pytest")
+        assert failure.tail == (
+            "E       AssertionError: 1 != 2",
+            "=== 1 failed, 999 passed in 12.3s ===",
+            "##[error]Process completed with exit code 1.",
+        )
+        assert failure.matches == (
+            SignatureMatch(
+                "pytest_failure",
+                "code",
+                "FAILED tests/test_api.py::test_create - AssertionError: 1 != 2",
+            ),
+            SignatureMatch("assertion_error", "code", "E       AssertionError: 1 != 2"),
+        )
+        assert digest.categories == {"code"}
+
+    def test_falls_back_to_job_log(self) -> None:
+        """Without step logs, the job's log is scanned."""
+        run = environment_failure_run()
+
+        digest = digest_archive(
+            8, io.BytesIO(run.archive), failed_steps(run.jobs["jobs"])
+        )
+
+        assert digest.failures[0].step is None
+        assert digest.environment_only
+
+    def test_caps_matches_per_step(self) -> None:
+        """Repeated failures stop being collected after max_matches."""
+        lines = [f"FAILED tests/test_{n}.py::test_x" for n in range(100)]
+        archive = make_log_archive({"job/1_Run.txt": lines})
+
+        digest = digest_archive(
+            9, io.BytesIO(archive), [FailedStep("job", "Run", 1)], max_matches=5
+        )
+
+        assert len(digest.failures[0].matches) == 5
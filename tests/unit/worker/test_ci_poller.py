@@ -0,0 +1,216 @@
+"""Unit tests for the shared CI/CD poller."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from github import GithubException
+
+from troller.domain.models.ci import CheckResult, CommitChecks
+from troller.worker.adapters.ci_poller import CIPoller, PollerStats, PollPolicy
+from troller.worker.adapters.github_client import GitHubClient
+
+POLICY = PollPolicy(
+    active_interval_seconds=10, max_interval_seconds=60, backoff_factor=2
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _checks(sha: str, state: str | None, status: str = "COMPLETED") -> CommitChecks:
+    conclusion = state if status == "COMPLETED" else None
+    return CommitChecks(
+        "owner", "repo", sha, state, (CheckResult("test", status, conclusion),)
+    )
+
+
+class _Recorder:
+    """Completion handler recording every delivery."""
+
+    def __init__(self) -> None:
+        self.deliveries: list[tuple[str, str | None]] = []
+
+    async def __call__(self, workflow_id: str, checks: CommitChecks) -> None:
+        self.deliveries.append((workflow_id, checks.state))
+
+
+def _poller() -> tuple[CIPoller, MagicMock, _Recorder, FakeClock]:
+    client = MagicMock(spec=GitHubClient)
+    recorder = _Recorder()
+    clock = FakeClock()
+    return CIPoller(client, recorder, POLICY, clock), client, recorder, clock
+
+
+class TestCIPoller:
+    """Test suite for CIPoller."""
+
+    async def test_one_query_per_repository_for_all_workflows(self) -> None:
+        """Watches in the same repository share one batched query."""
+        poller, client, recorder, _ = _poller()
+        client.get_commit_checks.return_value = {
+            "aaaaaaa": _checks("aaaaaaa", "SUCCESS"),
+            "bbbbbbb": _checks("bbbbbbb", "FAILURE"),
+        }
+        poller.register("owner", "repo", "aaaaaaa", "wf-1")
+        poller.register("owner", "repo", "aaaaaaa", "wf-2")
+        poller.register("owner", "repo", "bbbbbbb", "wf-3")
+
+        notified = await poller.poll_due()
+
+        client.get_commit_checks.assert_called_once_with(
+            "owner", "repo", ["aaaaaaa", "bbbbbbb"]
+        )
+        assert notified == 3
+        assert recorder.deliveries == [
+            ("wf-1", "SUCCESS"),
+            ("wf-2", "SUCCESS"),
+            ("wf-3", "FAILURE"),
+        ]
+        assert poller.stats() == PollerStats(0, 0, polls=1, notifications=3, errors=0)
+        assert poller.next_poll_delay() is None
+
+    async def test_polls_fast_while_running_and_backs_off_when_idle(self) -> None:
+        """Running checks keep the active interval; idle polls double it."""
+        poller, client, _, clock = _poller()
+        poller.register("owner", "repo", "aaaaaaa", "wf-1")
+        delays = []
+        for state, status in [
+            (None, "COMPLETED"),
+            (None, "COMPLETED"),
+            ("PENDING", "QUEUED"),
+            (None, "COMPLETED"),
+            (None, "COMPLETED"),
+            (None, "COMPLETED"),
+        ]:
+            client.get_commit_checks.return_value = {
+                "aaaaaaa": _checks("aaaaaaa", state, status)
+            }
+            await poller.poll_due()
+            delay = poller.next_poll_delay()
+            assert delay is not None
+            delays.append(delay)
+            clock.now += delay
+
+        assert delays == [20, 40, 10, 20, 40, 60]
+
+    async def test_repositories_not_due_are_skipped(self) -> None:
+        """Polling before the interval elapses makes no API call."""
+        poller, client, _, clock = _poller()
+        client.get_commit_checks.return_value = {
+            "aaaaaaa": _checks("aaaaaaa", "PENDING", "IN_PROGRESS")
+        }
+        poller.register("owner", "repo", "aaaaaaa", "wf-1")
+        await poller.poll_due()
+        clock.now += 5
+
+        await poller.poll_due()
+
+        assert client.get_commit_checks.call_count == 1
+
+    async def test_failed_poll_backs_off_and_keeps_watching(self) -> None:
+        """A GitHub error is counted and the repository is retried later."""
+        poller, client, _, _ = _poller()
+        client.get_commit_checks.side_effect = GithubException(502, "bad gateway")
+        poller.register("owner", "repo", "aaaaaaa", "wf-1")
+
+        assert await poller.poll_due() == 0
+
+        assert poller.next_poll_delay() == 20
+        assert poller.stats() == PollerStats(1, 1, polls=1, notifications=0, errors=1)
+
+    async def test_any_poll_error_is_contained_to_its_repository(self) -> None:
+        """A connection error in one repository does not stop the others."""
+        poller, client, recorder, _ = _poller()
+
+        def get_commit_checks(
+            owner: str, repo: str, shas: list[str]
+        ) -> dict[str, CommitChecks]:
+            if repo == "broken":
+                raise ConnectionError("connection reset")
+            return {"aaaaaaa": _checks("aaaaaaa", "SUCCESS")}
+
+        client.get_commit_checks.side_effect = get_commit_checks
+        poller.register("owner", "broken", "bbbbbbb", "wf-1")
+        poller.register("owner", "repo", "aaaaaaa", "wf-2")
+
+        assert await poller.poll_due() == 1
+
+        assert recorder.deliveries == [("wf-2", "SUCCESS")]
+        assert poller.stats() == PollerStats(1, 1, polls=2, notifications=1, errors=1)
+
+    def test_register_rejects_non_sha_refs(self) -> None:
+        """A branch name is refused before it can break the batched query."""
+        poller, _, _, _ = _poller()
+
+        with pytest.raises(ValueError, match="invalid commit SHA"):
+            poller.register("owner", "repo", "main", "wf-1")
+
+        assert poller.next_poll_delay() is None
+
+    async def test_failed_delivery_is_retried_on_a_later_poll(self) -> None:
+        """A result the workflow did not receive is delivered again."""
+        client = MagicMock(spec=GitHubClient)
+        client.get_commit_checks.return_value = {
+            "aaaaaaa": _checks("aaaaaaa", "SUCCESS")
+        }
+        attempts: list[str] = []
+
+        async def on_complete(workflow_id: str, checks: CommitChecks) -> None:
+            attempts.append(workflow_id)
+            if len(attempts) == 1:
+                raise RuntimeError("signal failed")
+
+        clock = FakeClock()
+        poller = CIPoller(client, on_complete, POLICY, clock)
+        poller.register("owner", "repo", "aaaaaaa", "wf-1")
+
+        assert await poller.poll_due() == 0
+        assert poller.next_poll_delay() == 20
+        clock.now += 20
+        assert await poller.poll_due() == 1
+
+        assert attempts == ["wf-1", "wf-1"]
+        assert poller.stats() == PollerStats(0, 0, polls=2, notifications=1, errors=1)
+
+    async def test_unregistered_workflow_is_not_notified(self) -> None:
+        """Workflows that stop waiting get no delivery."""
+        poller, client, recorder, _ = _poller()
+        client.get_commit_checks.return_value = {
+            "aaaaaaa": _checks("aaaaaaa", "SUCCESS")
+        }
+        poller.register("owner", "repo", "aaaaaaa", "wf-1")
+        poller.register("owner", "repo", "aaaaaaa", "wf-2")
+        poller.unregister("owner", "repo", "aaaaaaa", "wf-1")
+
+        await poller.poll_due()
+
+        assert recorder.deliveries == [("wf-2", "SUCCESS")]
+
+    async def test_run_wakes_up_for_new_registrations(self) -> None:
+        """A registration while the loop is idle is polled right away."""
+        client = MagicMock(spec=GitHubClient)
+        client.get_commit_checks.return_value = {
+            "aaaaaaa": _checks("aaaaaaa", "SUCCESS")
+        }
+        delivered = asyncio.Event()
+
+        async def on_complete(workflow_id: str, checks: CommitChecks) -> None:
+            delivered.set()
+
+        poller = CIPoller(client, on_complete, POLICY)
+        stop = asyncio.Event()
+        runner = asyncio.create_task(poller.run(stop))
+        await asyncio.sleep(0.01)
+
+        poller.register("owner", "repo", "aaaaaaa", "wf-1")
+        await asyncio.wait_for(delivered.wait(), 1)
+        stop.set()
+        await asyncio.wait_for(runner, 1)
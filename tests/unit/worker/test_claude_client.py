@@ -1,12 +1,33 @@
 """Unit tests for Claude API client adapter."""
 
+import asyncio
+import json
 import os
-from unittest.mock import MagicMock, patch
+import time
+from datetime import datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from anthropic.types import Usage
 
-from troller.domain.models.plan import Plan
-from troller.worker.adapters.claude_client import ClaudeClient
+from troller.domain.models.ci import FailureDigest, SignatureMatch, StepFailure
+from troller.domain.models.plan import Plan, PlanStep
+from troller.domain.models.replan import CommitSummary, PlanChanges
+from troller.worker.adapters.claude_client import (
+    CREATE_PLAN_TOOL,
+    PLANNING_SYSTEM_PROMPT,
+    AsyncClaudeClient,
+    ClaudeClient,
+)
+from troller.worker.adapters.concurrency import ConcurrencyLimiter
+from troller.worker.adapters.context_budget import ContextBudget
+from troller.worker.adapters.instrumentation import InMemoryCallSink
+from troller.worker.adapters.plan_cache import PlanCache
+from troller.worker.adapters.plan_stream import StreamedPlan, StreamedSummary
+from troller.worker.adapters.rate_limit import ANTHROPIC, Priority, RateLimitScheduler
+from troller.worker.adapters.repo_index import RankedFile, RepositoryContext, Symbol
+from troller.worker.adapters.singleflight import SingleFlight
 
 
 class TestClaudeClient:
@@ -148,3 +169,579 @@ class TestClaudeClient:
                 assert "Add feature X" in user_message
                 assert "Implement feature X with Y" in user_message
                 assert "42" in user_message
+
+    def test_generate_plan_marks_static_prefix_for_prompt_caching(self) -> None:
+        """generate_plan sends shared system prompt and tools with a cache breakpoint."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_anthropic = MagicMock()
+                mock_anthropic_class.return_value = mock_anthropic
+
+                mock_response = MagicMock()
+                mock_response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+                mock_anthropic.messages.create.return_value = mock_response
+
+                client = ClaudeClient()
+                client.generate_plan("First", "Body", 1)
+                first_call = mock_anthropic.messages.create.call_args.kwargs
+                client.generate_plan("Second", "Other body", 2)
+                second_call = mock_anthropic.messages.create.call_args.kwargs
+
+                system = first_call["system"]
+                assert system[0]["text"] == PLANNING_SYSTEM_PROMPT
+                assert system[0]["cache_control"] == {"type": "ephemeral"}
+                assert first_call["tools"] == [CREATE_PLAN_TOOL]
+                assert second_call["system"] == first_call["system"]
+                assert second_call["tools"] == first_call["tools"]
+
+    def test_generate_plan_exposes_cache_token_usage(self) -> None:
+        """generate_plan records cache read and creation tokens in metadata."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_anthropic = MagicMock()
+                mock_anthropic_class.return_value = mock_anthropic
+
+                mock_response = MagicMock()
+                mock_response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+                mock_response.usage = Usage(
+                    input_tokens=120,
+                    output_tokens=800,
+                    cache_read_input_tokens=1500,
+                    cache_creation_input_tokens=None,
+                )
+                mock_anthropic.messages.create.return_value = mock_response
+
+                client = ClaudeClient()
+                plan = client.generate_plan("Title", "Body", 5)
+
+                assert plan.metadata["usage"] == {
+                    "input_tokens": 120,
+                    "output_tokens": 800,
+                    "cache_read_input_tokens": 1500,
+                    "cache_creation_input_tokens": 0,
+                }
+
+    def test_generate_plan_serves_repeat_calls_from_plan_cache(self) -> None:
+        """generate_plan skips the API when the plan cache has the issue."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_anthropic = MagicMock()
+                mock_anthropic_class.return_value = mock_anthropic
+
+                mock_response = MagicMock()
+                mock_response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+                mock_anthropic.messages.create.return_value = mock_response
+
+                client = ClaudeClient(plan_cache=PlanCache())
+                first = client.generate_plan("Title", "Body", 5)
+                second = client.generate_plan("Title", "Body", 5)
+                client.generate_plan("Title", "Edited body", 5)
+
+                assert second is first
+                assert mock_anthropic.messages.create.call_count == 2
+
+    def test_generate_plan_does_not_cache_plans_failing_validation(self) -> None:
+        """A plan the validator rejects is returned but regenerated next time."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_messages = mock_anthropic_class.return_value.messages
+                mock_messages.create.return_value.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+                cache = PlanCache()
+                client = ClaudeClient(plan_cache=cache)
+
+                plan = client.generate_plan(
+                    "Title", "Body", 5, validate=lambda _: ["plan has no steps"]
+                )
+                client.generate_plan("Title", "Body", 5)
+                client.generate_plan("Title", "Body", 5)
+
+                assert plan.summary == "S"
+                assert mock_messages.create.call_count == 2
+                assert (cache.stats().misses, cache.stats().memory_hits) == (2, 1)
+
+    def test_stream_plan_yields_steps_then_final_plan(self) -> None:
+        """stream_plan yields parsed parts from input_json deltas, then the plan."""
+        plan_input = {
+            "summary": "Streamed",
+            "steps": [
+                {"id": "step-1", "description": "One", "completed": False},
+                {"id": "step-2", "description": "Two", "completed": False},
+            ],
+        }
+        text = json.dumps(plan_input)
+        stream_events = [MagicMock(type="message_start")] + [
+            MagicMock(
+                type="content_block_delta",
+                delta=MagicMock(type="input_json_delta", partial_json=text[i : i + 7]),
+            )
+            for i in range(0, len(text), 7)
+        ]
+        final_message = MagicMock()
+        final_message.content = [MagicMock(type="tool_use", input=plan_input)]
+
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_anthropic = MagicMock()
+                mock_anthropic_class.return_value = mock_anthropic
+                stream = mock_anthropic.messages.stream.return_value.__enter__()
+                stream.__iter__.return_value = iter(stream_events)
+                stream.get_final_message.return_value = final_message
+
+                client = ClaudeClient()
+                events = list(client.stream_plan("Title", "Body", 9))
+
+                assert events[0] == StreamedSummary(summary="Streamed")
+                assert [e.step.id for e in events[1:3]] == ["step-1", "step-2"]
+                assert isinstance(events[3], StreamedPlan)
+                assert events[3].plan.summary == "Streamed"
+                assert len(events[3].plan.steps) == 2
+                call_args = mock_anthropic.messages.stream.call_args
+                assert call_args.kwargs["tool_choice"]["name"] == "create_plan"
+
+    def test_generate_plan_reports_rate_limit_headers_to_scheduler(self) -> None:
+        """With a scheduler, calls wait for budget and feed back response headers."""
+        scheduler = MagicMock(spec=RateLimitScheduler)
+        headers = {"anthropic-ratelimit-requests-remaining": "49"}
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_anthropic = mock_anthropic_class.return_value
+                raw = mock_anthropic.messages.with_raw_response.create.return_value
+                raw.headers = headers
+                raw.parse.return_value.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+
+                plan = ClaudeClient(scheduler=scheduler).generate_plan("T", "B", 1)
+
+                assert plan.summary == "S"
+                scheduler.acquire.assert_called_once_with(ANTHROPIC, Priority.PLANNING)
+                scheduler.observe_headers.assert_called_once_with(ANTHROPIC, headers)
+                mock_anthropic.messages.create.assert_not_called()
+
+    def test_generate_plan_records_call_to_sink(self) -> None:
+        """Each call is measured, sent to the sink and summarized in metadata."""
+        sink = InMemoryCallSink()
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_response = MagicMock()
+                mock_response.model = "claude-opus-4-5-20251101"
+                mock_response.stop_reason = "tool_use"
+                mock_response.usage = Usage(input_tokens=1000, output_tokens=200)
+                mock_response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+                mock_messages = mock_anthropic_class.return_value.messages
+                mock_messages.create.return_value = mock_response
+
+                plan = ClaudeClient(sink=sink).generate_plan("T", "B", 3)
+
+                [record] = sink.records
+                assert record.operation == "generate_plan"
+                assert record.issue_number == 3
+                assert record.output_tokens == 200
+                assert record.cost_usd == pytest.approx(0.01)
+                assert record.wall_seconds is not None
+                assert record.time_to_first_token_seconds is None
+                assert plan.metadata["call"] == record.summary()
+
+    def test_rate_limit_wait_is_queue_time_not_latency(self) -> None:
+        """Waiting for the scheduler is reported apart from API latency."""
+        sink = InMemoryCallSink()
+        scheduler = MagicMock(spec=RateLimitScheduler)
+        scheduler.acquire.side_effect = lambda *args: time.sleep(0.05)
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                raw = mock_anthropic_class.return_value.messages.with_raw_response
+                response = raw.create.return_value.parse.return_value
+                response.model = "claude-opus-4-5-20251101"
+                response.usage = Usage(input_tokens=10, output_tokens=5)
+                response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+
+                ClaudeClient(scheduler=scheduler, sink=sink).generate_plan("T", "B", 1)
+
+                [record] = sink.records
+                assert record.queue_seconds is not None
+                assert record.queue_seconds >= 0.05
+                assert record.wall_seconds is not None
+                assert record.wall_seconds < 0.05
+
+    def test_generate_plan_trims_repetitive_issue_bodies(self) -> None:
+        """Repeated log lines are collapsed and the trimming is recorded."""
+        log = "\n".join(f"WARN connection {n} reset" for n in range(500))
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_messages = mock_anthropic_class.return_value.messages
+                mock_messages.create.return_value.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+
+                client = ClaudeClient(
+                    context_budget=ContextBudget(max_input_tokens=1_000)
+                )
+                plan = client.generate_plan("Flaky", log, 8)
+
+                kwargs = mock_messages.create.call_args.kwargs
+                prompt = kwargs["messages"][0]["content"]
+                assert "repeated 499 more times" in prompt
+                assert len(prompt) < len(log) / 10
+                context = plan.metadata["context"]
+                assert context["deduplicated_lines"] == 499
+                assert context["max_tokens"] == kwargs["max_tokens"]
+
+    def test_model_selects_request_model_and_cache_entry(self) -> None:
+        """Clients for different models never share cached plans."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_messages = mock_anthropic_class.return_value.messages
+                mock_messages.create.return_value.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+                cache = PlanCache()
+
+                ClaudeClient(plan_cache=cache).generate_plan("T", "B", 1)
+                ClaudeClient(
+                    plan_cache=cache, model="claude-haiku-4-5-20251001"
+                ).generate_plan("T", "B", 1)
+
+                models = [
+                    call.kwargs["model"] for call in mock_messages.create.call_args_list
+                ]
+                assert models == [
+                    "claude-opus-4-5-20251101",
+                    "claude-haiku-4-5-20251001",
+                ]
+
+    def test_generate_plan_includes_repository_context(self) -> None:
+        """Ranked repository files are shown to the model and change the cache key."""
+        repository = RepositoryContext(
+            "0123456789abcdef",
+            (RankedFile("src/app/cache.py", 4.2, (Symbol("PlanCache", "class", 12),)),),
+        )
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_messages = mock_anthropic_class.return_value.messages
+                mock_messages.create.return_value.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+                client = ClaudeClient(plan_cache=PlanCache())
+
+                client.generate_plan("T", "B", 1)
+                plan = client.generate_plan("T", "B", 1, repository)
+
+                assert mock_messages.create.call_count == 2
+                prompt = mock_messages.create.call_args.kwargs["messages"][0]["content"]
+                assert "(commit 0123456789ab)" in prompt
+                assert "- src/app/cache.py: class PlanCache (line 12)" in prompt
+                assert plan.metadata["repository"] == {
+                    "commit": "0123456789abcdef",
+                    "files": ["src/app/cache.py"],
+                }
+
+    def test_replan_sends_changes_and_merges_edits(self) -> None:
+        """Re-planning sends the compact plan plus changes and applies edits."""
+        previous = Plan(
+            summary="Add caching",
+            steps=[
+                PlanStep("step-1", "Add cache module", False, ["cache.py"]),
+                PlanStep("step-2", "Wire cache into client", False),
+            ],
+            created_at=datetime(2025, 1, 1),
+            metadata={"issue_number": 5},
+        )
+        failure = StepFailure(
+            "test",
+            "Run pytest",
+            ("collected 3 items", "1 failed"),
+            (SignatureMatch("pytest_failure", "code", "FAILED test_cache.py::t"),),
+        )
+        changes = PlanChanges(
+            commits=(CommitSummary("a" * 40, "Add cache module"),),
+            ci_failures=(FailureDigest(77, (failure,)),),
+        )
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                mock_messages = mock_anthropic_class.return_value.messages
+                response = mock_messages.create.return_value
+                response.usage = Usage(input_tokens=300, output_tokens=40)
+                response.content = [
+                    MagicMock(
+                        type="tool_use",
+                        input={
+                            "edits": [
+                                {"action": "complete", "step_id": "step-1"},
+                                {
+                                    "action": "insert",
+                                    "step_id": "step-1",
+                                    "description": "Fix failing cache test",
+                                    "related_files": ["test_cache.py"],
+                                },
+                            ]
+                        },
+                    )
+                ]
+
+                plan = ClaudeClient().replan("Cache plans", 5, previous, changes)
+
+                kwargs = mock_messages.create.call_args.kwargs
+                assert kwargs["tool_choice"] == {"type": "tool", "name": "revise_plan"}
+                assert kwargs["max_tokens"] == 4096
+                prompt = kwargs["messages"][0]["content"]
+                assert "step-1 [ ] Add cache module | files: cache.py" in prompt
+                assert "aaaaaaaaaaaa Add cache module" in prompt
+                assert "- run 77, test / Run pytest:" in prompt
+                assert "[code] FAILED test_cache.py::t" in prompt
+                assert [(s.id, s.completed) for s in plan.steps] == [
+                    ("step-1", True),
+                    ("step-3", False),
+                    ("step-2", False),
+                ]
+                assert plan.metadata["replan"]["edits"] == {"complete": 1, "insert": 1}
+                assert plan.metadata["usage"]["input_tokens"] == 300
+
+    def test_replan_without_changes_skips_the_call(self) -> None:
+        """Nothing new means the previous plan still stands."""
+        previous = Plan("S", [], datetime(2025, 1, 1), {})
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.Anthropic"
+            ) as mock_anthropic_class:
+                plan = ClaudeClient().replan("T", 1, previous, PlanChanges())
+
+                assert plan is previous
+                mock_anthropic_class.return_value.messages.create.assert_not_called()
+
+
+class TestAsyncClaudeClient:
+    """Test suite for AsyncClaudeClient adapter."""
+
+    def test_init_raises_error_when_api_key_missing(self) -> None:
+        """AsyncClaudeClient raises clear error when ANTHROPIC_API_KEY is missing."""
+        with patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(
+                ValueError, match="ANTHROPIC_API_KEY environment variable is required"
+            ):
+                AsyncClaudeClient()
+
+    async def test_generate_plan_returns_plan_object(self) -> None:
+        """generate_plan awaits AsyncAnthropic and returns Plan domain object."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.AsyncAnthropic"
+            ) as mock_anthropic_class:
+                mock_anthropic = MagicMock()
+                mock_anthropic_class.return_value = mock_anthropic
+
+                mock_response = MagicMock()
+                mock_response.content = [
+                    MagicMock(
+                        type="tool_use",
+                        input={
+                            "summary": "Async plan",
+                            "steps": [
+                                {
+                                    "id": "step-1",
+                                    "description": "First step",
+                                    "completed": False,
+                                }
+                            ],
+                        },
+                    )
+                ]
+                mock_anthropic.messages.create = AsyncMock(return_value=mock_response)
+
+                client = AsyncClaudeClient(limiter=ConcurrencyLimiter(2))
+                plan = await client.generate_plan(
+                    issue_title="Test Issue", issue_body="Test body", issue_number=7
+                )
+
+                assert isinstance(plan, Plan)
+                assert plan.summary == "Async plan"
+                assert plan.metadata["issue_number"] == 7
+                call_args = mock_anthropic.messages.create.call_args
+                assert call_args.kwargs["model"] == "claude-opus-4-5-20251101"
+
+    async def test_identical_concurrent_plans_share_one_call(self) -> None:
+        """Overlapping generate_plan calls with equal inputs make one API call."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.AsyncAnthropic"
+            ) as mock_anthropic_class:
+                response = MagicMock()
+                response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+
+                async def create(**_: object) -> MagicMock:
+                    await asyncio.sleep(0.01)
+                    return response
+
+                create_mock = AsyncMock(side_effect=create)
+                mock_anthropic_class.return_value.messages.create = create_mock
+                client = AsyncClaudeClient(
+                    limiter=ConcurrencyLimiter(4), flights=SingleFlight()
+                )
+
+                plans = await asyncio.gather(
+                    client.generate_plan("T", "B", 1),
+                    client.generate_plan("T", "B", 1),
+                    client.generate_plan("T", "B", 2),
+                )
+
+                assert plans[0] is plans[1]
+                assert create_mock.await_count == 2
+                assert client.coalescing_stats().coalesced == 1
+
+    async def test_plans_with_other_budget_or_sink_are_not_shared(self) -> None:
+        """Clients sharing a SingleFlight coalesce only identical requests."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.AsyncAnthropic"
+            ) as mock_anthropic_class:
+                response = MagicMock()
+                response.model = "claude-opus-4-5-20251101"
+                response.stop_reason = "tool_use"
+                response.usage = Usage(input_tokens=10, output_tokens=5)
+                response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+
+                async def create(**_: object) -> MagicMock:
+                    await asyncio.sleep(0.01)
+                    return response
+
+                create_mock = AsyncMock(side_effect=create)
+                mock_anthropic_class.return_value.messages.create = create_mock
+                flights: SingleFlight[Any, Plan] = SingleFlight()
+                sink = InMemoryCallSink()
+                clients = [
+                    AsyncClaudeClient(flights=flights),
+                    AsyncClaudeClient(flights=flights),
+                    AsyncClaudeClient(
+                        flights=flights,
+                        context_budget=ContextBudget(max_input_tokens=1_000),
+                    ),
+                    AsyncClaudeClient(flights=flights, sink=sink),
+                ]
+
+                await asyncio.gather(
+                    *(client.generate_plan("T", "B", 1) for client in clients)
+                )
+
+                assert create_mock.await_count == 3
+                assert flights.stats().coalesced == 1
+                assert len(sink.records) == 1
+
+    async def test_coalesced_callers_validate_and_cache_for_themselves(
+        self,
+    ) -> None:
+        """A shared plan goes through each caller's own validator and cache."""
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.AsyncAnthropic"
+            ) as mock_anthropic_class:
+                response = MagicMock()
+                response.content = [
+                    MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+                ]
+
+                async def create(**_: object) -> MagicMock:
+                    await asyncio.sleep(0.01)
+                    return response
+
+                create_mock = AsyncMock(side_effect=create)
+                mock_anthropic_class.return_value.messages.create = create_mock
+                flights: SingleFlight[Any, Plan] = SingleFlight()
+                accepting, rejecting = PlanCache(), PlanCache()
+                checked: list[Plan] = []
+
+                def reject(plan: Plan) -> list[str]:
+                    checked.append(plan)
+                    return ["plan has no steps"]
+
+                leader = AsyncClaudeClient(flights=flights, plan_cache=accepting)
+                follower = AsyncClaudeClient(flights=flights, plan_cache=rejecting)
+
+                first, shared = await asyncio.gather(
+                    leader.generate_plan("T", "B", 1),
+                    follower.generate_plan("T", "B", 1, validate=reject),
+                )
+                await leader.generate_plan("T", "B", 1)
+                await follower.generate_plan("T", "B", 1)
+
+                assert shared is first
+                assert checked == [first]
+                assert flights.stats().coalesced == 1
+                assert accepting.stats().memory_hits == 1
+                assert rejecting.stats().memory_hits == 0
+                assert create_mock.await_count == 2
+
+    async def test_generate_plan_respects_concurrency_limit(self) -> None:
+        """Concurrent generate_plan calls never exceed the limiter's limit."""
+        in_flight = 0
+        peak = 0
+
+        async def slow_create(**_kwargs: object) -> MagicMock:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            response = MagicMock()
+            response.content = [
+                MagicMock(type="tool_use", input={"summary": "S", "steps": []})
+            ]
+            return response
+
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+            with patch(
+                "troller.worker.adapters.claude_client.AsyncAnthropic"
+            ) as mock_anthropic_class:
+                mock_anthropic = MagicMock()
+                mock_anthropic_class.return_value = mock_anthropic
+                mock_anthropic.messages.create = slow_create
+
+                limiter = ConcurrencyLimiter(2)
+                client = AsyncClaudeClient(limiter=limiter)
+                await asyncio.gather(
+                    *(client.generate_plan("T", "B", n) for n in range(6))
+                )
+
+                assert peak == 2
+                stats = limiter.stats()
+                assert stats.total_acquired == 6
+                assert stats.max_queue_depth >= 4
+                assert stats.in_flight == 0
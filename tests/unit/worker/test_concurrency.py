@@ -0,0 +1,68 @@
+"""Unit tests for the concurrency limiter."""
+
+import asyncio
+
+import pytest
+
+from troller.worker.adapters.concurrency import (
+    ConcurrencyLimiter,
+    get_shared_limiter,
+)
+
+
+class TestConcurrencyLimiter:
+    """Test suite for ConcurrencyLimiter."""
+
+    def test_rejects_non_positive_limit(self) -> None:
+        """ConcurrencyLimiter requires a limit of at least one."""
+        with pytest.raises(ValueError, match="limit must be at least 1"):
+            ConcurrencyLimiter(0)
+
+    async def test_slot_tracks_in_flight(self) -> None:
+        """Holding a slot is reflected in the in-flight count."""
+        limiter = ConcurrencyLimiter(3)
+
+        async with limiter.slot():
+            assert limiter.stats().in_flight == 1
+
+        stats = limiter.stats()
+        assert stats.in_flight == 0
+        assert stats.total_acquired == 1
+
+    async def test_waiters_are_counted_in_queue_depth(self) -> None:
+        """Callers blocked on a full limiter show up as queue depth."""
+        limiter = ConcurrencyLimiter(1)
+        release = asyncio.Event()
+
+        async def holder() -> None:
+            async with limiter.slot():
+                await release.wait()
+
+        async def waiter() -> None:
+            async with limiter.slot():
+                pass
+
+        holder_task = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiter_tasks = [asyncio.create_task(waiter()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        assert limiter.stats().queue_depth == 3
+
+        release.set()
+        await asyncio.gather(holder_task, *waiter_tasks)
+
+        stats = limiter.stats()
+        assert stats.queue_depth == 0
+        assert stats.max_queue_depth == 3
+        assert stats.total_acquired == 4
+        assert stats.max_wait_seconds > 0
+        assert stats.mean_wait_seconds > 0
+
+    def test_shared_limiter_is_reused_by_name(self) -> None:
+        """get_shared_limiter returns one instance per name."""
+        first = get_shared_limiter("test-shared", 4)
+        second = get_shared_limiter("test-shared", 8)
+
+        assert first is second
+        assert first.limit == 4
@@ -0,0 +1,179 @@
+"""Unit tests for the planning context budget."""
+
+from troller.worker.adapters.context_budget import (
+    ContextBudget,
+    collapse_repeated_lines,
+    estimate_tokens,
+    output_budget,
+    prepare_context,
+    trim_code_blocks,
+)
+
+
+class TestCollapseRepeatedLines:
+    """Test suite for collapse_repeated_lines."""
+
+    def test_collapses_identical_log_lines(self) -> None:
+        """Three or more identical log lines collapse to one."""
+        text = "start\n" + "ERROR connection reset\n" * 4 + "end"
+
+        collapsed, removed = collapse_repeated_lines(text)
+
+        assert removed == 3
+        assert collapsed.splitlines() == [
+            "start",
+            "ERROR connection reset",
+            "[previous line repeated 3 more times]",
+            "end",
+        ]
+
+    def test_collapses_long_runs_differing_only_in_numbers(self) -> None:
+        """Log spam with changing timestamps and IDs collapses to one line."""
+        lines = [f"2025-01-{n:02} ERROR retry {n} for job 0xdead{n}" for n in range(12)]
+        text = "\n".join(["start", *lines, "end"])
+
+        collapsed, removed = collapse_repeated_lines(text)
+
+        assert removed == 11
+        assert collapsed.splitlines() == [
+            "start",
+            lines[0],
+            "[previous line repeated 11 more times with different numbers]",
+            "end",
+        ]
+
+    def test_collapses_inside_fenced_output(self) -> None:
+        """Lines in a code fence count as output even without a log prefix."""
+        frames = "\n".join(f"  at handler (worker.js:{n})" for n in range(10))
+        text = f"Trace:\n```\n{frames}\n```"
+
+        collapsed, removed = collapse_repeated_lines(text)
+
+        assert removed == 9
+        assert collapsed.splitlines()[:4] == [
+            "Trace:",
+            "```",
+            "  at handler (worker.js:0)",
+            "[previous line repeated 9 more times with different numbers]",
+        ]
+
+    def test_leaves_short_runs_and_code_alone(self) -> None:
+        """Pairs and differently indented lines are not collapsed."""
+        text = "a\na\n        }\n    }\n}\n\n\nend"
+
+        collapsed, removed = collapse_repeated_lines(text)
+
+        assert removed == 0
+        assert collapsed == text
+
+    def test_leaves_prose_and_short_numeric_runs_alone(self) -> None:
+        """Distinct lines that differ only in numbers are kept outside logs."""
+        versions = "\n".join(f"- Python 3.{n}" for n in range(10, 22))
+        asserts = "\n".join(f'assert parse("v{n}") == {n}' for n in range(3))
+        text = f"{versions}\n```\n{asserts}\n```"
+
+        collapsed, removed = collapse_repeated_lines(text)
+
+        assert removed == 0
+        assert collapsed == text
+
+
+class TestTrimCodeBlocks:
+    """Test suite for trim_code_blocks."""
+
+    def test_keeps_head_and_tail_of_long_blocks(self) -> None:
+        """Long fenced blocks lose their middle; short blocks are untouched."""
+        long_block = "\n".join(f"frame {n}" for n in range(100))
+        text = f"Intro\n```\n{long_block}\n```\n```py\nshort\n```"
+
+        trimmed, blocks, omitted = trim_code_blocks(text, head_lines=3, tail_lines=2)
+
+        assert (blocks, omitted) == (1, 95)
+        assert trimmed.splitlines() == [
+            "Intro",
+            "```",
+            "frame 0",
+            "frame 1",
+            "frame 2",
+            "[... 95 lines omitted ...]",
+            "frame 98",
+            "frame 99",
+            "```",
+            "```py",
+            "short",
+            "```",
+        ]
+
+    def test_unterminated_block_is_kept(self) -> None:
+        """A fence without a closing line is left as written."""
+        text = "```\n" + "\n".join(str(n) for n in range(50))
+
+        trimmed, blocks, _ = trim_code_blocks(text, head_lines=1, tail_lines=1)
+
+        assert (trimmed, blocks) == (text, 0)
+
+
+class TestPrepareContext:
+    """Test suite for prepare_context and output_budget."""
+
+    def test_small_body_is_sent_unchanged(self) -> None:
+        """Bodies within budget are sent byte-for-byte."""
+        body = "Fix the typo in the readme\n\n"
+
+        prepared = prepare_context(body, ContextBudget())
+
+        assert prepared.issue_body == body
+        assert prepared.report.deduplicated_lines == 0
+        assert prepared.report.truncated_characters == 0
+        assert prepared.max_tokens == prepared.report.max_tokens
+
+    def test_short_issue_with_numbered_lines_passes_through(self) -> None:
+        """Version lists and similar assertions are never collapsed in budget."""
+        body = (
+            "Parsing breaks on\n"
+            "- Python 3.11\n- Python 3.12\n- Python 3.13\n\n"
+            "```py\n"
+            'assert parse("v1") == 1\n'
+            'assert parse("v2") == 2\n'
+            'assert parse("v3") == 3\n'
+            "```\n"
+        )
+
+        prepared = prepare_context(body, ContextBudget())
+
+        assert prepared.issue_body == body
+        assert prepared.report.deduplicated_lines == 0
+
+    def test_repeated_logs_within_budget_are_kept(self) -> None:
+        """Collapsing only happens once the body is over budget."""
+        body = "ERROR connection reset\n" * 50
+
+        within = prepare_context(body, ContextBudget())
+        over = prepare_context(body, ContextBudget(max_input_tokens=100))
+
+        assert within.issue_body == body
+        assert over.report.deduplicated_lines == 49
+        assert over.report.truncated_characters == 0
+
+    def test_oversized_body_is_cut_in_the_middle(self) -> None:
+        """Text that survives deduplication is truncated to the budget."""
+        body = "".join(f"sentence number {n} is unique. " for n in range(5_000))
+        budget = ContextBudget(max_input_tokens=1_000)
+
+        prepared = prepare_context(body, budget)
+
+        assert prepared.report.original_tokens == estimate_tokens(body)
+        assert prepared.report.final_tokens <= 1_000 + 20
+        assert prepared.report.truncated_characters > 0
+        assert prepared.issue_body.startswith("sentence number 0 ")
+        assert prepared.issue_body.endswith("sentence number 4999 is unique. ")
+
+    def test_output_budget_grows_with_referenced_files(self) -> None:
+        """Issues naming more files get more output tokens, within limits."""
+        budget = ContextBudget(min_output_tokens=1_000, max_output_tokens=2_000)
+        few = output_budget("Change src/a.py", budget)
+        many = output_budget(" ".join(f"src/m{n}.py" for n in range(5)), budget)
+        huge = output_budget(" ".join(f"src/m{n}.py" for n in range(100)), budget)
+
+        assert budget.min_output_tokens < few < many
+        assert huge == budget.max_output_tokens
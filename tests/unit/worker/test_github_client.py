@@ -1,13 +1,21 @@
 """Unit tests for GitHub API client adapter."""
 
 import os
-from unittest.mock import MagicMock, patch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from unittest.mock import MagicMock, call, patch
 
 import pytest
-from github import Auth
+from github import Auth, GithubException
 from github.Issue import Issue as GithubIssue
 
-from troller.worker.adapters.github_client import GitHubClient
+from troller.worker.adapters.github_client import DEFAULT_POOL_SIZE, GitHubClient
+from troller.worker.adapters.rate_limit import (
+    GITHUB,
+    GITHUB_GRAPHQL,
+    RateLimitScheduler,
+)
 
 
 class TestGitHubClient:
@@ -86,3 +94,390 @@ class TestGitHubClient:
                 assert isinstance(
                     issue, MagicMock
                 )  # In real usage, would be GithubIssue
+
+    def test_clients_share_one_github_instance_per_token(self) -> None:
+        """GitHubClient instances reuse the process-wide PyGithub client."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch("troller.worker.adapters.github_client.Github") as mock_github:
+                GitHubClient()
+                GitHubClient()
+
+                mock_github.assert_called_once()
+                kwargs = mock_github.call_args.kwargs
+                assert kwargs["pool_size"] == DEFAULT_POOL_SIZE
+                assert kwargs["seconds_between_requests"] is None
+                assert kwargs["seconds_between_writes"] is None
+
+    def test_get_issue_reuses_cached_repository_handle(self) -> None:
+        """Repeated calls for the same repository fetch it only once."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                mock_github = MagicMock()
+                mock_github_class.return_value = mock_github
+
+                GitHubClient().get_issue("owner", "repo", 1)
+                GitHubClient().get_issue("owner", "repo", 2)
+                GitHubClient().get_issue("owner", "other", 3)
+
+                assert mock_github.get_repo.call_args_list == [
+                    call("owner/repo"),
+                    call("owner/other"),
+                ]
+                mock_repo = mock_github.get_repo.return_value
+                assert mock_repo.get_issue.call_count == 3
+
+    def test_concurrent_get_repo_calls_share_one_request(self) -> None:
+        """Overlapping fetches of the same repository make one API call."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                release = threading.Event()
+
+                def slow_get_repo(full_name: str) -> MagicMock:
+                    release.wait(5)
+                    return MagicMock(full_name=full_name)
+
+                mock_github_class.return_value.get_repo.side_effect = slow_get_repo
+                client = GitHubClient()
+
+                with ThreadPoolExecutor(3) as pool:
+                    futures = [
+                        pool.submit(GitHubClient().get_repo, "owner", "repo")
+                        for _ in range(3)
+                    ]
+                    while client.coalescing_stats().calls < 3:
+                        threading.Event().wait(0.001)
+                    release.set()
+                    repositories = [future.result() for future in futures]
+
+                assert mock_github_class.return_value.get_repo.call_count == 1
+                assert repositories[0] is repositories[1] is repositories[2]
+                assert client.coalescing_stats().coalesced == 2
+
+    def test_get_json_revalidates_with_etag(self) -> None:
+        """get_json sends If-None-Match and serves 304 answers from cache."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                requester.base_url = "https://api.github.com"
+                requester.requestJson.side_effect = [
+                    (200, {"etag": '"v1"'}, '{"state": "pending"}'),
+                    (304, {}, ""),
+                ]
+
+                client = GitHubClient()
+                first = client.get_combined_status("owner", "repo", "abc")
+                second = client.get_combined_status("owner", "repo", "abc")
+
+                assert first == second == {"state": "pending"}
+                url = "https://api.github.com/repos/owner/repo/commits/abc/status"
+                assert requester.requestJson.call_args_list == [
+                    call("GET", url, headers={}),
+                    call("GET", url, headers={"If-None-Match": '"v1"'}),
+                ]
+
+    def test_get_json_raises_github_exception_on_error(self) -> None:
+        """get_json surfaces error statuses through PyGithub's exceptions."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                requester.base_url = "https://api.github.com"
+                requester.requestJson.return_value = (404, {}, '{"message": "x"}')
+                requester.createException.return_value = GithubException(404)
+
+                with pytest.raises(GithubException):
+                    GitHubClient().get_json("/repos/owner/missing")
+
+                requester.createException.assert_called_once_with(
+                    404, {}, {"message": "x"}
+                )
+
+    def test_scheduler_learns_budget_from_github_responses(self) -> None:
+        """Calls go through the scheduler, which observes PyGithub's rate limit."""
+        scheduler = MagicMock(spec=RateLimitScheduler)
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                requester.rate_limiting = (4321, 5000)
+                requester.rate_limiting_resettime = 1_700_000_000
+
+                GitHubClient(scheduler=scheduler).get_issue("owner", "repo", 1)
+
+                assert scheduler.acquire.call_count == 2
+                scheduler.observe.assert_called_with(GITHUB, 4321, 1_700_000_000)
+
+    def test_graphql_calls_draw_on_the_graphql_budget(self) -> None:
+        """GraphQL budget headers never feed the REST bucket."""
+        scheduler = MagicMock(spec=RateLimitScheduler)
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                requester.rate_limiting = (4990, 5000)
+                requester.rate_limiting_resettime = 1_700_000_000
+                requester.graphql_query.return_value = (
+                    {},
+                    {"data": {"repository": {"issue_1": _graphql_issue(1)}}},
+                )
+
+                GitHubClient(scheduler=scheduler).get_issue_snapshots(
+                    "owner", "repo", [1]
+                )
+
+                scheduler.acquire.assert_called_once_with(
+                    GITHUB_GRAPHQL, scheduler.acquire.call_args.args[1]
+                )
+                scheduler.record_success.assert_called_once_with(GITHUB_GRAPHQL)
+                scheduler.observe.assert_called_once_with(
+                    GITHUB_GRAPHQL, 4990, 1_700_000_000
+                )
+
+
+def _last_page(nodes: list[dict[str, Any]]) -> dict[str, Any]:
+    return {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": nodes}
+
+
+def _graphql_issue(
+    number: int,
+    comments_next_page: str | None = None,
+    timeline_next_page: str | None = None,
+) -> dict[str, Any]:
+    return {
+        "number": number,
+        "title": f"Issue {number}",
+        "body": None,
+        "state": "OPEN",
+        "author": {"login": "octocat"},
+        "labels": _last_page([{"name": "bug"}, {"name": "good first issue"}]),
+        "comments": {
+            "pageInfo": {
+                "hasNextPage": comments_next_page is not None,
+                "endCursor": comments_next_page,
+            },
+            "nodes": [
+                {
+                    "author": None,
+                    "body": "first",
+                    "createdAt": "2025-01-01T00:00:00Z",
+                }
+            ],
+        },
+        "timelineItems": {
+            "pageInfo": {
+                "hasNextPage": timeline_next_page is not None,
+                "endCursor": timeline_next_page,
+            },
+            "nodes": [
+                {"subject": {}},
+                {
+                    "source": {
+                        "number": 99,
+                        "title": "Fix",
+                        "state": "OPEN",
+                        "headRefName": "fix",
+                        "headRefOid": "abc",
+                    }
+                },
+            ],
+        },
+    }
+
+
+class TestGitHubClientSnapshots:
+    """Test suite for GraphQL issue snapshots."""
+
+    def test_get_issue_snapshots_batches_issues_into_one_query(self) -> None:
+        """Several issues are fetched with a single GraphQL request."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                requester.graphql_query.return_value = (
+                    {},
+                    {
+                        "data": {
+                            "repository": {
+                                "defaultBranchRef": {"target": {"oid": "head"}},
+                                "issue_1": _graphql_issue(1),
+                                "issue_2": _graphql_issue(2),
+                            }
+                        }
+                    },
+                )
+
+                snapshots = GitHubClient().get_issue_snapshots("owner", "repo", [1, 2])
+
+                assert requester.graphql_query.call_count == 1
+                query, variables = requester.graphql_query.call_args.args
+                assert "issue_1: issue(number: 1)" in query
+                assert "issue_2: issue(number: 2)" in query
+                assert variables == {"owner": "owner", "name": "repo"}
+
+                snapshot = snapshots[2]
+                assert snapshot.title == "Issue 2"
+                assert snapshot.body == ""
+                assert snapshot.labels == ("bug", "good first issue")
+                assert snapshot.comments[0].author is None
+                assert [pr.number for pr in snapshot.linked_pull_requests] == [99]
+                assert snapshot.latest_commit_sha == "head"
+
+    def test_get_issue_snapshot_follows_comment_pagination(self) -> None:
+        """Comments beyond the first page are fetched with follow-up queries."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                second_page = _last_page(
+                    [
+                        {
+                            "author": {"login": "hubot"},
+                            "body": "second",
+                            "createdAt": "2025-01-02T00:00:00Z",
+                        }
+                    ]
+                )
+                requester.graphql_query.side_effect = [
+                    (
+                        {},
+                        {
+                            "data": {
+                                "repository": {
+                                    "defaultBranchRef": None,
+                                    "issue_5": _graphql_issue(5, "cursor-1"),
+                                }
+                            }
+                        },
+                    ),
+                    (
+                        {},
+                        {"data": {"repository": {"issue": {"comments": second_page}}}},
+                    ),
+                ]
+
+                snapshot = GitHubClient().get_issue_snapshot("owner", "repo", 5)
+
+                assert [c.body for c in snapshot.comments] == ["first", "second"]
+                assert snapshot.latest_commit_sha is None
+                variables = requester.graphql_query.call_args.args[1]
+                assert variables["cursor"] == "cursor-1"
+                assert variables["number"] == 5
+
+    def test_get_issue_snapshot_follows_timeline_pagination(self) -> None:
+        """Pull requests linked past the first timeline page are included."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                later_link = {
+                    "subject": {
+                        "number": 100,
+                        "title": "Retry",
+                        "state": "OPEN",
+                        "headRefName": "retry",
+                        "headRefOid": "def",
+                    }
+                }
+                requester.graphql_query.side_effect = [
+                    (
+                        {},
+                        {
+                            "data": {
+                                "repository": {
+                                    "defaultBranchRef": None,
+                                    "issue_5": _graphql_issue(
+                                        5, timeline_next_page="cursor-1"
+                                    ),
+                                }
+                            }
+                        },
+                    ),
+                    (
+                        {},
+                        {
+                            "data": {
+                                "repository": {
+                                    "issue": {"timelineItems": _last_page([later_link])}
+                                }
+                            }
+                        },
+                    ),
+                ]
+
+                snapshot = GitHubClient().get_issue_snapshot("owner", "repo", 5)
+
+                assert [pr.number for pr in snapshot.linked_pull_requests] == [
+                    99,
+                    100,
+                ]
+                query = requester.graphql_query.call_args.args[0]
+                assert "timelineItems(first: 100, after: $cursor, itemTypes" in query
+                assert "fragment PullRequestFields" in query
+
+
+class TestGitHubClientCommitChecks:
+    """Test suite for batched commit check queries."""
+
+    def test_get_commit_checks_batches_commits_into_one_query(self) -> None:
+        """Check runs and commit statuses of several commits come in one query."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch(
+                "troller.worker.adapters.github_client.Github"
+            ) as mock_github_class:
+                requester = mock_github_class.return_value.requester
+                rollup = {
+                    "state": "PENDING",
+                    "contexts": {
+                        "nodes": [
+                            {"name": "test", "status": "QUEUED", "conclusion": None},
+                            {"context": "ci/lint", "state": "SUCCESS"},
+                            {"context": "ci/deploy", "state": "EXPECTED"},
+                        ]
+                    },
+                }
+                requester.graphql_query.return_value = (
+                    {},
+                    {
+                        "data": {
+                            "repository": {
+                                "commit_0": {"statusCheckRollup": rollup},
+                                "commit_1": None,
+                            }
+                        }
+                    },
+                )
+
+                results = GitHubClient().get_commit_checks(
+                    "owner", "repo", ["aaaaaaa", "bbbbbbb", "aaaaaaa"]
+                )
+
+                assert requester.graphql_query.call_count == 1
+                query = requester.graphql_query.call_args.args[0]
+                assert 'commit_1: object(oid: "bbbbbbb")' in query
+                pending = results["aaaaaaa"]
+                assert pending.running
+                assert [(c.name, c.status, c.conclusion) for c in pending.checks] == [
+                    ("test", "QUEUED", None),
+                    ("ci/lint", "COMPLETED", "SUCCESS"),
+                    ("ci/deploy", "PENDING", None),
+                ]
+                assert results["bbbbbbb"].state is None
+
+    def test_get_commit_checks_rejects_non_sha_refs(self) -> None:
+        """Only object IDs are interpolated into the query."""
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test-token"}):
+            with patch("troller.worker.adapters.github_client.Github"):
+                with pytest.raises(ValueError, match="invalid commit SHA"):
+                    GitHubClient().get_commit_checks("owner", "repo", ['") { x'])
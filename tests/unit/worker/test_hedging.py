@@ -0,0 +1,190 @@
+"""Unit tests for hedged requests."""
+
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import call, patch
+
+from troller.worker.adapters.hedging import (
+    HedgePolicy,
+    Hedger,
+    HedgeStats,
+    LatencyTracker,
+)
+
+
+def _warmed_up(policy: HedgePolicy, max_workers: int = 32) -> Hedger:
+    """A hedger that has seen min_samples near-instant calls."""
+    hedger = Hedger(policy, max_workers)
+    for _ in range(policy.min_samples):
+        hedger.call(lambda: None)
+    return hedger
+
+
+def _stalling_request(release: threading.Event) -> Callable[[], str]:
+    """Request whose first invocation blocks until release is set."""
+    invocations = 0
+    lock = threading.Lock()
+
+    def request() -> str:
+        nonlocal invocations
+        with lock:
+            invocations += 1
+            attempt = invocations
+        if attempt == 1:
+            release.wait(5)
+            return "original"
+        return "hedge"
+
+    return request
+
+
+class TestLatencyTracker:
+    """Test suite for LatencyTracker."""
+
+    def test_percentile_over_sliding_window(self) -> None:
+        """Only the most recent window of samples counts."""
+        tracker = LatencyTracker(window=4)
+        assert tracker.percentile(0.5) is None
+
+        for seconds in (9.0, 1.0, 2.0, 3.0, 4.0):
+            tracker.record(seconds)
+
+        assert len(tracker) == 4
+        assert tracker.percentile(0.5) == 2.0
+        assert tracker.percentile(0.95) == 4.0
+
+
+class TestHedger:
+    """Test suite for Hedger."""
+
+    def test_no_hedging_before_warm_up(self) -> None:
+        """Calls run once, without a delay, until min_samples are observed."""
+        hedger = Hedger(HedgePolicy(min_samples=3))
+
+        assert hedger.call(lambda: 42) == 42
+        assert hedger.hedge_delay() is None
+        assert hedger.stats() == HedgeStats(calls=1, fired=0, won=0, over_budget=0)
+
+    def test_slow_call_is_answered_by_hedge(self) -> None:
+        """A call slower than the learned percentile returns the hedge result."""
+        hedger = _warmed_up(HedgePolicy(min_samples=3, max_hedge_ratio=1.0))
+        delay = hedger.hedge_delay()
+        release = threading.Event()
+        discarded: list[str] = []
+        reported = threading.Event()
+
+        def on_discard(result: str) -> None:
+            discarded.append(result)
+            reported.set()
+
+        with patch.object(
+            hedger._tracker, "record", wraps=hedger._tracker.record
+        ) as record:
+            try:
+                result = hedger.call(_stalling_request(release), on_discard)
+            finally:
+                release.set()
+            assert reported.wait(5)
+
+        assert result == "hedge"
+        assert discarded == ["original"]
+        # The stalled original counts as taking the hedge delay; its late
+        # completion is not recorded.
+        assert record.call_count == 2
+        assert record.call_args_list[0] == call(delay)
+        assert hedger.stats() == HedgeStats(calls=4, fired=1, won=1, over_budget=0)
+
+    def test_original_requests_do_not_queue_for_the_pool(self) -> None:
+        """Concurrent calls are not limited by the hedge pool's size."""
+        hedger = _warmed_up(
+            HedgePolicy(min_samples=1, max_hedge_ratio=0.0), max_workers=1
+        )
+        barrier = threading.Barrier(4, timeout=5)
+
+        with ThreadPoolExecutor(4) as callers:
+            results = list(callers.map(lambda _: hedger.call(barrier.wait), range(4)))
+
+        assert sorted(results) == [0, 1, 2, 3]
+
+    def test_original_requests_beyond_the_bound_run_inline(self) -> None:
+        """Only max_originals originals get a thread; the rest run inline."""
+        hedger = Hedger(
+            HedgePolicy(min_samples=1, max_hedge_ratio=0.0), max_originals=2
+        )
+        hedger.call(lambda: None)
+        barrier = threading.Barrier(4, timeout=5)
+
+        def request() -> str:
+            barrier.wait()
+            return threading.current_thread().name
+
+        with ThreadPoolExecutor(4, thread_name_prefix="caller") as callers:
+            names = list(callers.map(lambda _: hedger.call(request), range(4)))
+
+        assert sum(name.startswith("hedge-original") for name in names) == 2
+        assert sum(name.startswith("caller") for name in names) == 2
+
+    def test_budget_caps_hedges(self) -> None:
+        """No hedge is fired once the hedge ratio would be exceeded."""
+        hedger = _warmed_up(HedgePolicy(min_samples=3, max_hedge_ratio=0.1))
+        release = threading.Event()
+        threading.Timer(0.05, release.set).start()
+
+        result = hedger.call(_stalling_request(release))
+
+        assert result == "original"
+        assert hedger.stats() == HedgeStats(calls=4, fired=0, won=0, over_budget=1)
+
+    def test_failed_hedge_falls_back_to_original(self) -> None:
+        """If the hedge fails, the original request's result is used."""
+        hedger = _warmed_up(HedgePolicy(min_samples=3, max_hedge_ratio=1.0))
+        release = threading.Event()
+        stalling = _stalling_request(release)
+
+        def request() -> str:
+            result = stalling()
+            if result == "hedge":
+                release.set()
+                raise ConnectionError("hedge failed")
+            return result
+
+        assert hedger.call(request) == "original"
+        assert hedger.stats().won == 0
+
+    async def test_async_hedge_cancels_the_loser(self) -> None:
+        """The stalled original task is cancelled once the hedge wins."""
+        hedger = Hedger(HedgePolicy(min_samples=3, max_hedge_ratio=1.0))
+
+        async def instant() -> None:
+            return None
+
+        for _ in range(3):
+            await hedger.call_async(instant)
+        cancelled = asyncio.Event()
+        invocations = 0
+
+        async def request() -> str:
+            nonlocal invocations
+            invocations += 1
+            if invocations > 1:
+                return "hedge"
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "original"
+
+        delay = hedger.hedge_delay()
+        discarded: list[str] = []
+        with patch.object(
+            hedger._tracker, "record", wraps=hedger._tracker.record
+        ) as record:
+            assert await hedger.call_async(request, discarded.append) == "hedge"
+            await asyncio.wait_for(cancelled.wait(), 1)
+
+        assert discarded == []
+        assert record.call_args_list[0] == call(delay)
+        assert hedger.stats() == HedgeStats(calls=4, fired=1, won=1, over_budget=0)
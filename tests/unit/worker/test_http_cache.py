@@ -0,0 +1,70 @@
+"""Unit tests for the conditional-request cache."""
+
+from pathlib import Path
+
+from troller.worker.adapters.http_cache import CachedResponse, ConditionalCache
+
+URL = "https://api.github.com/repos/o/r/commits/abc/status"
+
+
+class TestCachedResponse:
+    """Test suite for CachedResponse."""
+
+    def test_validator_headers(self) -> None:
+        """Validators map to conditional request headers."""
+        response = CachedResponse("{}", etag='"v1"', last_modified="Wed, 01 Jan")
+
+        assert response.validator_headers() == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Wed, 01 Jan",
+        }
+        assert CachedResponse("{}").validator_headers() == {}
+
+
+class TestConditionalCache:
+    """Test suite for ConditionalCache."""
+
+    def test_stores_responses_with_validators(self) -> None:
+        """A 200 with an ETag is stored and returned unchanged."""
+        cache = ConditionalCache()
+
+        body = cache.resolve(URL, None, 200, {"etag": '"v1"'}, '{"state": "ok"}')
+
+        assert body == '{"state": "ok"}'
+        assert cache.get(URL) == CachedResponse('{"state": "ok"}', etag='"v1"')
+        assert cache.stats().refreshed == 1
+
+    def test_does_not_store_responses_without_validators(self) -> None:
+        """Responses that cannot be revalidated are not cached."""
+        cache = ConditionalCache()
+
+        cache.resolve(URL, None, 200, {}, "{}")
+
+        assert cache.get(URL) is None
+
+    def test_serves_cached_body_on_not_modified(self) -> None:
+        """A 304 is answered with the body of the revalidated entry."""
+        cache = ConditionalCache()
+        cache.resolve(URL, None, 200, {"etag": '"v1"'}, '{"state": "ok"}')
+
+        body = cache.resolve(URL, cache.get(URL), 304, {}, "")
+
+        assert body == '{"state": "ok"}'
+        assert cache.stats().not_modified == 1
+
+    def test_error_statuses_are_not_resolved(self) -> None:
+        """Errors, and 304s without a revalidated entry, return None."""
+        cache = ConditionalCache()
+
+        assert cache.resolve(URL, None, 404, {}, '{"message": "Not Found"}') is None
+        assert cache.resolve(URL, None, 304, {}, "") is None
+
+    def test_disk_tier_survives_new_instance(self, tmp_path: Path) -> None:
+        """Entries written to disk are visible to a fresh cache."""
+        ConditionalCache(disk_dir=tmp_path).resolve(
+            URL, None, 200, {"last-modified": "Wed, 01 Jan"}, "[]"
+        )
+
+        cached = ConditionalCache(disk_dir=tmp_path).get(URL)
+
+        assert cached == CachedResponse("[]", last_modified="Wed, 01 Jan")
@@ -0,0 +1,130 @@
+"""Unit tests for model call instrumentation."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from troller.worker.adapters.instrumentation import (
+    CallRecord,
+    CallTimer,
+    InMemoryCallSink,
+    JsonlCallSink,
+    call_cost,
+    workflow_scope,
+)
+
+USAGE = {
+    "input_tokens": 1_000,
+    "output_tokens": 2_000,
+    "cache_read_input_tokens": 10_000,
+    "cache_creation_input_tokens": 4_000,
+}
+
+
+def _record(workflow_id_scope: str | None = None) -> CallRecord:
+    if workflow_id_scope is None:
+        return CallRecord.create(
+            "generate_plan", "claude-opus-4-5-20251101", USAGE, "tool_use"
+        )
+    with workflow_scope(workflow_id_scope):
+        return CallRecord.create(
+            "generate_plan", "claude-opus-4-5-20251101", USAGE, "tool_use"
+        )
+
+
+class TestCallCost:
+    """Test suite for call_cost."""
+
+    def test_prices_every_token_kind(self) -> None:
+        """Input, output, cache write and cache read tokens are all billed."""
+        cost = call_cost("claude-opus-4-5-20251101", USAGE)
+
+        # 1k * $5 + 2k * $25 + 4k * $6.25 + 10k * $0.50, per million tokens.
+        assert cost == pytest.approx(0.085)
+
+    def test_batch_calls_are_half_price(self) -> None:
+        """Message Batches results cost half as much."""
+        standard = call_cost("claude-opus-4-5-20251101", USAGE)
+        batch = call_cost("claude-opus-4-5-20251101", USAGE, batch=True)
+
+        assert standard is not None
+        assert batch == pytest.approx(standard / 2)
+
+    def test_unknown_model_has_no_cost(self) -> None:
+        """Models without pricing are reported as None, not zero."""
+        assert call_cost("some-other-model", USAGE) is None
+
+
+class TestCallRecord:
+    """Test suite for CallRecord and workflow tagging."""
+
+    def test_create_tags_current_workflow(self) -> None:
+        """Records created inside workflow_scope carry the workflow ID."""
+        assert _record("wf-1").workflow_id == "wf-1"
+        assert _record().workflow_id is None
+
+    def test_summary_is_json_compatible(self) -> None:
+        """The metadata summary can be stored in a JSON plan cache."""
+        summary = _record().summary()
+
+        assert json.loads(json.dumps(summary)) == summary
+        assert summary["cost_usd"] == pytest.approx(0.085)
+
+
+class TestCallSinks:
+    """Test suite for the JSONL and in-memory sinks."""
+
+    def test_jsonl_sink_appends_one_line_per_call(self, tmp_path: Path) -> None:
+        """Each record becomes one JSON object per line."""
+        path = tmp_path / "calls" / "calls.jsonl"
+        sink = JsonlCallSink(path)
+
+        sink.record(_record("wf-1"))
+        sink.record(_record("wf-2"))
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["workflow_id"] for line in lines] == ["wf-1", "wf-2"]
+        assert lines[0]["output_tokens"] == 2_000
+
+    def test_in_memory_sink_totals_per_workflow(self) -> None:
+        """Totals aggregate all calls or only one workflow's calls."""
+        sink = InMemoryCallSink()
+        for workflow_id in ("wf-1", "wf-1", "wf-2"):
+            sink.record(_record(workflow_id))
+
+        per_workflow = sink.totals("wf-1")
+        overall = sink.totals()
+
+        assert per_workflow.calls == 2
+        assert per_workflow.output_tokens == 4_000
+        assert per_workflow.cost_usd == pytest.approx(0.17)
+        assert overall.calls == 3
+
+
+class TestCallTimer:
+    """Test suite for CallTimer."""
+
+    def test_measures_elapsed_and_first_token(self) -> None:
+        """Only the first mark_first_token call is recorded."""
+        ticks = iter([0.0, 0.4, 0.9, 2.0])
+        timer = CallTimer(clock=lambda: next(ticks))
+
+        timer.mark_first_token()
+        timer.mark_first_token()
+
+        assert timer.time_to_first_token == pytest.approx(0.4)
+        assert timer.elapsed() == pytest.approx(0.9)
+
+    def test_queue_time_is_kept_out_of_latency(self) -> None:
+        """Time before mark_sent is queue time, not call latency."""
+        ticks = iter([0.0, 3.0, 3.5, 5.0])
+        timer = CallTimer(clock=lambda: next(ticks))
+
+        timer.mark_sent()
+        timer.mark_first_token()
+        timer.mark_sent()
+
+        assert timer.queue_seconds == pytest.approx(3.0)
+        assert timer.time_to_first_token == pytest.approx(0.5)
+        assert timer.elapsed() == pytest.approx(2.0)
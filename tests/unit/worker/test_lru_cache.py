@@ -0,0 +1,63 @@
+"""Unit tests for the LRU cache."""
+
+import pytest
+
+from troller.worker.adapters.lru_cache import LRUCache
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUCache:
+    """Test suite for LRUCache."""
+
+    def test_rejects_non_positive_size(self) -> None:
+        """LRUCache requires room for at least one entry."""
+        with pytest.raises(ValueError, match="max_entries must be at least 1"):
+            LRUCache[str, int](0)
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Reading an entry protects it from eviction."""
+        cache: LRUCache[str, int] = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+
+        cache.put("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_expires_entries_after_ttl(self) -> None:
+        """Entries older than the TTL are treated as missing."""
+        clock = FakeClock()
+        cache: LRUCache[str, int] = LRUCache(10, ttl_seconds=5, clock=clock)
+        cache.put("a", 1)
+
+        clock.now = 5
+        assert cache.get("a") == 1
+
+        clock.now = 5.1
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_pop_and_clear(self) -> None:
+        """pop removes one entry and clear removes all."""
+        cache: LRUCache[str, int] = LRUCache(10)
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+
+        cache.clear()
+        assert len(cache) == 0
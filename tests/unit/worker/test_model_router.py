@@ -0,0 +1,149 @@
+"""Unit tests for the planning model cascade."""
+
+from datetime import datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from troller.domain.models.plan import Plan, PlanStep
+from troller.worker.adapters.claude_client import AsyncClaudeClient, ClaudeClient
+from troller.worker.adapters.model_router import (
+    DEFAULT_SIMPLE_THRESHOLD,
+    AsyncPlanRouter,
+    PlanRouter,
+    RoutingStats,
+    triage_issue,
+    validate_plan,
+)
+
+COMPLEX_BODY = (
+    "Move session handling out of src/app/views.py into src/app/session.py, "
+    "update src/app/middleware.py and src/app/settings.py accordingly.\n" * 20
+)
+
+
+def _plan(summary: str = "Fix it", stop_reason: str = "tool_use", **step: Any) -> Plan:
+    fields = {"id": "step-1", "description": "Edit the file", "completed": False}
+    return Plan(
+        summary=summary,
+        steps=[PlanStep(**{**fields, **step})],
+        created_at=datetime(2025, 1, 1),
+        metadata={
+            "call": {"stop_reason": stop_reason},
+            "usage": {"input_tokens": 800, "output_tokens": 120},
+        },
+    )
+
+
+class TestTriageIssue:
+    """Test suite for triage_issue."""
+
+    def test_short_typo_issue_is_simple(self) -> None:
+        """A one-line typo fix scores as simple."""
+        triage = triage_issue("Fix typo in README", "Teh -> The", ["documentation"])
+
+        assert triage.score <= DEFAULT_SIMPLE_THRESHOLD
+        assert "title mentions 'typo'" in triage.reasons
+
+    def test_short_body_alone_is_not_simple(self) -> None:
+        """One simple signal is not enough for the cheap model."""
+        triage = triage_issue("Crash when saving", "It crashes.")
+
+        assert triage.reasons == ("short body",)
+        assert triage.score > DEFAULT_SIMPLE_THRESHOLD
+
+    def test_long_multi_file_feature_is_complex(self) -> None:
+        """Long issues touching many files with feature labels score high."""
+        triage = triage_issue("Extract session layer", COMPLEX_BODY, ["enhancement"])
+
+        assert triage.score >= 5
+        assert "mentions 4 files" in triage.reasons
+
+
+class TestValidatePlan:
+    """Test suite for validate_plan."""
+
+    def test_accepts_well_formed_plan(self) -> None:
+        """A plan with a summary and described steps has no problems."""
+        assert validate_plan(_plan()) == []
+
+    def test_reports_truncated_and_empty_output(self) -> None:
+        """Truncated output and blank fields are reported."""
+        problems = validate_plan(_plan(" ", stop_reason="max_tokens", description=""))
+
+        assert problems == [
+            "summary is empty",
+            "step 'step-1' has no description",
+            "output was truncated at max_tokens",
+        ]
+
+
+class TestPlanRouter:
+    """Test suite for PlanRouter."""
+
+    def test_simple_issue_is_planned_on_cheap_model(self) -> None:
+        """Simple issues never reach the strong model."""
+        cheap = MagicMock(spec=ClaudeClient)
+        strong = MagicMock(spec=ClaudeClient)
+        cheap.generate_plan.return_value = _plan()
+        router = PlanRouter(cheap, strong)
+
+        plan = router.generate_plan("Fix typo", "Teh -> The", 3)
+
+        strong.generate_plan.assert_not_called()
+        assert plan.metadata["routing"]["tier"] == "cheap"
+        assert plan.metadata["routing"]["escalated"] is False
+        assert router.stats() == RoutingStats(cheap=1, strong=0, escalated=0)
+
+    def test_complex_issue_goes_straight_to_strong_model(self) -> None:
+        """Complex issues skip the cheap model."""
+        cheap = MagicMock(spec=ClaudeClient)
+        strong = MagicMock(spec=ClaudeClient)
+        strong.generate_plan.return_value = _plan()
+        router = PlanRouter(cheap, strong)
+
+        plan = router.generate_plan("Extract session layer", COMPLEX_BODY, 4)
+
+        cheap.generate_plan.assert_not_called()
+        assert plan.metadata["routing"]["tier"] == "strong"
+        assert router.stats() == RoutingStats(cheap=0, strong=1, escalated=0)
+
+    def test_invalid_cheap_plan_escalates(self) -> None:
+        """A cheap plan failing validation is replaced by a strong plan."""
+        cheap = MagicMock(spec=ClaudeClient)
+        strong = MagicMock(spec=ClaudeClient)
+        cheap.generate_plan.return_value = _plan(stop_reason="max_tokens")
+        strong.generate_plan.return_value = _plan("Strong plan")
+        router = PlanRouter(cheap, strong)
+
+        plan = router.generate_plan("Fix typo", "Teh -> The", 3)
+
+        assert plan.summary == "Strong plan"
+        assert plan.metadata["routing"]["escalated"] is True
+        assert plan.metadata["routing"]["rejected_cheap_plan"] == [
+            "output was truncated at max_tokens"
+        ]
+        assert plan.metadata["routing"]["rejected_cheap_usage"] == {
+            "input_tokens": 800,
+            "output_tokens": 120,
+        }
+        assert router.stats() == RoutingStats(cheap=0, strong=1, escalated=1)
+
+
+class TestAsyncPlanRouter:
+    """Test suite for AsyncPlanRouter."""
+
+    async def test_invalid_cheap_plan_escalates(self) -> None:
+        """The async router escalates just like the blocking one."""
+        cheap = MagicMock(spec=AsyncClaudeClient)
+        strong = MagicMock(spec=AsyncClaudeClient)
+        cheap.generate_plan = AsyncMock(return_value=_plan(description=" "))
+        strong.generate_plan = AsyncMock(return_value=_plan("Strong plan"))
+        router = AsyncPlanRouter(cheap, strong)
+
+        plan = await router.generate_plan("Bump version", "", 9)
+
+        assert plan.summary == "Strong plan"
+        cheap.generate_plan.assert_awaited_once_with(
+            "Bump version", "", 9, None, validate_plan
+        )
+        assert router.stats() == RoutingStats(cheap=0, strong=1, escalated=1)
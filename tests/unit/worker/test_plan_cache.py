@@ -0,0 +1,157 @@
+"""Unit tests for the content-addressed plan cache."""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from troller.domain.models.plan import Plan, PlanStep
+from troller.worker.adapters import plan_cache
+from troller.worker.adapters.plan_cache import PlanCache, plan_cache_key
+
+
+class FakeClock:
+    """Manually advanced wall-clock time source."""
+
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _plan(summary: str = "Plan") -> Plan:
+    return Plan(
+        summary=summary,
+        steps=[
+            PlanStep(
+                id="step-1",
+                description="Do it",
+                completed=False,
+                related_files=["src/app.py"],
+            )
+        ],
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        metadata={"issue_number": 1},
+    )
+
+
+def test_plan_cache_key_changes_with_every_input() -> None:
+    """Every planning input contributes to the cache key."""
+    base = plan_cache_key("Title", "Body", 1, "model-a", "1")
+
+    assert base == plan_cache_key("Title", "Body", 1, "model-a", "1")
+    assert base != plan_cache_key("Title!", "Body", 1, "model-a", "1")
+    assert base != plan_cache_key("Title", "Body!", 1, "model-a", "1")
+    assert base != plan_cache_key("Title", "Body", 2, "model-a", "1")
+    assert base != plan_cache_key("Title", "Body", 1, "model-b", "1")
+    assert base != plan_cache_key("Title", "Body", 1, "model-a", "2")
+
+
+class TestPlanCache:
+    """Test suite for PlanCache."""
+
+    def test_memory_only_round_trip(self) -> None:
+        """A plan stored in memory is returned on the next lookup."""
+        cache = PlanCache()
+        plan = _plan()
+
+        assert cache.get("k") is None
+        cache.put("k", plan)
+
+        assert cache.get("k") is plan
+        stats = cache.stats()
+        assert (stats.memory_hits, stats.disk_hits, stats.misses) == (1, 0, 1)
+
+    def test_disk_tier_survives_new_instance(self, tmp_path: Path) -> None:
+        """Plans persisted to disk are served by a fresh cache instance."""
+        db_path = tmp_path / "plans.sqlite3"
+        first = PlanCache(disk_path=db_path)
+        first.put("k", _plan("Persisted"))
+        first.close()
+
+        second = PlanCache(disk_path=db_path)
+        restored = second.get("k")
+
+        assert restored == _plan("Persisted")
+        assert second.stats().disk_hits == 1
+        assert second.get("k") == restored
+        assert second.stats().memory_hits == 1
+
+    def test_expired_entries_are_misses(self, tmp_path: Path) -> None:
+        """Entries older than the TTL are not served from either tier."""
+        clock = FakeClock()
+        cache = PlanCache(
+            disk_path=tmp_path / "plans.sqlite3", ttl_seconds=60, clock=clock
+        )
+        cache.put("k", _plan())
+
+        clock.now += 61
+
+        assert cache.get("k") is None
+        assert cache.stats().misses == 1
+
+    def test_disk_hit_keeps_its_age_in_memory(self, tmp_path: Path) -> None:
+        """A plan promoted from disk expires when the disk entry would."""
+        clock = FakeClock()
+        db_path = tmp_path / "plans.sqlite3"
+        first = PlanCache(disk_path=db_path, ttl_seconds=60, clock=clock)
+        first.put("k", _plan())
+        first.close()
+        second = PlanCache(disk_path=db_path, ttl_seconds=60, clock=clock)
+
+        clock.now += 50
+        assert second.get("k") == _plan()
+        clock.now += 11
+
+        assert second.get("k") is None
+        assert second.stats().misses == 1
+
+    def test_disk_tier_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """The disk tier keeps at most max_disk_entries rows."""
+        clock = FakeClock()
+        db_path = tmp_path / "plans.sqlite3"
+        cache = PlanCache(
+            disk_path=db_path, max_memory_entries=1, max_disk_entries=2, clock=clock
+        )
+        cache.put("a", _plan("A"))
+        clock.now += 1
+        cache.put("b", _plan("B"))
+        clock.now += 1
+        cache.get("a")
+        clock.now += 1
+        cache.put("c", _plan("C"))
+        cache.close()
+
+        reopened = PlanCache(disk_path=db_path, clock=clock)
+        assert reopened.get("a") is not None
+        assert reopened.get("b") is None
+        assert reopened.get("c") is not None
+
+    def test_expired_rows_are_swept_periodically(self, tmp_path: Path) -> None:
+        """Expired rows leave the disk on the next sweep, not on every write."""
+        clock = FakeClock()
+        db_path = tmp_path / "plans.sqlite3"
+        with patch.object(plan_cache, "_PRUNE_EVERY_WRITES", 3):
+            cache = PlanCache(disk_path=db_path, ttl_seconds=10, clock=clock)
+            cache.put("old", _plan())
+            clock.now += 11
+            cache.put("a", _plan())
+            rows_before_sweep = _rows(db_path)
+            cache.put("b", _plan())
+            cache.close()
+
+        assert rows_before_sweep == ["a", "old"]
+        assert _rows(db_path) == ["a", "b"]
+        with closing(sqlite3.connect(db_path)) as db:
+            indexes = db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND tbl_name = 'plans' AND sql IS NOT NULL"
+            ).fetchall()
+        assert indexes == [("plans_accessed_at",)]
+
+
+def _rows(db_path: Path) -> list[str]:
+    with closing(sqlite3.connect(db_path)) as db:
+        return sorted(key for (key,) in db.execute("SELECT key FROM plans"))
@@ -0,0 +1,107 @@
+"""Unit tests for the compact plan codec and Temporal payload converter."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from temporalio.converter import DataConverter
+
+from troller.domain.models.plan import CompletionDelta, Plan, PlanStep
+from troller.worker.adapters.plan_codec import (
+    ENCODING,
+    decode_plan,
+    encode_plan,
+    plan_data_converter,
+)
+
+
+def _plan(step_count: int = 3) -> Plan:
+    return Plan(
+        summary="Add retries to the GitHub adapter",
+        steps=[
+            PlanStep(
+                id=f"step-{n}",
+                description=f"Update the adapter, part {n}",
+                completed=n % 2 == 0,
+                related_files=[
+                    "src/troller/worker/adapters/github_client.py",
+                    "tests/unit/worker/test_github_client.py",
+                ],
+                estimated_complexity="moderate" if n % 3 else None,
+            )
+            for n in range(1, step_count + 1)
+        ],
+        created_at=datetime(2025, 1, 15, 10, 30, tzinfo=timezone.utc),
+        metadata={"issue_number": 7, "usage": {"input_tokens": 10}},
+        technical_approach="Wrap calls",
+        testing_strategy=None,
+    )
+
+
+class TestPlanCodec:
+    """Test suite for encode_plan and decode_plan."""
+
+    def test_round_trip_preserves_plan(self) -> None:
+        """A decoded plan equals the original."""
+        plan = _plan()
+
+        assert decode_plan(encode_plan(plan)) == plan
+
+    def test_round_trip_through_compression(self) -> None:
+        """Large plans are compressed and still decode to the original."""
+        plan = _plan(step_count=50)
+
+        encoded = encode_plan(plan, compression_threshold=1)
+
+        assert encoded[:1] == b"\x01"
+        assert decode_plan(encoded) == plan
+
+    def test_encoding_is_smaller_than_json(self) -> None:
+        """Interned paths and positional steps beat the plain JSON form."""
+        plan = _plan(step_count=20)
+
+        uncompressed = encode_plan(plan, compression_threshold=10**9)
+
+        assert len(uncompressed) < len(json.dumps(plan.to_dict())) / 2
+
+    def test_decoded_paths_share_one_string(self) -> None:
+        """Repeated related files decode to the same string object."""
+        plan = decode_plan(encode_plan(_plan()))
+
+        first, second = plan.steps[0], plan.steps[1]
+        assert first.related_files is not None and second.related_files is not None
+        assert first.related_files[0] is second.related_files[0]
+
+    def test_decode_rejects_unknown_marker(self) -> None:
+        """Data without a known frame marker is rejected."""
+        with pytest.raises(ValueError, match="unknown plan payload marker"):
+            decode_plan(b"{}")
+
+
+class TestPlanPayloadConverter:
+    """Test suite for the Temporal data converter."""
+
+    async def test_models_round_trip_through_data_converter(self) -> None:
+        """Plan, PlanStep and CompletionDelta use the compact encoding."""
+        plan = _plan()
+        values = [
+            plan,
+            plan.steps[0],
+            CompletionDelta(step_count=3, completed=0b101, reopened=0b010),
+        ]
+
+        payloads = await plan_data_converter.encode(values)
+        decoded = await plan_data_converter.decode(payloads)
+
+        assert decoded == values
+        assert {payload.metadata["encoding"] for payload in payloads} == {
+            ENCODING.encode()
+        }
+
+    async def test_other_values_use_default_converters(self) -> None:
+        """Values that are not plan models fall through to JSON."""
+        payloads = await plan_data_converter.encode([{"a": 1}, None])
+
+        assert await plan_data_converter.decode(payloads) == [{"a": 1}, None]
+        default_payloads = await DataConverter.default.encode([{"a": 1}, None])
+        assert payloads == default_payloads
@@ -0,0 +1,77 @@
+"""Unit tests for incremental plan stream parsing."""
+
+import json
+
+from troller.domain.models.plan import PlanStep
+from troller.worker.adapters.plan_stream import (
+    IncrementalPlanParser,
+    StreamedStep,
+    StreamedSummary,
+)
+
+PLAN_INPUT = {
+    "summary": 'Fix the "login" bug {quickly}',
+    "steps": [
+        {
+            "id": "step-1",
+            "description": "Reproduce with [brackets] and \\\\ escapes",
+            "completed": False,
+            "related_files": ["src/auth.py"],
+            "estimated_complexity": "simple",
+        },
+        {"id": "step-2", "description": "Fix it", "completed": False},
+    ],
+    "technical_approach": "Patch the validator",
+    "testing_strategy": None,
+}
+
+
+class TestIncrementalPlanParser:
+    """Test suite for IncrementalPlanParser."""
+
+    def test_emits_summary_and_steps_when_fed_one_character_at_a_time(
+        self,
+    ) -> None:
+        """Values are emitted exactly once regardless of fragment boundaries."""
+        parser = IncrementalPlanParser()
+        events = []
+        for char in json.dumps(PLAN_INPUT):
+            events.extend(parser.feed(char))
+
+        assert events == [
+            StreamedSummary(summary='Fix the "login" bug {quickly}'),
+            StreamedStep(
+                PlanStep(
+                    id="step-1",
+                    description="Reproduce with [brackets] and \\\\ escapes",
+                    completed=False,
+                    related_files=["src/auth.py"],
+                    estimated_complexity="simple",
+                )
+            ),
+            StreamedStep(PlanStep(id="step-2", description="Fix it", completed=False)),
+        ]
+
+    def test_emits_step_before_later_steps_arrive(self) -> None:
+        """A step is emitted as soon as its closing brace is seen."""
+        text = json.dumps(PLAN_INPUT)
+        first_step_end = text.index('"step-2"')
+        parser = IncrementalPlanParser()
+
+        early = parser.feed(text[:first_step_end])
+        late = parser.feed(text[first_step_end:])
+
+        assert [type(event) for event in early] == [StreamedSummary, StreamedStep]
+        assert late == [
+            StreamedStep(PlanStep(id="step-2", description="Fix it", completed=False))
+        ]
+
+    def test_ignores_strings_outside_summary(self) -> None:
+        """Other top-level string values are not mistaken for the summary."""
+        parser = IncrementalPlanParser()
+
+        events = parser.feed(
+            '{"technical_approach": "summary", "steps": [], "summary": "Real"}'
+        )
+
+        assert events == [StreamedSummary(summary="Real")]
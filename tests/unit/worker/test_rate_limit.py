@@ -0,0 +1,218 @@
+"""Unit tests for the rate-limit scheduler."""
+
+import threading
+
+import pytest
+
+from troller.worker.adapters.rate_limit import (
+    ANTHROPIC,
+    GITHUB,
+    Priority,
+    RateLimitScheduler,
+    get_shared_scheduler,
+)
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep moves time forward."""
+
+    def __init__(self, start: float = 1_000.0) -> None:
+        self.now = start
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock: FakeClock, jitter: float = 0.0) -> RateLimitScheduler:
+    return RateLimitScheduler(clock=clock, wall_clock=clock, jitter=lambda: jitter)
+
+
+class TestRateLimitScheduler:
+    """Test suite for RateLimitScheduler."""
+
+    def test_acquire_within_capacity_does_not_wait(self) -> None:
+        """Calls inside the burst capacity go through immediately."""
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+        scheduler.configure("api", capacity=3, refill_per_second=1)
+
+        for _ in range(3):
+            scheduler.acquire("api", sleep=clock.sleep)
+
+        assert clock.sleeps == []
+        stats = scheduler.stats("api")
+        assert stats.acquired == 3
+        assert stats.throttled == 0
+
+    def test_acquire_waits_for_refill_when_empty(self) -> None:
+        """An exhausted bucket makes the next caller wait for a token."""
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+        scheduler.configure("api", capacity=1, refill_per_second=4)
+
+        scheduler.acquire("api", sleep=clock.sleep)
+        scheduler.acquire("api", sleep=clock.sleep)
+
+        assert sum(clock.sleeps) == pytest.approx(0.25)
+        stats = scheduler.stats("api")
+        assert stats.throttled == 1
+        assert stats.total_wait_seconds == pytest.approx(0.25)
+
+    def test_observe_github_headers_spreads_remaining_budget(self) -> None:
+        """x-ratelimit headers set the refill rate for the rest of the window."""
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+
+        scheduler.observe_headers(
+            GITHUB,
+            {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": str(clock.now + 100)},
+        )
+
+        stats = scheduler.stats(GITHUB)
+        assert stats.tokens == 10
+        assert stats.refill_per_second == pytest.approx(0.1)
+
+    def test_observe_anthropic_headers(self) -> None:
+        """anthropic-ratelimit-requests headers are understood too."""
+        clock = FakeClock(start=1_700_000_000.0)
+        scheduler = _scheduler(clock)
+
+        scheduler.observe_headers(
+            ANTHROPIC,
+            {
+                "anthropic-ratelimit-requests-remaining": "30",
+                "anthropic-ratelimit-requests-reset": "2023-11-14T22:13:50Z",
+            },
+        )
+
+        stats = scheduler.stats(ANTHROPIC)
+        assert stats.tokens == 30
+        assert stats.refill_per_second == pytest.approx(1.0)
+
+    def test_observe_anthropic_token_headers(self) -> None:
+        """The budget closest to exhaustion, tokens included, sets the rate."""
+        clock = FakeClock(start=1_700_000_000.0)
+        scheduler = _scheduler(clock)
+
+        scheduler.observe_headers(
+            ANTHROPIC,
+            {
+                "anthropic-ratelimit-requests-limit": "50",
+                "anthropic-ratelimit-requests-remaining": "45",
+                "anthropic-ratelimit-requests-reset": "2023-11-14T22:13:50Z",
+                "anthropic-ratelimit-input-tokens-limit": "40000",
+                "anthropic-ratelimit-input-tokens-remaining": "8000",
+                "anthropic-ratelimit-input-tokens-reset": "2023-11-14T22:13:40Z",
+                "anthropic-ratelimit-output-tokens-limit": "8000",
+                "anthropic-ratelimit-output-tokens-remaining": "6000",
+                "anthropic-ratelimit-output-tokens-reset": "2023-11-14T22:13:30Z",
+            },
+        )
+
+        stats = scheduler.stats(ANTHROPIC)
+        # 20% of input tokens left: 10 of the 50 requests' worth, over 20s.
+        assert stats.tokens == 10
+        assert stats.refill_per_second == pytest.approx(0.5)
+
+    def test_exhausted_token_budget_blocks_anthropic_calls(self) -> None:
+        """No output tokens left blocks calls until that budget resets."""
+        clock = FakeClock(start=1_700_000_000.0)
+        scheduler = _scheduler(clock)
+
+        scheduler.observe_headers(
+            ANTHROPIC,
+            {
+                "anthropic-ratelimit-requests-remaining": "45",
+                "anthropic-ratelimit-requests-reset": "2023-11-14T22:14:20Z",
+                "anthropic-ratelimit-output-tokens-remaining": "0",
+                "anthropic-ratelimit-output-tokens-reset": "2023-11-14T22:13:30Z",
+            },
+        )
+        scheduler.acquire(ANTHROPIC, sleep=clock.sleep)
+
+        assert sum(clock.sleeps) == pytest.approx(10)
+
+    def test_exhausted_budget_blocks_until_window_reset(self) -> None:
+        """Zero remaining blocks callers until the reset, then restores capacity."""
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+        scheduler.configure("api", capacity=5, refill_per_second=1)
+
+        scheduler.observe("api", remaining=0, reset_at_epoch=clock.now + 30)
+        scheduler.acquire("api", sleep=clock.sleep)
+
+        assert sum(clock.sleeps) == pytest.approx(30)
+        assert scheduler.stats("api").tokens == 4
+
+    def test_backoff_honours_retry_after_with_jitter(self) -> None:
+        """retry-after sets the backoff base and jitter stretches it."""
+        clock = FakeClock()
+        scheduler = _scheduler(clock, jitter=0.5)
+
+        delay = scheduler.backoff(ANTHROPIC, headers={"Retry-After": "8"})
+
+        assert delay == pytest.approx(10)
+        scheduler.acquire(ANTHROPIC, sleep=clock.sleep)
+        assert sum(clock.sleeps) == pytest.approx(10)
+        assert scheduler.stats(ANTHROPIC).backoffs == 1
+
+    def test_backoff_is_exponential_without_retry_after(self) -> None:
+        """Without retry-after the delay doubles with each attempt."""
+        scheduler = _scheduler(FakeClock())
+
+        delays = [scheduler.backoff(GITHUB, attempt=n) for n in range(3)]
+
+        assert delays == [1.0, 2.0, 4.0]
+
+    def test_backoff_grows_with_consecutive_errors_until_success(self) -> None:
+        """Without an attempt, repeated rate-limit errors back off further."""
+        scheduler = _scheduler(FakeClock())
+
+        delays = [scheduler.backoff(GITHUB) for _ in range(3)]
+        scheduler.record_success(GITHUB)
+
+        assert delays == [1.0, 2.0, 4.0]
+        assert scheduler.backoff(GITHUB) == 1.0
+
+    def test_higher_priority_waiter_is_served_first(self) -> None:
+        """A background call yields while a planning call is waiting."""
+        scheduler = RateLimitScheduler()
+        scheduler.configure("api", capacity=1, refill_per_second=20)
+        scheduler.acquire("api")
+        order: list[str] = []
+
+        def call(name: str, priority: Priority) -> None:
+            scheduler.acquire("api", priority)
+            order.append(name)
+
+        background = threading.Thread(
+            target=call, args=("background", Priority.BACKGROUND)
+        )
+        planning = threading.Thread(target=call, args=("planning", Priority.PLANNING))
+        planning.start()
+        background.start()
+        planning.join()
+        background.join()
+
+        assert order == ["planning", "background"]
+
+    async def test_acquire_async_waits_for_refill(self) -> None:
+        """acquire_async draws from the same bucket without blocking the loop."""
+        scheduler = RateLimitScheduler()
+        scheduler.configure("api", capacity=1, refill_per_second=50)
+
+        await scheduler.acquire_async("api")
+        await scheduler.acquire_async("api")
+
+        stats = scheduler.stats("api")
+        assert stats.acquired == 2
+        assert stats.throttled == 1
+
+    def test_shared_scheduler_is_a_singleton(self) -> None:
+        """get_shared_scheduler returns the same instance on every call."""
+        assert get_shared_scheduler() is get_shared_scheduler()
@@ -0,0 +1,329 @@
+"""Unit tests for the incremental repository index."""
+
+import subprocess
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from troller.worker.adapters import repo_index
+from troller.worker.adapters.repo_index import (
+    IndexUpdate,
+    RepositoryIndex,
+    RepositoryIndexes,
+    Symbol,
+    extract_symbols,
+    terms,
+)
+from troller.worker.adapters.workspaces import GitCommandError, Workspace
+
+CACHE_MODULE = '''"""Plan cache."""
+
+
+class PlanCache:
+    """Caches generated plans."""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, plan):
+        pass
+
+
+def plan_cache_key(title, body):
+    return title
+'''
+
+LIMITER_MODULE = """class ConcurrencyLimiter:
+    def acquire(self):
+        pass
+
+
+def get_shared_limiter():
+    return ConcurrencyLimiter()
+"""
+
+
+def _git(cwd: Path, *args: str) -> str:
+    completed = subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return completed.stdout.strip()
+
+
+def _commit(repo: Path, files: dict[str, str | None]) -> str:
+    """Write (or, for None, delete) files and commit; returns the new SHA."""
+    for name, content in files.items():
+        path = repo / name
+        if content is None:
+            path.unlink()
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _git(repo, "add", "--all")
+    _git(
+        repo,
+        "-c",
+        "user.name=Test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "--quiet",
+        "-m",
+        "Update",
+    )
+    return _git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "--quiet", "--initial-branch=main")
+    _commit(
+        repo,
+        {
+            "src/app/plan_cache.py": CACHE_MODULE,
+            "src/app/concurrency.py": LIMITER_MODULE,
+            "README.md": "Plans GitHub issues.\n",
+            "logo.png": "\x89PNG",
+        },
+    )
+    return repo
+
+
+def test_terms_split_identifiers() -> None:
+    """Identifiers yield their parts and the joined compound."""
+    assert terms("GitHubClient plan_cache_key of HTTPServer") == [
+        "git",
+        "hub",
+        "client",
+        "githubclient",
+        "plan",
+        "cache",
+        "key",
+        "plancachekey",
+        "http",
+        "server",
+        "httpserver",
+    ]
+
+
+def test_extract_symbols_reports_kind_and_line() -> None:
+    """Python definitions are found with their line numbers."""
+    assert extract_symbols("src/app/concurrency.py", LIMITER_MODULE) == (
+        Symbol("ConcurrencyLimiter", "class", 1),
+        Symbol("acquire", "def", 2),
+        Symbol("get_shared_limiter", "def", 6),
+    )
+    assert extract_symbols("README.md", "# class Heading") == ()
+
+
+class TestRepositoryIndex:
+    """Test suite for RepositoryIndex."""
+
+    def test_build_indexes_text_files_of_commit(self, repo: Path) -> None:
+        """Every indexable file of the commit is indexed."""
+        index = RepositoryIndex()
+
+        update = index.build(repo, "HEAD")
+
+        assert update == IndexUpdate(
+            _git(repo, "rev-parse", "HEAD"), None, True, 3, 0, 0
+        )
+        assert len(index) == 3
+        assert [s.name for s in index.symbols("src/app/plan_cache.py")] == [
+            "PlanCache",
+            "get",
+            "put",
+            "plan_cache_key",
+        ]
+
+    def test_search_ranks_matching_file_first(self, repo: Path) -> None:
+        """BM25 puts the file whose terms match the query on top."""
+        index = RepositoryIndex()
+        index.build(repo, "HEAD")
+
+        ranked = index.search("Plan cache returns stale plans")
+
+        assert ranked[0].path == "src/app/plan_cache.py"
+        assert [s.name for s in ranked[0].symbols] == ["PlanCache", "plan_cache_key"]
+        assert all(r.path != "src/app/concurrency.py" for r in ranked)
+
+    def test_advance_reads_only_changed_files(self, repo: Path) -> None:
+        """Moving to a new commit re-reads the diff, not the whole tree."""
+        index = RepositoryIndex()
+        index.build(repo, "HEAD")
+        sha = _commit(
+            repo,
+            {
+                "src/app/concurrency.py": None,
+                "src/app/rate_limit.py": "class RateLimitScheduler:\n    pass\n",
+                "README.md": "Plans and implements GitHub issues.\n",
+            },
+        )
+
+        with patch.object(
+            repo_index, "_read_blobs", wraps=repo_index._read_blobs
+        ) as read:
+            update = index.advance(repo, sha)
+
+        [(_, blobs)] = [call.args for call in read.call_args_list]
+        assert sorted(path for path, _ in blobs) == [
+            "README.md",
+            "src/app/rate_limit.py",
+        ]
+        assert (update.added, update.modified, update.removed) == (1, 1, 1)
+        assert not update.rebuilt
+        assert index.commit == sha
+        assert index.search("concurrency limiter") == []
+        assert index.search("rate limit")[0].path == "src/app/rate_limit.py"
+
+    def test_advance_matches_full_build(self, repo: Path) -> None:
+        """An advanced index ranks exactly like one built from scratch."""
+        advanced = RepositoryIndex()
+        advanced.build(repo, "HEAD")
+        sha = _commit(
+            repo,
+            {"src/app/plan_cache.py": CACHE_MODULE.replace("PlanCache", "PlanStore")},
+        )
+        advanced.advance(repo, sha)
+        built = RepositoryIndex()
+        built.build(repo, sha)
+
+        query = "plan store cache limiter"
+        assert advanced.search(query) == built.search(query)
+
+    def test_failed_advance_keeps_previous_commit(self, repo: Path) -> None:
+        """A read failing partway leaves the index exactly as it was."""
+        index = RepositoryIndex()
+        index.build(repo, "HEAD")
+        before = index.commit, index.search("plan cache limiter")
+        sha = _commit(
+            repo,
+            {
+                "src/app/concurrency.py": None,
+                "src/app/plan_cache.py": "class PlanStore:\n    pass\n",
+                "src/app/rate_limit.py": "class RateLimitScheduler:\n    pass\n",
+            },
+        )
+        read_blobs = repo_index._read_blobs
+
+        def failing(
+            git_dir: Path, blobs: list[tuple[str, str]]
+        ) -> Iterator[tuple[str, bytes | None]]:
+            reader = read_blobs(git_dir, blobs)
+            yield next(reader)
+            reader.close()
+            raise GitCommandError("git cat-file: unexpected end of output")
+
+        with patch.object(repo_index, "_read_blobs", side_effect=failing):
+            with pytest.raises(GitCommandError):
+                index.advance(repo, sha)
+
+        assert (index.commit, index.search("plan cache limiter")) == before
+
+    def test_abandoned_blob_read_does_not_hang(self, repo: Path) -> None:
+        """Closing the reader early stops cat-file even with pipes full."""
+        oid = _git(repo, "rev-parse", "HEAD:src/app/plan_cache.py")
+        # Far more requests and output than the pipes hold.
+        reader = repo_index._read_blobs(repo, [("f", oid)] * 20_000)
+        next(reader)
+
+        closer = threading.Thread(target=reader.close, daemon=True)
+        closer.start()
+        closer.join(5)
+
+        assert not closer.is_alive()
+
+    def test_advance_rebuilds_when_old_commit_is_gone(self, repo: Path) -> None:
+        """An index whose commit no longer exists is rebuilt."""
+        index = RepositoryIndex()
+        index.build(repo, "HEAD")
+        index._commit = "f" * 40
+
+        update = index.advance(repo, "HEAD")
+
+        assert update.rebuilt
+        assert update.previous == "f" * 40
+
+    def test_unknown_commit_raises(self, repo: Path) -> None:
+        """Revisions that do not resolve to a commit are git errors."""
+        with pytest.raises(GitCommandError, match="rev-parse"):
+            RepositoryIndex().build(repo, "no-such-branch")
+
+    def test_large_files_are_indexed_by_path_only(self, repo: Path) -> None:
+        """Files over MAX_FILE_BYTES contribute their path but no content."""
+        sha = _commit(repo, {"data/fixtures.json": '{"limiter": 1}\n' * 50})
+        index = RepositoryIndex()
+
+        with patch.object(repo_index, "MAX_FILE_BYTES", 400):
+            index.build(repo, sha)
+
+        assert index.search("limiter")[0].path == "src/app/concurrency.py"
+        assert index.search("fixtures")[0].path == "data/fixtures.json"
+
+    def test_planning_context_puts_referenced_files_first(self, repo: Path) -> None:
+        """Files the issue names by path lead, then the best matches."""
+        index = RepositoryIndex()
+        index.build(repo, "HEAD")
+
+        context = index.planning_context(
+            "Plan cache misses", "See concurrency.py for the limiter.", max_files=2
+        )
+
+        assert [f.path for f in context.files] == [
+            "src/app/concurrency.py",
+            "src/app/plan_cache.py",
+        ]
+        assert context.files[0].referenced
+        assert context.commit == index.commit
+
+    def test_planning_context_reads_symbols_of_selected_files_only(
+        self, repo: Path
+    ) -> None:
+        """Files that miss the cut are scored but their symbols are not read."""
+        index = RepositoryIndex()
+        index.build(repo, "HEAD")
+
+        with patch.object(
+            index, "_matching_symbols", wraps=index._matching_symbols
+        ) as matching:
+            context = index.planning_context(
+                "Plan cache limiter", "Plans stall on the limiter.", max_files=1
+            )
+
+        assert len(index.search("Plan cache limiter plans stall", limit=10)) > 1
+        assert [f.path for f in context.files] == [
+            call.args[0] for call in matching.call_args_list
+        ]
+
+    def test_planning_context_requires_built_index(self) -> None:
+        """An empty index cannot select context."""
+        with pytest.raises(ValueError, match="not been built"):
+            RepositoryIndex().planning_context("T", "B")
+
+
+class TestRepositoryIndexes:
+    """Test suite for RepositoryIndexes."""
+
+    def test_follows_workspace_commits(self, repo: Path) -> None:
+        """The repository's index is reused and advanced to each commit."""
+        indexes = RepositoryIndexes()
+        first = Workspace(
+            "owner", "repo", "wf-1", repo, _git(repo, "rev-parse", "HEAD")
+        )
+        indexes.planning_context(first, "Plan cache", "")
+        sha = _commit(repo, {"src/app/rate_limit.py": "def schedule():\n    pass\n"})
+        second = Workspace("owner", "repo", "wf-2", repo, sha)
+
+        with patch.object(
+            RepositoryIndex, "build", autospec=True, side_effect=RepositoryIndex.build
+        ) as build:
+            context = indexes.planning_context(second, "Rate limit schedule", "")
+
+        build.assert_not_called()
+        assert context.commit == sha
+        assert context.files[0].path == "src/app/rate_limit.py"
@@ -0,0 +1,137 @@
+"""Unit tests for singleflight request coalescing."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from troller.worker.adapters.singleflight import (
+    SingleFlight,
+    SingleFlightStats,
+    get_shared_flight,
+)
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight."""
+
+    def test_concurrent_calls_share_one_request(self) -> None:
+        """Callers arriving while a request runs get its result."""
+        flight: SingleFlight[str, int] = SingleFlight()
+        release = threading.Event()
+        requests = 0
+
+        def request() -> int:
+            nonlocal requests
+            requests += 1
+            release.wait(5)
+            return 42
+
+        with ThreadPoolExecutor(4) as pool:
+            futures = [pool.submit(flight.do, "key", request) for _ in range(4)]
+            while flight.stats().calls < 4:
+                threading.Event().wait(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == [42, 42, 42, 42]
+        assert requests == 1
+        assert flight.stats() == SingleFlightStats(
+            calls=4, executed=1, coalesced=3, errors=0, in_flight=0
+        )
+
+    def test_error_is_shared_then_forgotten(self) -> None:
+        """Waiting callers see the error, and the next call retries."""
+        flight: SingleFlight[str, int] = SingleFlight()
+        release = threading.Event()
+
+        def failing() -> int:
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        with ThreadPoolExecutor(2) as pool:
+            futures = [pool.submit(flight.do, "key", failing) for _ in range(2)]
+            while flight.stats().calls < 2:
+                threading.Event().wait(0.001)
+            release.set()
+            for future in futures:
+                with pytest.raises(RuntimeError, match="boom"):
+                    future.result()
+
+        assert flight.do("key", lambda: 7) == 7
+        assert flight.stats().errors == 1
+        assert flight.stats().executed == 2
+
+    def test_sequential_and_distinct_calls_are_not_coalesced(self) -> None:
+        """Only calls overlapping in time with the same key are shared."""
+        flight: SingleFlight[str, str] = SingleFlight()
+
+        assert flight.do("a", lambda: "first") == "first"
+        assert flight.do("a", lambda: "second") == "second"
+        assert flight.do("b", lambda: "third") == "third"
+        assert flight.stats().coalesced == 0
+
+    async def test_async_calls_share_one_task(self) -> None:
+        """Concurrent coroutines with the same key await one request."""
+        flight: SingleFlight[str, int] = SingleFlight()
+        requests = 0
+
+        async def request() -> int:
+            nonlocal requests
+            requests += 1
+            await asyncio.sleep(0.01)
+            return requests
+
+        results = await asyncio.gather(
+            flight.do_async("key", request),
+            flight.do_async("key", request),
+            flight.do_async("other", request),
+        )
+
+        assert results[0] == results[1]
+        assert requests == 2
+        assert flight.stats() == SingleFlightStats(
+            calls=3, executed=2, coalesced=1, errors=0, in_flight=0
+        )
+
+    async def test_cancelled_caller_does_not_cancel_shared_request(self) -> None:
+        """Other callers still get the result when one of them gives up."""
+        flight: SingleFlight[str, str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def request() -> str:
+            await release.wait()
+            return "plan"
+
+        first = asyncio.ensure_future(flight.do_async("key", request))
+        second = asyncio.ensure_future(flight.do_async("key", request))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "plan"
+        assert first.cancelled()
+
+    async def test_async_error_reaches_every_caller(self) -> None:
+        """A failed async request raises in every waiting coroutine."""
+        flight: SingleFlight[str, str] = SingleFlight()
+
+        async def failing() -> str:
+            await asyncio.sleep(0)
+            raise ValueError("bad")
+
+        results = await asyncio.gather(
+            flight.do_async("key", failing),
+            flight.do_async("key", failing),
+            return_exceptions=True,
+        )
+
+        assert [type(result) for result in results] == [ValueError, ValueError]
+        assert flight.stats().errors == 1
+
+
+def test_get_shared_flight_returns_one_instance_per_name() -> None:
+    """Adapters asking for the same name share coalescing state."""
+    assert get_shared_flight("test-shared") is get_shared_flight("test-shared")
+    assert get_shared_flight("test-shared") is not get_shared_flight("test-other")
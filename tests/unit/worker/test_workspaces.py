@@ -0,0 +1,269 @@
+"""Unit tests for repository workspaces, against local git repositories."""
+
+import subprocess
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from troller.worker.adapters.workspaces import (
+    GitCommandError,
+    RepositoryWorkspaces,
+    WorkspaceStats,
+)
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _git(cwd: Path, *args: str) -> str:
+    completed = subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return completed.stdout.strip()
+
+
+def _commit(origin: Path, name: str, content: str) -> str:
+    (origin / name).write_text(content)
+    _git(origin, "add", name)
+    _git(
+        origin,
+        "-c",
+        "user.name=Test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "--quiet",
+        "-m",
+        f"Add {name}",
+    )
+    return _git(origin, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def origin(tmp_path: Path) -> Path:
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    _git(origin, "init", "--quiet", "--initial-branch=main")
+    _commit(origin, "README.md", "hello\n")
+    return origin
+
+
+def _workspaces(
+    tmp_path: Path, origin: Path, **kwargs: object
+) -> tuple[RepositoryWorkspaces, FakeClock]:
+    clock = FakeClock()
+    workspaces = RepositoryWorkspaces(
+        tmp_path / "workspaces",
+        remote_url=lambda owner, repo: str(origin),
+        clock=clock,
+        **kwargs,  # type: ignore[arg-type]
+    )
+    return workspaces, clock
+
+
+class TestRepositoryWorkspaces:
+    """Test suite for RepositoryWorkspaces."""
+
+    def test_checkout_creates_worktree_at_head(
+        self, tmp_path: Path, origin: Path
+    ) -> None:
+        """A new worktree checks out the remote's HEAD."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+
+        workspace = workspaces.checkout("owner", "repo", "wf-1")
+
+        assert workspace.commit == _git(origin, "rev-parse", "HEAD")
+        assert (workspace.path / "README.md").read_text() == "hello\n"
+        assert workspace.path.is_relative_to(tmp_path / "workspaces" / "worktrees")
+
+    def test_workflows_share_one_mirror(self, tmp_path: Path, origin: Path) -> None:
+        """Only the first checkout of a repository clones it."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+
+        with patch.object(workspaces, "_git", wraps=workspaces._git) as git:
+            first = workspaces.checkout("owner", "repo", "wf-1")
+            second = workspaces.checkout("owner", "repo", "wf-2")
+
+        commands = [call.args[1] for call in git.call_args_list]
+        assert commands.count("clone") == 1
+        assert "fetch" not in commands
+        assert first.path != second.path
+        assert workspaces.stats().mirrors == 1
+        assert workspaces.stats().worktrees == 2
+
+    def test_existing_worktree_keeps_local_changes(
+        self, tmp_path: Path, origin: Path
+    ) -> None:
+        """A workflow gets back its own worktree as it left it."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+        workspace = workspaces.checkout("owner", "repo", "wf-1")
+        (workspace.path / "notes.txt").write_text("work in progress")
+
+        again = workspaces.checkout("owner", "repo", "wf-1")
+
+        assert again.path == workspace.path
+        assert (again.path / "notes.txt").read_text() == "work in progress"
+
+    def test_missing_ref_fetches_mirror(self, tmp_path: Path, origin: Path) -> None:
+        """A ref not yet in the mirror is fetched even within the interval."""
+        workspaces, _ = _workspaces(tmp_path, origin, fetch_interval_seconds=3600)
+        workspaces.checkout("owner", "repo", "wf-1")
+        sha = _commit(origin, "feature.py", "print('new')\n")
+
+        workspace = workspaces.checkout("owner", "repo", "wf-2", ref=sha)
+
+        assert workspace.commit == sha
+        assert (workspace.path / "feature.py").exists()
+
+    def test_pull_request_refs_are_not_mirrored(
+        self, tmp_path: Path, origin: Path
+    ) -> None:
+        """Only branches and tags are mirrored; a PR head is fetched by ID."""
+        _git(origin, "checkout", "--quiet", "-b", "contributor")
+        pr_head = _commit(origin, "patch.py", "print('pr')\n")
+        _git(origin, "checkout", "--quiet", "main")
+        _git(origin, "update-ref", "refs/pull/1/head", pr_head)
+        _git(origin, "branch", "--quiet", "-D", "contributor")
+        _git(origin, "tag", "v1")
+        workspaces, clock = _workspaces(tmp_path, origin)
+
+        workspaces.checkout("owner", "repo", "wf-1")
+        clock.now += 3600
+        workspace = workspaces.checkout("owner", "repo", "wf-2", ref=pr_head)
+
+        mirror = tmp_path / "workspaces" / "mirrors" / "owner" / "repo.git"
+        refs = _git(mirror, "for-each-ref", "--format=%(refname)").splitlines()
+        assert refs == ["refs/heads/main", "refs/tags/v1"]
+        assert workspace.commit == pr_head
+
+    def test_stale_mirror_is_fetched(self, tmp_path: Path, origin: Path) -> None:
+        """The default branch is refreshed once the fetch interval has passed."""
+        workspaces, clock = _workspaces(tmp_path, origin, fetch_interval_seconds=60)
+        workspaces.checkout("owner", "repo", "wf-1")
+        sha = _commit(origin, "feature.py", "print('new')\n")
+
+        stale = workspaces.checkout("owner", "repo", "wf-2")
+        clock.now += 60
+        fresh = workspaces.checkout("owner", "repo", "wf-3")
+
+        assert stale.commit != sha
+        assert fresh.commit == sha
+
+    def test_unknown_ref_raises(self, tmp_path: Path, origin: Path) -> None:
+        """A ref the remote does not have either is reported as a git error."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+
+        with pytest.raises(GitCommandError, match="no-such-branch"):
+            workspaces.checkout("owner", "repo", "wf-1", ref="no-such-branch")
+
+    def test_evicts_least_recently_used_worktree(
+        self, tmp_path: Path, origin: Path
+    ) -> None:
+        """Over the worktree limit, the oldest idle worktree goes first."""
+        workspaces, clock = _workspaces(tmp_path, origin, max_worktrees=2)
+        first = workspaces.checkout("owner", "repo", "wf-1")
+        clock.now += 1
+        second = workspaces.checkout("owner", "repo", "wf-2")
+        clock.now += 1
+        workspaces.checkout("owner", "repo", "wf-1")
+        clock.now += 1
+
+        workspaces.checkout("owner", "repo", "wf-3")
+
+        assert first.path.exists()
+        assert not second.path.exists()
+        assert workspaces.stats().evictions == 1
+        assert "wf-2" not in _git(first.path, "worktree", "list")
+
+    def test_leased_worktree_is_not_evicted(self, tmp_path: Path, origin: Path) -> None:
+        """A lease protects a worktree even when it is the oldest."""
+        workspaces, clock = _workspaces(tmp_path, origin, max_worktrees=1)
+
+        with workspaces.lease("owner", "repo", "wf-1") as leased:
+            clock.now += 1
+            other = workspaces.checkout("owner", "repo", "wf-2")
+
+            assert leased.path.exists()
+            assert other.path.exists()
+            assert workspaces.stats().leased == 1
+
+        # Over the limit once the lease ends: the older worktree goes.
+        assert not leased.path.exists()
+        assert other.path.exists()
+
+    def test_byte_quota_evicts_worktrees_then_unused_mirrors(
+        self, tmp_path: Path, origin: Path
+    ) -> None:
+        """Exceeding the disk quota frees idle worktrees and their mirrors."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+        workspace = workspaces.checkout("owner", "repo", "wf-1")
+        workspaces._max_bytes = 0
+
+        workspaces._enforce_quota()
+
+        assert not workspace.path.exists()
+        assert workspaces.stats() == WorkspaceStats(
+            mirrors=0, worktrees=0, leased=0, bytes_used=0, evictions=2
+        )
+
+    def test_worktree_leased_after_selection_is_not_evicted(
+        self, tmp_path: Path, origin: Path
+    ) -> None:
+        """A lease starting while a victim is being evicted saves it."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+        workspace = workspaces.checkout("owner", "repo", "wf-1")
+        workspaces._max_bytes = 0
+        mirror_lock = workspaces._mirror_lock
+
+        def lease_first(mirror: Path) -> threading.Lock:
+            # Runs after the victim was chosen, before it is removed.
+            workspaces._leases[workspace.path] = 1
+            return mirror_lock(mirror)
+
+        with patch.object(workspaces, "_mirror_lock", side_effect=lease_first):
+            workspaces._enforce_quota()
+
+        assert workspace.path.exists()
+        assert workspaces.stats().evictions == 0
+
+    def test_remove_deletes_worktree(self, tmp_path: Path, origin: Path) -> None:
+        """Removing a worktree unregisters it from the mirror."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+        workspace = workspaces.checkout("owner", "repo", "wf-1")
+
+        workspaces.remove("owner", "repo", "wf-1")
+
+        assert not workspace.path.exists()
+        assert workspaces.stats().worktrees == 0
+        assert workspaces.checkout("owner", "repo", "wf-1").path == workspace.path
+
+    def test_picks_up_existing_root(self, tmp_path: Path, origin: Path) -> None:
+        """A new manager reuses mirrors and worktrees already on disk."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+        workspace = workspaces.checkout("owner", "repo", "wf-1")
+
+        restarted, _ = _workspaces(tmp_path, origin)
+
+        stats = restarted.stats()
+        assert (stats.mirrors, stats.worktrees) == (1, 1)
+        assert stats.bytes_used > 0
+        assert restarted.checkout("owner", "repo", "wf-1").path == workspace.path
+
+    def test_unsafe_names_stay_inside_root(self, tmp_path: Path, origin: Path) -> None:
+        """Workflow IDs cannot escape the workspace root."""
+        workspaces, _ = _workspaces(tmp_path, origin)
+
+        workspace = workspaces.checkout("owner", "repo", "../../escape")
+
+        assert workspace.path.parent == (
+            tmp_path / "workspaces" / "worktrees" / "owner" / "repo"
+        )